@@ -0,0 +1,145 @@
+"""Benchmark of the antiscam features extraction over the messages of a training CSV file
+
+Compare the eager construction of a `Message`, which computed every feature with separate passes over the text,
+to the single-pass `get_text_features` and the lazy features of `Message.from_raw`, and check that both produce
+exactly the same features for every message.
+Run it from the repository root: `python -m benchmarks.antiscam_features messages.csv`"""
+
+import argparse
+import csv
+import os
+import sys
+import time
+from collections import Counter
+from typing import Callable
+
+from modules.antiscam.model import AntiScamAgent
+from modules.antiscam.model.classes import Message, get_avg_word_len, get_mentions_count, get_text_features
+from modules.antiscam.model.normalization import normalize
+from modules.antiscam.model.similarities import check_message
+from modules.antiscam.src.inference import MIN_WORDS_COUNT
+
+FEATURES = ("normd_message", "contains_everyone", "url_score", "mentions_count", "max_frequency", "punctuation_count",
+            "caps_percentage", "avg_word_len")
+
+
+# features extraction as it was before the single-pass one, used as the reference
+def old_get_max_frequency(msg: str):
+    counter = Counter(msg.replace(' ', '').lower())
+    s = sum(counter.values())
+    return round(max(v/s for v in counter.values()), 5)
+
+def old_get_punctuation_count(msg: str):
+    counter = 0
+    for c in msg:
+        if c in {'.', '!', '?'}:
+            counter += 1
+    return counter
+
+def old_get_caps_frequency(msg: str):
+    counter = 0
+    for c in msg:
+        if c != c.lower():
+            counter += 1
+    return round(counter / len(msg), 5)
+
+def old_get_text_features(raw_message: str):
+    return ("@everyone" in raw_message, old_get_max_frequency(raw_message), old_get_punctuation_count(raw_message),
+            old_get_caps_frequency(raw_message))
+
+def old_from_raw(raw_message: str, mentions_count: int, websites_reference: dict[str, bool]):
+    normd_message = normalize(raw_message)
+    contains_everyone = "@everyone" in raw_message
+    url_score = check_message(raw_message, websites_reference)
+    max_frequency = old_get_max_frequency(raw_message)
+    punctuation_count = old_get_punctuation_count(raw_message)
+    caps_percentage = old_get_caps_frequency(raw_message)
+    avg_word_len = get_avg_word_len(normd_message)
+    return Message(raw_message, normd_message, contains_everyone, url_score, mentions_count, max_frequency, punctuation_count,
+                   caps_percentage, avg_word_len, 0)
+
+
+def read_messages(filepath: str, column: str) -> list[str]:
+    "Read the non-empty messages of a CSV file"
+    with open(filepath, 'r', encoding="utf-8", newline='') as csv_file:
+        reader = csv.DictReader(csv_file)
+        if reader.fieldnames is None or column not in reader.fieldnames:
+            sys.exit(f"No {column!r} column in {filepath}, available columns: {reader.fieldnames}")
+        return [row[column] for row in reader if row[column]]
+
+def read_websites(filepath: str | None) -> dict[str, bool]:
+    "Read the websites list used to score the URLs, if any"
+    if filepath is None or not os.path.isfile(filepath):
+        print("No websites list found, URLs are scored without known domains")
+        return {}
+    agent = AntiScamAgent.__new__(AntiScamAgent)
+    agent.fetch_websites_locally(filepath)
+    return agent.websites_list
+
+def time_function(messages: list[str], function: Callable[[str], object], repeat: int) -> float:
+    "Return the best total duration of a function called on every message, in seconds"
+    durations: list[float] = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for message in messages:
+            function(message)
+        durations.append(time.perf_counter() - start)
+    return min(durations)
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n", maxsplit=1)[0])
+    parser.add_argument("csv_path", help="CSV file of the training messages, with a header row")
+    parser.add_argument("--column", default="message", help="Column of the raw messages text")
+    parser.add_argument("--websites", default=AntiScamAgent.WEBSITES_FILEPATH,
+                        help="CSV file of the known websites, used to score the URLs")
+    parser.add_argument("--repeat", type=int, default=3, help="Number of timed runs, the best one is kept")
+    args = parser.parse_args()
+
+    messages = read_messages(args.csv_path, args.column)
+    websites = read_websites(args.websites)
+    mentions = {message: get_mentions_count(message) for message in messages}
+    print(f"{len(messages)} messages read from {args.csv_path}")
+
+    # check that the features are identical, and load the lazy resources (like the nltk data) before timing
+    mismatches = 0
+    for message in messages:
+        old = old_from_raw(message, mentions[message], websites)
+        new = Message.from_raw(message, mentions[message], websites)
+        old_features = {feature: getattr(old, feature) for feature in FEATURES}
+        new_features = {feature: getattr(new, feature) for feature in FEATURES}
+        if old_features != new_features or tuple(get_text_features(message)) != old_get_text_features(message):
+            mismatches += 1
+            if mismatches <= 5:
+                differences = {key: (value, new_features[key])
+                               for key, value in old_features.items() if value != new_features[key]}
+                print(f"Different features for {message[:80]!r}: {differences}")
+    if mismatches:
+        print(f"{mismatches} messages have different features")
+        sys.exit(1)
+    print("Every message has identical features\n")
+
+    def inference_path(message: str):
+        # like analyze_message: the URL score and the average word length are only needed for long enough messages
+        features = Message.from_raw(message, mentions[message], websites)
+        if len(features.normd_message.split()) >= MIN_WORDS_COUNT:
+            _ = features.url_score, features.avg_word_len
+
+    def all_features(message: str):
+        features = Message.from_raw(message, mentions[message], websites)
+        _ = features.normd_message, features.url_score, features.avg_word_len
+
+    cases = (
+        ("cheap features, separate passes", old_get_text_features),
+        ("cheap features, get_text_features", get_text_features),
+        ("eager Message construction", lambda message: old_from_raw(message, mentions[message], websites)),
+        ("lazy Message, inference path", inference_path),
+        ("lazy Message, every feature", all_features),
+    )
+    print(f"{'Case':<40} {'Total (ms)':>11} {'Per message (µs)':>17}")
+    for name, function in cases:
+        duration = time_function(messages, function, args.repeat)
+        print(f"{name:<40} {duration * 1000:>11.1f} {duration / len(messages) * 1e6:>17.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,101 @@
+"""Micro-benchmark of the SQL tracing overhead added to every database query
+
+Time the `_log_query` and `_save_execution_time` steps of a query with tracing disabled, with the slow queries log,
+and with tracing enabled, for statements already fingerprinted and for new ones (like queries on per-guild tables).
+No database is needed: the queries are formatted by a MySQL cursor which is never connected.
+Run it from the repository root: `python -m benchmarks.sql_profiler_overhead`"""
+
+import argparse
+import asyncio
+import io
+import logging
+import time
+from types import SimpleNamespace
+from typing import Callable
+
+from mysql.connector.connection import MySQLConnection, MySQLCursor
+from mysql.connector.conversion import MySQLConverter
+
+from core.database.query.db_read_query import DatabaseReadQuery
+from core.database.query.profiler import SqlProfiler, get_query_fingerprint
+
+QUERIES: tuple[tuple[str, tuple | dict], ...] = (
+    ("SELECT `xp` FROM `xp` WHERE `userID` = %s AND `banned` = %s", (123456789012345678, False)),
+    ("SELECT `value` FROM `serverconfig` WHERE `guild_id` = %s AND `option_name` = %s AND `beta` = %s",
+     (987654321098765432, "anti_scam", False)),
+    ("INSERT INTO `xp` (`userID`,`xp`) VALUES (%(u)s, %(x)s) ON DUPLICATE KEY UPDATE xp = xp + %(x)s;",
+     {"u": 123456789012345678, "x": 12}),
+)
+
+
+def create_connection() -> MySQLConnection:
+    "Create a connection object able to format queries, but never connected to a server"
+    cnx = MySQLConnection()
+    # these are usually set when connecting
+    cnx.converter_class = MySQLConverter
+    cnx._sql_mode = "" # pylint: disable=protected-access
+    return cnx
+
+def create_queries(profiler: SqlProfiler, new_statements: bool, count: int) -> list[DatabaseReadQuery]:
+    "Create the queries to run the benchmark on, with a fake bot and a disconnected cursor"
+    stats_cog = SimpleNamespace(sql_performance_records=[])
+    bot = SimpleNamespace(sql_profiler=profiler, get_cog=lambda name: stats_cog if name == "BotStats" else None)
+    cnx = create_connection()
+    cursor = MySQLCursor(cnx)
+    queries: list[DatabaseReadQuery] = []
+    for index in range(count):
+        if new_statements:
+            # a table named after a guild ID, never seen before by the fingerprints cache
+            query, args = f"SELECT `xp` FROM `{10**17 + index}` WHERE `userID` = %s", (123456789012345678,)
+        else:
+            query, args = QUERIES[index % len(QUERIES)]
+        db_query = DatabaseReadQuery(bot, cnx, query, args)
+        db_query.cursor = cursor
+        queries.append(db_query)
+    return queries
+
+async def time_step(queries: list[DatabaseReadQuery], step: Callable[[DatabaseReadQuery], object]) -> float:
+    "Run a step of every query, and return its average duration in microseconds"
+    start = time.perf_counter()
+    for query in queries:
+        await step(query)
+    return (time.perf_counter() - start) / len(queries) * 1e6
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n", maxsplit=1)[0])
+    parser.add_argument("--iterations", type=int, default=20_000, help="Number of queries timed for each case")
+    args = parser.parse_args()
+
+    # write the debug logs somewhere, as a tracing bot would
+    logger = logging.getLogger("bot.sql")
+    logger.setLevel(logging.DEBUG)
+    logger.addHandler(logging.StreamHandler(io.StringIO()))
+    logger.propagate = False
+
+    cases = (
+        ("tracing disabled", False, None, False),
+        ("tracing disabled, slow queries log", False, 1000.0, False),
+        ("tracing enabled", True, None, False),
+        ("tracing enabled, new statements", True, None, True),
+    )
+    print(f"{'Case':<40} {'_log_query (µs)':>16} {'_save_execution_time (µs)':>26}")
+    for name, enabled, threshold, new_statements in cases:
+        get_query_fingerprint.cache_clear()
+        profiler = SqlProfiler()
+        profiler.enabled = enabled
+        profiler.slow_query_threshold_ms = threshold
+        queries = create_queries(profiler, new_statements, args.iterations)
+        log_duration = await time_step(queries, lambda query: query._log_query()) # pylint: disable=protected-access
+        if new_statements:
+            # the fingerprints computed by the previous step are not cached in production
+            get_query_fingerprint.cache_clear()
+        start_time = time.perf_counter()
+        save_duration = await time_step(
+            queries,
+            lambda query: query._save_execution_time(start_time) # pylint: disable=protected-access
+        )
+        print(f"{name:<40} {log_duration:>16.2f} {save_duration:>26.2f}")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
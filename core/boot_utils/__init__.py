@@ -1,10 +1,12 @@
 from .args_parser import setup_start_parser
 from .load_cogs import load_cogs
 from .logs_setup import set_beta_logs, setup_logger
+from .startup_timeline import StartupTimeline
 
 __all__ = [
     "setup_start_parser",
     "load_cogs",
     "setup_logger",
-    "set_beta_logs"
+    "set_beta_logs",
+    "StartupTimeline",
 ]
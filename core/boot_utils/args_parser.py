@@ -12,5 +12,11 @@ def setup_start_parser():
                         action="store_false", dest="rss_features")
     parser.add_argument("--count-open-files", help="Count the number of files currently opened by the process",
                         action="store_true", dest="count_open_files")
+    parser.add_argument("--prewarm-imports", help="Load the heavy optional libraries in background once the bot is ready",
+                        action="store_true", dest="prewarm_imports")
+    parser.add_argument("--sql-trace", help="Log every SQL query and profile their latency",
+                        action="store_true", dest="sql_trace")
+    parser.add_argument("--slow-query-threshold", type=float, metavar="MS", dest="slow_query_threshold",
+                        help="Log the SQL queries taking longer than this number of milliseconds")
 
     return parser
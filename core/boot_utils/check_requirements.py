@@ -1,5 +1,5 @@
-import os
 import sys
+from importlib import metadata
 
 from packaging.requirements import InvalidRequirement, Requirement
 from packaging.version import Version
@@ -36,27 +36,19 @@ def _get_requirements_from_file(filepath: str):
 
 def _check_requirements_versions(requirements: list[Requirement]):
     "Check if the requirements are correctly installed"
-    # list installed packages
-    lst = os.popen("pip list --format=freeze")
-    pack_list = lst.read().split("\n")
-    # map installed packages to their parsed version
-    packages_map: dict[str, Version] = {}
-    for pack in pack_list:
-        if not pack.strip():
-            continue
-        pack_name, raw_version = pack.split("==")
-        packages_map[pack_name.lower()] = Version(raw_version)
-    # check if requirements are installed
     all_satisfied = True
     for req in requirements:
         req_name = req.name.lower()
-        if req_name not in packages_map:
+        # read the installed version from the package metadata
+        try:
+            installed_version = Version(metadata.version(req.name))
+        except metadata.PackageNotFoundError:
             print(f"⚠️ \033[33m{req_name} is not installed.\033[0m")
             all_satisfied = False
             continue
-        if not req.specifier.contains(packages_map[req_name]):
+        if not req.specifier.contains(installed_version):
             print(f"⚠️ \033[33m{req_name} is not correctly installed.\033[0m")
             print(f"\t\033[33m{req_name} {req.specifier} is required.\033[0m")
-            print(f"\t\033[33m{req_name} {packages_map[req_name]} is installed.\033[0m")
+            print(f"\t\033[33m{req_name} {installed_version} is installed.\033[0m")
             all_satisfied = False
     return all_satisfied
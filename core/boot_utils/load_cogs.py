@@ -1,15 +1,22 @@
+import asyncio
 import sys
+import time
 from typing import TYPE_CHECKING
 
 import discord
 from LRFutils import progress
 
+from .startup_timeline import OVERLAPPING_COG_CATEGORY, StartupTimeline
+
 if TYPE_CHECKING:
     from core.bot_classes import Axobot
 
+# modules loaded before every other one, as the others use them
+FIRST_MODULES = ("languages",)
+
 
-async def load_cogs(bot: "Axobot"):
-    "Load the bot modules"
+async def load_cogs(bot: "Axobot", timeline: StartupTimeline | None = None):
+    "Load the bot modules, and record their loading time in the startup timeline if given"
     initial_modules = [
         "languages",
         "admin",
@@ -59,18 +66,42 @@ async def load_cogs(bot: "Axobot"):
     )
 
     # load utilities core cog
+    start = time.perf_counter()
     await bot.load_extension("core.utilities")
+    if timeline:
+        timeline.record("core.utilities", start, "cog")
 
-    # Here we load our extensions (cogs) listed above in [initial_extensions]
-    count = 0
-    for i, module_name in enumerate(initial_modules):
-        progress_bar(i)
+    loaded_count = 0
+    async def load_module(module_name: str, category: str):
+        nonlocal loaded_count
+        start = time.perf_counter()
         try:
             await bot.load_module(module_name)
-        except discord.DiscordException:
-            bot.log.critical("Failed to load extension %s", module_name, exc_info=True)
-            count += 1
-        if count > 0:
-            bot.log.critical("%s modules not loaded\nEnd of program", count)
+        finally:
+            if timeline:
+                timeline.record(module_name, start, category)
+            loaded_count += 1
+            progress_bar(loaded_count)
+
+    # modules don't depend on each other when loading, except on the ones loaded first:
+    # the other ones are loaded concurrently
+    failed_modules: list[str] = []
+    first_modules = [module_name for module_name in initial_modules if module_name in FIRST_MODULES]
+    other_modules = [module_name for module_name in initial_modules if module_name not in FIRST_MODULES]
+    for modules_group in (first_modules, other_modules):
+        # durations of modules loaded together are not their own loading cost
+        category = "cog" if len(modules_group) == 1 else OVERLAPPING_COG_CATEGORY
+        results = await asyncio.gather(
+            *(load_module(module_name, category) for module_name in modules_group),
+            return_exceptions=True
+        )
+        for module_name, result in zip(modules_group, results):
+            if isinstance(result, discord.DiscordException):
+                bot.log.critical("Failed to load extension %s", module_name, exc_info=result)
+                failed_modules.append(module_name)
+            elif isinstance(result, BaseException):
+                raise result
+        if failed_modules:
+            bot.log.critical("%s modules not loaded\nEnd of program", len(failed_modules))
             sys.exit()
     progress_bar(len(initial_modules), stop=True)
@@ -0,0 +1,62 @@
+import time
+from contextlib import contextmanager
+from typing import NamedTuple
+
+# steps run concurrently with other ones, whose duration includes the time spent waiting for the others
+OVERLAPPING_COG_CATEGORY = "cog (overlap)"
+
+CATEGORIES_NOTES = {
+    OVERLAPPING_COG_CATEGORY: "wall-clock duration of modules loaded concurrently, overlapping each other: "
+                              "it includes the time spent waiting for the other modules, not only their own loading",
+}
+
+
+class TimelineEntry(NamedTuple):
+    "A step of the bot startup"
+    name: str
+    category: str
+    start: float
+    duration: float
+
+
+class StartupTimeline:
+    "Record the duration of each step of the bot startup, to find out what makes it slow"
+
+    def __init__(self):
+        self.origin = time.perf_counter()
+        self.entries: list[TimelineEntry] = []
+
+    @contextmanager
+    def phase(self, name: str, category: str = "phase"):
+        "Measure the duration of a startup step"
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.record(name, start, category)
+
+    def record(self, name: str, start: float, category: str = "phase"):
+        "Save a startup step which started at a given `time.perf_counter()` value, and ends now"
+        self.entries.append(TimelineEntry(name, category, start - self.origin, time.perf_counter() - start))
+
+    def format_table(self, category: str | None = None) -> str:
+        "Format the recorded steps as a text table, sorted by start time"
+        entries = sorted(
+            (entry for entry in self.entries if category is None or entry.category == category),
+            key=lambda entry: entry.start
+        )
+        name_width = max((len(entry.name) for entry in entries), default=4)
+        category_width = max((len(entry.category) for entry in entries), default=8)
+        category_width = max(category_width, 8)
+        lines = [
+            f"{'Step':<{name_width}}  {'Category':<{category_width}}  {'Start (s)':>9}  {'Duration (s)':>12}",
+            f"{'-' * name_width}  {'-' * category_width}  {'-' * 9}  {'-' * 12}",
+        ]
+        for entry in entries:
+            lines.append(
+                f"{entry.name:<{name_width}}  {entry.category:<{category_width}}  {entry.start:>9.3f}  {entry.duration:>12.3f}"
+            )
+        for entry_category in sorted({entry.category for entry in entries} & CATEGORIES_NOTES.keys()):
+            lines.append(f"{entry_category}: {CATEGORIES_NOTES[entry_category]}")
+        lines.append(f"Total startup time: {time.perf_counter() - self.origin:.3f}s")
+        return "\n".join(lines)
@@ -1,5 +1,6 @@
 from .axobot import Axobot
 from .consts import DISCORD_INVITE_REGEX, PRIVATE_GUILD_ID, SUPPORT_GUILD_ID
+from .message_facts import MessageFacts
 from .my_context import MyContext
 
 __all__ = [
@@ -7,5 +8,6 @@ __all__ = [
     "DISCORD_INVITE_REGEX",
     "PRIVATE_GUILD_ID",
     "SUPPORT_GUILD_ID",
+    "MessageFacts",
     "MyContext",
 ]
@@ -2,6 +2,7 @@ import asyncio
 import datetime
 import logging
 import sys
+import time
 from typing import (TYPE_CHECKING, Awaitable, Callable, Literal, Optional,
                     overload)
 
@@ -10,13 +11,15 @@ from aiohttp import ClientSession
 from discord.ext import commands
 
 from core.boot_utils.conf_loader import get_secrets_dict
-from core.database import DatabaseConnectionManager, DatabaseQueryHandler
+from core.database import DatabaseConnectionManager, DatabaseQueryHandler, SqlProfiler
 from core.emojis_manager import EmojisManager
 from core.tasks_handler import TaskHandler
 from core.tips import TipsManager
 
 from .bot_embeds_manager import send_log_embed
 from .consts import PRIVATE_GUILD_ID
+from .loop_lag_monitor import LoopLagMonitor
+from .message_facts import MessageAnalyzer
 from .my_context import MyContext
 
 if TYPE_CHECKING:
@@ -67,24 +70,35 @@ class Axobot(commands.bot.AutoShardedBot):
         self.db = DatabaseConnectionManager()
         self.db_main = DatabaseQueryHandler(self, "axobot")
         self.db_xp = DatabaseQueryHandler(self, "axobot-xp")
+        self.sql_profiler = SqlProfiler() # SQL queries tracing and latency profile
         self.log = logging.getLogger("bot") # logs module
         self.xp_enabled: bool = True # if xp is enabled
         self.rss_enabled: bool = True # if rss is enabled
         self.stats_enabled: bool = True # if the stats system is enabled (for grafana mainly)
         self.files_count_enabled: bool = False # if the files count stats system is enabled
         self.internal_loop_enabled: bool = True # if internal loop is enabled
+        self.prewarm_imports_enabled: bool = False # if heavy libraries should be loaded in background once ready
         self.zws = "\u200B"  # here's a zero width space
         self.secrets = get_secrets_dict() # other misc credentials
         self.zombie_mode: bool = zombie_mode # if we should listen without sending any message
         self.task_handler = TaskHandler(self)
         self.emojis_manager = EmojisManager(self)
         self.tips_manager = TipsManager(self)
+        self.message_analyzer = MessageAnalyzer(self)
+        self.loop_lag_monitor = LoopLagMonitor()
         self._options_list: dict[str, "AllRepresentation"] | None = None
         self._options_list_lock = asyncio.Lock()
         # app commands
         self.tree.on_error = self.on_app_cmd_error
         self.app_commands_list: Optional[list[discord.app_commands.AppCommand]] = None
 
+    async def setup_hook(self):
+        self.loop_lag_monitor.start()
+
+    async def close(self):
+        self.loop_lag_monitor.stop()
+        await super().close()
+
     async def on_error(self, event_method: Exception | str, *_args, **_kwargs):
         "Called when an event raises an uncaught exception"
         if isinstance(event_method, str) and event_method.startswith("on_") and event_method != "on_error":
@@ -92,6 +106,33 @@ class Axobot(commands.bot.AutoShardedBot):
             self.dispatch("error", error, f"While handling event `{event_method}`")
         # await super().on_error(event_method, *args, **kwargs)
 
+    async def on_message(self, message: discord.Message):
+        """Process commands, and analyze each new message once to send the result to the `on_message_facts` listeners
+        The analysis runs in the background, so that it doesn't delay the commands"""
+        if message.author == self.user:
+            # our own messages are never commands, and the listeners don't need their facts
+            self.dispatch("message_facts", message, self.message_analyzer.get_unanalyzed_facts(message))
+            return
+        ctx = await self.get_context(message)
+        self._schedule_event(self._analyze_message, "on_message_analysis", message, ctx)
+        if not message.author.bot:
+            await self.invoke(ctx)
+
+    async def _analyze_message(self, message: discord.Message, ctx: MyContext):
+        "Compute the facts of a new message, and send them to the `on_message_facts` listeners"
+        facts = await self.message_analyzer.analyze(message, ctx)
+        self.dispatch("message_facts", message, facts)
+
+    async def _run_event(self, coro, event_name: str, *args, **kwargs):
+        "Run an event listener, measuring how long it takes for the message listeners"
+        if event_name != MessageAnalyzer.EVENT_NAME:
+            return await super()._run_event(coro, event_name, *args, **kwargs)
+        start = time.perf_counter()
+        try:
+            await super()._run_event(coro, event_name, *args, **kwargs)
+        finally:
+            self.message_analyzer.record(coro.__qualname__, (time.perf_counter() - start) * 1000)
+
     async def on_app_cmd_error(self, interaction: discord.Interaction, error: discord.app_commands.AppCommandError):
         self.dispatch("interaction_error", interaction, error)
 
@@ -277,6 +318,14 @@ class Axobot(commands.bot.AutoShardedBot):
             return fake_tr
         return cog.tr
 
+    async def tr_many(self, source, string_ids: list[str], **kwargs) -> list[str]:
+        """Translate multiple strings for a same source, resolving its language only once"""
+        cog = self.get_cog("Languages")
+        if cog is None:
+            self.log.error("Unable to load Languages cog")
+            return ["en" if string_id == "_used_locale" else string_id for string_id in string_ids]
+        return await cog.tr_many(source, string_ids, **kwargs)
+
     async def send_embed(self, embeds: list[discord.Embed] | discord.Embed, url: str | None=None):
         """Send a list of embeds to a discord channel"""
         if isinstance(embeds, discord.Embed):
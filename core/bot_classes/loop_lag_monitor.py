@@ -0,0 +1,137 @@
+import asyncio
+import os
+import time
+from dataclasses import dataclass
+from types import CoroutineType
+from typing import Any
+
+from .message_facts import ListenerTimings
+
+# time between two loop latency samples
+SAMPLING_INTERVAL = 0.5
+# callbacks blocking the loop longer than this are attributed to their source
+SLOW_CALLBACK_THRESHOLD_MS = 50
+# maximum number of distinct slow callbacks sources kept in the report
+MAX_OFFENDERS = 500
+
+_MODULES_DIR = os.path.join(os.getcwd(), "modules") + os.sep
+_ORIGINAL_HANDLE_RUN = asyncio.events.Handle._run # pylint: disable=protected-access
+
+
+@dataclass(slots=True)
+class SlowCallbacksStats:
+    "How many times and how long a source blocked the event loop"
+    count: int = 0
+    total_ms: float = 0.0
+    max_ms: float = 0.0
+
+    def record(self, duration_ms: float):
+        "Add a new blocking duration"
+        self.count += 1
+        self.total_ms += duration_ms
+        self.max_ms = max(self.max_ms, duration_ms)
+
+
+def _get_coroutine_label(coro: Any) -> str | None:
+    """Find the outermost bot module function in a chain of awaiting coroutines,
+    which is the listener, command or task loop responsible for it"""
+    first_label: str | None = None
+    while isinstance(coro, CoroutineType):
+        if first_label is None:
+            first_label = coro.__qualname__
+        if coro.cr_code.co_filename.startswith(_MODULES_DIR):
+            return coro.__qualname__
+        coro = coro.cr_await
+    return first_label
+
+def get_callback_label(handle: asyncio.Handle) -> str:
+    "Get a readable name of the code run by an event loop callback"
+    # pylint: disable=protected-access
+    callback = handle._callback
+    task = getattr(callback, "__self__", None)
+    if isinstance(task, asyncio.Task):
+        coro_label = _get_coroutine_label(task.get_coro())
+        task_name = task.get_name()
+        if coro_label is None or coro_label in task_name:
+            return task_name
+        if task_name.startswith("Task-"):
+            return coro_label
+        return f"{coro_label} ({task_name})"
+    return getattr(callback, "__qualname__", None) or repr(callback)
+
+
+class LoopLagMonitor:
+    """Measure how late the event loop runs its callbacks, and find out which code blocks it
+
+    A background task regularly measures how late it is woken up, and every loop callback taking more than
+    SLOW_CALLBACK_THRESHOLD_MS is attributed to the listener, command or task loop it comes from.
+    The only cost for other callbacks is two clock reads."""
+
+    def __init__(self):
+        self.lag_timings = ListenerTimings()
+        self.slow_callbacks_count = 0
+        # source label -> slow callbacks stats, since the monitor started
+        self.offenders: dict[str, SlowCallbacksStats] = {}
+        self._sampling_task: asyncio.Task | None = None
+
+    @property
+    def is_running(self):
+        return self._sampling_task is not None and not self._sampling_task.done()
+
+    def start(self):
+        "Start sampling the loop latency and watching for slow callbacks"
+        if self.is_running:
+            return
+        self._sampling_task = asyncio.create_task(self._sample_lag(), name="loop-lag-monitor")
+        monitor = self
+        threshold = SLOW_CALLBACK_THRESHOLD_MS / 1000
+
+        def timed_run(handle: asyncio.Handle):
+            start = time.perf_counter()
+            _ORIGINAL_HANDLE_RUN(handle)
+            duration = time.perf_counter() - start
+            if duration >= threshold:
+                monitor.record_slow_callback(handle, duration * 1000)
+
+        asyncio.events.Handle._run = timed_run # pylint: disable=protected-access
+
+    def stop(self):
+        "Stop the monitor"
+        asyncio.events.Handle._run = _ORIGINAL_HANDLE_RUN # pylint: disable=protected-access
+        if self._sampling_task is not None:
+            self._sampling_task.cancel()
+            self._sampling_task = None
+
+    async def _sample_lag(self):
+        "Measure how late the loop wakes up this task"
+        while True:
+            expected = time.perf_counter() + SAMPLING_INTERVAL
+            await asyncio.sleep(SAMPLING_INTERVAL)
+            self.lag_timings.record(max(time.perf_counter() - expected, 0.0) * 1000)
+
+    def record_slow_callback(self, handle: asyncio.Handle, duration_ms: float):
+        "Attribute a slow callback to its source"
+        try:
+            label = get_callback_label(handle)
+        except Exception: # pylint: disable=broad-except
+            label = "unknown"
+        self.slow_callbacks_count += 1
+        if (stats := self.offenders.get(label)) is None:
+            if len(self.offenders) >= MAX_OFFENDERS:
+                return
+            stats = self.offenders[label] = SlowCallbacksStats()
+        stats.record(duration_ms)
+
+    def pop_stats(self) -> tuple[ListenerTimings, int]:
+        "Get the loop lag timings and the number of slow callbacks since the last call, and reset them"
+        timings, self.lag_timings = self.lag_timings, ListenerTimings()
+        count, self.slow_callbacks_count = self.slow_callbacks_count, 0
+        return timings, count
+
+    def get_top_offenders(self, limit: int = 10) -> list[tuple[str, SlowCallbacksStats]]:
+        "Get the sources which blocked the loop the longest in total"
+        return sorted(self.offenders.items(), key=lambda item: item[1].total_ms, reverse=True)[:limit]
+
+    def reset_offenders(self):
+        "Forget the recorded slow callbacks sources"
+        self.offenders = {}
@@ -0,0 +1,154 @@
+import bisect
+import re
+from dataclasses import dataclass, field
+from types import MappingProxyType
+from typing import TYPE_CHECKING, Any, Mapping
+
+import discord
+
+from .consts import DISCORD_INVITE_REGEX
+from .my_context import MyContext
+
+if TYPE_CHECKING:
+    from .axobot import Axobot
+
+# server config options read by the message listeners, fetched once per message
+MESSAGE_CONFIG_OPTIONS = (
+    "anti_caps_lock",
+    "anti_raid",
+    "anti_raid_ignored_roles",
+    "anti_scam",
+    "enable_events",
+    "enable_xp",
+    "noxp_channels",
+    "noxp_roles",
+    "poll_channels",
+    "xp_rate",
+    "xp_type",
+)
+
+CUSTOM_EMOJI_REGEX = re.compile(r"<a?:[\w-]+:(\d{17,19})>")
+LINK_REGEX = re.compile(r"https?://[^\s<>]+")
+
+# upper bounds (in ms) of the listeners timing histogram buckets
+TIMING_BUCKETS_MS = (1, 2, 5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000)
+
+
+@dataclass(frozen=True, slots=True)
+class MessageFacts:
+    "Everything the message listeners need to know about a message, computed once when it is received"
+    message: discord.Message
+    is_command: bool
+    # snapshot of MESSAGE_CONFIG_OPTIONS, empty for messages not sent by a guild member
+    config: Mapping[str, Any]
+    user_mentions: tuple[int, ...]
+    role_mentions: tuple[int, ...]
+    invites: tuple[str, ...]
+    links: tuple[str, ...]
+    custom_emojis: tuple[int, ...]
+    clean_content: str
+
+    @property
+    def guild(self):
+        return self.message.guild
+
+    @property
+    def author(self):
+        return self.message.author
+
+
+@dataclass(slots=True)
+class ListenerTimings:
+    "Histogram of the execution durations of a message listener"
+    buckets: list[int] = field(default_factory=lambda: [0] * (len(TIMING_BUCKETS_MS) + 1))
+    count: int = 0
+    total_ms: float = 0.0
+    max_ms: float = 0.0
+
+    def record(self, duration_ms: float):
+        "Add a new duration to the histogram"
+        self.buckets[bisect.bisect_left(TIMING_BUCKETS_MS, duration_ms)] += 1
+        self.count += 1
+        self.total_ms += duration_ms
+        self.max_ms = max(self.max_ms, duration_ms)
+
+    @property
+    def average_ms(self):
+        return self.total_ms / self.count if self.count else 0.0
+
+    def percentile(self, percent: float) -> float:
+        "Estimate a percentile from the histogram, as the upper bound of the matching bucket"
+        if self.count == 0:
+            return 0.0
+        threshold = self.count * percent / 100
+        cumulated = 0
+        for upper_bound, bucket_count in zip(TIMING_BUCKETS_MS, self.buckets):
+            cumulated += bucket_count
+            if cumulated >= threshold:
+                return float(upper_bound)
+        return self.max_ms
+
+
+class MessageAnalyzer:
+    """Compute the MessageFacts of new messages and keep track of how long each message listener takes
+
+    Listeners subscribe to the `message_facts` event, which is dispatched once per message by the bot"""
+
+    EVENT_NAME = "on_message_facts"
+
+    def __init__(self, bot: "Axobot"):
+        self.bot = bot
+        self.timings: dict[str, ListenerTimings] = {}
+
+    async def analyze(self, message: discord.Message, ctx: MyContext) -> MessageFacts:
+        "Compute the facts about a message"
+        content = message.content
+        return MessageFacts(
+            message=message,
+            is_command=ctx.command is not None,
+            config=MappingProxyType(await self._get_config_snapshot(message)),
+            user_mentions=tuple(message.raw_mentions),
+            role_mentions=tuple(message.raw_role_mentions),
+            invites=tuple(DISCORD_INVITE_REGEX.findall(content)),
+            links=tuple(LINK_REGEX.findall(content)),
+            custom_emojis=tuple(dict.fromkeys(int(emoji_id) for emoji_id in CUSTOM_EMOJI_REGEX.findall(content))),
+            clean_content=message.clean_content,
+        )
+
+    @staticmethod
+    def get_unanalyzed_facts(message: discord.Message) -> MessageFacts:
+        "Get empty facts for a message not worth analyzing, like the ones sent by the bot itself"
+        return MessageFacts(
+            message=message,
+            is_command=False,
+            config=MappingProxyType({}),
+            user_mentions=(),
+            role_mentions=(),
+            invites=(),
+            links=(),
+            custom_emojis=(),
+            clean_content=message.content,
+        )
+
+    async def _get_config_snapshot(self, message: discord.Message) -> dict[str, Any]:
+        "Fetch the config options used by the listeners, for messages sent by a guild member"
+        if not isinstance(message.author, discord.Member) or message.author.bot:
+            return {}
+        if cog := self.bot.get_cog("ServerConfig"):
+            if self.bot.database_online:
+                return await cog.get_options(message.guild, MESSAGE_CONFIG_OPTIONS)
+        return {
+            option: await self.bot.get_config(message.guild.id, option)
+            for option in MESSAGE_CONFIG_OPTIONS
+        }
+
+    def record(self, listener_name: str, duration_ms: float):
+        "Save the execution time of a listener"
+        if (timings := self.timings.get(listener_name)) is None:
+            timings = self.timings[listener_name] = ListenerTimings()
+        timings.record(duration_ms)
+
+    def pop_timings(self) -> dict[str, ListenerTimings]:
+        "Get the timings recorded since the last call, and reset them"
+        timings, self.timings = self.timings, {}
+        return timings
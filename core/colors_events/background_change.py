@@ -1,17 +1,27 @@
 from typing import TYPE_CHECKING
 
 from PIL import Image, ImageDraw, ImageFilter
-from rembg import new_session, remove
+
+from core.lazy_import import LazyValue, lazy_import
 
 if TYPE_CHECKING:
+    import rembg
+
     from core.colors_events.utils import ColorType
+else:
+    # rembg imports onnxruntime, which is heavy to load
+    rembg = lazy_import("rembg")
+
+# the model session is reused between calls, as loading it takes a few seconds
+BACKGROUND_SESSION = LazyValue("rembg u2netp session", lambda: rembg.new_session("u2netp"))
 
 
 async def get_background_mask(image: Image.Image) -> Image.Image:
     "Detect the image background and return the corresponding mask"
-    return remove(
+    session = await BACKGROUND_SESSION.get_async()
+    return rembg.remove(
         image,
-        session=new_session("u2netp"),
+        session=session,
         alpha_matting=True,
         only_mask=True
     )
@@ -1,7 +1,8 @@
 from .db_connection_manager import DatabaseConnectionManager
-from .query import DatabaseQueryHandler
+from .query import DatabaseQueryHandler, SqlProfiler
 
 __all__ = [
     "DatabaseConnectionManager",
     "DatabaseQueryHandler",
+    "SqlProfiler",
 ]
@@ -71,7 +71,14 @@ class DatabaseConnectionManager:
     def __create_connection(self, database: str) -> MySQLConnection:
         "Create a new connection to the database."
         self.__log.info("Opening new connection to database '%s'", database)
-        cnx = sql_connect(
+        cnx = self.open_connection(database)
+        self.__connections[database] = ConnectionDetails(cnx, int(time.time()))
+        return cnx
+
+    def open_connection(self, database: str) -> MySQLConnection:
+        """Open a new connection to the database, which is not shared with the rest of the bot
+        Used for long operations run in another thread, the caller must close it"""
+        return sql_connect(
             host=self.__database_keys["host"],
             user=self.__database_keys["user"],
             password=self.__database_keys["password"],
@@ -81,5 +88,3 @@ class DatabaseConnectionManager:
             collation="utf8mb4_unicode_ci",
             connection_timeout=5
         )
-        self.__connections[database] = ConnectionDetails(cnx, int(time.time()))
-        return cnx
@@ -1,5 +1,7 @@
 from .db_query_handler import DatabaseQueryHandler
+from .profiler import SqlProfiler
 
 __all__ = [
     "DatabaseQueryHandler",
+    "SqlProfiler",
 ]
@@ -33,7 +33,18 @@ class DatabaseAbstractQuery(ABC):
 
     async def _format_query(self):
         "Create a formatted query string from the query and its arguments."
-        await format_query(self.cursor, self.query, self.args)
+        return await format_query(self.cursor, self.query, self.args)
+
+    async def _log_query(self):
+        "Log the formatted query, only if SQL tracing is enabled"
+        if self.bot.sql_profiler.enabled:
+            self.log.debug("%s", await self._format_query())
 
     async def _save_execution_time(self, start_time: float):
-        await save_execution_time(self.bot, start_time)
+        "Save the query execution time, and log the query if it was slow"
+        delta_ms = await save_execution_time(self.bot, start_time)
+        profiler = self.bot.sql_profiler
+        if profiler.enabled:
+            profiler.record(self.query, delta_ms)
+        if profiler.is_slow(delta_ms):
+            self.log.warning("Slow query (%.1fms): %s", delta_ms, await self._format_query())
@@ -1,12 +1,13 @@
 import logging
 import sys
+import time
 from typing import TYPE_CHECKING, Self
 
 from mysql.connector import errors
 from mysql.connector.connection import MySQLConnection, MySQLCursor
 from mysql.connector.connection_cext import CMySQLConnection, CMySQLCursor
 
-from .utils import format_query
+from .utils import format_query, save_execution_time
 
 if TYPE_CHECKING:
     from core.bot_classes.axobot import Axobot
@@ -28,14 +29,22 @@ class DatabaseMutliQueries():
 
     async def __aexit__(self, exc_type, value, traceback):
         if self.cursor is not None:
-            self.cnx.commit()
+            # don't save half of the queries if one of them failed
+            if exc_type is None:
+                self.cnx.commit()
+            else:
+                self.cnx.rollback()
             self.cursor.close()
+            self.cursor = None
 
-    async def write(self, query: str, args: tuple | dict | None = None):
-        """Execute a write query, but delay the commit until the context manager exits"""
-        query_for_logs = await format_query(self.cursor, query, args)
-        self.log.debug("%s", query_for_logs)
+    async def write(self, query: str, args: tuple | dict | None = None) -> int:
+        """Execute a write query, but delay the commit until the context manager exits
+        Return the number of affected rows"""
+        profiler = self.bot.sql_profiler
+        if profiler.enabled:
+            self.log.debug("%s", await format_query(self.cursor, query, args))
 
+        start_time = time.perf_counter()
         try:
             self.cursor.execute(query, args)
         except errors.ProgrammingError as err:
@@ -43,3 +52,10 @@ class DatabaseMutliQueries():
             self.log.error("%s", self.cursor._executed, exc_info=True)
             await self.__aexit__(*sys.exc_info())
             raise err
+
+        delta_ms = await save_execution_time(self.bot, start_time)
+        if profiler.enabled:
+            profiler.record(query, delta_ms)
+        if profiler.is_slow(delta_ms):
+            self.log.warning("Slow query (%.1fms): %s", delta_ms, await format_query(self.cursor, query, args))
+        return self.cursor.rowcount
@@ -28,10 +28,9 @@ class DatabaseReadQuery(DatabaseAbstractQuery):
             dictionary=(not self.astuple)
         )
 
-        query_for_logs = await self._format_query()
-        self.log.debug("%s", query_for_logs)
+        await self._log_query()
 
-        start_time = time.time()
+        start_time = time.perf_counter()
 
         try:
             self.cursor.execute(self.query, self.args)
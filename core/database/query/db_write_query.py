@@ -23,10 +23,9 @@ class DatabaseWriteQuery(DatabaseAbstractQuery):
     async def __aenter__(self) -> int | None:
         self.cursor = self.cnx.cursor()
 
-        query_for_logs = await self._format_query()
-        self.log.debug("%s", query_for_logs)
+        await self._log_query()
 
-        start_time = time.time()
+        start_time = time.perf_counter()
 
         try:
             execute_result = self.cursor.execute(self.query, self.args, multi=self.multi)
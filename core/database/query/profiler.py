@@ -0,0 +1,102 @@
+import bisect
+import re
+from dataclasses import dataclass, field
+from functools import lru_cache
+
+# upper bounds (in ms) of the queries latency histogram buckets
+LATENCY_BUCKETS_MS = (0.25, 0.5, 1, 2, 5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000, 10000)
+
+# strings and comments are matched together, as each one can contain the delimiters of the other
+RE_STRINGS_AND_COMMENTS = re.compile(
+    r"(?P<string>'(?:[^'\\]|\\.|'')*'|\"(?:[^\"\\]|\\.|\"\")*\")|/\*.*?\*/|--[^\n]*|#[^\n]*",
+    re.DOTALL
+)
+RE_PLACEHOLDERS = re.compile(r"%\(\w+\)s|%s")
+RE_NUMBERS = re.compile(r"(?<![\w`.])\d+(?:\.\d+)?\b")
+# tables named after a guild ID, like in the xp database
+RE_NUMERIC_TABLES = re.compile(r"`\d+`")
+RE_VALUES_LIST = re.compile(r"\bVALUES\s*\(\s*\?(?:\s*,\s*\?)*\s*\)(?:\s*,\s*\(\s*\?(?:\s*,\s*\?)*\s*\))*", re.IGNORECASE)
+RE_IN_LIST = re.compile(r"\bIN\s*\(\s*\?(?:\s*,\s*\?)*\s*\)", re.IGNORECASE)
+RE_WHITESPACES = re.compile(r"\s+")
+
+
+def _replace_string_or_comment(match: re.Match[str]) -> str:
+    return '?' if match.group("string") is not None else ' '
+
+@lru_cache(maxsize=4096)
+def get_query_fingerprint(query: str) -> str:
+    """Normalize a query so that every execution of the same statement has the same fingerprint,
+    whatever its arguments or formatting"""
+    fingerprint = RE_STRINGS_AND_COMMENTS.sub(_replace_string_or_comment, query)
+    fingerprint = RE_PLACEHOLDERS.sub('?', fingerprint)
+    fingerprint = RE_NUMBERS.sub('?', fingerprint)
+    fingerprint = RE_NUMERIC_TABLES.sub("`?`", fingerprint)
+    fingerprint = RE_WHITESPACES.sub(' ', fingerprint).strip()
+    # lists of values have a variable length
+    fingerprint = RE_IN_LIST.sub("IN (...)", fingerprint)
+    fingerprint = RE_VALUES_LIST.sub("VALUES (...)", fingerprint)
+    return fingerprint
+
+
+@dataclass(slots=True)
+class QueryTimings:
+    "Number of executions and latency histogram of a query fingerprint"
+    buckets: list[int] = field(default_factory=lambda: [0] * (len(LATENCY_BUCKETS_MS) + 1))
+    count: int = 0
+    total_ms: float = 0.0
+    max_ms: float = 0.0
+
+    def record(self, duration_ms: float):
+        "Add a new duration to the histogram"
+        self.buckets[bisect.bisect_left(LATENCY_BUCKETS_MS, duration_ms)] += 1
+        self.count += 1
+        self.total_ms += duration_ms
+        self.max_ms = max(self.max_ms, duration_ms)
+
+    @property
+    def average_ms(self):
+        return self.total_ms / self.count if self.count else 0.0
+
+    def percentile(self, percent: float) -> float:
+        "Estimate a percentile from the histogram, as the upper bound of the matching bucket"
+        if self.count == 0:
+            return 0.0
+        threshold = self.count * percent / 100
+        cumulated = 0
+        for upper_bound, bucket_count in zip(LATENCY_BUCKETS_MS, self.buckets):
+            cumulated += bucket_count
+            if cumulated >= threshold:
+                return min(float(upper_bound), self.max_ms)
+        return self.max_ms
+
+
+class SqlProfiler:
+    """Tracing settings of the database queries, and latency profile of every executed statement
+
+    When tracing is disabled, queries are neither formatted for the debug logs nor profiled,
+    and only their duration is compared to the slow queries threshold."""
+
+    def __init__(self):
+        self.enabled = False
+        # queries taking longer than this are logged with their arguments, None to disable
+        self.slow_query_threshold_ms: float | None = None
+        self.timings: dict[str, QueryTimings] = {}
+
+    def record(self, query: str, duration_ms: float):
+        "Save the execution time of a query"
+        fingerprint = get_query_fingerprint(query)
+        if (timings := self.timings.get(fingerprint)) is None:
+            timings = self.timings[fingerprint] = QueryTimings()
+        timings.record(duration_ms)
+
+    def is_slow(self, duration_ms: float):
+        "Check if a query duration is above the slow queries threshold"
+        return self.slow_query_threshold_ms is not None and duration_ms >= self.slow_query_threshold_ms
+
+    def reset(self):
+        "Forget every recorded timing"
+        self.timings = {}
+
+    def get_top(self, limit: int = 10) -> list[tuple[str, QueryTimings]]:
+        "Get the fingerprints which took the most time in total"
+        return sorted(self.timings.items(), key=lambda item: item[1].total_ms, reverse=True)[:limit]
@@ -11,11 +11,13 @@ if TYPE_CHECKING:
     from core.bot_classes.axobot import Axobot
 
 
-async def save_execution_time(bot: "Axobot", start_time: float):
-    "Save the execution time of a query to the bot's stats cog."
+async def save_execution_time(bot: "Axobot", start_time: float) -> float:
+    """Save the execution time of a query (started at a given `time.perf_counter()` value) to the bot's stats cog
+    Return that execution time in ms"""
+    delta_ms = (time.perf_counter() - start_time) * 1000
     if cog := bot.get_cog("BotStats"):
-        delta_ms = (time.time() - start_time) * 1000
         cog.sql_performance_records.append(delta_ms)
+    return delta_ms
 
 async def format_query(cursor: MySQLCursor | CMySQLCursor, query: str, args: tuple | dict | None):
     "Create a formatted query string from the query and its arguments."
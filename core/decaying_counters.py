@@ -0,0 +1,70 @@
+import time
+from collections import OrderedDict
+from itertools import islice
+from typing import Generic, Hashable, TypeVar
+
+K = TypeVar("K", bound=Hashable)
+
+
+class DecayingCounters(Generic[K]):
+    """Integer counters which lose `decay_amount` every `decay_interval` seconds, until they reach 0
+
+    The decay is computed when a counter is read or updated, so no periodic task has to walk through every counter.
+    Counters back to 0 are forgotten, and the least recently updated ones are dropped when `max_size` is reached."""
+
+    __slots__ = ("decay_amount", "decay_interval", "max_size", "_counters")
+
+    def __init__(self, decay_amount: int, decay_interval: float, max_size: int = 100_000):
+        if decay_amount <= 0 or decay_interval <= 0:
+            raise ValueError("Decay amount and interval must be positive")
+        self.decay_amount = decay_amount
+        self.decay_interval = decay_interval
+        self.max_size = max_size
+        # key -> [value, time of the last decay step], from the least to the most recently updated
+        self._counters: OrderedDict[K, list[float]] = OrderedDict()
+
+    def __len__(self):
+        return len(self._counters)
+
+    def __contains__(self, key: K):
+        return self.get(key) > 0
+
+    def _apply_decay(self, key: K, entry: list[float], now: float) -> int:
+        "Update a counter with the decay steps elapsed since its last update, and return its new value"
+        steps = int((now - entry[1]) // self.decay_interval)
+        if steps:
+            entry[0] -= steps * self.decay_amount
+            entry[1] += steps * self.decay_interval
+            if entry[0] <= 0:
+                del self._counters[key]
+                return 0
+        return int(entry[0])
+
+    def get(self, key: K) -> int:
+        "Get the current value of a counter"
+        if (entry := self._counters.get(key)) is None:
+            return 0
+        return self._apply_decay(key, entry, time.monotonic())
+
+    def add(self, key: K, amount: int = 1) -> int:
+        "Increase a counter, and return its new value"
+        now = time.monotonic()
+        if (entry := self._counters.get(key)) is not None and self._apply_decay(key, entry, now) > 0:
+            entry[0] += amount
+            self._counters.move_to_end(key)
+        else:
+            entry = self._counters[key] = [amount, now]
+        self._remove_expired(now)
+        return int(entry[0])
+
+    def _remove_expired(self, now: float):
+        "Drop the oldest counters if they reached 0, or if there are too many counters"
+        while len(self._counters) > self.max_size:
+            self._counters.popitem(last=False)
+        # check a few of the least recently updated counters, to forget the idle ones without a full scan
+        for key in list(islice(self._counters, 2)):
+            self._apply_decay(key, self._counters[key], now)
+
+    def clear(self):
+        "Remove every counter"
+        self._counters.clear()
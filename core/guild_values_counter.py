@@ -0,0 +1,117 @@
+from collections import Counter
+from typing import Generic, Hashable, Iterable, TypeVar
+
+V = TypeVar("V", bound=Hashable)
+
+
+class GuildValuesCounter(Generic[V]):
+    """Histogram of values attached to guilds (like a config option value or the enabled logs kinds),
+    counting only the guilds where the bot currently is
+
+    It is loaded once from the database, then updated on every change, so reading it doesn't need any query.
+    Changes made before the initial loading are ignored, as the loading query will already include them."""
+
+    def __init__(self):
+        self.is_loaded = False
+        # guild ID -> values of this guild, including guilds where the bot isn't anymore
+        self._guilds_values: dict[int, Counter[V]] = {}
+        self._present_guilds: set[int] = set()
+        # values of the present guilds
+        self._histogram: Counter[V] = Counter()
+        # number of present guilds with at least one value
+        self._valued_guilds_count = 0
+
+    def load(self, rows: Iterable[tuple[int, V]], present_guilds: Iterable[int]):
+        "Build the histogram from (guild ID, value) rows"
+        self._guilds_values.clear()
+        self._histogram.clear()
+        self._valued_guilds_count = 0
+        self._present_guilds = set(present_guilds)
+        self.is_loaded = True
+        for guild_id, value in rows:
+            self.add(guild_id, value)
+
+    @property
+    def guilds_count(self):
+        "Number of guilds where the bot is"
+        return len(self._present_guilds)
+
+    def add(self, guild_id: int, value: V):
+        "Add a value to a guild"
+        if not self.is_loaded:
+            return
+        guild_values = self._guilds_values.setdefault(guild_id, Counter())
+        if guild_id in self._present_guilds:
+            if not guild_values:
+                self._valued_guilds_count += 1
+            self._histogram[value] += 1
+        guild_values[value] += 1
+
+    def discard(self, guild_id: int, value: V):
+        "Remove a value from a guild, if it was there"
+        if not self.is_loaded or (guild_values := self._guilds_values.get(guild_id)) is None or value not in guild_values:
+            return
+        guild_values[value] -= 1
+        if guild_values[value] == 0:
+            del guild_values[value]
+        if not guild_values:
+            del self._guilds_values[guild_id]
+        if guild_id in self._present_guilds:
+            self._decrement(value)
+            if not guild_values:
+                self._valued_guilds_count -= 1
+
+    def set(self, guild_id: int, value: V | None):
+        "Replace every value of a guild by a single one"
+        self.clear_guild(guild_id)
+        if value is not None:
+            self.add(guild_id, value)
+
+    def clear_guild(self, guild_id: int):
+        "Remove every value of a guild"
+        if not self.is_loaded or (guild_values := self._guilds_values.pop(guild_id, None)) is None:
+            return
+        if guild_id in self._present_guilds:
+            for value, count in guild_values.items():
+                self._decrement(value, count)
+            self._valued_guilds_count -= 1
+
+    def add_guild(self, guild_id: int):
+        "Start counting the values of a guild the bot joined"
+        if not self.is_loaded or guild_id in self._present_guilds:
+            return
+        self._present_guilds.add(guild_id)
+        if guild_values := self._guilds_values.get(guild_id):
+            self._histogram.update(guild_values)
+            self._valued_guilds_count += 1
+
+    def remove_guild(self, guild_id: int):
+        "Stop counting the values of a guild the bot left"
+        if not self.is_loaded or guild_id not in self._present_guilds:
+            return
+        self._present_guilds.discard(guild_id)
+        if guild_values := self._guilds_values.get(guild_id):
+            for value, count in guild_values.items():
+                self._decrement(value, count)
+            self._valued_guilds_count -= 1
+
+    def _decrement(self, value: V, count: int = 1):
+        self._histogram[value] -= count
+        if self._histogram[value] <= 0:
+            del self._histogram[value]
+
+    def get_histogram(self, ignored_guilds: Iterable[int] = ()) -> Counter[V]:
+        "Get the number of times each value is used in the present guilds, excepted in the ignored ones"
+        histogram = self._histogram.copy()
+        for guild_id in set(ignored_guilds):
+            if guild_id in self._present_guilds and (guild_values := self._guilds_values.get(guild_id)):
+                histogram.subtract(guild_values)
+        return +histogram
+
+    def get_guilds_without_value_count(self, ignored_guilds: Iterable[int] = ()) -> int:
+        "Get the number of present guilds without any value, excepted the ignored ones"
+        count = len(self._present_guilds) - self._valued_guilds_count
+        for guild_id in set(ignored_guilds):
+            if guild_id in self._present_guilds and guild_id not in self._guilds_values:
+                count -= 1
+        return count
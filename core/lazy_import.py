@@ -0,0 +1,95 @@
+import asyncio
+import importlib
+import logging
+import threading
+import time
+import weakref
+from types import ModuleType
+from typing import Any, Callable, Generic, TypeVar
+
+T = TypeVar("T")
+
+log = logging.getLogger("bot")
+
+
+class LazyValue(Generic[T]):
+    """A value built by `factory` the first time it is requested, like a heavy library import or a big object
+
+    The build is protected by a lock, so a value requested from several threads at once is only built once."""
+
+    __slots__ = ("name", "_factory", "_value", "_loaded", "_lock", "__weakref__")
+
+    def __init__(self, name: str, factory: Callable[[], T]):
+        self.name = name
+        self._factory = factory
+        self._value: T | None = None
+        self._loaded = False
+        self._lock = threading.Lock()
+        _REGISTRY.add(self)
+
+    @property
+    def is_loaded(self):
+        "Check if the value has already been built"
+        return self._loaded
+
+    def get(self) -> T:
+        "Get the value, building it if needed"
+        if not self._loaded:
+            with self._lock:
+                if not self._loaded:
+                    self._value = self._factory()
+                    self._loaded = True
+        return self._value
+
+    async def get_async(self) -> T:
+        "Get the value, building it in a separate thread if needed to avoid blocking the event loop"
+        if self._loaded:
+            return self._value
+        return await asyncio.to_thread(self.get)
+
+
+class LazyModule(ModuleType):
+    "A module proxy, which only imports the real module when one of its attributes is accessed"
+
+    def __init__(self, module_name: str):
+        super().__init__(module_name)
+        self.__lazy_value = LazyValue(module_name, lambda: importlib.import_module(module_name))
+
+    def __getattr__(self, attribute: str) -> Any:
+        # only called for attributes not found on the proxy itself
+        return getattr(self.__lazy_value.get(), attribute)
+
+    def __repr__(self):
+        state = "loaded" if self.__lazy_value.is_loaded else "not loaded"
+        return f"<lazy module {self.__name__!r} ({state})>"
+
+
+def lazy_import(module_name: str) -> Any:
+    """Get a proxy of a module, which will be imported on its first use
+    Use it behind a `TYPE_CHECKING` check to keep the type hints of the real module"""
+    return LazyModule(module_name)
+
+
+# every lazy value still in use, to be able to pre-warm them
+_REGISTRY: "weakref.WeakSet[LazyValue]" = weakref.WeakSet()
+
+def _prewarm_all() -> tuple[int, float]:
+    "Build every lazy value not loaded yet, and return how many were built and how long it took"
+    start = time.perf_counter()
+    count = 0
+    for lazy_value in list(_REGISTRY):
+        if lazy_value.is_loaded:
+            continue
+        try:
+            lazy_value.get()
+        except Exception as err: # pylint: disable=broad-except
+            log.warning("Could not pre-warm %s: %s", lazy_value.name, err)
+            continue
+        count += 1
+    return count, time.perf_counter() - start
+
+async def prewarm_lazy_values():
+    "Build every lazy value in a background thread, so that their first use doesn't have to wait for them"
+    count, duration = await asyncio.to_thread(_prewarm_all)
+    if count:
+        log.info("Pre-warmed %s lazy imports in %.2fs", count, duration)
@@ -1,5 +1,7 @@
+import asyncio
+from collections import OrderedDict
 from math import ceil
-from typing import Any
+from typing import Any, Generic, TypeVar
 
 from discord import (ButtonStyle, Interaction, Message, NotFound, SelectOption,
                      User, ui)
@@ -7,23 +9,102 @@ from discord import (ButtonStyle, Interaction, Message, NotFound, SelectOption,
 from core.bot_classes import Axobot, MyContext
 
 
+T = TypeVar("T")
+
+
 def cut_text(lines: list[str], max_length: int = 1024, max_size=100) -> list[str]:
     "Cut some text into multiple paragraphs"
     result: list[str] = []
     paragraph: list[str] = []
+    # length of the paragraph once joined with line breaks
+    paragraph_length = 0
     for line in lines:
-        if len(paragraph)+1 > max_size or len("\n".join(paragraph+[line])) > max_length:
+        new_length = paragraph_length + len(line) + (1 if paragraph else 0)
+        if len(paragraph)+1 > max_size or new_length > max_length:
             result.append("\n".join(paragraph))
             paragraph = [line]
+            paragraph_length = len(line)
         else:
             paragraph.append(line)
+            paragraph_length = new_length
     if len(paragraph) > 0:
         result.append("\n".join(paragraph))
     return result
 
 
+class PaginatorSource(Generic[T]):
+    """Source of the items displayed by a paginator, fetched by chunks only when a page needs them
+
+    Subclasses implement `fetch_chunk`, which receives the cursor returned by its previous call (None the first time), and
+    returns the next items along with the cursor to fetch the following ones, or None if there is nothing left.
+    The cursor can be an offset, or the key of the last fetched item for keyset pagination."""
+
+    def __init__(self, per_page: int, total_count: int | None = None):
+        self.per_page = per_page
+        self.total_count = total_count
+        self.items: list[T] = []
+        self.exhausted = False
+        self._cursor: Any = None
+        self._lock = asyncio.Lock()
+        self._prefetch_task: asyncio.Task | None = None
+
+    async def fetch_chunk(self, cursor: Any) -> tuple[list[T], Any]:
+        "Fetch the items following the given cursor"
+        raise NotImplementedError("fetch_chunk must be implemented!")
+
+    async def _load_until(self, count: int):
+        "Fetch chunks until at least `count` items are loaded, or every item is"
+        async with self._lock:
+            while not self.exhausted and len(self.items) < count:
+                items, self._cursor = await self.fetch_chunk(self._cursor)
+                self.items.extend(items)
+                if self._cursor is None or not items:
+                    self.exhausted = True
+
+    async def get_page(self, page: int) -> list[T]:
+        "Get the items of a page, starting from 1"
+        await self._load_until(page * self.per_page)
+        return self.items[(page-1) * self.per_page:page * self.per_page]
+
+    def get_page_count(self) -> int:
+        "Get the number of pages, counting a page for the items not fetched yet"
+        if self.total_count is not None:
+            count = self.total_count
+        elif self.exhausted:
+            count = len(self.items)
+        else:
+            count = len(self.items) + 1
+        return max(1, ceil(count / self.per_page))
+
+    def prefetch(self, page: int):
+        "Start fetching the items of a page in the background, so that it's ready when the user gets there"
+        if self.exhausted or len(self.items) >= page * self.per_page:
+            return
+        if self._prefetch_task is not None and not self._prefetch_task.done():
+            return
+        self._prefetch_task = asyncio.create_task(self._load_until(page * self.per_page))
+        # a failed prefetch is retried when the page is actually requested
+        self._prefetch_task.add_done_callback(lambda task: task.cancelled() or task.exception())
+
+
+class ListSource(PaginatorSource[T]):
+    "Paginator source for items already in memory"
+
+    def __init__(self, items: list[T], per_page: int):
+        super().__init__(per_page, total_count=len(items))
+        self.items = list(items)
+        self.exhausted = True
+
+    async def fetch_chunk(self, cursor: Any) -> tuple[list[T], Any]:
+        return [], None
+
+
 class Paginator(ui.View):
-    "Base class to paginate something"
+    """Base class to paginate something
+
+    Set `pages_cache_size` to keep the last rendered pages of the view, if their content doesn't change over time"""
+
+    pages_cache_size: int = 0
 
     def __init__(self, client: Axobot, user: User, stop_label: str="Quit", timeout: int=180):
         super().__init__(timeout=timeout)
@@ -31,10 +112,12 @@ class Paginator(ui.View):
         self.user = user
         self.page = 1
         self.children[2].label = stop_label
+        # (page, pages count) -> rendered page content, from the least to the most recently used
+        self._pages_cache: OrderedDict[tuple[int, int], dict[str, Any]] = OrderedDict()
 
     async def send_init(self, ctx: MyContext | Interaction):
         "Build the first page, before anyone actually click"
-        contents = await self.get_page_content(
+        contents = await self._get_cached_page_content(
             ctx if isinstance(ctx, Interaction) else None,
             self.page
         )
@@ -53,6 +136,20 @@ class Paginator(ui.View):
         "Get total number of available pages"
         raise NotImplementedError("get_page_count must be implemented!")
 
+    async def _get_cached_page_content(self, interaction: Interaction, page: int) -> dict[str, Any]:
+        "Get a page content from the rendered pages cache, or build it"
+        if self.pages_cache_size <= 0:
+            return await self.get_page_content(interaction, page)
+        # the pages count is part of the key, as it's usually displayed in the page footer
+        key = (page, await self.get_page_count())
+        if (contents := self._pages_cache.get(key)) is not None:
+            self._pages_cache.move_to_end(key)
+            return contents
+        contents = await self.get_page_content(interaction, page)
+        self._pages_cache[key] = contents
+        if len(self._pages_cache) > self.pages_cache_size:
+            self._pages_cache.popitem(last=False)
+        return contents
 
     async def interaction_check(self, interaction: Interaction, /) -> bool:
         "Check if the user is actually allowed to press that"
@@ -86,7 +183,7 @@ class Paginator(ui.View):
             await interaction.response.defer()
         await self._update_buttons()
         if isinstance(interaction, Interaction):
-            contents = await self.get_page_content(interaction, self.page)
+            contents = await self._get_cached_page_content(interaction, self.page)
             await interaction.edit_original_response(
                 view=self,
                 **contents
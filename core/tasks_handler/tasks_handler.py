@@ -1,9 +1,12 @@
 from __future__ import annotations
 
+import asyncio
+import heapq
 import json
 import logging
 import re
-from datetime import datetime, timedelta, timezone
+import time
+from datetime import timedelta, timezone
 from typing import TYPE_CHECKING
 
 import discord
@@ -17,120 +20,242 @@ from .views import RecreateReminderView
 if TYPE_CHECKING:
     from core.bot_classes import Axobot
 
+# delay before trying again a task which could not be executed (guild unavailable, missing permissions...)
+RETRY_DELAY = 20
+# maximum time to sleep without checking the schedule again, to recover from any clock change
+MAX_SLEEP = 3600
+# maximum number of tasks executed at the same time
+MAX_CONCURRENT_TASKS = 20
+
+DuplicateKey = tuple[int, int | None, str, int | None]
+
+def get_duplicate_key(task: DbTask) -> DuplicateKey:
+    "Get the key identifying identical tasks, which are merged instead of duplicated"
+    return (task["user"], task["guild"], task["action"], task["channel"])
+
+def get_due_timestamp(task: DbTask) -> float:
+    "Get the UNIX timestamp at which a task should be executed"
+    return (task["begin"] + timedelta(seconds=task["duration"])).timestamp()
+
+
 class TaskHandler:
-    "Handler for timed tasks (like reminders or planned unban)"
+    """Handler for timed tasks (like reminders or planned unban)
+
+    Tasks are loaded once from the database, then kept in memory in a heap ordered by due time, so that each task is
+    executed when it is due without polling the database"""
 
     def __init__(self, bot: Axobot):
         self.bot = bot
         self.log = logging.getLogger("bot.tasks")
+        # task ID -> task
+        self._tasks: dict[int, DbTask] = {}
+        # heap of (due timestamp, task ID), possibly containing outdated entries which are skipped when popped
+        self._schedule: list[tuple[float, int]] = []
+        # task ID -> its current due timestamp in the heap
+        self._due_times: dict[int, float] = {}
+        # (user, guild, action, channel) -> ID of the non-timer task for this key
+        self._duplicates_index: dict[DuplicateKey, int] = {}
+        self._loaded = False
+        self._load_lock = asyncio.Lock()
+        self._wakeup = asyncio.Event()
+        self._scheduler_task: asyncio.Task | None = None
+        self._running_tasks: set[asyncio.Task] = set()
+        self._concurrency_limit = asyncio.Semaphore(MAX_CONCURRENT_TASKS)
 
-    async def get_events_from_db(self, get_all: bool = False) -> list[DbTask]:
-        """Renvoie une liste de tous les events qui doivent être exécutés"""
-        try:
+    @property
+    def is_running(self):
+        "Check if the scheduler is currently executing the due tasks"
+        return self._scheduler_task is not None and not self._scheduler_task.done()
+
+    def start(self):
+        "Start executing the tasks when they are due"
+        if self.is_running:
+            return
+        self._scheduler_task = asyncio.create_task(self._run_scheduler())
+
+    def stop(self):
+        "Stop executing the tasks"
+        if self._scheduler_task is not None:
+            self._scheduler_task.cancel()
+            self._scheduler_task = None
+
+    async def _ensure_loaded(self):
+        "Load every task from the database, if not done yet"
+        if self._loaded:
+            return
+        async with self._load_lock:
+            if self._loaded:
+                return
             query = "SELECT * FROM `timed` WHERE beta=%s"
-            events: list[dict] = []
             async with self.bot.db_main.read(query, (self.bot.beta,)) as query_results:
                 for row in query_results:
                     row["begin"] = row["begin"].replace(tzinfo=timezone.utc)
-                    if get_all:
-                        events.append(row)
-                    else:
-                        now = self.bot.utcnow() if row["begin"].tzinfo else datetime.utcnow()
-                        if row["begin"] + timedelta(seconds=row["duration"]) < now:
-                            events.append(row)
-            return events
-        except Exception as err:  # pylint: disable=broad-except
-            self.bot.dispatch("error", err)
-            return []
+                    self._schedule_task(row)
+            self._loaded = True
+            self.log.info("Loaded %s timed tasks", len(self._tasks))
+
+    def _schedule_task(self, task: DbTask, due_time: float | None = None):
+        "Add or move a task in the schedule"
+        self._tasks[task["ID"]] = task
+        if task["action"] != "timer":
+            self._duplicates_index[get_duplicate_key(task)] = task["ID"]
+        if due_time is None:
+            due_time = get_due_timestamp(task)
+        self._due_times[task["ID"]] = due_time
+        heapq.heappush(self._schedule, (due_time, task["ID"]))
+        # the scheduler may be sleeping until a later task
+        self._wakeup.set()
+
+    def _unschedule_task(self, task_id: int):
+        "Remove a task from the schedule"
+        task = self._tasks.pop(task_id, None)
+        self._due_times.pop(task_id, None)
+        if task is not None and task["action"] != "timer":
+            key = get_duplicate_key(task)
+            if self._duplicates_index.get(key) == task_id:
+                del self._duplicates_index[key]
+
+    def _pop_due_tasks(self, now: float) -> list[DbTask]:
+        "Remove the due tasks from the heap and return them"
+        due_tasks: list[DbTask] = []
+        while self._schedule and self._schedule[0][0] <= now:
+            due_time, task_id = heapq.heappop(self._schedule)
+            # skip the entries of removed or rescheduled tasks
+            if self._due_times.get(task_id) != due_time:
+                continue
+            del self._due_times[task_id]
+            due_tasks.append(self._tasks[task_id])
+        return due_tasks
 
-    async def check_tasks(self):
-        "Fetch and execute pending tasks"
+    async def _run_scheduler(self):
+        "Sleep until the next task is due, then execute every due task"
         await self.bot.wait_until_ready()
-        if not self.bot.database_online:
-            return
-        tasks_list = await self.get_events_from_db()
-        if len(tasks_list) == 0:
-            return
-        self.log.debug("Iterating (%s tasks found)", len(tasks_list))
-        for task in tasks_list:
-            if task["action"] == "mute":
+        while not self.bot.database_online:
+            await asyncio.sleep(RETRY_DELAY)
+        await self._ensure_loaded()
+        while True:
+            self._wakeup.clear()
+            now = time.time()
+            for task in self._pop_due_tasks(now):
+                running_task = asyncio.create_task(self._execute_task(task))
+                self._running_tasks.add(running_task)
+                running_task.add_done_callback(self._running_tasks.discard)
+            delay = self._schedule[0][0] - now if self._schedule else MAX_SLEEP
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout=min(max(delay, 0), MAX_SLEEP))
+            except asyncio.TimeoutError:
+                pass
+
+    async def _execute_task(self, task: DbTask):
+        "Execute a due task, and try again later if it is still there afterwards"
+        async with self._concurrency_limit:
+            try:
+                if self.bot.internal_loop_enabled and self.bot.database_online:
+                    task = await self._refresh_task(task)
+                    if task is None:
+                        return
+                    await self.execute_task(task)
+            except Exception as err:  # pylint: disable=broad-except
+                self.bot.dispatch("error", err)
+            if task["ID"] in self._tasks and task["ID"] not in self._due_times:
+                self._schedule_task(task, time.time() + RETRY_DELAY)
+
+    async def _refresh_task(self, task: DbTask) -> DbTask | None:
+        "Get the latest version of a task from the database, in case it was edited or deleted elsewhere"
+        query = "SELECT * FROM `timed` WHERE `ID` = %s"
+        async with self.bot.db_main.read(query, (task["ID"],), fetchone=True) as query_result:
+            row: DbTask | None = query_result or None
+        if row is None:
+            self._unschedule_task(task["ID"])
+            return None
+        row["begin"] = row["begin"].replace(tzinfo=timezone.utc)
+        if get_due_timestamp(row) > time.time():
+            self._schedule_task(row)
+            return None
+        self._tasks[row["ID"]] = row
+        return row
+
+    async def execute_task(self, task: DbTask):
+        "Execute a due task, and remove it if it was successful"
+        self.log.debug("Executing task %s (%s)", task["ID"], task["action"])
+        if task["action"] == "mute":
+            try:
+                guild = self.bot.get_guild(task["guild"])
+                if guild is None:
+                    return
+                user = guild.get_member(task["user"])
+                if user is None:
+                    return
                 try:
-                    guild = self.bot.get_guild(task["guild"])
-                    if guild is None:
-                        continue
-                    user = guild.get_member(task["user"])
-                    if user is None:
-                        continue
-                    try:
-                        await self.bot.get_cog("Moderation").unmute_member(guild, user, guild.me)
-                    except discord.Forbidden:
-                        continue
-                    self.bot.dispatch("tempmute_expiration", guild, user, task["begin"])
-                    await self.remove_task(task["ID"])
-                except Exception as err:  # pylint: disable=broad-except
-                    self.bot.dispatch("error", err)
-                    self.log.error("Unmute: Unable to auto unmute %s", err)
-            if task["action"] == "ban":
+                    await self.bot.get_cog("Moderation").unmute_member(guild, user, guild.me)
+                except discord.Forbidden:
+                    return
+                self.bot.dispatch("tempmute_expiration", guild, user, task["begin"])
+                await self.remove_task(task["ID"])
+            except Exception as err:  # pylint: disable=broad-except
+                self.bot.dispatch("error", err)
+                self.log.error("Unmute: Unable to auto unmute %s", err)
+        elif task["action"] == "ban":
+            try:
+                guild = self.bot.get_guild(task["guild"])
+                if guild is None:
+                    return
                 try:
-                    guild = self.bot.get_guild(task["guild"])
-                    if guild is None:
-                        continue
-                    try:
-                        user = await self.bot.fetch_user(task["user"])
-                    except discord.DiscordException:
-                        continue
-                    try:
-                        await guild.unban(user, reason="Temp ban expired"+self.bot.zws)
-                    except discord.Forbidden:
-                        await self.remove_task(task["ID"])
-                        continue
-                    self.bot.dispatch("tempban_expiration", guild, user, task["begin"])
-                    await self.remove_task(task["ID"])
-                except discord.errors.NotFound:
-                    await self.remove_task(task["ID"])
-                except Exception as err:  # pylint: disable=broad-except
-                    self.bot.dispatch("error", err)
-                    self.log.error("Unban: Unable to auto unban: %s", err)
-            if task["action"] == "timer":
+                    user = await self.bot.fetch_user(task["user"])
+                except discord.DiscordException:
+                    return
                 try:
-                    sent = await self.task_timer(task)
-                except discord.errors.NotFound:
+                    await guild.unban(user, reason="Temp ban expired"+self.bot.zws)
+                except discord.Forbidden:
+                    await self.remove_task(task["ID"])
+                    return
+                self.bot.dispatch("tempban_expiration", guild, user, task["begin"])
+                await self.remove_task(task["ID"])
+            except discord.errors.NotFound:
+                await self.remove_task(task["ID"])
+            except Exception as err:  # pylint: disable=broad-except
+                self.bot.dispatch("error", err)
+                self.log.error("Unban: Unable to auto unban: %s", err)
+        elif task["action"] == "timer":
+            try:
+                sent = await self.task_timer(task)
+            except discord.errors.NotFound:
+                await self.remove_task(task["ID"])
+            except Exception as err:  # pylint: disable=broad-except
+                self.bot.dispatch("error", err)
+                self.log.error("Reminder: Unable to send timer: %s", err)
+            else:
+                if sent:
                     await self.remove_task(task["ID"])
-                except Exception as err:  # pylint: disable=broad-except
-                    self.bot.dispatch("error", err)
-                    self.log.error("Reminder: Unable to send timer: %s", err)
-                else:
-                    if sent:
-                        await self.remove_task(task["ID"])
-            if task["action"] == "role-grant":
+        elif task["action"] == "role-grant":
+            try:
+                guild = self.bot.get_guild(task["guild"])
+                if guild is None:
+                    return
+                user = guild.get_member(task["user"])
+                if user is None:
+                    return
                 try:
-                    guild = self.bot.get_guild(task["guild"])
-                    if guild is None:
-                        continue
-                    user = guild.get_member(task["user"])
-                    if user is None:
-                        continue
+                    data = json.loads(task["data"])
+                except (json.JSONDecodeError, KeyError):
+                    return
+                role = guild.get_role(data["role"])
+                if role is not None:
                     try:
-                        data = json.loads(task["data"])
-                    except (json.JSONDecodeError, KeyError):
-                        continue
-                    role = guild.get_role(data["role"])
-                    if role is not None:
-                        try:
-                            await user.remove_roles(role, reason="Temp role expired")
-                        except discord.Forbidden:
-                            self.bot.dispatch(
-                                "server_warning",
-                                ServerWarningType.TEMP_ROLE_REMOVE_FORBIDDEN,
-                                guild,
-                                role=role,
-                                user=user
-                            )
-                            self.log.warning("RoleGrant: Unable to remove temporary role: Forbidden")
-                    await self.remove_task(task["ID"])
-                except Exception as err:  # pylint: disable=broad-except
-                    self.bot.dispatch("error", err)
-                    self.log.error("RoleGrant: Unable to remove temporary role: %s", err)
+                        await user.remove_roles(role, reason="Temp role expired")
+                    except discord.Forbidden:
+                        self.bot.dispatch(
+                            "server_warning",
+                            ServerWarningType.TEMP_ROLE_REMOVE_FORBIDDEN,
+                            guild,
+                            role=role,
+                            user=user
+                        )
+                        self.log.warning("RoleGrant: Unable to remove temporary role: Forbidden")
+                await self.remove_task(task["ID"])
+            except Exception as err:  # pylint: disable=broad-except
+                self.bot.dispatch("error", err)
+                self.log.error("RoleGrant: Unable to remove temporary role: %s", err)
 
     async def _get_or_fetch_user(self, user_id: int):
         if user := self.bot.get_user(user_id):
@@ -200,14 +325,11 @@ class TaskHandler:
     async def add_task(self, action: str, duration: int, userid: int, guildid: int | None = None,
                        channelid: int | None = None, message: str | None = None, data: dict | None = None):
         """Add a task to the list"""
-        tasks_list = await self.get_events_from_db(get_all=True)
-        for task in tasks_list:
-            if (task["user"] == userid
-                    and task["guild"] == guildid
-                    and task["action"] == action
-                    and task["channel"] == channelid
-                    and task["action"] != "timer"):
-                return await self.update_duration(task["ID"], duration)
+        await self._ensure_loaded()
+        if action != "timer":
+            duplicate_id = self._duplicates_index.get((userid, guildid, action, channelid))
+            if duplicate_id is not None:
+                return await self.update_duration(duplicate_id, duration)
         data = None if data is None else json.dumps(data)
         query = "INSERT INTO `timed` (`guild`,`channel`,`user`,`action`,`duration`,`message`, `data`, `beta`) VALUES (%(guild)s,%(channel)s,%(user)s,%(action)s,%(duration)s,%(message)s,%(data)s,%(beta)s)"
         query_args = {
@@ -220,8 +342,20 @@ class TaskHandler:
             "data": data,
             "beta": self.bot.beta
         }
-        async with self.bot.db_main.write(query, query_args):
+        async with self.bot.db_main.write(query, query_args) as task_id:
             pass
+        self._schedule_task({
+            "ID": task_id,
+            "guild": guildid,
+            "channel": channelid,
+            "user": userid,
+            "action": action,
+            "begin": self.bot.utcnow().replace(microsecond=0),
+            "duration": duration,
+            "message": message,
+            "data": data,
+            "beta": self.bot.beta
+        })
         return True
 
     async def update_duration(self, task_id: int, new_duration: int):
@@ -229,6 +363,10 @@ class TaskHandler:
         query = f"UPDATE `timed` SET `duration`={new_duration} WHERE `ID`={task_id}"
         async with self.bot.db_main.write(query):
             pass
+        if (task := self._tasks.get(task_id)) is not None:
+            task["duration"] = new_duration
+            if task_id in self._due_times:
+                self._schedule_task(task)
         return True
 
     async def remove_task(self, task_id: int):
@@ -236,6 +374,7 @@ class TaskHandler:
         query = f"DELETE FROM `timed` WHERE `timed`.`ID` = {task_id}"
         async with self.bot.db_main.write(query):
             pass
+        self._unschedule_task(task_id)
         return True
 
     async def cancel_unmute(self, user_id: int, guild_id: int):
@@ -246,3 +385,7 @@ class TaskHandler:
                 pass
         except Exception as err:  # pylint: disable=broad-except
             self.bot.dispatch("error", err)
+        else:
+            for task_id, task in list(self._tasks.items()):
+                if task["action"] == "mute" and task["guild"] == guild_id and task["user"] == user_id:
+                    self._unschedule_task(task_id)
@@ -74,14 +74,14 @@ class AxobotTranslator(app_commands.Translator):
 
     async def _translate_cmd(self, lang: str, string: str, locale: Locale) -> str | None:
         try:
-            return await self.bot.get_cog("Languages").get_translation(lang, string)
+            return self.bot.get_cog("Languages").get_translation(lang, string)
         except KeyError:
             if locale in {Locale.american_english, Locale.french}:
                 self.bot.log.warning(f"[translator] Missing translation for '{string}' in {locale} ({lang})")
 
     async def _translate_custom(self, lang: str, string: locale_str, locale: Locale) -> str | None:
         try:
-            return await self.bot.get_cog("Languages").get_translation(lang, string.message)
+            return self.bot.get_cog("Languages").get_translation(lang, string.message)
         except KeyError:
             self.bot.log.warning(f"[translator] Missing translation for '{string.message}' in {locale} ({lang})")
             return string.extras.get("default")
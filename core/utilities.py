@@ -1,6 +1,7 @@
 import asyncio
 import operator
 import re
+from collections import Counter
 from typing import Any
 
 import aiohttp
@@ -140,22 +141,24 @@ class Utilities(commands.Cog):
             liste.append(card)
         return sorted(liste2)+sorted(liste)
 
-    async def get_user_languages(self, user: discord.User, limit: int=0):
+    async def get_user_languages(self, user: discord.User, limit: int=0, guilds: list[discord.Guild] | None = None):
         """Get the most used languages of an user
-        If limit=0, return every languages"""
+        If limit=0, return every languages
+        The mutual guilds can be given if they were already computed"""
         if not self.bot.database_online:
             return [("en", 1.0)]
-        languages = []
         disp_lang: list[tuple[str, float]] = []
         available_langs: list[str] = (await self.bot.get_options_list())["language"]["values"]
-        for guild in user.mutual_guilds:
+        languages: Counter[str] = Counter()
+        for guild in (user.mutual_guilds if guilds is None else guilds):
             lang: str = await self.bot.get_config(guild.id, "language")
-            languages.append(lang)
+            languages[lang] += 1
+        total = languages.total()
         for lang in available_langs:
-            if (count := languages.count(lang)) > 0:
+            if (count := languages[lang]) > 0:
                 disp_lang.append((
                     lang,
-                    round(count/len(languages), 2)
+                    round(count/total, 2)
                 ))
         disp_lang.sort(key=operator.itemgetter(1), reverse=True)
         if limit == 0:
@@ -465,6 +465,40 @@ class Admin(commands.Cog):
             txt = "\n".join(f"{result[0]:>{length}}: {result[1]} MB" for result in query_results if result[1] is not None)
         await interaction.followup.send("```yaml\n" + txt + "\n```")
 
+    @db_group.command(name="trace")
+    async def db_trace(self, interaction: discord.Interaction, enabled: bool,
+                       slow_query_threshold: app_commands.Range[float, 0] | None = None):
+        "Active ou désactive le traçage et le profilage des requêtes SQL"
+        profiler = self.bot.sql_profiler
+        profiler.enabled = enabled
+        if slow_query_threshold is not None:
+            profiler.slow_query_threshold_ms = slow_query_threshold or None
+        if not enabled:
+            profiler.reset()
+        threshold = profiler.slow_query_threshold_ms
+        await interaction.response.send_message(
+            f"SQL tracing {'enabled' if enabled else 'disabled'}, "
+            + (f"slow queries threshold: {threshold}ms" if threshold else "slow queries log disabled")
+        )
+
+    @db_group.command(name="profile")
+    async def db_profile(self, interaction: discord.Interaction, number: app_commands.Range[int, 1, 20] = 10):
+        "Affiche les requêtes SQL ayant pris le plus de temps depuis l'activation du traçage"
+        profiler = self.bot.sql_profiler
+        if not profiler.enabled:
+            await interaction.response.send_message("SQL tracing is disabled")
+            return
+        if not (top := profiler.get_top(number)):
+            await interaction.response.send_message("No query recorded yet")
+            return
+        txt = "\n\n".join(
+            f"{timings.count} calls, {timings.total_ms:.0f}ms total - p50 {timings.percentile(50)}ms, "
+            f"p95 {timings.percentile(95)}ms, p99 {timings.percentile(99)}ms, max {timings.max_ms:.1f}ms\n"
+            f"{fingerprint[:250]}"
+            for fingerprint, timings in top
+        )
+        await interaction.response.send_message("```\n" + txt[:1980] + "\n```")
+
     @cached(TTLCache(1, 3600))
     async def get_databases_names(self) -> list[str]:
         "Get every database names visible for the bot"
@@ -483,6 +517,23 @@ class Admin(commands.Cog):
         ][:25]
 
 
+    @admin_main.command(name="loop-lag")
+    async def loop_lag(self, interaction: discord.Interaction, number: app_commands.Range[int, 1, 20] = 10,
+                       reset: bool = False):
+        "Affiche le code ayant le plus bloqué la boucle d'événements du bot"
+        monitor = self.bot.loop_lag_monitor
+        top = monitor.get_top_offenders(number)
+        if reset:
+            monitor.reset_offenders()
+        if not top:
+            await interaction.response.send_message("No slow callback recorded yet")
+            return
+        txt = "\n".join(
+            f"{stats.total_ms:>8.0f}ms total, {stats.count:>4} times, max {stats.max_ms:.0f}ms - {label[:100]}"
+            for label, stats in top
+        )
+        await interaction.response.send_message("```\n" + txt[:1980] + "\n```")
+
     @admin_main.command(name="emergency")
     async def emergency_cmd(self, interaction: discord.Interaction):
         """Déclenche la procédure d'urgence
@@ -968,6 +1019,8 @@ Cette option affecte tous les serveurs"""
         current_acc = antiscam.agent.model.get_external_accuracy(data)
         if acc > current_acc:
             antiscam.agent.save_model(model)
+            if antiscam.inference is not None:
+                antiscam.inference.reload()
             txt += f"\n✅ This model is better than the current one ({current_acc:.3f}), replacing it!"
         else:
             txt += f"\n❌ This model is not better than the current one ({current_acc:.3f})"
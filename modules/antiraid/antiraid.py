@@ -1,13 +1,13 @@
 import re
-from collections import defaultdict
 from datetime import timedelta
 from typing import Literal
 
 import discord
 from cachetools import TTLCache
-from discord.ext import commands, tasks
+from discord.ext import commands
 
-from core.bot_classes import DISCORD_INVITE_REGEX, Axobot
+from core.bot_classes import Axobot, MessageFacts
+from core.decaying_counters import DecayingCounters
 
 
 class AntiRaid(commands.Cog):
@@ -18,27 +18,19 @@ class AntiRaid(commands.Cog):
         self.file = "antiraid"
         # Cache of raider status for (guild_id, user_id) - True if raider detected
         self.check_cache = TTLCache[tuple[int, int], bool](maxsize=10_000, ttl=60)
-        # Cache of mentions sent by users - count of recent mentions, decreased every minute
-        self.mentions_score: defaultdict[int, int] = defaultdict(int)
-        # Cache of discord invites sent by users - count of recent mentions, decreased every minute
-        self.invites_score: defaultdict[int, int] = defaultdict(int)
+        # Cache of mentions sent by users - count of recent mentions, decreased by 2 every 30s
+        self.mentions_score = DecayingCounters[int](decay_amount=2, decay_interval=30)
+        # Cache of discord invites sent by users - count of recent invites, decreased by 1 every 30s
+        self.invites_score = DecayingCounters[int](decay_amount=1, decay_interval=30)
 
-    async def cog_load(self):
-        # pylint: disable=no-member
-        self.decrease_users_scores.start()
-
-    async def cog_unload(self):
-         # pylint: disable=no-member
-        self.decrease_users_scores.cancel()
-
-    @commands.Cog.listener(name="on_message")
-    async def on_message_anticaps(self, msg: discord.Message):
+    @commands.Cog.listener(name="on_message_facts")
+    async def on_message_anticaps(self, msg: discord.Message, facts: MessageFacts):
         "Check for capslock messages"
         if msg.guild is None or msg.author.bot or not self.bot.database_online or len(msg.content) < 8:
             return
         if msg.channel.permissions_for(msg.author).administrator:
             return
-        if not await self.bot.get_config(msg.guild, "anti_caps_lock"):
+        if not facts.config["anti_caps_lock"]:
             return
         clean_content = msg.content
         for rgx_match in (r'\|', r'\*', r'_', r"<a?:\w+:\d+>", r"<(#|@&?!?)\d+>", r"https?://\w+\.\S+"):
@@ -67,9 +59,10 @@ class AntiRaid(commands.Cog):
         return self.check_cache.get((member.guild.id, member.id), False)
 
 
-    async def _get_raid_level(self, guild: discord.Guild) -> int:
+    async def _get_raid_level(self, guild: discord.Guild, level_name: str | None = None) -> int:
         "Get the raid protection level of a guild, between 0 and 5"
-        level_name: str = await self.bot.get_config(guild.id, "anti_raid")
+        if level_name is None:
+            level_name = await self.bot.get_config(guild.id, "anti_raid")
         return (await self.bot.get_options_list())["anti_raid"]["values"].index(level_name)
 
     async def on_join_raid_check(self, member: discord.Member):
@@ -204,11 +197,14 @@ class AntiRaid(commands.Cog):
         return True
 
 
-    async def _should_ignore_member(self, member: discord.Member):
+    async def _should_ignore_member(self, member: discord.Member, facts: MessageFacts | None = None):
         "Check whether this member should be verified (False) or is immune (True)"
         if member.bot:
             return True
-        immune_roles: list[discord.Role] | None = await self.bot.get_config(member.guild.id, "anti_raid_ignored_roles")
+        if facts is not None:
+            immune_roles: list[discord.Role] | None = facts.config["anti_raid_ignored_roles"]
+        else:
+            immune_roles = await self.bot.get_config(member.guild.id, "anti_raid_ignored_roles")
         if not immune_roles:
             return member.guild_permissions.moderate_members
         return any(
@@ -216,36 +212,36 @@ class AntiRaid(commands.Cog):
             for role in immune_roles
         )
 
-    @commands.Cog.listener("on_message")
-    async def on_message_antiraid(self, message: discord.Message):
+    @commands.Cog.listener("on_message_facts")
+    async def on_message_antiraid(self, message: discord.Message, facts: MessageFacts):
         "Check mentions/invites count when a message is sent"
         # if the message is not in a guild or the bot can't see the guild
         if not isinstance(message.author, discord.Member) or message.guild.me is None:
             return
         # if the author is a bot or should be immune
-        if await self._should_ignore_member(message.author):
+        if await self._should_ignore_member(message.author, facts):
             return
         # if the antiraid is disabled
-        if await self._get_raid_level(message.guild) == 0:
+        if await self._get_raid_level(message.guild, facts.config["anti_raid"]) == 0:
             return
         # 1. Check mentions
-        raw_mentions = [mention for mention in message.raw_mentions if mention != message.author.id]
+        raw_mentions = [mention for mention in facts.user_mentions if mention != message.author.id]
         if mentions_count := len(raw_mentions):
             # add users mentions count to the user score
-            self.mentions_score[message.author.id] += mentions_count
+            self.mentions_score.add(message.author.id, mentions_count)
         # if mentions score is higher than 0, apply sanctions
-        if mentions_count != 0 and self.mentions_score[message.author.id] > 0:
+        if mentions_count != 0 and self.mentions_score.get(message.author.id) > 0:
             await self.check_mentions_score(message.author)
         # 2. Check invites
-        if invites_count := len(DISCORD_INVITE_REGEX.findall(message.content)):
-            self.invites_score[message.author.id] += invites_count
+        if invites_count := len(facts.invites):
+            self.invites_score.add(message.author.id, invites_count)
         # if invites score is higher than 0, apply sanctions
-        if invites_count != 0 and self.invites_score[message.author.id] > 0:
+        if invites_count != 0 and self.invites_score.get(message.author.id) > 0:
             await self.check_invites_score(message.author)
 
     async def check_mentions_score(self, member: discord.Member):
         "Check if a member has a mentions score higher than the treshold set by the antiraid config, and take actions"
-        score = self.mentions_score[member.id]
+        score = self.mentions_score.get(member.id)
         if score == 0:
             return
         level = await self._get_raid_level(member.guild)
@@ -289,7 +285,7 @@ class AntiRaid(commands.Cog):
 
     async def check_invites_score(self, member: discord.Member):
         "Check if a member has a invites score higher than the treshold set by the antiraid config, and take actions"
-        score = self.invites_score[member.id]
+        score = self.invites_score.get(member.id)
         if score == 0:
             return
         level = await self._get_raid_level(member.guild)
@@ -331,30 +327,5 @@ class AntiRaid(commands.Cog):
         return False
 
 
-    @tasks.loop(seconds=30)
-    async def decrease_users_scores(self):
-        """Decrease mentions and invites count every 30 seconds"""
-        # Decrease mentions count by 2
-        mentions_users_to_remove: list[int] = []
-        for member_id in self.mentions_score:
-            self.mentions_score[member_id] -= 2
-            if self.mentions_score[member_id] <= 0:
-                mentions_users_to_remove.append(member_id)
-        for member_id in mentions_users_to_remove:
-            del self.mentions_score[member_id]
-        # Decrease invites count by 1
-        invites_users_to_remove: list[int] = []
-        for member_id in self.invites_score:
-            self.invites_score[member_id] -= 1
-            if self.invites_score[member_id] <= 0:
-                invites_users_to_remove.append(member_id)
-        for member_id in invites_users_to_remove:
-            del self.invites_score[member_id]
-
-    @decrease_users_scores.error
-    async def on_decrease_mentions_count_error(self, error: Exception):
-        self.bot.dispatch("error", error, "When calling `decrease_mentions_count` (<@279568324260528128>)")
-
-
 async def setup(bot):
     await bot.add_cog(AntiRaid(bot))
@@ -6,16 +6,17 @@ from discord import app_commands
 from discord.ext import commands, tasks
 
 from core.arguments.args import MessageTransformer
-from core.bot_classes import Axobot
+from core.bot_classes import Axobot, MessageFacts
 
 from .model import AntiScamAgent, Message
 from .model.classes import (EMBED_COLORS, MsgReportView, PredictionResult,
-                            get_avg_word_len, get_caps_frequency,
-                            get_max_frequency, get_mentions_count,
-                            get_punctuation_count)
+                            get_avg_word_len, get_mentions_count,
+                            get_text_features)
 from .model.normalization import normalize
 from .model.similarities import check_message
 from .model.training_bayes import train_model
+from .src.inference import InferenceService
+from .src.scan_cache import ScanCache
 
 
 def is_immune(member: discord.Member) -> bool:
@@ -47,10 +48,24 @@ class AntiScam(commands.Cog):
         )
         self.bot.tree.add_command(self.report_ctx_menu)
         self.messages_scanned_in_last_minute = 0
-        self.recent_scans: dict[str, PredictionResult] = {}
+        self.recent_scans = ScanCache()
+        self.inference: InferenceService | None = None
 
     async def cog_load(self):
-        "Load websites list from database"
+        "Load websites list from database, and start the inference workers"
+        self.cleanup_recent_scans_loop.start() # pylint: disable=no-member
+        await self.load_websites_list()
+        self.inference = InferenceService(self.agent)
+        self.inference.start()
+
+    async def load_websites_list(self):
+        "Load websites list from database, or from the local file if the database is unreachable"
+        await self._load_websites_list()
+        # the inference workers keep their own copy of the agent data
+        if self.inference is not None:
+            self.inference.reload(self.agent)
+
+    async def _load_websites_list(self):
         if self.bot.database_online:
             if self.agent is None:
                 self.log.warning("No model found, training a new one... this will take a while")
@@ -71,19 +86,20 @@ class AntiScam(commands.Cog):
                 self.bot.dispatch("error", err, "While loading antiscam domains list")
         self.agent.fetch_websites_locally()
         self.log.info("Loaded %s domain names from local file", len(self.agent.websites_list))
-        self.cleanup_recent_scans_loop.start() # pylint: disable=no-member
 
     async def cog_unload(self):
-        "Disable the report context menu"
+        "Disable the report context menu and stop the inference workers"
         self.bot.tree.remove_command(self.report_ctx_menu.name, type=self.report_ctx_menu.type)
+        if self.inference is not None:
+            await self.inference.close()
         # pylint: disable=no-member
         if self.cleanup_recent_scans_loop.is_running():
             self.cleanup_recent_scans_loop.stop()
 
     @tasks.loop(hours=3)
     async def cleanup_recent_scans_loop(self):
-        "Cleanup the recent scans cache every 3 hours"
-        self.recent_scans.clear()
+        "Remove the expired entries of the recent scans cache every 3 hours"
+        self.recent_scans.remove_expired()
 
     @property
     def report_channel(self) -> discord.TextChannel:
@@ -145,13 +161,14 @@ class AntiScam(commands.Cog):
             for msg in messages:
                 mentions_count = msg["mentions_count"] if msg["mentions_count"] > 0 else get_mentions_count(msg["message"])
                 normd_msg = normalize(msg["message"])
+                text_features = get_text_features(msg["message"])
                 edits = {
                     "normd_message": normd_msg,
                     "url_score": check_message(msg["message"], self.agent.websites_list),
                     "mentions_count": mentions_count,
-                    "max_frequency": get_max_frequency(msg["message"]),
-                    "punctuation_count": get_punctuation_count(msg["message"]),
-                    "caps_percentage": get_caps_frequency(msg["message"]),
+                    "max_frequency": text_features.max_frequency,
+                    "punctuation_count": text_features.punctuation_count,
+                    "caps_percentage": text_features.caps_percentage,
                     "avg_word_len": get_avg_word_len(normd_msg)
                 }
                 if all(value == msg[k] for k, value in edits.items()):
@@ -311,7 +328,7 @@ class AntiScam(commands.Cog):
             self.bot.dispatch("antiscam_report", source_msg, predictions, report_author)
 
     @commands.Cog.listener()
-    async def on_message(self, msg: discord.Message):
+    async def on_message_facts(self, msg: discord.Message, facts: MessageFacts):
         "Check any message for scam dangerousity"
         if (
             isinstance(msg.author, discord.User)
@@ -320,20 +337,22 @@ class AntiScam(commands.Cog):
         ):
             return
         await self.bot.wait_until_ready()
-        if msg.guild is not None and not await self.bot.get_config(msg.guild.id, "anti_scam"):
+        if msg.guild is not None and not facts.config["anti_scam"]:
             return
         # if content already analyzed, get the harmless probability from cache
-        if (result := self.recent_scans.get(msg.content)) is not None:
+        result, _ = self.recent_scans.get(msg.content)
+        if result is not None:
             if result.probabilities[1] > HARMLESS_WARNING_THRESHOLD:
                 return
             harmless_probability = result.probabilities[1]
         else:
             # if content is new, analyze it
-            message: Message = Message.from_raw(msg.content, len(msg.mentions), self.agent.websites_list)
-            if len(message.normd_message.split()) < 3:
+            if self.inference is None:
+                return
+            message, result = await self.inference.analyze(msg.content, len(msg.mentions))
+            if result is None:
                 return
             self.messages_scanned_in_last_minute += 1
-            result = self.agent.predict_bot(message)
             if result.result > 1:
                 message.category = 0
                 self.log.info("Detected (%s): %s", result.probabilities[2], message.message)
@@ -344,7 +363,7 @@ class AntiScam(commands.Cog):
             elif harmless_probability <= HARMLESS_WARNING_THRESHOLD:
                 msg_id = await self.db_insert_msg(message)
                 await self.send_report(msg.author, msg_id, message)
-            self.recent_scans[msg.content] = result
+            self.recent_scans.set(msg.content, result)
         # take action based on the harmless probability
         if harmless_probability <= HARMLESS_DELETION_THRESHOLD:
             try:
@@ -12,6 +12,9 @@ from .classes import Message, PredictionResult
 class AntiScamAgent:
     """Class taking care or everything"""
 
+    MODEL_FILEPATH = os.path.dirname(__file__) + "/data/bayes_model.pkl"
+    WEBSITES_FILEPATH = os.path.dirname(__file__) + "/data/base_websites.csv"
+
     def __init__(self):
         self.categories = {
             0: "pending",
@@ -27,7 +30,7 @@ class AntiScamAgent:
 
     def fetch_websites_locally(self, filename: str | None = None):
         "Fetch the websites list from a local CSV file, if possible"
-        filepath = filename if filename else os.path.dirname(__file__) + "/data/base_websites.csv"
+        filepath = filename if filename else AntiScamAgent.WEBSITES_FILEPATH
         self.websites_list = {}
         with open(filepath, 'r', encoding="utf-8") as csv_file:
             spamreader = csv.reader(csv_file)
@@ -36,7 +39,7 @@ class AntiScamAgent:
 
     def save_websites_locally(self, data: dict[str, bool], filename: str | None = None):
         "Save the websites list to a local CSV file"
-        filepath = filename if filename else os.path.dirname(__file__) + "/data/base_websites.csv"
+        filepath = filename if filename else AntiScamAgent.WEBSITES_FILEPATH
         with open(filepath, 'w', encoding="utf-8") as csv_file:
             spamwriter = csv.writer(csv_file)
             for key, value in data.items():
@@ -61,13 +64,13 @@ class AntiScamAgent:
                 if module == "classes" and name == "Message":
                     return Message
                 return super().find_class(module, name)
-        with open(os.path.dirname(__file__)+"/data/bayes_model.pkl", "rb") as raw:
+        with open(AntiScamAgent.MODEL_FILEPATH, "rb") as raw:
             return CustomUnpickler(raw).load()
 
     @staticmethod
     def save_model_to_file(model: RandomForest):
         "Save the model to a file"
-        with open(os.path.dirname(__file__)+"/data/bayes_model.pkl", "wb") as raw:
+        with open(AntiScamAgent.MODEL_FILEPATH, "wb") as raw:
             pickle.dump(model, raw)
 
     def save_model(self, new_model: RandomForest):
@@ -86,7 +89,8 @@ class AntiScamAgent:
 
         prediction = self.model.get_classes(dataset)
 
-        return PredictionResult(prediction.values(), prediction.keys())
+        # results are sent back from the inference worker processes, and dict views can't be pickled
+        return PredictionResult(list(prediction.values()), list(prediction.keys()))
 
 async def update_unicode_map():
     "Update the unicode map file from the unicode.org website of confusable characters"
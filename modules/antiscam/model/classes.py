@@ -1,6 +1,7 @@
 import re
 from collections import Counter
-from typing import TypeVar
+from functools import cached_property
+from typing import NamedTuple, TypeVar
 
 import discord
 
@@ -8,32 +9,31 @@ from .normalization import normalize
 from .similarities import check_message
 
 
+class TextFeatures(NamedTuple):
+    "Cheap features computed directly from the raw text of a message"
+    contains_everyone: bool
+    max_frequency: float
+    punctuation_count: int
+    caps_percentage: float
+
+def get_text_features(msg: str) -> TextFeatures:
+    "Compute every raw text feature from a single count of the message characters"
+    char_counts = Counter(msg)
+    # lowercase the whole text at once, as some characters are lowered differently depending on their context
+    lowered_counts = Counter(msg.replace(' ', '').lower())
+    # check distinct characters only, which are much fewer than the message length
+    caps_count = sum(count for char, count in char_counts.items() if char != char.lower())
+    return TextFeatures(
+        contains_everyone="@everyone" in msg,
+        max_frequency=round(max(lowered_counts.values()) / lowered_counts.total(), 5),
+        punctuation_count=char_counts['.'] + char_counts['!'] + char_counts['?'],
+        caps_percentage=round(caps_count / len(msg), 5),
+    )
+
 def get_mentions_count(msg: str):
     "Returns the number of user mentions in the message."
     return len(re.findall(r"<@!?\d{15,}>", msg))
 
-def get_max_frequency(msg: str):
-    "Returns the frequency of the most common character in the message, between 0 and 1, rounded to 4 decimals."
-    counter = Counter(msg.replace(' ', '').lower())
-    s = sum(counter.values())
-    return round(max(v/s for v in counter.values()), 5)
-
-def get_punctuation_count(msg: str):
-    "Returns the number of punctuation characters in the message."
-    counter = 0
-    for c in msg:
-        if c in {'.', '!', '?'}:
-            counter += 1
-    return counter
-
-def get_caps_frequency(msg: str):
-    "Returns the percentage of uppercase characters in the message, between 0 and 1."
-    counter = 0
-    for c in msg:
-        if c != c.lower():
-            counter += 1
-    return round(counter / len(msg), 5)
-
 def get_avg_word_len(msg: str):
     "Returns the average length of words in the message."
     lengths = [len(word) for word in msg.split(' ')]
@@ -67,16 +67,42 @@ class Message:
 
     @classmethod
     def from_raw(cls, raw_message: str, mentions_count: int, websites_reference: dict[str, bool]):
-        "Create a Message instance from a string"
-        normd_message = normalize(raw_message)
-        contains_everyone = "@everyone" in raw_message
-        url_score = check_message(raw_message, websites_reference)
-        max_frequency = get_max_frequency(raw_message)
-        punctuation_count = get_punctuation_count(raw_message)
-        caps_percentage = get_caps_frequency(raw_message)
-        avg_word_len = get_avg_word_len(normd_message)
-        return cls(raw_message, normd_message, contains_everyone, url_score, mentions_count, max_frequency, punctuation_count,
-                   caps_percentage, avg_word_len, 0)
+        """Create a Message instance from a string
+
+        The normalized text, URL score and average word length are only computed when first accessed"""
+        features = get_text_features(raw_message)
+        message = cls.__new__(cls)
+        message.message = raw_message
+        message.contains_everyone = features.contains_everyone
+        message.mentions_count = mentions_count
+        message.max_frequency = features.max_frequency
+        message.punctuation_count = features.punctuation_count
+        message.caps_percentage = features.caps_percentage
+        message.category = 0
+        message._websites_reference = websites_reference
+        return message
+
+    # values given to the constructor are stored in the instance dict, and take precedence over these properties
+    @cached_property
+    def normd_message(self) -> str:
+        "The normalized text of the message"
+        return normalize(self.message)
+
+    @cached_property
+    def url_score(self) -> int:
+        "The sum of the scam-likelihood of each URL in the message"
+        return check_message(self.message, self._websites_reference)
+
+    @cached_property
+    def avg_word_len(self) -> float:
+        "The average length of words in the normalized message"
+        return get_avg_word_len(self.normd_message)
+
+    def __getstate__(self):
+        # don't send the whole websites list along with the message: features not computed yet are left out
+        state = self.__dict__.copy()
+        state.pop("_websites_reference", None)
+        return state
 
     def to_dict(self):
         return {
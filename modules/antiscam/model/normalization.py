@@ -3,8 +3,19 @@ import re
 from json import load
 
 from emoji.unicode_codes import get_aliases_unicode_dict
-from nltk import SnowballStemmer
-from nltk.corpus import stopwords
+
+from core.lazy_import import LazyValue
+
+
+def _load_stop_words() -> set[str]:
+    # pylint: disable=import-outside-toplevel
+    from nltk.corpus import stopwords
+    return set(stopwords.words("english"))
+
+def _load_affixes_stemmer():
+    # pylint: disable=import-outside-toplevel
+    from nltk import SnowballStemmer
+    return SnowballStemmer("english")
 
 UNICODE_EMOJI: dict[str, str] = get_aliases_unicode_dict()
 
@@ -27,8 +38,9 @@ RE_DISCORD_CHANNEL = re.compile(r"<#&?\d{15,}>")
 RE_DISCORD_INVITE = re.compile(r"(https?://)?(www\.)?(discord\.(gg|io|me|li)|discordapp\.com/invite)/ ?[\w-]{3,}")
 RE_DISCORD_ID = re.compile(r"(?P<pre>\D|^)(\d{17,19})(?P<post>\D|$)")
 
-STOP_WORDS = set(stopwords.words("english"))
-AFFIXES_STEM = SnowballStemmer("english")
+# the nltk data is only loaded when the first message is normalized
+STOP_WORDS = LazyValue("nltk english stop words", _load_stop_words)
+AFFIXES_STEM = LazyValue("nltk english stemmer", _load_affixes_stemmer)
 PROTECTED_WORDS = ("discordchannel", "discorduser", "discordemoji", "discordrole", "discordid",
                    "emailaddress", "webaddress", "phonenumber", "moneysymbol", "number", "discordinvite", "emoji")
 
@@ -83,11 +95,13 @@ def normalize_chars(message: str, remove_dots: bool = True) -> str:
 
 
 def normalize_stopwords(message: str) -> str:
-    return ' '.join(term for term in message.split() if term in PROTECTED_WORDS or term not in STOP_WORDS)
+    stop_words = STOP_WORDS.get()
+    return ' '.join(term for term in message.split() if term in PROTECTED_WORDS or term not in stop_words)
 
 
 def normalize_affixes(message: str) -> str:
-    return ' '.join(term if term in PROTECTED_WORDS else AFFIXES_STEM.stem(term) for term in message.split())
+    stemmer = AFFIXES_STEM.get()
+    return ' '.join(term if term in PROTECTED_WORDS else stemmer.stem(term) for term in message.split())
 
 def normalize_unicode(message: str) -> str:
     new_msg = ''
@@ -0,0 +1,188 @@
+import asyncio
+import logging
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import NamedTuple
+
+from ..model import AntiScamAgent, Message, PredictionResult
+
+# minimum number of normalized words for a message to be analyzed by the model
+MIN_WORDS_COUNT = 3
+
+
+class InferenceResult(NamedTuple):
+    "Result of the analysis of a message, with no prediction if the message is too short"
+    message: Message
+    prediction: PredictionResult | None
+
+
+class _InferenceRequest(NamedTuple):
+    content: str
+    mentions_count: int
+    future: asyncio.Future[InferenceResult]
+
+
+def analyze_message(agent: AntiScamAgent, content: str, mentions_count: int) -> InferenceResult:
+    "Extract the features of a message and predict its category"
+    message = Message.from_raw(content, mentions_count, agent.websites_list)
+    if len(message.normd_message.split()) < MIN_WORDS_COUNT:
+        return InferenceResult(message, None)
+    return InferenceResult(message, agent.predict_bot(message))
+
+
+# agent loaded once in each worker process
+_worker_agent: AntiScamAgent | None = None
+
+def _init_worker(model_filepath: str, websites_list: dict[str, bool]):
+    global _worker_agent # pylint: disable=global-statement
+    # spawned workers don't inherit a model path changed at runtime
+    AntiScamAgent.MODEL_FILEPATH = model_filepath
+    _worker_agent = AntiScamAgent()
+    _worker_agent.websites_list = websites_list
+
+def _analyze_batch(items: list[tuple[str, int]]) -> list[InferenceResult]:
+    return [analyze_message(_worker_agent, content, mentions_count) for content, mentions_count in items]
+
+
+class InferenceService:
+    """Run the antiscam analysis of messages in worker processes, to keep the event loop responsive
+
+    Messages are grouped into small batches during `batch_window` seconds to reduce the inter-process overhead.
+    When too many messages are waiting, they are analyzed inline instead."""
+
+    def __init__(self, agent: AntiScamAgent, max_workers: int = 1, batch_window: float = 0.005,
+                 max_batch_size: int = 32, max_pending: int = 512):
+        self.agent = agent
+        self.max_workers = max_workers
+        self.batch_window = batch_window
+        self.max_batch_size = max_batch_size
+        self.max_pending = max_pending
+        self.log = logging.getLogger("bot.antiscam")
+        self._queue: asyncio.Queue[_InferenceRequest] = asyncio.Queue()
+        self._pool: ProcessPoolExecutor | None = None
+        self._batcher_task: asyncio.Task | None = None
+        self._running_batches: set[asyncio.Task] = set()
+        self._workers_slots = asyncio.Semaphore(max_workers)
+        self.pending_count = 0
+
+    @property
+    def is_running(self):
+        return self._pool is not None
+
+    def start(self):
+        "Start the worker processes with the current agent data"
+        if self._pool is not None:
+            return
+        self._pool = self._create_pool()
+        if self._pool is not None and self._batcher_task is None:
+            self._batcher_task = asyncio.create_task(self._batcher())
+
+    def reload(self, agent: AntiScamAgent | None = None):
+        """Restart the worker processes, so that they use the current model file and websites list
+        The batches already sent to the previous workers are still analyzed by them"""
+        if agent is not None:
+            self.agent = agent
+        if self._pool is None:
+            self.start()
+            return
+        self._pool.shutdown(wait=False, cancel_futures=False)
+        self._pool = self._create_pool()
+
+    def _create_pool(self):
+        # workers load the model from its file, and would fail forever without it
+        if not os.path.isfile(AntiScamAgent.MODEL_FILEPATH):
+            self.log.warning("No antiscam model file found, messages will be analyzed inline")
+            return None
+        # don't fork the whole bot process (with its threads and connections) to create the workers
+        return ProcessPoolExecutor(
+            max_workers=self.max_workers,
+            mp_context=multiprocessing.get_context("spawn"),
+            initializer=_init_worker,
+            initargs=(AntiScamAgent.MODEL_FILEPATH, self.agent.websites_list),
+        )
+
+    async def close(self):
+        "Stop the worker processes, and analyze the remaining messages inline"
+        if self._batcher_task is not None:
+            self._batcher_task.cancel()
+            self._batcher_task = None
+        # let the batches already sent finish
+        await asyncio.gather(*self._running_batches, return_exceptions=True)
+        if self._pool is not None:
+            self._pool.shutdown(wait=False, cancel_futures=True)
+            self._pool = None
+        while not self._queue.empty():
+            request = self._queue.get_nowait()
+            self._resolve_inline(request)
+
+    async def analyze(self, content: str, mentions_count: int) -> InferenceResult:
+        "Analyze a message, in a worker process if possible"
+        if self._pool is None or self.pending_count >= self.max_pending:
+            return analyze_message(self.agent, content, mentions_count)
+        future: asyncio.Future[InferenceResult] = asyncio.get_running_loop().create_future()
+        self.pending_count += 1
+        self._queue.put_nowait(_InferenceRequest(content, mentions_count, future))
+        try:
+            return await future
+        finally:
+            self.pending_count -= 1
+
+    async def _batcher(self):
+        "Group the queued messages into batches and send them to the workers"
+        while True:
+            batch = [await self._queue.get()]
+            try:
+                # wait a bit for other messages to come
+                await asyncio.sleep(self.batch_window)
+                while len(batch) < self.max_batch_size and not self._queue.empty():
+                    batch.append(self._queue.get_nowait())
+                await self._workers_slots.acquire()
+            except asyncio.CancelledError:
+                for request in batch:
+                    self._resolve_inline(request)
+                raise
+            task = asyncio.create_task(self._run_batch(batch))
+            self._running_batches.add(task)
+            task.add_done_callback(self._running_batches.discard)
+
+    async def _run_batch(self, batch: list[_InferenceRequest]):
+        try:
+            if self._pool is None:
+                for request in batch:
+                    self._resolve_inline(request)
+                return
+            loop = asyncio.get_running_loop()
+            items = [(request.content, request.mentions_count) for request in batch]
+            try:
+                results = await loop.run_in_executor(self._pool, _analyze_batch, items)
+            except BrokenProcessPool:
+                self.log.error("Antiscam worker process crashed, restarting it")
+                self._restart_pool()
+                for request in batch:
+                    self._resolve_inline(request)
+                return
+            except Exception as err: # pylint: disable=broad-except
+                for request in batch:
+                    if not request.future.done():
+                        request.future.set_exception(err)
+                return
+            for request, result in zip(batch, results, strict=True):
+                if not request.future.done():
+                    request.future.set_result(result)
+        finally:
+            self._workers_slots.release()
+
+    def _restart_pool(self):
+        if self._pool is not None:
+            self._pool.shutdown(wait=False, cancel_futures=True)
+        self._pool = self._create_pool()
+
+    def _resolve_inline(self, request: _InferenceRequest):
+        if request.future.done():
+            return
+        try:
+            request.future.set_result(analyze_message(self.agent, request.content, request.mentions_count))
+        except Exception as err: # pylint: disable=broad-except
+            request.future.set_exception(err)
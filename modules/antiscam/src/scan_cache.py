@@ -0,0 +1,160 @@
+import hashlib
+import re
+import time
+from collections import OrderedDict
+from typing import Literal, NamedTuple
+
+from ..model import PredictionResult
+
+CacheLookupKind = Literal["hit", "near_hit", "miss"]
+
+RE_URL = re.compile(r"https?://(?:www\.)?([^/\s]+)\S*")
+RE_TOKEN = re.compile(r"\w+")
+SHINGLE_SIZE = 4
+FINGERPRINT_BITS = 64
+
+
+def get_content_digest(content: str) -> bytes:
+    "Get a short digest identifying an exact message content"
+    return hashlib.blake2b(content.encode("utf-8"), digest_size=16).digest()
+
+def get_canonical_words(content: str) -> list[str]:
+    """Split a message into lowercase words, ignoring punctuation and URL paths
+    (scam waves often only change the path of their links)"""
+    return RE_TOKEN.findall(RE_URL.sub(r" \1 ", content.lower()))
+
+def get_simhash(features: set[str]) -> int:
+    "Compute the 64-bits SimHash fingerprint of a set of features"
+    rows = [
+        f"{int.from_bytes(hashlib.blake2b(feature.encode('utf-8'), digest_size=8).digest()):064b}"
+        for feature in features
+    ]
+    threshold = len(rows) / 2
+    fingerprint = 0
+    for column in zip(*rows):
+        fingerprint = (fingerprint << 1) | (column.count("1") > threshold)
+    return fingerprint
+
+
+class _CacheEntry(NamedTuple):
+    result: PredictionResult
+    fingerprint: int | None
+    created_at: float
+
+
+class ScanCache:
+    """Cache of the recent antiscam verdicts, bounded in size and duration
+
+    Entries are indexed by a digest of the message content, and by a SimHash fingerprint of its words, so that a message
+    almost identical to a recently scanned one (a changed character or URL slug) can reuse its verdict"""
+
+    def __init__(self, max_size: int = 20_000, ttl: float = 3 * 3600, max_distance: int = 3, min_words: int = 5):
+        if not 0 <= max_distance < FINGERPRINT_BITS // 2:
+            raise ValueError(f"max_distance must be between 0 and {FINGERPRINT_BITS // 2 - 1}")
+        self.max_size = max_size
+        self.ttl = ttl
+        self.max_distance = max_distance
+        self.min_words = min_words
+        # fingerprints are split into bands to find candidates without comparing them to every cached entry:
+        # two fingerprints with at most `max_distance` different bits have at least one identical band
+        self._bands_count = max_distance + 1
+        self._band_bits = FINGERPRINT_BITS // self._bands_count
+        self._entries: OrderedDict[bytes, _CacheEntry] = OrderedDict()
+        # for each band, map of band value -> digests of the entries having this value
+        self._bands_index: list[dict[int, set[bytes]]] = [{} for _ in range(self._bands_count)]
+        self.stats: dict[CacheLookupKind, int] = {"hit": 0, "near_hit": 0, "miss": 0}
+
+    def __len__(self):
+        return len(self._entries)
+
+    def _get_fingerprint(self, content: str) -> int | None:
+        "Compute the SimHash of the characters shingles of a message"
+        words = get_canonical_words(content)
+        if len(words) < self.min_words:
+            # too short for a meaningful fingerprint
+            return None
+        text = " ".join(words)
+        return get_simhash({text[i:i + SHINGLE_SIZE] for i in range(max(1, len(text) - SHINGLE_SIZE + 1))})
+
+    def _get_bands(self, fingerprint: int) -> list[int]:
+        mask = (1 << self._band_bits) - 1
+        return [(fingerprint >> (self._band_bits * i)) & mask for i in range(self._bands_count)]
+
+    def get(self, content: str) -> tuple[PredictionResult | None, CacheLookupKind]:
+        "Find the verdict of an identical or almost identical message"
+        now = time.monotonic()
+        digest = get_content_digest(content)
+        if (entry := self._entries.get(digest)) is not None:
+            if now - entry.created_at < self.ttl:
+                self._entries.move_to_end(digest)
+                self.stats["hit"] += 1
+                return entry.result, "hit"
+            self._remove(digest)
+        if (fingerprint := self._get_fingerprint(content)) is not None:
+            if (result := self._find_similar(fingerprint, now)) is not None:
+                self.stats["near_hit"] += 1
+                return result, "near_hit"
+        self.stats["miss"] += 1
+        return None, "miss"
+
+    def _find_similar(self, fingerprint: int, now: float) -> PredictionResult | None:
+        "Find the closest cached entry within the maximum distance"
+        best_result, best_distance = None, self.max_distance + 1
+        checked: set[bytes] = set()
+        expired: list[bytes] = []
+        for band_index, band in zip(self._bands_index, self._get_bands(fingerprint)):
+            for digest in band_index.get(band, ()):
+                if digest in checked:
+                    continue
+                checked.add(digest)
+                entry = self._entries[digest]
+                if now - entry.created_at >= self.ttl:
+                    expired.append(digest)
+                    continue
+                distance = (entry.fingerprint ^ fingerprint).bit_count()
+                if distance < best_distance:
+                    best_result, best_distance = entry.result, distance
+        for digest in expired:
+            self._remove(digest)
+        return best_result
+
+    def set(self, content: str, result: PredictionResult):
+        "Save the verdict of a scanned message"
+        digest = get_content_digest(content)
+        if digest in self._entries:
+            self._remove(digest)
+        fingerprint = self._get_fingerprint(content)
+        self._entries[digest] = _CacheEntry(result, fingerprint, time.monotonic())
+        if fingerprint is not None:
+            for band_index, band in zip(self._bands_index, self._get_bands(fingerprint)):
+                band_index.setdefault(band, set()).add(digest)
+        while len(self._entries) > self.max_size:
+            self._remove(next(iter(self._entries)))
+
+    def _remove(self, digest: bytes):
+        entry = self._entries.pop(digest)
+        if entry.fingerprint is None:
+            return
+        for band_index, band in zip(self._bands_index, self._get_bands(entry.fingerprint)):
+            digests = band_index[band]
+            digests.discard(digest)
+            if not digests:
+                del band_index[band]
+
+    def remove_expired(self):
+        "Remove every expired entry"
+        now = time.monotonic()
+        for digest in [digest for digest, entry in self._entries.items() if now - entry.created_at >= self.ttl]:
+            self._remove(digest)
+
+    def clear(self):
+        "Remove every entry"
+        self._entries.clear()
+        for band_index in self._bands_index:
+            band_index.clear()
+
+    def pop_stats(self) -> dict[CacheLookupKind, int]:
+        "Get the lookups counters since the last call, and reset them"
+        stats = self.stats
+        self.stats = {"hit": 0, "near_hit": 0, "miss": 0}
+        return stats
@@ -7,11 +7,12 @@ import discord
 from discord import app_commands
 from discord.ext import commands, tasks
 
-from core.bot_classes import SUPPORT_GUILD_ID, Axobot
+from core.bot_classes import SUPPORT_GUILD_ID, Axobot, MessageFacts
 from core.checks.checks import database_connected
 from core.formatutils import FormatUtils
 
 from .data import EventData, EventRewardRole, EventType
+from .src.points_snapshot import EventPointsSnapshot, fetch_event_points_snapshot
 from .subcogs import AbstractSubcog, SingleReactionSubcog
 
 
@@ -32,6 +33,10 @@ class BotEvents(commands.Cog):
         self.coming_event_id: str | None = None
         self.update_current_event()
 
+        # snapshot of the event points table, valid until the next points update
+        self.points_snapshot: EventPointsSnapshot | None = None
+        self._points_version = 0
+
         self._subcog: AbstractSubcog = SingleReactionSubcog(
             self.bot, self.current_event, self.current_event_data, self.current_event_id)
 
@@ -43,6 +48,20 @@ class BotEvents(commands.Cog):
             self._subcog = SingleReactionSubcog(self.bot, self.current_event, self.current_event_data, self.current_event_id)
         return self._subcog
 
+    async def refresh_points_snapshot(self) -> EventPointsSnapshot:
+        "Read the event points table and save its snapshot, to be reused until the next points update"
+        version = self._points_version
+        snapshot = await fetch_event_points_snapshot(self.bot)
+        # don't save a snapshot which may miss a points update made during the query
+        if version == self._points_version:
+            self.points_snapshot = snapshot
+        return snapshot
+
+    def invalidate_points_snapshot(self):
+        "Forget the points snapshot after a points update"
+        self._points_version += 1
+        self.points_snapshot = None
+
     async def cog_load(self):
         if self.bot.internal_loop_enabled:
             self._update_event_loop.start() # pylint: disable=no-member
@@ -111,7 +130,7 @@ class BotEvents(commands.Cog):
         await self.bot.send_embed(emb, url="loop")
 
     @commands.Cog.listener()
-    async def on_message(self, msg: discord.Message):
+    async def on_message_facts(self, msg: discord.Message, facts: MessageFacts):
         "Add a random reaction to specific messages if an event is active"
         if self.bot.zombie_mode or msg.author.bot:
             # don't react if zombie mode is enabled or of it's a bot
@@ -120,7 +139,7 @@ class BotEvents(commands.Cog):
             # don't react if we don't have the required permission
             return
         if self.current_event:
-            await self.subcog.on_message(msg)
+            await self.subcog.on_message(msg, facts)
 
     @commands.Cog.listener()
     async def on_raw_reaction_add(self, payload: discord.RawReactionActionEvent):
@@ -322,6 +341,7 @@ class BotEvents(commands.Cog):
                 ON DUPLICATE KEY UPDATE other_points = other_points + VALUE(`other_points`);"
             async with self.bot.db_main.write(query, (user_id, points, self.bot.beta)):
                 pass
+            self.invalidate_points_snapshot()
             try:
                 await self.reload_event_rankcard(user_id)
                 await self.reload_event_special_role(user_id)
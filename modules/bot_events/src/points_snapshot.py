@@ -0,0 +1,115 @@
+import math
+from bisect import bisect_left, bisect_right
+from dataclasses import dataclass
+from typing import TYPE_CHECKING, Iterable
+
+if TYPE_CHECKING:
+    from core.bot_classes import Axobot
+
+
+def _round_half_away(value: float) -> int:
+    "Round a number like MySQL does, with halves rounded away from zero"
+    return int(math.copysign(math.floor(abs(value) + 0.5), value))
+
+
+@dataclass(frozen=True, slots=True)
+class PointsDistribution:
+    "Distribution of a list of points values"
+    count: int
+    nonzero_count: int
+    total: int
+    min: int | None
+    max: int | None
+    median: int | None
+    p90: int | None
+    p99: int | None
+
+    @classmethod
+    def from_sorted_values(cls, values: list[int]):
+        "Compute the distribution of some values sorted in ascending order"
+        count = len(values)
+        if count == 0:
+            return cls(0, 0, 0, None, None, None, None, None)
+        return cls(
+            count=count,
+            nonzero_count=count - (bisect_right(values, 0) - bisect_left(values, 0)),
+            total=sum(values),
+            min=values[0],
+            max=values[-1],
+            median=_round_half_away((values[(count - 1) // 2] + values[count // 2]) / 2),
+            p90=values[math.ceil(0.9 * count) - 1],
+            p99=values[math.ceil(0.99 * count) - 1],
+        )
+
+
+class EventPointsSnapshot:
+    """Snapshot of the event points of every user, computed from a single scan of the points table
+
+    It provides both the distribution of the points, and the leaderboard of the users."""
+
+    def __init__(self, rows: Iterable[tuple[int, int, int]]):
+        "Build the snapshot from (user ID, points, collect points) rows"
+        self._users_points: dict[int, int] = {}
+        collect_values: list[int] = []
+        for user_id, points, collect_points in rows:
+            self._users_points[user_id] = points
+            collect_values.append(collect_points)
+        collect_values.sort()
+        # every points values, sorted in ascending order
+        self._points_asc = sorted(self._users_points.values())
+        # users having a non-zero amount of points, from the best to the worst
+        self._leaderboard = sorted(
+            ((user_id, points) for user_id, points in self._users_points.items() if points != 0),
+            key=lambda item: item[1], reverse=True
+        )
+        points_asc = self._points_asc
+        self.collect_distribution = PointsDistribution.from_sorted_values(collect_values)
+        self.points_distribution = PointsDistribution.from_sorted_values(points_asc)
+        self.nonzero_points_distribution = PointsDistribution.from_sorted_values(
+            [points for points in points_asc if points != 0]
+        )
+        self.participants_count = len(points_asc) - bisect_right(points_asc, 0)
+
+    def __len__(self):
+        return len(self._users_points)
+
+    def get_top(self, number: int) -> list[dict[str, int]]:
+        "Get the leaderboard of the users having a non-zero amount of points"
+        return [{"user_id": user_id, "points": points} for user_id, points in self._leaderboard[:number]]
+
+    def get_rank(self, user_id: int) -> dict[str, int] | None:
+        "Get the points and the rank of a user, or None if they have never earned points"
+        if (points := self._users_points.get(user_id)) is None:
+            return None
+        # 1 + number of users having strictly more points
+        rank = 1 + len(self._points_asc) - bisect_right(self._points_asc, points)
+        return {"user_id": user_id, "points": points, "rank": rank}
+
+    def get_stats_metrics(self) -> list[tuple[str, int]]:
+        "Get the metrics to record in the stats table"
+        collect = self.collect_distribution
+        points, nonzero_points = self.points_distribution, self.nonzero_points_distribution
+        metrics = [
+            ("eventpoints_collect.total", collect.total),
+            ("eventpoints_collect.min", collect.min),
+            ("eventpoints_collect.max", collect.max),
+            ("eventpoints_collect.median", collect.median),
+            ("eventpoints_collect.p90", collect.p90),
+            ("eventpoints_collect.p99", collect.p99),
+            ("eventpoints_collect.rows", collect.nonzero_count),
+            ("eventpoints.total", points.total),
+            ("eventpoints.min", points.min),
+            ("eventpoints.max", points.max),
+            ("eventpoints.median", nonzero_points.median),
+            ("eventpoints.p90", nonzero_points.p90),
+            ("eventpoints.p99", nonzero_points.p99),
+            ("eventpoints.rows", nonzero_points.count),
+        ]
+        return [(variable, value) for variable, value in metrics if value is not None]
+
+
+async def fetch_event_points_snapshot(bot: "Axobot") -> EventPointsSnapshot:
+    "Read the whole event points table once, and build its snapshot"
+    query = "SELECT `user_id`, `points`, `collect_points` FROM `event_points` WHERE `beta` = %s"
+    async with bot.db_main.read(query, (bot.beta,), astuple=True) as query_results:
+        return EventPointsSnapshot(query_results)
@@ -4,7 +4,7 @@ from typing import Any, Literal, TypedDict
 
 import discord
 
-from core.bot_classes import Axobot
+from core.bot_classes import Axobot, MessageFacts
 from core.formatutils import FormatUtils
 
 from ..data.dict_types import (EventData, EventItem, EventItemWithCount,
@@ -31,7 +31,7 @@ class AbstractSubcog(ABC):
         self.translations_data = get_events_translations()
 
     @abstractmethod
-    async def on_message(self, msg: discord.Message):
+    async def on_message(self, msg: discord.Message, facts: MessageFacts):
         "Called when a message is sent"
 
     @abstractmethod
@@ -159,13 +159,13 @@ class AbstractSubcog(ABC):
             top_5_f.append(f"{i+1}. {username} ({row['points']} points)")
         return "\n".join(top_5_f)
 
-    async def is_fun_enabled(self, message: discord.Message):
+    async def is_fun_enabled(self, facts: MessageFacts):
         "Check if fun is enabled in a given context"
-        if message.guild is None:
+        if facts.guild is None:
             return True
-        if not self.bot.database_online and not message.author.guild_permissions.manage_guild:
+        if not self.bot.database_online and not facts.author.guild_permissions.manage_guild:
             return False
-        return await self.bot.get_config(message.guild.id, "enable_events")
+        return facts.config["enable_events"]
 
     async def get_random_tip_field(self, interaction: discord.Interaction):
         return {
@@ -212,10 +212,18 @@ class AbstractSubcog(ABC):
                 self.bot.dispatch("error", err)
         return True
 
+    def _get_points_snapshot(self):
+        "Get the event points snapshot if it is still up to date"
+        if cog := self.bot.get_cog("BotEvents"):
+            return cog.points_snapshot
+        return None
+
     async def db_get_event_top(self, number: int):
         "Get the event points leaderboard containing at max the given number of users"
         if not self.bot.database_online:
             return None
+        if snapshot := self._get_points_snapshot():
+            return snapshot.get_top(number)
         query = "SELECT `user_id`, `points` FROM `event_points` WHERE `points` != 0 AND `beta` = %s \
             ORDER BY `points` DESC LIMIT %s"
         async with self.bot.db_main.read(query, (self.bot.beta, number)) as query_results:
@@ -225,6 +233,8 @@ class AbstractSubcog(ABC):
         "Get the number of users who have at least 1 event point"
         if not self.bot.database_online:
             return 0
+        if snapshot := self._get_points_snapshot():
+            return snapshot.participants_count
         query = "SELECT COUNT(*) as count FROM `event_points` WHERE `points` > 0 AND `beta` = %s;"
         async with self.bot.db_main.read(query, (self.bot.beta,), fetchone=True) as query_results:
             return query_results["count"]
@@ -233,6 +243,8 @@ class AbstractSubcog(ABC):
         "Get the ranking of a user"
         if not self.bot.database_online:
             return None
+        if snapshot := self._get_points_snapshot():
+            return snapshot.get_rank(user_id)
         query = "SELECT `user_id`, `points`, FIND_IN_SET( `points`, \
             ( SELECT GROUP_CONCAT( `points` ORDER BY `points` DESC ) FROM `event_points` WHERE `beta` = %(beta)s ) ) AS rank \
                 FROM `event_points` WHERE `user_id` = %(user)s AND `beta` = %(beta)s"
@@ -294,6 +306,8 @@ class AbstractSubcog(ABC):
             return
         async with self.bot.db_main.write(query, (user_id, points, self.bot.beta)):
             pass
+        if cog := self.bot.get_cog("BotEvents"):
+            cog.invalidate_points_snapshot()
 
     async def db_get_event_items(self, event_type: EventType) -> list[EventItem]:
         "Get the items to win during a specific event"
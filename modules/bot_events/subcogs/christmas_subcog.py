@@ -50,13 +50,13 @@ class ChristmasSubcog(AbstractSubcog):
         super().__init__(bot, current_event, current_event_data, current_event_id)
         self.pending_reactions: dict[int, EventItem] = {} # map of MessageID => EventItem
 
-    async def on_message(self, msg):
+    async def on_message(self, msg, facts):
         "Add random reaction to some messages"
         if self.current_event and (data := self.current_event_data.get("emojis")):
             if msg.guild is not None and not msg.channel.permissions_for(msg.guild.me).add_reactions:
                 # don't react if we can't add reactions
                 return
-            if not await self.is_fun_enabled(msg):
+            if not await self.is_fun_enabled(facts):
                 # don't react if fun is disabled for this guild
                 return
             if random() < data["probability"] and await self.check_trigger_words(msg.content):
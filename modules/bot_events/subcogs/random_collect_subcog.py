@@ -22,13 +22,13 @@ class RandomCollectSubcog(AbstractSubcog):
         self.collect_max_strike_period = 3600 * 2 # (2h) time in seconds after which the strike level is reset to 0
         self.collect_bonus_per_strike = 1.05 # the amount of points is multiplied by this number for each strike level
 
-    async def on_message(self, msg):
+    async def on_message(self, msg, facts):
         "Add random reaction to some messages"
         if self.current_event and (data := self.current_event_data.get("emojis")):
             if msg.guild is not None and not msg.channel.permissions_for(msg.guild.me).add_reactions:
                 # don't react if we can't add reactions
                 return
-            if not await self.is_fun_enabled(msg):
+            if not await self.is_fun_enabled(facts):
                 # don't react if fun is disabled for this guild
                 return
             if random() < data["probability"] and any(trigger in msg.content for trigger in data["triggers"]):
@@ -23,13 +23,13 @@ class SingleReactionSubcog(AbstractSubcog):
 
         self.collect_cooldown = 60*30 # (30min) time in seconds between 2 collects
 
-    async def on_message(self, msg):
+    async def on_message(self, msg, facts):
         "Add random reaction to some message"
         if self.current_event and (data := self.current_event_data.get("emojis")):
             if msg.guild is not None and not msg.channel.permissions_for(msg.guild.me).add_reactions:
                 # don't react if we can't add reactions
                 return
-            if not await self.is_fun_enabled(msg):
+            if not await self.is_fun_enabled(facts):
                 # don't react if fun is disabled for this guild
                 return
             if random() < data["probability"] and await self.check_trigger_words(msg.content):
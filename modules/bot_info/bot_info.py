@@ -1,6 +1,9 @@
+import asyncio
 import glob
+import json
 import os
 import sys
+from collections import Counter
 from typing import Literal
 
 import discord
@@ -14,6 +17,11 @@ from core.checks import checks
 from core.formatutils import FormatUtils
 from docs import conf
 
+from .src.users_counter import UsersCounter
+
+# lines count of every Python file, kept between restarts to only read the modified files at boot
+CODELINES_CACHE_FILE = "codelines-cache.json"
+
 
 class BotInfo(commands.Cog):
     "Commands to get information about the bot"
@@ -25,27 +33,120 @@ class BotInfo(commands.Cog):
         self.process = psutil.Process()
         self.process.cpu_percent()
         self.codelines: int | None = None
+        # file path -> (modification time, lines count)
+        self._codelines_cache: dict[str, tuple[float, int]] | None = None
+        self._is_counting_codelines = False
+        # unique users in every guild, and in every guild except the ignored ones
+        self.all_users_counter = UsersCounter()
+        self.users_counter = UsersCounter(IGNORED_GUILDS)
+
+    async def cog_load(self):
+        if self.bot.is_ready():
+            await self.rebuild_users_counters()
 
     @commands.Cog.listener()
     async def on_ready(self):
+        await self.rebuild_users_counters()
         await self.refresh_code_lines_count()
 
+    async def rebuild_users_counters(self):
+        "Count the unique users and bots from the members cache"
+        self.all_users_counter.rebuild(self.bot.guilds)
+        # use the same ignored guilds as the /stats command, including the banned ones, to avoid a rebuild on its first call
+        self.users_counter.rebuild(self.bot.guilds, await self.get_ignored_guilds())
+
+    @commands.Cog.listener()
+    async def on_member_join(self, member: discord.Member):
+        for counter in (self.all_users_counter, self.users_counter):
+            counter.add_member(member)
+
+    @commands.Cog.listener()
+    async def on_member_remove(self, member: discord.Member):
+        for counter in (self.all_users_counter, self.users_counter):
+            counter.remove_member(member)
+
+    @commands.Cog.listener("on_guild_join")
+    @commands.Cog.listener("on_guild_available")
+    async def on_guild_counted(self, guild: discord.Guild):
+        for counter in (self.all_users_counter, self.users_counter):
+            counter.add_guild(guild)
+
+    @commands.Cog.listener("on_guild_remove")
+    @commands.Cog.listener("on_guild_unavailable")
+    async def on_guild_uncounted(self, guild: discord.Guild):
+        for counter in (self.all_users_counter, self.users_counter):
+            counter.remove_guild(guild)
+
 
     async def refresh_code_lines_count(self):
         """Count lines of Python code in the current folder
 
-        Comments and empty lines are ignored."""
+        Comments and empty lines are ignored. Nothing is done if a count is already running."""
+        if self._is_counting_codelines:
+            return
+        self._is_counting_codelines = True
+        try:
+            self.codelines = await asyncio.to_thread(self._count_code_lines)
+        finally:
+            self._is_counting_codelines = False
+
+    def _count_code_lines(self) -> int:
+        "Count lines of Python code in the current folder, only reading the files modified since the last count"
+        if self._codelines_cache is None:
+            self._codelines_cache = self._load_codelines_cache()
+        has_changed = False
         count = 0
+        known_files: set[str] = set()
         path = os.getcwd() + "/**/*.py"
         for filename in glob.iglob(path, recursive=True):
             if "/env/" in filename or not filename.endswith(".py"):
                 continue
-            with open(filename, 'r', encoding="utf-8") as file:
-                for line in file.read().split("\n"):
-                    cleaned_line = line.strip()
-                    if len(cleaned_line) > 2 and not cleaned_line.startswith('#') or cleaned_line.startswith('"'):
-                        count += 1
-        self.codelines = count
+            try:
+                mtime = os.stat(filename).st_mtime
+            except OSError:
+                continue
+            known_files.add(filename)
+            cached = self._codelines_cache.get(filename)
+            if cached is None or cached[0] != mtime:
+                cached = (mtime, self._count_file_code_lines(filename))
+                self._codelines_cache[filename] = cached
+                has_changed = True
+            count += cached[1]
+        # forget the deleted files
+        for filename in self._codelines_cache.keys() - known_files:
+            del self._codelines_cache[filename]
+            has_changed = True
+        if has_changed:
+            self._save_codelines_cache()
+        return count
+
+    @staticmethod
+    def _load_codelines_cache() -> dict[str, tuple[float, int]]:
+        "Load the lines count of the files from the previous run"
+        try:
+            with open(CODELINES_CACHE_FILE, 'r', encoding="utf-8") as file:
+                return {filename: (mtime, count) for filename, (mtime, count) in json.load(file).items()}
+        except (OSError, ValueError, TypeError):
+            return {}
+
+    def _save_codelines_cache(self):
+        "Save the lines count of the files for the next run"
+        try:
+            with open(CODELINES_CACHE_FILE, 'w', encoding="utf-8") as file:
+                json.dump(self._codelines_cache, file)
+        except OSError as err:
+            self.bot.log.warning("Could not save the code lines cache: %s", err)
+
+    @staticmethod
+    def _count_file_code_lines(filename: str) -> int:
+        "Count lines of code in a Python file, ignoring comments and empty lines"
+        count = 0
+        with open(filename, 'r', encoding="utf-8") as file:
+            for line in file.read().split("\n"):
+                cleaned_line = line.strip()
+                if len(cleaned_line) > 2 and not cleaned_line.startswith('#') or cleaned_line.startswith('"'):
+                    count += 1
+        return count
 
     async def get_ignored_guilds(self) -> list[int]:
         "Get the list of ignored guild IDs"
@@ -146,9 +247,24 @@ class BotInfo(commands.Cog):
 
     def get_users_nber(self, ignored_guilds: list[int]):
         "Return the amount of members and the amount of bots in every reachable guild, excepted in ignored guilds"
-        members = [x.members for x in self.bot.guilds if x.id not in ignored_guilds]
-        members = list(set(x for x in members for x in x)) # filter users
-        return len(members), len([x for x in members if x.bot])
+        if not ignored_guilds:
+            counter = self.all_users_counter
+        else:
+            counter = self.users_counter
+            if not counter.is_built or counter.ignored_guilds != frozenset(ignored_guilds):
+                # the list of ignored guilds changed
+                counter.rebuild(self.bot.guilds, ignored_guilds)
+        if not counter.is_built:
+            counter.rebuild(self.bot.guilds)
+        return counter.get_counts()
+
+    def check_users_counters(self) -> bool:
+        "Check that the unique users and bots counters match a full recount"
+        return all(
+            counter.check_consistency(self.bot.guilds)
+            for counter in (self.all_users_counter, self.users_counter)
+            if counter.is_built
+        )
 
     async def stats_commands(self, interaction: discord.Interaction):
         """List the most used commands
@@ -156,51 +272,18 @@ class BotInfo(commands.Cog):
         ..Doc infos.html#statistics"""
         await interaction.response.defer()
         forbidden = ["eval", "admin", "test", "bug", "idea", "send_msg"]
-        forbidden_where = ", ".join(f"'cmd.{elem}'" for elem in forbidden)
-        forbidden_where += ", " + ", ".join(f"'app_cmd.{elem}'" for elem in forbidden)
+        forbidden_variables = {f"cmd.{elem}" for elem in forbidden}
         commands_limit = 15
         lang = await self.bot._(interaction, "_used_locale")
-        # SQL query
+        # read the commands usages from the stats summaries
         async def do_query(minutes: int | None = None):
-            if minutes:
-                date_where_clause = "date BETWEEN (DATE_SUB(UTC_TIMESTAMP(), INTERVAL %(minutes)s MINUTE)) AND UTC_TIMESTAMP() AND"
-            else:
-                date_where_clause = ""
-            query = f"""
-SELECT
-    `all`.`variable`,
-    SUBSTRING_INDEX(`all`.`variable`, ".", -1) as cmd,
-    SUM(`all`.`value`) as usages
-FROM
-(
-    (
-        SELECT
-    		`variable`,
-	    	`value`
-    	FROM `statsbot`.`zbot`
-    	WHERE
-        	`variable` LIKE "cmd.%" AND
-            {date_where_clause}
-            `variable` NOT IN ({forbidden_where}) AND
-        	`entity_id` = %(entity_id)s
-	) UNION ALL (
-    	SELECT
-        	`variable`,
-	    	`value`
-    	FROM `statsbot`.`zbot-archives`
-    	WHERE
-        	`variable` LIKE "cmd.%" AND
-            {date_where_clause}
-            `variable` NOT IN ({forbidden_where}) AND
-        	`entity_id` = %(entity_id)s
-	)
-) AS `all`
-GROUP BY cmd
-ORDER BY usages DESC LIMIT %(limit)s"""
-            query_args = {"entity_id": self.bot.entity_id, "minutes": minutes, "limit": commands_limit}
-            async with self.bot.db_main.read(query, query_args) as query_result:
-                pass
-            return [row for row in query_result if not any(row["cmd"].startswith(x) for x in forbidden)]
+            sums = await self.bot.get_cog("BotStats").rollups.get_sums("cmd.", minutes, prefix=True)
+            usages: Counter[str] = Counter()
+            for variable, (value, _) in sums.items():
+                cmd = variable.split('.')[-1]
+                if variable not in forbidden_variables and not any(cmd.startswith(x) for x in forbidden):
+                    usages[cmd] += int(value)
+            return [{"cmd": cmd, "usages": count} for cmd, count in usages.most_common(commands_limit)]
 
         # in the last 24h
         data_24h = await do_query(60*24)
@@ -0,0 +1,90 @@
+from typing import Iterable
+
+import discord
+
+
+class UsersCounter:
+    """Reference-counted tally of the unique users and bots in the guilds of the bot
+
+    Each user is counted once, whatever the number of guilds they share with the bot.
+    The tally is built once from the members cache, then kept up to date from the members and guilds events."""
+
+    def __init__(self, ignored_guilds: Iterable[int] = ()):
+        self.ignored_guilds = frozenset(ignored_guilds)
+        self.is_built = False
+        # user ID -> number of counted guilds where this user is
+        self._guilds_count: dict[int, int] = {}
+        self._counted_guilds: set[int] = set()
+        self.bots_count = 0
+
+    @property
+    def users_count(self):
+        "Number of unique users, including bots"
+        return len(self._guilds_count)
+
+    def get_counts(self) -> tuple[int, int]:
+        "Return the amount of unique users and the amount of unique bots"
+        return self.users_count, self.bots_count
+
+    def rebuild(self, guilds: Iterable[discord.Guild], ignored_guilds: Iterable[int] | None = None):
+        "Count every member from scratch"
+        if ignored_guilds is not None:
+            self.ignored_guilds = frozenset(ignored_guilds)
+        self._guilds_count.clear()
+        self._counted_guilds.clear()
+        self.bots_count = 0
+        self.is_built = True
+        for guild in guilds:
+            self.add_guild(guild)
+
+    def add_guild(self, guild: discord.Guild):
+        "Count the members of a new guild"
+        if not self.is_built or guild.id in self.ignored_guilds or guild.id in self._counted_guilds:
+            return
+        self._counted_guilds.add(guild.id)
+        for member in guild.members:
+            self._add_user(member)
+
+    def remove_guild(self, guild: discord.Guild):
+        "Stop counting the members of a guild"
+        if guild.id not in self._counted_guilds:
+            return
+        self._counted_guilds.discard(guild.id)
+        for member in guild.members:
+            self._remove_user(member)
+
+    def add_member(self, member: discord.Member):
+        "Count a member who joined a guild"
+        if member.guild.id in self._counted_guilds:
+            self._add_user(member)
+
+    def remove_member(self, member: discord.Member):
+        "Stop counting a member who left a guild"
+        if member.guild.id in self._counted_guilds:
+            self._remove_user(member)
+
+    def _add_user(self, user: discord.abc.User):
+        count = self._guilds_count.get(user.id, 0)
+        if count == 0 and user.bot:
+            self.bots_count += 1
+        self._guilds_count[user.id] = count + 1
+
+    def _remove_user(self, user: discord.abc.User):
+        if (count := self._guilds_count.get(user.id)) is None:
+            return
+        if count > 1:
+            self._guilds_count[user.id] = count - 1
+            return
+        del self._guilds_count[user.id]
+        if user.bot:
+            self.bots_count -= 1
+
+    def check_consistency(self, guilds: Iterable[discord.Guild]) -> bool:
+        "Check that the tally matches a full recount of the members cache"
+        users: dict[int, bool] = {}
+        for guild in guilds:
+            if guild.id in self.ignored_guilds:
+                continue
+            for member in guild.members:
+                users[member.id] = member.bot
+        return (len(users), sum(users.values())) == self.get_counts()
@@ -12,10 +12,13 @@ import mysql
 import psutil
 from discord.ext import commands, tasks
 
-from core.bot_classes import Axobot, MyContext
+from core.bot_classes import Axobot, MessageFacts, MyContext
 from core.enums import ServerWarningType
+from modules.bot_events.src.points_snapshot import fetch_event_points_snapshot
 from modules.tickets.src.types import TicketCreationEvent
 
+from .src.rollups import StatsRollups
+
 try:
     import orjson  # type: ignore
 except ModuleNotFoundError:
@@ -69,6 +72,8 @@ class BotStats(commands.Cog):
         self.snooze_events: dict[tuple[int, int], int] = defaultdict(int)
         self.stream_events: dict[str, int] = defaultdict(int)
         self.voice_transcript_events: dict[tuple[float, float], int] = defaultdict(int)
+        self.xp_decay_run: tuple[int, float] | None = None
+        self.rollups = StatsRollups(bot)
 
     async def cog_load(self):
         # pylint: disable=no-member
@@ -79,6 +84,8 @@ class BotStats(commands.Cog):
         self.status_loop.start()
         self.heartbeat_loop.start()
         self.emojis_loop.start()
+        self.compact_loop.start()
+        self.rollups_backfill_loop.start()
 
     async def cog_unload(self):
         # pylint: disable=no-member
@@ -89,6 +96,8 @@ class BotStats(commands.Cog):
         self.status_loop.stop()
         self.heartbeat_loop.stop()
         self.emojis_loop.stop()
+        self.compact_loop.stop()
+        self.rollups_backfill_loop.cancel()
 
     @property
     def emoji_table(self):
@@ -229,6 +238,11 @@ class BotStats(commands.Cog):
         "Called when a voice transcript is completed"
         self.voice_transcript_events[(message_duration, generation_duration)] += 1
 
+    @commands.Cog.listener()
+    async def on_xp_decay_completed(self, statements_count: int, duration: float):
+        "Called when the daily xp decay is completed"
+        self.xp_decay_run = (statements_count, duration)
+
     @commands.Cog.listener()
     async def on_stream_starts(self, *_args):
         "Called when a stream starts"
@@ -240,12 +254,12 @@ class BotStats(commands.Cog):
         self.stream_events["ends"] += 1
 
     @commands.Cog.listener()
-    async def on_message(self, message: discord.Message):
+    async def on_message_facts(self, message: discord.Message, facts: MessageFacts):
         "Collect a few stats from some specific messages"
         await self._check_backup_msg(message)
         await self._check_voice_msg(message)
         if message.author != self.bot.user:
-            await self.emoji_analysis(message)
+            self.emoji_analysis(facts)
 
     async def _check_backup_msg(self, message: discord.Message):
         "Collect the last backup size from the logs channel"
@@ -280,130 +294,47 @@ class BotStats(commands.Cog):
         async with self.bot.db_main.read(query, fetchone=True, astuple=True) as query_result:
             return query_result[0]
 
-    async def db_record_event_collect_values(self, now: datetime):
-        "Record into the stats table the total, min, max and median dailies values, as well as the number of dailies rows"
-        # check if any daily is present
-        query = "SELECT COUNT(*) FROM `axobot`.`event_points` WHERE `beta` = %s"
-        async with self.bot.db_main.read(query, (self.bot.beta,), fetchone=True, astuple=True) as query_result:
-            if query_result[0] == 0:
-                return
-        # unit, is_sum, entity_id, beta
-        args = ("points", False, self.bot.entity_id, self.bot.beta)
-        # Total
-        query = "INSERT INTO `statsbot`.`zbot` SELECT %s, %s, SUM(collect_points) AS value, 0, %s, %s, %s FROM `axobot`.`event_points` WHERE `beta` = %s"
-        async with self.bot.db_main.write(query, (now, "eventpoints_collect.total", *args)) as _:
-            pass
-        # Min
-        query = "INSERT INTO `statsbot`.`zbot` SELECT %s, %s, MIN(collect_points) AS value, 0, %s, %s, %s FROM `axobot`.`event_points` WHERE `beta` = %s"
-        async with self.bot.db_main.write(query, (now, "eventpoints_collect.min", *args)) as _:
-            pass
-        # Max
-        query = "INSERT INTO `statsbot`.`zbot` SELECT %s, %s, MAX(collect_points) AS value, 0, %s, %s, %s FROM `axobot`.`event_points` WHERE `beta` = %s"
-        async with self.bot.db_main.write(query, (now, "eventpoints_collect.max", *args)) as _:
-            pass
-        # Median
-        query = """SET @row_index := -1;
-        INSERT INTO `statsbot`.`zbot`
-            SELECT %s, %s, ROUND(AVG(subq.collect_points)) as value, 0, %s, %s, %s
-            FROM (
-                SELECT @row_index:=@row_index + 1 AS row_index, collect_points
-                FROM `axobot`.`event_points`
-                WHERE `beta` = %s
-                ORDER BY collect_points
-            ) AS subq
-            WHERE subq.row_index
-            IN (FLOOR(@row_index / 2) , CEIL(@row_index / 2))"""
-        async with self.bot.db_main.write(query, (now, "eventpoints_collect.median", *args), multi=True) as _:
-            pass
-        # Number of rows
-        query = "INSERT INTO `statsbot`.`zbot` SELECT %s, %s, COUNT(*) AS value, 0, %s, %s, %s FROM `axobot`.`event_points` "\
-            "WHERE `collect_points` != 0 AND `beta` = %s"
-        async with self.bot.db_main.write(query, (now, "eventpoints_collect.rows", *args)) as _:
-            pass
-
-    async def db_record_event_points_values(self, now: datetime):
-        """Record into the stats table the total, min, max and median event points values,
-        as well as the number of users having at least 1 point"""
-        # check if any daily is present
-        query = "SELECT COUNT(*) FROM `axobot`.`event_points` WHERE `beta` = %s"
-        async with self.bot.db_main.read(query, (self.bot.beta,), fetchone=True, astuple=True) as query_result:
-            if query_result[0] == 0:
-                return
-        # unit, is_sum, entity_id, beta
-        args = ("points", False, self.bot.entity_id, self.bot.beta)
-        # Total
-        query = "INSERT INTO `statsbot`.`zbot` SELECT %s, %s, SUM(`points`) AS value, 0, %s, %s, %s FROM `axobot`.`event_points`"\
-            " WHERE `beta` = %s"
-        async with self.bot.db_main.write(query, (now, "eventpoints.total", *args)) as _:
-            pass
-        # Min
-        query = "INSERT INTO `statsbot`.`zbot` SELECT %s, %s, MIN(`points`) AS value, 0, %s, %s, %s FROM `axobot`.`event_points`"\
-            " WHERE `beta` = %s"
-        async with self.bot.db_main.write(query, (now, "eventpoints.min", *args)) as _:
-            pass
-        # Max
-        query = "INSERT INTO `statsbot`.`zbot` SELECT %s, %s, MAX(`points`) AS value, 0, %s, %s, %s FROM `axobot`.`event_points`"\
-            " WHERE `beta` = %s"
-        async with self.bot.db_main.write(query, (now, "eventpoints.max", *args)) as _:
-            pass
-        # Median
-        query = """SET @row_index := -1;
-        INSERT INTO `statsbot`.`zbot`
-            SELECT %s, %s, ROUND(AVG(subq.`points`)) as value, 0, %s, %s, %s
-            FROM (
-                SELECT @row_index:=@row_index + 1 AS row_index, `points`
-                FROM `axobot`.`event_points`
-                WHERE `points` != 0 AND `beta` = %s
-                ORDER BY points
-            ) AS subq
-            WHERE subq.row_index
-            IN (FLOOR(@row_index / 2) , CEIL(@row_index / 2))"""
-        async with self.bot.db_main.write(query, (now, "eventpoints.median", *args), multi=True) as _:
-            pass
-        # Number of rows
-        query = "INSERT INTO `statsbot`.`zbot` SELECT %s, %s, COUNT(*) AS value, 0, %s, %s, %s FROM `axobot`.`event_points` "\
-            "WHERE `points` != 0 AND `beta` = %s"
-        async with self.bot.db_main.write(query, (now, "eventpoints.rows", *args)) as _:
+    async def db_record_event_points_snapshot(self, now: datetime):
+        """Record into the stats table the distribution of the dailies and event points values
+        (total, min, max, median, percentiles and number of non-zero rows), computed from a single scan of the points table"""
+        if cog := self.bot.get_cog("BotEvents"):
+            snapshot = await cog.refresh_points_snapshot()
+        else:
+            snapshot = await fetch_event_points_snapshot(self.bot)
+        if len(snapshot) == 0:
+            return
+        metrics = snapshot.get_stats_metrics()
+        query = "INSERT INTO `statsbot`.`zbot` VALUES " + ", ".join(["(%s, %s, %s, 0, %s, %s, %s)"] * len(metrics))
+        query_args = [
+            arg
+            for variable, value in metrics
+            for arg in (now, variable, value, "points", False, self.bot.entity_id)
+        ]
+        async with self.bot.db_main.write(query, query_args):
             pass
 
-    async def db_record_serverlogs_enabled(self, now: datetime):
+    async def record_serverlogs_enabled(self, now: datetime):
         "Record into the stats table the number of enabled serverlogs, grouped by kind"
-        guild_ids = {guild.id for guild in self.bot.guilds}
-        query = "SELECT guild, kind FROM `serverlogs` WHERE `beta` = %s"
-        async with self.bot.db_main.read(query, (self.bot.beta,)) as query_results:
-            enabled_kinds = defaultdict(int)
-            for row in query_results:
-                if row["guild"] in guild_ids:
-                    enabled_kinds[row["kind"]] += 1
+        if (serverlogs_cog := self.bot.get_cog("ServerLogs")) is None:
+            return ()
+        enabled_kinds = await serverlogs_cog.get_enabled_logs_count()
         query = "INSERT INTO `statsbot`.`zbot` VALUES (%s, %s, %s,  0,\"logs\", 0, %s);"
         return ((query, (now, f"logs.{kind}.enabled", count, self.bot.entity_id))
             for kind, count in enabled_kinds.items()
         )
 
-
-    async def db_get_antiscam_enabled_count(self):
+    async def get_antiscam_enabled_count(self):
         "Get the number of active guilds where antiscam is enabled"
-        query = "SELECT `guild_id` FROM `serverconfig` WHERE `option_name` = 'anti_scam' AND `value` = %s"
-        count = 0
-        guild_ids = {guild.id for guild in self.bot.guilds}
-        async with self.bot.db_main.read(query, ("True",)) as query_results:
-            for row in query_results:
-                if row["guild_id"] in guild_ids:
-                    count += 1
-        return count
-
-    async def emoji_analysis(self, msg: discord.Message):
+        if (config_cog := self.bot.get_cog("ServerConfig")) is None:
+            return 0
+        return await config_cog.get_option_value_usage("anti_scam", "True")
+
+    def emoji_analysis(self, facts: MessageFacts):
         """Lists the emojis used in a message"""
-        try:
-            if not self.bot.database_online:
-                return
-            ctx = await self.bot.get_context(msg)
-            if ctx.command is not None:
-                return
-            for emoji_id in set(re.findall(r"<a?:[\w-]+:(\d{17,19})>", msg.content)):
-                self.emojis_usage[int(emoji_id)] += 1
-        except Exception as err:
-            self.bot.dispatch("error", err)
+        if not self.bot.database_online or facts.is_command:
+            return
+        for emoji_id in facts.custom_emojis:
+            self.emojis_usage[emoji_id] += 1
 
     async def db_get_emojis_info(self, emoji_id: int | list[int]) -> list[dict[str, Any]]:
         """Get info about an emoji usage"""
@@ -433,6 +364,11 @@ class BotStats(commands.Cog):
         now = self.bot.utcnow()
         # remove seconds and less
         now = now.replace(second=0, microsecond=0)
+        if not self.rollups.is_prepared:
+            try:
+                await self.rollups.prepare(now)
+            except Exception as err: # pylint: disable=broad-except
+                self.bot.dispatch("error", err, "When preparing the stats rollups")
         # prepare requests
         query = "INSERT INTO `statsbot`.`zbot` VALUES (%s, %s, %s, %s, %s, %s, %s);"
         cnx = self.bot.cnx_axobot
@@ -477,6 +413,22 @@ class BotStats(commands.Cog):
                 cursor.execute(query, (now, "perf.sql_count", sql_count, 0, "queries/min", True, self.bot.entity_id))
                 cursor.execute(query, (now, "perf.sql", sql_perf, 1, "ms", False, self.bot.entity_id))
                 self.sql_performance_records.clear()
+            # Event loop lag
+            loop_lag, slow_callbacks_count = self.bot.loop_lag_monitor.pop_stats()
+            if loop_lag.count:
+                cursor.execute(query,
+                               (now, "perf.loop_lag.avg", round(loop_lag.average_ms, 2), 1, "ms", False, self.bot.entity_id))
+                cursor.execute(query, (now, "perf.loop_lag.p95", loop_lag.percentile(95), 1, "ms", False, self.bot.entity_id))
+                cursor.execute(query, (now, "perf.loop_lag.max", round(loop_lag.max_ms, 2), 1, "ms", False, self.bot.entity_id))
+            cursor.execute(query,
+                           (now, "perf.slow_callbacks", slow_callbacks_count, 0, "callbacks/min", True, self.bot.entity_id))
+            # Message listeners execution time
+            for listener_name, timings in self.bot.message_analyzer.pop_timings().items():
+                prefix = f"perf.message_listeners.{listener_name}"
+                cursor.execute(query, (now, prefix+".calls", timings.count, 0, "calls/min", True, self.bot.entity_id))
+                cursor.execute(query, (now, prefix+".avg", round(timings.average_ms, 2), 1, "ms", False, self.bot.entity_id))
+                cursor.execute(query, (now, prefix+".p95", timings.percentile(95), 1, "ms", False, self.bot.entity_id))
+                cursor.execute(query, (now, prefix+".max", round(timings.max_ms, 2), 1, "ms", False, self.bot.entity_id))
             # CPU usage
             if bot_cpu := await self.get_list_usage(self.bot_cpu_records):
                 cursor.execute(query, (now, "perf.bot_cpu", bot_cpu, 1, '%', False, self.bot.entity_id))
@@ -512,8 +464,11 @@ class BotStats(commands.Cog):
                                (now, "antiscam.scanned",
                                 antiscam_cog.messages_scanned_in_last_minute, 0, "messages/min", True, self.bot.entity_id))
                 antiscam_cog.messages_scanned_in_last_minute = 0
+                for lookup_kind, count in antiscam_cog.recent_scans.pop_stats().items():
+                    cursor.execute(query,
+                                   (now, f"antiscam.cache.{lookup_kind}", count, 0, "messages/min", True, self.bot.entity_id))
             # antiscam activated count
-            antiscam_enabled = await self.db_get_antiscam_enabled_count()
+            antiscam_enabled = await self.get_antiscam_enabled_count()
             cursor.execute(query, (now, "antiscam.activated", antiscam_enabled, 0, "guilds", False, self.bot.entity_id))
             # tickets creation
             if self.ticket_events["creation"]:
@@ -523,14 +478,12 @@ class BotStats(commands.Cog):
                 self.ticket_events["creation"] = 0
             if self.bot.current_event:
                 try:
-                    # Dailies points
-                    await self.db_record_event_collect_values(now)
-                    # Events points
-                    await self.db_record_event_points_values(now)
+                    # Dailies and events points
+                    await self.db_record_event_points_snapshot(now)
                 except Exception as err: # pylint: disable=broad-except
                     self.bot.dispatch("error", err, "When recording event points")
             # serverlogs
-            for serverlogs_query in await self.db_record_serverlogs_enabled(now):
+            for serverlogs_query in await self.record_serverlogs_enabled(now):
                 cursor.execute(*serverlogs_query)
             for k, v in self.emitted_serverlogs.items():
                 cursor.execute(query, (now, f"logs.{k}.emitted", v, 0, "event/min", True, self.bot.entity_id))
@@ -567,11 +520,19 @@ class BotStats(commands.Cog):
                 cursor.execute(query, (now, f"voice_transcripts.{message_duration:.0f}.{generation_duration:.0f}", count, 0,
                                        "transcripts", True, self.bot.entity_id))
             self.voice_transcript_events.clear()
+            # xp decay
+            if self.xp_decay_run is not None:
+                statements_count, duration = self.xp_decay_run
+                cursor.execute(query, (now, "xp.decay.statements", statements_count, 0, "queries", False, self.bot.entity_id))
+                cursor.execute(query, (now, "xp.decay.duration", round(duration, 3), 1, 's', False, self.bot.entity_id))
+                self.xp_decay_run = None
             # Process open files
             for fd, count in self.open_files.items():
                 cursor.execute(query, (now, f"process.open_files.{fd}", count, 0,
                                        "files", False, self.bot.entity_id))
             self.open_files.clear()
+            # Hourly and daily summaries
+            self.rollups.record_minute(cursor, now)
             # Push everything
             cnx.commit()
         except mysql.connector.errors.IntegrityError as err: # usually duplicate primary key
@@ -590,21 +551,48 @@ class BotStats(commands.Cog):
 
     async def get_sum_stats(self, variable: str, minutes: int) -> int | float | str | None:
         """Get the sum of a certain variable in the last X minutes"""
-        cnx = self.bot.cnx_axobot
-        cursor = cnx.cursor(dictionary=True)
-        cursor.execute('SELECT variable, SUM(value) as value, type FROM `statsbot`.`zbot` WHERE variable = %s \
-                       AND date BETWEEN (DATE_SUB(UTC_TIMESTAMP(),INTERVAL %s MINUTE)) AND UTC_TIMESTAMP() AND `entity_id`=%s',
-                       (variable, minutes, self.bot.entity_id))
-        result: list[dict] = list(cursor)
-        cursor.close()
-        if len(result) == 0:
+        result = (await self.rollups.get_sums(variable, minutes)).get(variable)
+        if result is None:
             return 0
-        result = result[0]
-        if result["type"] == 0:
-            return int(result["value"])
-        if result["type"] == 1:
-            return float(result["value"])
-        return result["value"]
+        value, value_type = result
+        if value_type == 0:
+            return int(value)
+        if value_type == 1:
+            return float(value)
+        return value
+
+    @tasks.loop(minutes=2)
+    async def rollups_backfill_loop(self):
+        """Summarize the stats history into the rollups, retrying until it succeeds once
+        Waits for the stats loop to prepare the rollups, so that the cutoff date is known"""
+        if not (self.bot.stats_enabled and self.bot.database_online and self.rollups.is_prepared):
+            return
+        try:
+            await self.rollups.backfill()
+        except Exception as err: # pylint: disable=broad-except
+            self.bot.dispatch("error", err, "When backfilling the stats rollups")
+            return
+        self.rollups_backfill_loop.stop() # pylint: disable=no-member
+
+    @rollups_backfill_loop.before_loop
+    async def before_rollups_backfill_loop(self):
+        await self.bot.wait_until_ready()
+
+    @tasks.loop(hours=6)
+    async def compact_loop(self):
+        "Delete the old raw stats, already summarized in the rollups"
+        if not (self.bot.stats_enabled and self.bot.database_online):
+            return
+        if deleted_count := await self.rollups.compact():
+            self.log.info("Deleted %s raw stats rows already summarized", deleted_count)
+
+    @compact_loop.before_loop
+    async def before_compact_loop(self):
+        await self.bot.wait_until_ready()
+
+    @compact_loop.error
+    async def on_compact_loop_error(self, error: Exception):
+        self.bot.dispatch("error", error, "When compacting the raw stats")
 
     @tasks.loop(minutes=4)
     async def status_loop(self):
@@ -0,0 +1,253 @@
+import asyncio
+import logging
+from datetime import datetime, timedelta
+from typing import TYPE_CHECKING, Literal
+
+from mysql.connector.cursor import MySQLCursor
+
+if TYPE_CHECKING:
+    from core.bot_classes import Axobot
+
+RollupGranularity = Literal["hour", "day"]
+
+# raw stats rows older than this are deleted, once they have been summarized in the rollups
+RAW_STATS_RETENTION = timedelta(days=30)
+COMPACTION_BATCH_SIZE = 10_000
+
+RAW_TABLES = ("`statsbot`.`zbot`", "`statsbot`.`zbot-archives`")
+ROLLUPS_TABLE = "`statsbot`.`zbot_rollups`"
+# for each granularity, the date from which the summaries are updated every minute,
+# and whether the older raw rows have been summarized yet
+BACKFILL_TABLE = "`statsbot`.`zbot_rollups_backfill`"
+
+CREATE_TABLE_QUERY = f"""
+CREATE TABLE IF NOT EXISTS {ROLLUPS_TABLE} (
+    `granularity` ENUM('hour', 'day') NOT NULL,
+    `period_start` DATETIME NOT NULL,
+    `variable` VARCHAR(255) NOT NULL,
+    `entity_id` INT NOT NULL,
+    `value_sum` DOUBLE NOT NULL,
+    `value_count` INT NOT NULL,
+    `value_min` DOUBLE NOT NULL,
+    `value_max` DOUBLE NOT NULL,
+    `type` TINYINT NOT NULL,
+    PRIMARY KEY (`entity_id`, `granularity`, `variable`, `period_start`),
+    KEY `period` (`entity_id`, `granularity`, `period_start`)
+)"""
+
+CREATE_BACKFILL_TABLE_QUERY = f"""
+CREATE TABLE IF NOT EXISTS {BACKFILL_TABLE} (
+    `entity_id` INT NOT NULL,
+    `granularity` ENUM('hour', 'day') NOT NULL,
+    `cutoff` DATETIME NOT NULL,
+    `completed_at` DATETIME NULL,
+    PRIMARY KEY (`entity_id`, `granularity`)
+)"""
+
+PERIOD_FORMATS: dict[RollupGranularity, str] = {
+    "hour": "%Y-%m-%d %H:00:00",
+    "day": "%Y-%m-%d 00:00:00",
+}
+
+UPSERT_CLAUSE = """
+ON DUPLICATE KEY UPDATE
+    `value_sum` = `value_sum` + VALUES(`value_sum`),
+    `value_count` = `value_count` + VALUES(`value_count`),
+    `value_min` = LEAST(`value_min`, VALUES(`value_min`)),
+    `value_max` = GREATEST(`value_max`, VALUES(`value_max`)),
+    `type` = VALUES(`type`)"""
+
+
+def get_period_start(date: datetime, granularity: RollupGranularity) -> datetime:
+    "Get the start of the hour or day containing a date"
+    if granularity == "hour":
+        return date.replace(minute=0, second=0, microsecond=0)
+    return date.replace(hour=0, minute=0, second=0, microsecond=0)
+
+
+class StatsRollups:
+    """Hourly and daily summaries of the bot stats, per variable
+
+    The summaries are updated every minute from the freshly inserted raw rows, so that reading a sum over a long period
+    only touches a few summary rows instead of every raw row of that period."""
+
+    def __init__(self, bot: "Axobot"):
+        self.bot = bot
+        self.log = logging.getLogger("bot.stats")
+        # minute from which each granularity is updated every minute, the older raw rows are summarized by the backfill
+        self.cutoffs: dict[RollupGranularity, datetime] = {}
+        # whether the summaries include the whole history, and can be read instead of the raw rows
+        self.is_initialized = False
+
+    @property
+    def is_prepared(self):
+        "Check if the summaries are updated every minute"
+        return len(self.cutoffs) == len(PERIOD_FORMATS)
+
+    async def prepare(self, now: datetime):
+        """Create the summaries tables if needed, and start updating the summaries from the `now` minute
+        Must be called before inserting the raw rows of that minute"""
+        self.cutoffs, backfilled = await asyncio.to_thread(self._prepare, now)
+        self.is_initialized = set(PERIOD_FORMATS) <= backfilled
+
+    def _prepare(self, now: datetime) -> tuple[dict[RollupGranularity, datetime], set[str]]:
+        """Create the tables, and get the cutoff of every granularity: the raw rows before it are summarized by the backfill,
+        the other ones every minute. A new cutoff is saved for granularities without one yet"""
+        cnx = self.bot.db.open_connection("axobot")
+        cursor = cnx.cursor(dictionary=True)
+        try:
+            cursor.execute(CREATE_TABLE_QUERY)
+            cursor.execute(CREATE_BACKFILL_TABLE_QUERY)
+            cursor.execute(f"SELECT * FROM {BACKFILL_TABLE} WHERE `entity_id` = %s", (self.bot.entity_id,))
+            states = {row["granularity"]: row for row in cursor.fetchall()}
+            cutoffs: dict[RollupGranularity, datetime] = {}
+            for granularity in PERIOD_FORMATS:
+                if state := states.get(granularity):
+                    cutoffs[granularity] = state["cutoff"]
+                else:
+                    cursor.execute(
+                        f"INSERT INTO {BACKFILL_TABLE} (`entity_id`, `granularity`, `cutoff`) VALUES (%s, %s, %s)",
+                        (self.bot.entity_id, granularity, now)
+                    )
+                    cutoffs[granularity] = now
+            cnx.commit()
+        finally:
+            cursor.close()
+            cnx.close()
+        backfilled = {granularity for granularity, state in states.items() if state["completed_at"] is not None}
+        return cutoffs, backfilled
+
+    async def backfill(self):
+        """Summarize the raw rows older than the cutoff of each granularity, if not done yet
+        The aggregation can take a while, so it runs in another thread with its own database connection"""
+        if not self.is_prepared or self.is_initialized:
+            return
+        self.log.info("Summarizing the stats history into the rollups table")
+        await asyncio.to_thread(self._backfill, dict(self.cutoffs))
+        self.is_initialized = True
+
+    def _backfill(self, cutoffs: dict[RollupGranularity, datetime]):
+        """Add the raw rows older than the cutoffs to the summaries, and mark them as backfilled, in a single transaction
+        so that a failed backfill can safely be run again"""
+        raw_rows = " UNION ALL ".join(
+            f"SELECT `date`, `variable`, `value`, `type` FROM {table} "
+            "WHERE `entity_id` = %(entity_id)s AND `date` < %(cutoff)s"
+            for table in RAW_TABLES
+        )
+        cnx = self.bot.db.open_connection("axobot")
+        cursor = cnx.cursor()
+        try:
+            query = f"SELECT `granularity` FROM {BACKFILL_TABLE} WHERE `entity_id` = %s AND `completed_at` IS NOT NULL"
+            cursor.execute(query, (self.bot.entity_id,))
+            completed = {row[0] for row in cursor.fetchall()}
+            for granularity, cutoff in cutoffs.items():
+                if granularity in completed:
+                    continue
+                query_args = {
+                    "granularity": granularity,
+                    "period_format": PERIOD_FORMATS[granularity],
+                    "entity_id": self.bot.entity_id,
+                    "cutoff": cutoff,
+                    "date": self.bot.utcnow(),
+                }
+                # the period containing the cutoff may already have been updated by record_minute
+                cursor.execute(f"""INSERT INTO {ROLLUPS_TABLE}
+SELECT %(granularity)s, DATE_FORMAT(`date`, %(period_format)s) AS `period`, `variable`, %(entity_id)s,
+    SUM(`value`), COUNT(*), MIN(`value`), MAX(`value`), MAX(`type`)
+FROM ({raw_rows}) AS `raw`
+GROUP BY `period`, `variable`
+{UPSERT_CLAUSE}""", query_args)
+                cursor.execute(
+                    f"""UPDATE {BACKFILL_TABLE} SET `completed_at` = %(date)s
+WHERE `entity_id` = %(entity_id)s AND `granularity` = %(granularity)s""",
+                    query_args
+                )
+            cnx.commit()
+        except Exception:
+            cnx.rollback()
+            raise
+        finally:
+            cursor.close()
+            cnx.close()
+
+    def record_minute(self, cursor: MySQLCursor, date: datetime):
+        """Add the raw rows inserted at a given date to the summaries, for the granularities whose cutoff is reached
+        The cursor transaction must include the raw rows insertion"""
+        for granularity, cutoff in self.cutoffs.items():
+            if date < cutoff:
+                # these rows will be summarized by the backfill
+                continue
+            query = f"""INSERT INTO {ROLLUPS_TABLE}
+SELECT %s, %s, `variable`, `entity_id`, SUM(`value`), COUNT(*), MIN(`value`), MAX(`value`), MAX(`type`)
+FROM {RAW_TABLES[0]}
+WHERE `date` = %s AND `entity_id` = %s
+GROUP BY `variable`, `entity_id`
+{UPSERT_CLAUSE}"""
+            cursor.execute(query, (granularity, get_period_start(date, granularity), date, self.bot.entity_id))
+
+    async def get_sums(self, variable: str, minutes: int | None = None, prefix: bool = False
+                       ) -> dict[str, tuple[float, int]]:
+        """Get the sum and type of one variable (or every variable starting with `prefix`)
+        in the last X minutes, or since the beginning if `minutes` is None
+
+        Complete hours are read from the hourly summaries, only the incomplete hours at the edges of the period are
+        read from the raw rows. Until the summaries are initialized, everything is read from the raw rows."""
+        if prefix:
+            variable_clause = "`variable` LIKE %(variable)s"
+            variable = variable.replace('\\', '\\\\').replace('%', '\\%').replace('_', '\\_') + '%'
+        else:
+            variable_clause = "`variable` = %(variable)s"
+        query_args = {"variable": variable, "entity_id": self.bot.entity_id}
+        subqueries: list[str] = []
+        if minutes is None:
+            if self.is_initialized:
+                subqueries.append(f"""SELECT `variable`, `value_sum` AS `value`, `type` FROM {ROLLUPS_TABLE}
+    WHERE `entity_id` = %(entity_id)s AND `granularity` = 'day' AND {variable_clause}""")
+            else:
+                subqueries.extend(
+                    f"SELECT `variable`, `value`, `type` FROM {table} WHERE `entity_id` = %(entity_id)s AND {variable_clause}"
+                    for table in RAW_TABLES
+                )
+        else:
+            now = self.bot.utcnow()
+            start = now - timedelta(minutes=minutes)
+            query_args |= {"start": start, "end": now}
+            raw_rows_clause = ""
+            if self.is_initialized:
+                first_hour = get_period_start(start, "hour")
+                if first_hour < start:
+                    first_hour += timedelta(hours=1)
+                last_hour = max(get_period_start(now, "hour"), first_hour)
+                query_args |= {"first_hour": first_hour, "last_hour": last_hour}
+                subqueries.append(f"""SELECT `variable`, `value_sum` AS `value`, `type` FROM {ROLLUPS_TABLE}
+    WHERE `entity_id` = %(entity_id)s AND `granularity` = 'hour' AND {variable_clause}
+        AND `period_start` >= %(first_hour)s AND `period_start` < %(last_hour)s""")
+                raw_rows_clause = "\n        AND (`date` < %(first_hour)s OR `date` >= %(last_hour)s)"
+            subqueries.append(f"""SELECT `variable`, `value`, `type` FROM {RAW_TABLES[0]}
+    WHERE `entity_id` = %(entity_id)s AND {variable_clause} AND `date` BETWEEN %(start)s AND %(end)s{raw_rows_clause}""")
+        union = "\n    UNION ALL\n    ".join(subqueries)
+        query = f"""SELECT `variable`, SUM(`value`) AS `value`, MAX(`type`) AS `type` FROM (
+    {union}
+) AS `all`
+GROUP BY `variable`"""
+        async with self.bot.db_main.read(query, query_args) as query_result:
+            return {
+                row["variable"]: (row["value"], row["type"])
+                for row in query_result
+            }
+
+    async def compact(self) -> int:
+        """Delete the raw rows older than the retention delay, as they are already summarized
+        Nothing is deleted until the history backfill is committed, as the rows would be lost for good"""
+        if not self.is_initialized:
+            return 0
+        limit_date = self.bot.utcnow() - RAW_STATS_RETENTION
+        deleted_count = 0
+        for table in RAW_TABLES:
+            query = f"DELETE FROM {table} WHERE `entity_id` = %s AND `date` < %s LIMIT {COMPACTION_BATCH_SIZE}"
+            while True:
+                async with self.bot.db_main.write(query, (self.bot.entity_id, limit_date), returnrowcount=True) as count:
+                    deleted_count += count
+                if count < COMPACTION_BATCH_SIZE:
+                    break
+        return deleted_count
@@ -1,6 +1,5 @@
 import importlib
 from datetime import datetime
-from math import ceil
 from typing import Any
 
 import discord
@@ -11,7 +10,7 @@ from core.arguments import args
 from core.bot_classes import Axobot
 from core.checks.checks import database_connected
 from core.formatutils import FormatUtils
-from core.paginator import Paginator
+from core.paginator import Paginator, PaginatorSource
 
 importlib.reload(args)
 
@@ -101,6 +100,27 @@ class Cases(commands.Cog):
         async with self.bot.db_main.read(query, (guild_id, user_id)) as query_results:
             return [await self._convert_db_row_to_case(row) for row in query_results]
 
+    async def db_get_user_cases_chunk(self, guild_id: int, user_id: int, before_id: int | None, limit: int) -> list[Case]:
+        "Get the most recent cases of a user in a guild, older than a given case ID"
+        if not self.bot.database_online:
+            return []
+        if before_id is None:
+            query = f"SELECT * FROM `{self.table}` WHERE `guild` = %s AND `user` = %s ORDER BY `ID` DESC LIMIT %s"
+            query_args = (guild_id, user_id, limit)
+        else:
+            query = f"SELECT * FROM `{self.table}` WHERE `guild` = %s AND `user` = %s AND `ID` < %s ORDER BY `ID` DESC LIMIT %s"
+            query_args = (guild_id, user_id, before_id, limit)
+        async with self.bot.db_main.read(query, query_args) as query_results:
+            return [await self._convert_db_row_to_case(row) for row in query_results]
+
+    async def db_get_user_cases_count_in_guild(self, guild_id: int, user_id: int) -> int:
+        "Get the number of cases of a user in a guild"
+        if not self.bot.database_online:
+            return 0
+        query = f"SELECT COUNT(*) as count FROM `{self.table}` WHERE `guild` = %s AND `user` = %s"
+        async with self.bot.db_main.read(query, (guild_id, user_id), fetchone=True) as query_results:
+            return query_results["count"] if query_results else 0
+
     async def db_get_all_user_cases(self, user_id: int) -> list[Case]:
         "Get all cases of a user"
         if not self.bot.database_online:
@@ -193,31 +213,39 @@ VALUES (%(g)s, %(u)s, %(t)s, %(m)s, %(r)s, %(d)s)"
         "Main method to show cases from a given user"
         await interaction.response.defer()
         syntax: str = await self.bot._(interaction, "cases.list-0")
-        cases = await self.db_get_user_cases_in_guild(guild_id, user.id)
-        cases.reverse()
-        if not cases:
+        cases_count = await self.db_get_user_cases_count_in_guild(guild_id, user.id)
+        if cases_count == 0:
             await interaction.followup.send(await self.bot._(interaction, "cases.no-case"))
             return
         username = user.global_name or user.name
         author_text = await self.bot._(interaction, "cases.display.title", user=username, user_id=user.id)
-        title = await self.bot._(interaction, "cases.records_number", nbr=len(cases))
+        title = await self.bot._(interaction, "cases.records_number", nbr=cases_count)
         lang = await self.bot._(interaction, "_used_locale")
+        cases_cog = self
+
+        class CasesSource(PaginatorSource[Case]):
+            "Fetch the user cases by chunks, from the most recent one"
+            async def fetch_chunk(self, cursor: int | None):
+                chunk_size = self.per_page * 5
+                cases = await cases_cog.db_get_user_cases_chunk(guild_id, user.id, cursor, chunk_size)
+                return cases, (cases[-1].id if len(cases) == chunk_size else None)
 
         class RecordsPaginator(Paginator):
             "Paginator used to display a user record"
+            pages_cache_size = 10
+            source = CasesSource(per_page=21, total_count=cases_count)
+
             async def get_page_count(self) -> int:
-                length = len(cases)
-                if length == 0:
-                    return 1
-                return ceil(length/21)
+                return self.source.get_page_count()
 
             async def get_page_content(self, interaction, page):
                 "Create one page"
                 embed_color = self.client.get_cog("ServerConfig").embed_color
                 embed = discord.Embed(title=title, colour=embed_color, timestamp=interaction.created_at)
                 embed.set_author(name=author_text, icon_url=user.display_avatar.with_format("png").url)
-                page_start, page_end = (page-1)*21, page*21
-                for case in cases[page_start:page_end]:
+                page_cases = await self.source.get_page(page)
+                self.source.prefetch(page+1)
+                for case in page_cases:
                     guild = self.client.get_guild(case.guild_id)
                     if guild is None:
                         guild = case.guild_id
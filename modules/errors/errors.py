@@ -6,13 +6,14 @@ import sys
 import traceback
 
 import discord
-from discord.ext import commands, tasks
+from discord.ext import commands
 
 from core.arguments import errors as arguments_errors
 from core.bot_classes import Axobot, MyContext
 from core.checks import checks
 from core.checks.errors import (NotAVoiceMessageError, NotDuringEventError,
                                 VerboseCommandError)
+from core.decaying_counters import DecayingCounters
 from modules.perms.arguments.perms_args import InvalidPermissionTargetError
 
 AllowedCtx = MyContext | discord.Message | discord.Interaction | str
@@ -24,40 +25,14 @@ class Errors(commands.Cog):
         self.bot = bot
         self.file = "errors"
         self.log = logging.getLogger("bot.errors")
-        # map of user ID and number of cooldowns recently hit
-        self.cooldown_pool: dict[int, int] = {}
-
-    async def cog_load(self):
-        # pylint: disable=no-member
-        self.reduce_cooldown_pool.start()
-
-    async def cog_unload(self):
-        # pylint: disable=no-member
-        if self.reduce_cooldown_pool.is_running():
-            self.reduce_cooldown_pool.cancel()
+        # number of cooldowns recently hit by each user, reduced by 1 every 5s
+        self.cooldown_pool = DecayingCounters[int](decay_amount=1, decay_interval=5)
 
     async def can_send_cooldown_error(self, user_id: int):
         "Check if we can send a cooldown error message for a given user, to avoid spam"
-        spam_score = self.cooldown_pool.get(user_id, 0)
-        self.cooldown_pool[user_id] = spam_score + 1
+        spam_score = self.cooldown_pool.add(user_id) - 1
         return spam_score < 4
 
-    @tasks.loop(seconds=5)
-    async def reduce_cooldown_pool(self):
-        "Reduce the cooldown score by 1 every 5s"
-        to_delete: set[int] = set()
-        for user_id in self.cooldown_pool:
-            self.cooldown_pool[user_id] -= 1
-            if self.cooldown_pool[user_id] <= 0:
-                to_delete.add(user_id)
-        for user_id in to_delete:
-            del self.cooldown_pool[user_id]
-
-    @reduce_cooldown_pool.error
-    async def on_reduce_cooldown_pool_error(self, error):
-        "Log errors from reduce_cooldown_pool"
-        self.bot.dispatch("error", error)
-
     @commands.Cog.listener()
     async def on_command_error(self, ctx: MyContext, error: Exception):
         """The event triggered when an error is raised while invoking a command."""
@@ -9,7 +9,7 @@ import discord
 from discord.ext import commands, tasks
 from mysql.connector.errors import IntegrityError
 
-from core.bot_classes import SUPPORT_GUILD_ID, Axobot
+from core.bot_classes import SUPPORT_GUILD_ID, Axobot, MessageFacts
 
 
 class Events(commands.Cog):
@@ -53,6 +53,7 @@ class Events(commands.Cog):
         # pylint: disable=no-member
         if self.loop.is_running():
             self.loop.cancel()
+        self.bot.task_handler.stop()
 
     @commands.Cog.listener()
     async def on_ready(self):
@@ -111,7 +112,7 @@ class Events(commands.Cog):
             await channel.send(f"Nous venons d'atteindre les **{guilds_count} serveurs** ! :tada:")
 
     @commands.Cog.listener()
-    async def on_message(self, msg: discord.Message):
+    async def on_message_facts(self, msg: discord.Message, _facts: MessageFacts):
         """Called for each new message because it's cool"""
         if self.bot.zombie_mode:
             return
@@ -220,11 +221,11 @@ class Events(commands.Cog):
             return
         now = self.bot.utcnow()
         try:
-            # Timed tasks - every 20s
-            if now.second%20 == 0 and self.bot.database_online:
-                await self.bot.task_handler.check_tasks()
+            # Timed tasks - executed by their own scheduler once started
+            if not self.bot.task_handler.is_running and self.bot.database_online:
+                self.bot.task_handler.start()
             # Clear old rank cards - every 20min
-            elif now.minute%20 == 0 and self.bot.database_online:
+            if now.minute%20 == 0 and self.bot.database_online:
                 await self.bot.get_cog("Xp").clear_cards()
             # Bots lists updates - every day
             elif now.hour == 0 and now.day != self.dbl_last_sending.day:
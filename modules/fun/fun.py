@@ -3,27 +3,39 @@ import importlib
 import random
 import urllib.parse
 from math import ceil
-from typing import Any, Literal
+from typing import TYPE_CHECKING, Any, Literal
 
 import aiohttp
 import discord
-import geocoder
 from asyncache import cached
 from cachetools import TTLCache
 from discord import app_commands
 from discord.ext import commands
 from pytz import timezone
-from timezonefinder import TimezoneFinder
 
 from core.arguments import args
 from core.bot_classes import SUPPORT_GUILD_ID, Axobot, MyContext
 from core.checks import checks
 from core.formatutils import FormatUtils
+from core.lazy_import import LazyValue, lazy_import
 from core.paginator import Paginator
 
 importlib.reload(checks)
 importlib.reload(args)
 
+if TYPE_CHECKING:
+    import geocoder
+    import timezonefinder
+else:
+    geocoder = lazy_import("geocoder")
+    timezonefinder = lazy_import("timezonefinder")
+
+# loading the timezones data takes a few seconds, so it's only done when needed
+TIMEZONE_FINDER = LazyValue(
+    "timezone finder",
+    lambda: timezonefinder.TimezoneFinder() # pylint: disable=unnecessary-lambda
+)
+
 
 def flatten_list(first_list: list) -> list:
     return [item for sublist in first_list for item in sublist]
@@ -43,7 +55,6 @@ class Fun(commands.Cog):
     def __init__(self, bot: Axobot):
         self.bot = bot
         self.file = "fun"
-        self.tf = TimezoneFinder()
         self.nasa_pict: dict[str, Any] | None = None
 
     @property
@@ -387,7 +398,8 @@ You can specify a verification limit by adding a number in argument (up to 1.000
         if not g.ok:
             await interaction.followup.send(content=await self.bot._(interaction, "fun.invalid-city"))
             return
-        tz_name: str | None = self.tf.timezone_at_land(lat=g.json["lat"], lng=g.json["lng"])
+        timezone_finder = await TIMEZONE_FINDER.get_async()
+        tz_name: str | None = timezone_finder.timezone_at_land(lat=g.json["lat"], lng=g.json["lng"])
         if tz_name is None:
             await interaction.followup.send(content=await self.bot._(interaction, "fun.uninhabited-city"))
             return
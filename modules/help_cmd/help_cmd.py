@@ -81,8 +81,10 @@ If the bot can't send the new command format, it will try to send the old one.""
         arg_input = " ".join(args).lower()
         if arg_input in self.commands_data:
             return arg_input
-        for category_id in self.commands_data:
-            category_name = await self.bot._(ctx.channel, f"help.categories.{category_id}")
+        categories_names = await self.bot.tr_many(
+            ctx.channel, [f"help.categories.{category_id}" for category_id in self.commands_data]
+        )
+        for category_id, category_name in zip(self.commands_data, categories_names):
             if category_name.lower() == arg_input:
                 return category_id
         return None
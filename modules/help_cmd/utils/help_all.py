@@ -59,10 +59,11 @@ async def all_commands(cog: "HelpCog", ctx: MyContext, commands_list: Iterable[d
 async def _generate_compressed_help(cog: "HelpCog", ctx: MyContext, categories: dict[str, list[str]]):
     "Generate embed fields to list all command categories, with how many commands they contain"
     fields: list[FieldData] = []
+    titles = await _get_categories_names(cog, ctx, categories.keys())
     for category_id, category_commands in categories.items():
         if not category_commands:
             continue
-        title = await _get_category_name(cog, ctx, category_id)
+        title = titles[category_id]
         description = await cog.bot._(
             ctx.channel, "help.cmd-count", count=len(category_commands), p='/', cog=category_id
         )
@@ -72,10 +73,11 @@ async def _generate_compressed_help(cog: "HelpCog", ctx: MyContext, categories:
 async def _generate_normal_help(cog: "HelpCog", ctx: MyContext, categories: dict[str, list[str]]):
     "Generate embed fields to list all commands in each category"
     fields: list[FieldData] = []
+    titles = await _get_categories_names(cog, ctx, categories.keys())
     for category_id, category_commands in categories.items():
         if not category_commands:
             continue
-        title = await _get_category_name(cog, ctx, category_id)
+        title = titles[category_id]
         # make sure the commands list fits in one field
         field_commands: list[str] = []
         for command in category_commands:
@@ -89,7 +91,12 @@ async def _generate_normal_help(cog: "HelpCog", ctx: MyContext, categories: dict
             fields.append({"name": title, "value": "\n".join(field_commands), "inline": False})
     return fields
 
-async def _get_category_name(cog: "HelpCog", ctx: MyContext, category_id: str):
-    category_name = await cog.bot._(ctx.channel, f"help.categories.{category_id}")
-    emoji = cog.commands_data[category_id]["emoji"]
-    return f"{emoji}  __**{category_name.capitalize()}**__"
+async def _get_categories_names(cog: "HelpCog", ctx: MyContext, category_ids: Iterable[str]) -> dict[str, str]:
+    "Get the formatted title of each given category"
+    category_ids = list(category_ids)
+    categories_names = await cog.bot.tr_many(ctx.channel, [f"help.categories.{category_id}" for category_id in category_ids])
+    titles: dict[str, str] = {}
+    for category_id, category_name in zip(category_ids, categories_names):
+        emoji = cog.commands_data[category_id]["emoji"]
+        titles[category_id] = f"{emoji}  __**{category_name.capitalize()}**__"
+    return titles
@@ -13,6 +13,8 @@ from core.checks import checks
 from core.formatutils import FormatUtils
 from modules.rss.src.rss_general import FeedObject
 
+from .src.lookup_index import GuildsLookupIndex
+
 default_color = discord.Color(0x50e3c2)
 
 importlib.reload(args)
@@ -40,6 +42,45 @@ class Info(commands.Cog):
     def __init__(self, bot: Axobot):
         self.bot = bot
         self.file = "info"
+        self.lookup_index = GuildsLookupIndex()
+
+    async def cog_load(self):
+        if self.bot.is_ready():
+            self.lookup_index.rebuild(self.bot.guilds)
+
+    @commands.Cog.listener()
+    async def on_ready(self):
+        "Build the roles and guilds lookup indexes"
+        self.lookup_index.rebuild(self.bot.guilds)
+
+    @commands.Cog.listener()
+    async def on_guild_join(self, guild: discord.Guild):
+        self.lookup_index.add_guild(guild)
+
+    @commands.Cog.listener()
+    async def on_guild_available(self, guild: discord.Guild):
+        "Index the guilds becoming available after the bot is ready, like after an outage"
+        self.lookup_index.add_guild(guild)
+
+    @commands.Cog.listener()
+    async def on_guild_remove(self, guild: discord.Guild):
+        self.lookup_index.remove_guild(guild)
+
+    @commands.Cog.listener()
+    async def on_guild_update(self, before: discord.Guild, after: discord.Guild):
+        self.lookup_index.rename_guild(before, after)
+
+    @commands.Cog.listener()
+    async def on_guild_role_create(self, role: discord.Role):
+        self.lookup_index.add_role(role)
+
+    @commands.Cog.listener()
+    async def on_guild_role_delete(self, role: discord.Role):
+        self.lookup_index.remove_role(role)
+
+    @commands.Cog.listener()
+    async def on_guild_role_update(self, before: discord.Role, after: discord.Role):
+        self.lookup_index.rename_role(before, after)
 
     async def display_critical(self, interaction: discord.Interaction):
         return interaction.user.guild_permissions.manage_guild
@@ -285,31 +326,27 @@ class Info(commands.Cog):
 
     async def role_info(self, interaction: discord.Interaction, role: discord.Role):
         "Get info about a server role"
-        lang = await self.bot._(interaction, "_used_locale")
+        (
+            lang, tr_title, since, tr_name, tr_id, tr_color, tr_yes, tr_no, tr_mentionable, tr_members
+        ) = await self.bot.tr_many(interaction, [
+            "_used_locale", "info.info.role-title", "misc.since", "misc.name", "info.info.role-0", "info.info.role-1",
+            "misc.yes", "misc.no", "info.info.role-2", "info.info.role-3"
+        ])
         embed = discord.Embed(colour=role.color)
         icon_url = role.guild.icon.with_static_format("png") if role.guild.icon else None
-        embed.set_author(name=f"{await self.bot._(interaction, 'info.info.role-title')} '{role.name}'", icon_url=icon_url)
-        since = await self.bot._(interaction, "misc.since")
+        embed.set_author(name=f"{tr_title} '{role.name}'", icon_url=icon_url)
         # Name
-        embed.add_field(name=str(await self.bot._(interaction, "misc.name")).capitalize(),
-                        value=role.mention, inline=True)
+        embed.add_field(name=tr_name.capitalize(), value=role.mention, inline=True)
         # ID
-        embed.add_field(name=await self.bot._(interaction, "info.info.role-0"),
-                        value=str(role.id), inline=True)
+        embed.add_field(name=tr_id, value=str(role.id), inline=True)
         # Color
         color_url = f"https://www.color-hex.com/color/{role.color.value:x}"
-        embed.add_field(name=await self.bot._(interaction, "info.info.role-1"),
-                        value=f"[{role.color}]({color_url})", inline=True)
+        embed.add_field(name=tr_color, value=f"[{role.color}]({color_url})", inline=True)
         # Mentionnable
-        if role.mentionable:
-            mentionable = await self.bot._(interaction, "misc.yes")
-        else:
-            mentionable = await self.bot._(interaction, "misc.no")
-        embed.add_field(name=await self.bot._(interaction, "info.info.role-2"),
-                        value=mentionable.capitalize(), inline=True)
+        mentionable = tr_yes if role.mentionable else tr_no
+        embed.add_field(name=tr_mentionable, value=mentionable.capitalize(), inline=True)
         # Members count
-        embed.add_field(name=await self.bot._(interaction, "info.info.role-3"),
-                        value=len(role.members), inline=True)
+        embed.add_field(name=tr_members, value=len(role.members), inline=True)
         # Specificities
         if role.tags:
             specificities = []
@@ -961,8 +998,10 @@ class Info(commands.Cog):
         servers_in: list[str] = []
         owned, membered = 0, 0
         await interaction.response.defer()
+        # mutual_guilds walks through every guild of the bot, so only compute it once
+        mutual_guilds = user.mutual_guilds if hasattr(user, "mutual_guilds") else []
         if hasattr(user, "mutual_guilds"):
-            for s in user.mutual_guilds:
+            for s in mutual_guilds:
                 if s.owner==user:
                     servers_in.append(f":crown: {s.name} ({s.id})")
                     owned += 1
@@ -989,7 +1028,7 @@ class Info(commands.Cog):
         # Languages
         disp_lang = list()
         if hasattr(user, "mutual_guilds"):
-            for lang in await self.bot.get_cog("Utilities").get_user_languages(user):
+            for lang in await self.bot.get_cog("Utilities").get_user_languages(user, guilds=mutual_guilds):
                 disp_lang.append(f"{lang[0]} ({lang[1]*100:.0f}%)")
         if len(disp_lang) == 0:
             disp_lang = ["Unknown"]
@@ -1033,11 +1072,8 @@ class Info(commands.Cog):
         if guild.isnumeric():
             guild: discord.Guild = self.bot.get_guild(int(guild))
         else:
-            for x in self.bot.guilds:
-                if x.name == guild:
-                    guild = x
-                    break
-        if isinstance(guild, str) or guild is None:
+            guild: discord.Guild = self.lookup_index.find_guild(self.bot, guild)
+        if guild is None:
             await interaction.followup.send("Unknown server")
             return
         # Bots
@@ -1080,6 +1116,7 @@ class Info(commands.Cog):
         emb.add_field(name="RSS feeds count", value=rss_numb)
         emb.add_field(name="Roles rewards count", value=rr_len)
         emb.add_field(name="Streamers count", value=streamers_len)
+        emb.set_footer(text=self._get_lookup_index_footer())
         await interaction.followup.send(embed=emb)
 
     @find_main.command(name="channel")
@@ -1108,10 +1145,7 @@ class Info(commands.Cog):
     async def find_role(self, interaction: discord.Interaction, role_name: str):
         "Find any role from any server where the bot is"
         await interaction.response.defer()
-        every_roles: list[discord.Role] = []
-        for serv in self.bot.guilds:
-            every_roles += serv.roles
-        role = discord.utils.find(lambda item: role_name in {str(item.id), item.name, item.mention}, every_roles)
+        role = self.lookup_index.find_role(self.bot, role_name)
         if role is None:
             await interaction.followup.send("Unknown role")
             return
@@ -1124,8 +1158,15 @@ class Info(commands.Cog):
         emb.add_field(name="Server", value=f"{role.guild.name} ({role.guild.id})", inline=False)
         emb.add_field(name="Members", value=len(role.members))
         emb.add_field(name="Colour", value=str(role.colour))
+        emb.set_footer(text=self._get_lookup_index_footer())
         await interaction.followup.send(embed=emb)
 
+    def _get_lookup_index_footer(self):
+        "Describe the size of the lookup indexes"
+        index = self.lookup_index
+        memory = index.get_memory_usage() / 1024**2
+        return f"Lookup index: {len(index.role_guilds)} roles, {len(index.guild_names)} guild names, {memory:.1f} MB"
+
     @find_main.command(name="rss")
     async def find_rss(self, interaction: discord.Interaction, feed_id: int):
         "Find any active or inactive RSS feed"
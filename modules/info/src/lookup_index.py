@@ -0,0 +1,108 @@
+import re
+import sys
+from typing import Iterable
+
+import discord
+
+RE_ROLE_MENTION = re.compile(r"<@&(\d{15,})>")
+EMPTY_SET_SIZE = sys.getsizeof(set())
+
+
+class GuildsLookupIndex:
+    """Indexes of the roles and guilds visible by the bot, to find them by ID or name without iterating every guild
+
+    The indexes are built once when the bot is ready, then kept up to date from the guilds and roles events"""
+
+    def __init__(self):
+        # role ID -> ID of its guild
+        self.role_guilds: dict[int, int] = {}
+        # role name -> IDs of the roles with that name
+        self.role_names: dict[str, set[int]] = {}
+        # guild name -> IDs of the guilds with that name
+        self.guild_names: dict[str, set[int]] = {}
+        # running estimation of the memory used by the names and their IDs sets
+        self._names_size = 0
+
+    def _add_name(self, index: dict[str, set[int]], name: str, item_id: int):
+        if (ids := index.get(name)) is None:
+            ids = index[name] = set()
+            self._names_size += sys.getsizeof(name) + EMPTY_SET_SIZE
+        ids.add(item_id)
+
+    def _remove_name(self, index: dict[str, set[int]], name: str, item_id: int):
+        if (ids := index.get(name)) is None:
+            return
+        ids.discard(item_id)
+        if not ids:
+            del index[name]
+            self._names_size -= sys.getsizeof(name) + EMPTY_SET_SIZE
+
+    def rebuild(self, guilds: Iterable[discord.Guild]):
+        "Build the indexes from scratch"
+        self.role_guilds.clear()
+        self.role_names.clear()
+        self.guild_names.clear()
+        self._names_size = 0
+        for guild in guilds:
+            self.add_guild(guild)
+
+    def add_guild(self, guild: discord.Guild):
+        "Index a guild and its roles"
+        self._add_name(self.guild_names, guild.name, guild.id)
+        for role in guild.roles:
+            self.add_role(role)
+
+    def remove_guild(self, guild: discord.Guild):
+        "Remove a guild and its roles from the indexes"
+        self._remove_name(self.guild_names, guild.name, guild.id)
+        for role in guild.roles:
+            self.remove_role(role)
+
+    def rename_guild(self, before: discord.Guild, after: discord.Guild):
+        "Update the index after a guild name change"
+        if before.name != after.name:
+            self._remove_name(self.guild_names, before.name, before.id)
+            self._add_name(self.guild_names, after.name, after.id)
+
+    def add_role(self, role: discord.Role):
+        "Index a role"
+        self.role_guilds[role.id] = role.guild.id
+        self._add_name(self.role_names, role.name, role.id)
+
+    def remove_role(self, role: discord.Role):
+        "Remove a role from the indexes"
+        self.role_guilds.pop(role.id, None)
+        self._remove_name(self.role_names, role.name, role.id)
+
+    def rename_role(self, before: discord.Role, after: discord.Role):
+        "Update the index after a role name change"
+        if before.name != after.name:
+            self._remove_name(self.role_names, before.name, before.id)
+            self._add_name(self.role_names, after.name, after.id)
+
+    def find_role(self, client: discord.Client, query: str) -> discord.Role | None:
+        "Find a role from its ID, mention or exact name"
+        if match := RE_ROLE_MENTION.fullmatch(query):
+            query = match.group(1)
+        if query.isnumeric() and (guild_id := self.role_guilds.get(int(query))):
+            if (guild := client.get_guild(guild_id)) and (role := guild.get_role(int(query))):
+                return role
+        # with several roles of the same name, take the oldest one
+        for role_id in sorted(self.role_names.get(query, ())):
+            if (guild := client.get_guild(self.role_guilds[role_id])) and (role := guild.get_role(role_id)):
+                return role
+        return None
+
+    def find_guild(self, client: discord.Client, name: str) -> discord.Guild | None:
+        "Find a guild from its exact name"
+        # with several guilds of the same name, take the oldest one
+        for guild_id in sorted(self.guild_names.get(name, ())):
+            if guild := client.get_guild(guild_id):
+                return guild
+        return None
+
+    def get_memory_usage(self) -> int:
+        """Get an estimation of the memory used by the indexes, in bytes
+        The names are measured when added or removed, so this doesn't iterate over the indexes"""
+        dicts_size = sys.getsizeof(self.role_guilds) + sys.getsizeof(self.role_names) + sys.getsizeof(self.guild_names)
+        return dicts_size + self._names_size
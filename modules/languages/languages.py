@@ -1,5 +1,6 @@
+from typing import Iterable
+
 import discord
-import i18n
 from asyncache import cached
 from cachetools import TTLCache
 from discord.ext import commands
@@ -7,6 +8,8 @@ from discord.ext import commands
 from core.bot_classes import Axobot
 from core.translator import AxobotTranslator
 
+from .src import TranslationCatalog, TranslationResult
+
 SourceType = (
     None
     | int
@@ -28,14 +31,8 @@ class Languages(discord.ext.commands.Cog):
     def __init__(self, bot: Axobot):
         self.bot = bot
         self.file = "languages"
-        i18n.set("filename_format", "{locale}.{format}")
-        i18n.set("file_format", "json")
-        i18n.set("fallback", None)
-        i18n.set("on_missing_translation", "error")
-        i18n.set("skip_locale_root_data", True)
-        i18n.unload_everything()
-        i18n.load_path.clear()
-        i18n.load_path.append("./lang")
+        self.catalog = TranslationCatalog("./lang")
+        self.catalog.load()
 
     async def cog_load(self):
         await self.bot.tree.set_translator(AxobotTranslator(self.bot))
@@ -51,8 +48,21 @@ class Languages(discord.ext.commands.Cog):
     async def get_default_language(self) -> str:
         return (await self.bot.get_options_list())["language"]["default"]
 
-    async def tr(self, source: SourceType, string_id: str, **kwargs):
+    async def tr(self, source: SourceType, string_id: str, **kwargs) -> TranslationResult:
         """Renvoie le texte en fonction de la langue"""
+        locale = await self.get_source_locale(source)
+        return await self._get_translation_or_report(locale, string_id, **kwargs)
+
+    async def tr_many(self, source: SourceType, string_ids: Iterable[str], **kwargs) -> list[TranslationResult]:
+        """Translate multiple strings at once, while resolving the source language only once"""
+        locale = await self.get_source_locale(source)
+        return [
+            await self._get_translation_or_report(locale, string_id, **kwargs)
+            for string_id in string_ids
+        ]
+
+    async def get_source_locale(self, source: SourceType) -> str:
+        "Find the language to use for a given translation source"
         if isinstance(source, discord.PartialMessageable):
             if source.guild_id:
                 source = source.guild_id
@@ -82,46 +92,47 @@ class Languages(discord.ext.commands.Cog):
         if isinstance(source, discord.Member | discord.User):
             # get lang from user
             used_langs = await self.bot.get_cog("Utilities").get_user_languages(source, limit=1)
-            lang_opt = used_langs[0][0] if len(used_langs) > 0 else self.get_default_language()
+            lang_opt = used_langs[0][0] if len(used_langs) > 0 else await self.get_default_language()
         elif not self.bot.database_online or source is None:
             # get default lang
-            lang_opt = self.get_default_language()
+            lang_opt = await self.get_default_language()
         elif isinstance(source, discord.DMChannel):
             # get lang from DM channel
             recipient = await self.bot.get_recipient(source)
             if recipient is None:
-                lang_opt = self.get_default_language()
+                lang_opt = await self.get_default_language()
             else:
                 used_langs = await self.bot.get_cog("Utilities").get_user_languages(recipient, limit=1)
-                lang_opt = used_langs[0][0] if len(used_langs) > 0 else self.get_default_language()
+                lang_opt = used_langs[0][0] if len(used_langs) > 0 else await self.get_default_language()
         elif isinstance(source, int):
             # get lang from server ID
             lang_opt: str = await self.bot.get_config(source, "language")
             if lang_opt is None:
-                lang_opt = self.get_default_language()
+                lang_opt = await self.get_default_language()
         else:
             raise TypeError(f"Unknown type for translation source: {type(source)}")
         if lang_opt not in await self.get_available_languages():
             # if lang not known: fallback to default
-            lang_opt = self.get_default_language()
-        return await self._recursive_get_translation(lang_opt, string_id, **kwargs)
+            lang_opt = await self.get_default_language()
+        return lang_opt
 
-    async def _recursive_get_translation(self, locale: str, string_id: str, **kwargs):
-        "Find the translation in the given locale, or fallback to another locale"
+    async def _get_translation_or_report(self, locale: str, string_id: str, **kwargs) -> TranslationResult:
+        "Find the translation in the given locale (or its fallbacks), and signal it if it's missing"
+        if string_id == "_used_locale":
+            return locale
+        if not self.catalog.has_translation(locale, string_id):
+            await self.msg_not_found(string_id, locale)
         try:
-            return await self.get_translation(locale, string_id, **kwargs)
+            return self.catalog.translate(locale, string_id, **kwargs)
         except KeyError:
-            await self.msg_not_found(string_id, locale)
-            if locale == "en":
-                return string_id
-            fallback = "fr" if locale == "fr2" else "en"
-            return await self._recursive_get_translation(fallback, string_id, **kwargs)
+            return string_id
 
-    async def get_translation(self, locale: str, string_id: str, **kwargs) -> str | list:
-        "Get a translation from the i18n files directly"
+    def get_translation(self, locale: str, string_id: str, **kwargs) -> TranslationResult:
+        """Get a translation from the compiled catalog directly, without any fallback
+        Raises KeyError if the string is not translated in this locale"""
         if string_id == "_used_locale":
             return locale
-        return i18n.t(string_id, locale=locale, **kwargs)
+        return self.catalog.translate(locale, string_id, use_fallback=False, **kwargs)
 
     async def msg_not_found(self, string_id: str, lang: str):
         "Signal to the dev that a translation is missing"
@@ -0,0 +1,6 @@
+from .catalog import TranslationCatalog, TranslationResult
+
+__all__ = [
+    "TranslationCatalog",
+    "TranslationResult",
+]
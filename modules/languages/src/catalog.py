@@ -0,0 +1,199 @@
+import json
+import os
+import re
+from typing import Any, Union
+
+PLURAL_KEYS = {"zero", "one", "few", "many"}
+PLURAL_FEW = 5
+
+# same syntax as i18n: "%%" escape, "%name" and "%{name}" placeholders
+_PLACEHOLDER_RE = re.compile(r"%(?:(?P<escaped>%)|(?P<named>\w+)|\{(?P<braced>\w+)\})")
+
+
+class _PlaceholderValues(dict):
+    "Placeholder values given to a template, keeping unknown placeholders as they were written"
+
+    def __init__(self, values: dict[str, Any], raw_tokens: dict[str, str]):
+        super().__init__(values)
+        self.raw_tokens = raw_tokens
+
+    def __missing__(self, key: str):
+        return self.raw_tokens[key]
+
+
+class CompiledTemplate:
+    "A translation string where placeholders have been converted into a str.format template"
+
+    __slots__ = ("template", "raw_tokens")
+
+    def __init__(self, template: str, raw_tokens: dict[str, str]):
+        self.template = template
+        self.raw_tokens = raw_tokens
+
+    def format(self, values: dict[str, Any]) -> str:
+        "Replace the placeholders by their values"
+        return self.template.format_map(_PlaceholderValues(values, self.raw_tokens))
+
+    def __repr__(self):
+        return f"<CompiledTemplate {self.template!r}>"
+
+
+class PluralTemplate:
+    "A translation with one variant per plural form, selected from the 'count' argument"
+
+    __slots__ = ("forms",)
+
+    def __init__(self, forms: dict[str, "CompiledValue"]):
+        self.forms = forms
+
+    def select(self, count: int) -> "CompiledValue | None":
+        "Get the variant matching a count, following the i18n rules"
+        if count == 0:
+            if "zero" in self.forms:
+                return self.forms["zero"]
+        elif count == 1:
+            if "one" in self.forms:
+                return self.forms["one"]
+        elif count <= PLURAL_FEW:
+            if "few" in self.forms:
+                return self.forms["few"]
+        return self.forms.get("many")
+
+
+CompiledValue = Union[str, CompiledTemplate, PluralTemplate, tuple["CompiledValue", ...]]
+TranslationResult = Union[str, tuple["TranslationResult", ...], dict[str, str]]
+
+
+def compile_string(text: str) -> str | CompiledTemplate:
+    """Parse the placeholders of a translation string
+    Strings without any placeholder are kept as plain strings, to be returned without any processing"""
+    if "%" not in text:
+        return text
+    parts: list[str] = []
+    raw_tokens: dict[str, str] = {}
+    last_end = 0
+    for match in _PLACEHOLDER_RE.finditer(text):
+        parts.append(text[last_end:match.start()].replace("{", "{{").replace("}", "}}"))
+        last_end = match.end()
+        if match.group("escaped") is not None:
+            parts.append("%")
+            continue
+        name = match.group("named") or match.group("braced")
+        if name.isdigit():
+            # would be understood as a positional field by str.format
+            parts.append(match.group().replace("{", "{{").replace("}", "}}"))
+            continue
+        raw_tokens.setdefault(name, match.group())
+        parts.append("{" + name + "}")
+    parts.append(text[last_end:].replace("{", "{{").replace("}", "}}"))
+    if not raw_tokens:
+        # only escaped percent signs
+        return "".join(parts).replace("{{", "{").replace("}}", "}")
+    return CompiledTemplate("".join(parts), raw_tokens)
+
+
+def compile_value(value: Any) -> CompiledValue:
+    "Compile any translation value (string, list or plural forms)"
+    if isinstance(value, str):
+        return compile_string(value)
+    if isinstance(value, list | tuple):
+        return tuple(compile_value(item) for item in value)
+    if isinstance(value, dict):
+        return PluralTemplate({key: compile_value(item) for key, item in value.items()})
+    return str(value)
+
+
+def render_value(value: CompiledValue, kwargs: dict[str, Any]) -> TranslationResult:
+    "Build the final translation from a compiled value"
+    if isinstance(value, str):
+        return value
+    if isinstance(value, CompiledTemplate):
+        return value.format(kwargs)
+    if isinstance(value, tuple):
+        return tuple(render_value(item, kwargs) for item in value)
+    # plural forms
+    if "count" in kwargs:
+        if (form := value.select(kwargs["count"])) is not None:
+            return render_value(form, kwargs)
+    return {key: render_value(form, kwargs) for key, form in value.forms.items()}
+
+
+def flatten_translations(data: dict[str, Any], namespace: str, result: dict[str, CompiledValue]):
+    "Flatten nested translations into dotted keys, keeping plural forms together"
+    for key, value in data.items():
+        full_key = f"{namespace}.{key}" if namespace else key
+        if isinstance(value, dict) and not (value and PLURAL_KEYS.issuperset(value)):
+            flatten_translations(value, full_key, result)
+        else:
+            result[full_key] = compile_value(value)
+
+
+class TranslationCatalog:
+    """Precompiled translations, loaded once from the JSON files
+
+    Each locale is flattened into a single dictionary where missing keys are already filled from
+    the fallback locales, so that a lookup is a single dict access"""
+
+    def __init__(self, directory: str = "./lang", default_locale: str = "en", fallbacks: dict[str, str] | None = None):
+        self.directory = directory
+        self.default_locale = default_locale
+        self.fallbacks = fallbacks if fallbacks is not None else {"fr2": "fr"}
+        # translations actually written for each locale
+        self._own: dict[str, dict[str, CompiledValue]] = {}
+        # translations of each locale, including the fallbacks
+        self._merged: dict[str, dict[str, CompiledValue]] = {}
+
+    @property
+    def locales(self) -> set[str]:
+        "List of loaded locales"
+        return set(self._merged)
+
+    def load(self):
+        "Read and compile every translation file"
+        own: dict[str, dict[str, CompiledValue]] = {}
+        for namespace in sorted(os.listdir(self.directory)):
+            namespace_dir = os.path.join(self.directory, namespace)
+            if not os.path.isdir(namespace_dir):
+                continue
+            for filename in sorted(os.listdir(namespace_dir)):
+                locale, ext = os.path.splitext(filename)
+                if ext != ".json":
+                    continue
+                with open(os.path.join(namespace_dir, filename), "r", encoding="utf-8") as file:
+                    data = json.load(file)
+                flatten_translations(data, namespace, own.setdefault(locale, {}))
+        self._own = own
+        self._merged = {
+            locale: self._merge_locale(locale)
+            for locale in own
+        }
+
+    def _get_fallback_chain(self, locale: str) -> list[str]:
+        "Get the list of locales to look into, from the least to the most important"
+        chain = [locale]
+        while chain[-1] != self.default_locale:
+            chain.append(self.fallbacks.get(chain[-1], self.default_locale))
+        return chain[::-1]
+
+    def _merge_locale(self, locale: str) -> dict[str, CompiledValue]:
+        merged: dict[str, CompiledValue] = {}
+        for fallback in self._get_fallback_chain(locale):
+            merged.update(self._own.get(fallback, {}))
+        return merged
+
+    def has_translation(self, locale: str, string_id: str) -> bool:
+        "Check if a string is translated in a locale, without using any fallback"
+        return string_id in self._own.get(locale, {})
+
+    def translate(self, locale: str, string_id: str, use_fallback: bool = True, **kwargs) -> TranslationResult:
+        """Get a translation from the catalog
+        Raises KeyError if the string doesn't exist in the locale (or in any of its fallbacks)"""
+        source = self._merged if use_fallback else self._own
+        try:
+            value = source[locale][string_id]
+        except KeyError:
+            if use_fallback and locale not in source:
+                value = source[self.default_locale][string_id]
+            else:
+                raise
+        return render_value(value, kwargs)
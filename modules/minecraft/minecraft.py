@@ -15,6 +15,8 @@ from core.bot_classes import Axobot
 from core.formatutils import FormatUtils
 from modules.rss.src import FeedObject
 
+from .src.server_list_ping import ServerListPingClient, ServerPingError
+
 SERVER_ADDRESS_REGEX = re.compile(r"^(?:(?:25[0-5]|2[0-4][0-9]|[01]?[0-9][0-9]?)\.){3}(?:25[0-5]|2[0-4][0-9]|[01]?[0-9][0-9]?)$|"
                                   r"^(([a-zA-Z0-9]|[a-zA-Z0-9][a-zA-Z0-9\-]*[a-zA-Z0-9])\.)+([A-Za-z]|"
                                   r"[A-Za-z][A-Za-z0-9\-]*[A-Za-z0-9])$")
@@ -89,6 +91,7 @@ class Minecraft(commands.Cog):
         self.embed_color = 0x16BD06
         self.uuid_cache: dict[str, str] = {}
         self._session: aiohttp.ClientSession | None = None
+        self.ping_client = ServerListPingClient(timeout=5, cache_ttl=60)
 
     @property
     def session(self):
@@ -294,7 +297,7 @@ class Minecraft(commands.Cog):
         ip, port = validation
         port_str = str(port) if port else ''
         await interaction.response.defer()
-        obj = await self.create_server_1(interaction, ip, port_str)
+        obj = await self.get_server_status(interaction, ip, port_str or None)
         embed = await self.form_msg_server(obj, interaction, (ip, port_str))
         await interaction.followup.send(embed=embed)
 
@@ -351,6 +354,27 @@ class Minecraft(commands.Cog):
             return None
         return ip, port
 
+    async def get_server_status(self, source: discord.Interaction | discord.Guild,
+                                ip: str, port: str | None=None) -> str | MCServer:
+        """Collect and serialize server data from a given IP, by pinging the server directly
+        Fallbacks to the HTTP APIs if the server could not be reached (for example if it uses a DNS SRV record)"""
+        try:
+            status = await self.ping_client.ping(ip, int(port) if port else None)
+        except ServerPingError as err:
+            self.bot.log.debug("[mc-server] Direct ping failed, using HTTP APIs instead: %s", err)
+            return await self.create_server_1(source, ip, port)
+        formated_ip = f"{ip}:{port}" if port is not None else str(ip)
+        if status.favicon is not None:
+            img_url = "https://api.minetools.eu/favicon/" + \
+                str(ip) + str("/"+str(port) if port is not None else '')
+        else:
+            img_url = None
+        return await MCServer(
+            formated_ip, version=status.version, online_players=status.online_players, max_players=status.max_players,
+            players=status.players_sample[:31], img=img_url, ping=status.latency, desc=status.description,
+            api="Server List Ping"
+        ).clear_desc()
+
     async def create_server_1(self, source: discord.Interaction | discord.Guild,
                               ip: str, port: str | None=None) -> str | MCServer:
         "Collect and serialize server data from a given IP, using minetools.eu"
@@ -496,7 +520,7 @@ class Minecraft(commands.Cog):
             obj = self.feeds[feed.link]
         else:
             try:
-                obj = await self.create_server_1(guild, i[0], i[1])
+                obj = await self.get_server_status(guild, i[0], i[1])
             except Exception as err:
                 self.bot.dispatch("error", err, f"Guild {feed.guild_id} - id {feed.feed_id}")
                 return False
@@ -0,0 +1,252 @@
+import asyncio
+import json
+import struct
+import time
+from dataclasses import dataclass, field
+from typing import Any
+
+from cachetools import TTLCache
+
+DEFAULT_PORT = 25565
+# protocol version sent in the handshake: -1 means "any version" for status requests
+HANDSHAKE_PROTOCOL_VERSION = -1
+
+
+class ServerPingError(Exception):
+    "Raised when a server didn't answer the Server List Ping correctly"
+
+
+@dataclass(frozen=True)
+class ServerStatus:
+    "Status of a Minecraft server, as returned by the Server List Ping protocol"
+    version: str
+    protocol: int
+    online_players: int
+    max_players: int
+    description: str
+    latency: float | None
+    players_sample: list[str] = field(default_factory=list)
+    favicon: str | None = None
+    legacy: bool = False
+
+
+def _encode_varint(value: int) -> bytes:
+    "Encode an int into the VarInt format used by the Minecraft protocol"
+    value &= 0xFFFFFFFF
+    result = bytearray()
+    while True:
+        byte = value & 0x7F
+        value >>= 7
+        if value:
+            result.append(byte | 0x80)
+        else:
+            result.append(byte)
+            return bytes(result)
+
+def _encode_string(value: str) -> bytes:
+    data = value.encode("utf-8")
+    return _encode_varint(len(data)) + data
+
+def _make_packet(packet_id: int, payload: bytes = b"") -> bytes:
+    data = _encode_varint(packet_id) + payload
+    return _encode_varint(len(data)) + data
+
+async def _read_varint(reader: asyncio.StreamReader) -> int:
+    "Read a VarInt from the stream"
+    result = 0
+    for i in range(5):
+        byte = (await reader.readexactly(1))[0]
+        result |= (byte & 0x7F) << (7 * i)
+        if not byte & 0x80:
+            if result & (1 << 31):
+                result -= 1 << 32
+            return result
+    raise ServerPingError("VarInt is too big")
+
+def _decode_varint(data: bytes, offset: int = 0) -> tuple[int, int]:
+    "Decode a VarInt from a buffer, and return it with the offset of the next byte"
+    result = 0
+    for i in range(5):
+        if offset >= len(data):
+            raise ServerPingError("Unexpected end of packet")
+        byte = data[offset]
+        offset += 1
+        result |= (byte & 0x7F) << (7 * i)
+        if not byte & 0x80:
+            return result, offset
+    raise ServerPingError("VarInt is too big")
+
+async def _read_packet(reader: asyncio.StreamReader) -> tuple[int, bytes]:
+    "Read one packet from the stream, and return its ID and its payload"
+    length = await _read_varint(reader)
+    if not 0 < length < 2**21:
+        raise ServerPingError(f"Invalid packet length: {length}")
+    data = await reader.readexactly(length)
+    packet_id, offset = _decode_varint(data)
+    return packet_id, data[offset:]
+
+
+def flatten_chat_component(component: Any) -> str:
+    "Convert a JSON chat component (used for the server description) into plain text"
+    if isinstance(component, str):
+        return component
+    if isinstance(component, list):
+        return "".join(flatten_chat_component(item) for item in component)
+    if isinstance(component, dict):
+        text = str(component.get("text", ""))
+        if "translate" in component and not text:
+            text = str(component["translate"])
+        return text + "".join(flatten_chat_component(item) for item in component.get("extra", []))
+    return ""
+
+
+async def _modern_ping(host: str, port: int, timeout: float) -> ServerStatus:
+    "Get a server status using the Server List Ping protocol of Minecraft 1.7+"
+    reader, writer = await asyncio.wait_for(asyncio.open_connection(host, port), timeout)
+    try:
+        handshake = (
+            _encode_varint(HANDSHAKE_PROTOCOL_VERSION)
+            + _encode_string(host)
+            + struct.pack(">H", port)
+            + _encode_varint(1) # next state: status
+        )
+        writer.write(_make_packet(0x00, handshake) + _make_packet(0x00))
+        await writer.drain()
+        packet_id, payload = await asyncio.wait_for(_read_packet(reader), timeout)
+        if packet_id != 0x00:
+            raise ServerPingError(f"Unexpected packet ID in status response: {packet_id}")
+        json_length, offset = _decode_varint(payload)
+        try:
+            data: dict[str, Any] = json.loads(payload[offset:offset + json_length].decode("utf-8"))
+        except ValueError as err:
+            raise ServerPingError("Invalid status response") from err
+        # measure latency with a ping request
+        latency = None
+        try:
+            start = time.perf_counter()
+            writer.write(_make_packet(0x01, struct.pack(">q", int(start * 1000))))
+            await writer.drain()
+            packet_id, _ = await asyncio.wait_for(_read_packet(reader), timeout)
+            if packet_id == 0x01:
+                latency = (time.perf_counter() - start) * 1000
+        except (OSError, asyncio.IncompleteReadError, ServerPingError):
+            # some servers close the connection before answering the ping
+            pass
+    finally:
+        writer.close()
+        try:
+            await writer.wait_closed()
+        except OSError:
+            pass
+    try:
+        players: dict[str, Any] = data.get("players") or {}
+        version: dict[str, Any] = data.get("version") or {}
+        return ServerStatus(
+            version=str(version.get("name", "")),
+            protocol=int(version.get("protocol", -1)),
+            online_players=int(players.get("online", 0)),
+            max_players=int(players.get("max", 0)),
+            description=flatten_chat_component(data.get("description", "")),
+            latency=latency,
+            players_sample=[player["name"] for player in players.get("sample") or [] if "name" in player],
+            favicon=data.get("favicon"),
+        )
+    except (AttributeError, TypeError, ValueError) as err:
+        raise ServerPingError("Invalid status response") from err
+
+async def _legacy_ping(host: str, port: int, timeout: float) -> ServerStatus:
+    "Get a server status using the legacy Server List Ping (Minecraft 1.6 and older)"
+    start = time.perf_counter()
+    reader, writer = await asyncio.wait_for(asyncio.open_connection(host, port), timeout)
+    try:
+        writer.write(b"\xfe\x01")
+        await writer.drain()
+        header = await asyncio.wait_for(reader.readexactly(3), timeout)
+        if header[0] != 0xFF:
+            raise ServerPingError("Invalid legacy ping response")
+        length = struct.unpack(">H", header[1:])[0]
+        data = (await asyncio.wait_for(reader.readexactly(length * 2), timeout)).decode("utf-16-be")
+        latency = (time.perf_counter() - start) * 1000
+    finally:
+        writer.close()
+        try:
+            await writer.wait_closed()
+        except OSError:
+            pass
+    if data.startswith("§1\x00"):
+        # 1.4 to 1.6 format: §1, protocol, version, motd, online players, max players
+        fields = data[3:].split("\x00")
+        if len(fields) < 5:
+            raise ServerPingError("Invalid legacy ping response")
+        protocol, version, motd, online, max_players = fields[:5]
+    else:
+        # beta 1.8 to 1.3 format: motd§online players§max players
+        fields = data.split("§")
+        if len(fields) < 3:
+            raise ServerPingError("Invalid legacy ping response")
+        motd, online, max_players = "§".join(fields[:-2]), fields[-2], fields[-1]
+        protocol, version = "-1", "<1.4"
+    try:
+        return ServerStatus(
+            version=version,
+            protocol=int(protocol),
+            online_players=int(online),
+            max_players=int(max_players),
+            description=motd,
+            latency=latency,
+            legacy=True,
+        )
+    except ValueError as err:
+        raise ServerPingError("Invalid legacy ping response") from err
+
+
+class ServerListPingClient:
+    """Asynchronous client for the Minecraft Server List Ping protocol
+
+    Results (including failures) are cached per address for a short time, concurrent requests to the same address share
+    the same ping, and the total number of simultaneous connections is limited"""
+
+    def __init__(self, timeout: float = 5, cache_ttl: float = 60, max_concurrency: int = 50, cache_size: int = 5_000):
+        self.timeout = timeout
+        self.cache: TTLCache[tuple[str, int], ServerStatus | ServerPingError] = TTLCache(cache_size, ttl=cache_ttl)
+        self._semaphore = asyncio.Semaphore(max_concurrency)
+        self._pending: dict[tuple[str, int], asyncio.Task[ServerStatus | ServerPingError]] = {}
+
+    async def ping(self, host: str, port: int | None = None) -> ServerStatus:
+        """Get the status of a server
+        Raises ServerPingError if the server could not be reached or answered incorrectly"""
+        address = (host.lower(), port or DEFAULT_PORT)
+        result = self.cache.get(address)
+        if result is None:
+            task = self._pending.get(address)
+            if task is None:
+                task = asyncio.create_task(self._ping_and_cache(address))
+                self._pending[address] = task
+                task.add_done_callback(lambda _: self._pending.pop(address, None))
+            result = await asyncio.shield(task)
+        if isinstance(result, ServerPingError):
+            raise result
+        return result
+
+    async def _ping_and_cache(self, address: tuple[str, int]) -> ServerStatus | ServerPingError:
+        try:
+            result = await self._ping_uncached(*address)
+        except ServerPingError as err:
+            result = err
+        self.cache[address] = result
+        return result
+
+    async def _ping_uncached(self, host: str, port: int) -> ServerStatus:
+        async with self._semaphore:
+            try:
+                return await _modern_ping(host, port, self.timeout)
+            except (OSError, asyncio.IncompleteReadError, ServerPingError) as err:
+                if isinstance(err, OSError):
+                    # unreachable server (includes timeouts): no need to try again with the legacy protocol
+                    raise ServerPingError(f"Unable to ping {host}:{port}: {err!r}") from err
+                modern_error = err
+            try:
+                return await _legacy_ping(host, port, self.timeout)
+            except (OSError, asyncio.IncompleteReadError, ServerPingError, UnicodeDecodeError):
+                pass
+        raise ServerPingError(f"Unable to ping {host}:{port}: {modern_error!r}") from modern_error
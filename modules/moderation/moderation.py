@@ -11,7 +11,7 @@ from core.arguments import args
 from core.bot_classes import Axobot
 from core.checks import checks
 from core.formatutils import FormatUtils
-from core.paginator import Paginator
+from core.paginator import Paginator, PaginatorSource
 from core.views import ConfirmView
 from modules.cases.cases import Case
 
@@ -726,50 +726,47 @@ You must be an administrator of this server to use this command.
             await interaction.response.send_message(await self.bot._(interaction, "moderation.ban.cant-ban"), ephemeral=True)
             return
 
+        class BansSource(PaginatorSource[discord.guild.BanEntry]):
+            "Fetch the guild bans by chunks, starting after the last fetched user"
+            async def fetch_chunk(self, cursor: discord.User | None):
+                if cursor is None:
+                    entries = [entry async for entry in interaction.guild.bans(limit=1000)]
+                else:
+                    entries = [entry async for entry in interaction.guild.bans(limit=1000, after=cursor)]
+                return entries, (entries[-1].user if len(entries) == 1000 else None)
+
         class BansPaginator(Paginator):
             "Paginator used to display banned users"
-            saved_bans: list[discord.guild.BanEntry] = []
-            users: set[int] = set()
+            pages_cache_size = 10
+            source = BansSource(per_page=30)
 
             async def get_page_count(self) -> int:
-                length = len(self.saved_bans)
-                if length == 0:
-                    return 1
-                if length%1000 == 0:
-                    return self.page+1
-                return ceil(length/30)
+                return self.source.get_page_count()
 
             async def get_page_content(self, interaction, page):
                 "Create one page"
-                if last_user := (None if len(self.saved_bans) == 0 else self.saved_bans[-1].user):
-                    self.saved_bans += [
-                        entry
-                        async for entry in interaction.guild.bans(limit=1000, after=last_user)
-                        if entry.user.id not in self.users
-                    ]
-                else:
-                    self.saved_bans += [
-                        entry
-                        async for entry in interaction.guild.bans(limit=1000)
-                        if entry.user.id not in self.users
-                    ]
-                self.users = {entry.user.id for entry in self.saved_bans}
+                page_bans = await self.source.get_page(page)
+                if len(page_bans) == 0 and page > 1:
+                    # the last chunk was full, but there was nothing after it
+                    page = self.page = self.source.get_page_count()
+                    page_bans = await self.source.get_page(page)
+                self.source.prefetch(page+1)
 
                 _title = await self.client._(interaction, "moderation.ban.list-title-0")
                 emb = discord.Embed(
                     title=_title.format(interaction.guild.name),
                     color=7506394
                 )
-                if len(self.saved_bans) == 0:
+                if len(page_bans) == 0:
                     emb.description = await self.client._(interaction, "moderation.ban.no-bans")
                 else:
-                    page_start, page_end = (page-1)*30, min(page*30, len(self.saved_bans))
-                    for i in range(page_start, page_end, 10):
-                        column_start, column_end = i+1, min(i+10, len(self.saved_bans))
+                    page_start = (page-1)*30
+                    for i in range(0, len(page_bans), 10):
+                        column_start, column_end = page_start+i+1, page_start+min(i+10, len(page_bans))
                         if show_reasons:
-                            values = [f"{entry.user}  *({entry.reason})*" for entry in self.saved_bans[i:i+10]]
+                            values = [f"{entry.user}  *({entry.reason})*" for entry in page_bans[i:i+10]]
                         else:
-                            values = [str(entry.user) for entry in self.saved_bans[i:i+10]]
+                            values = [str(entry.user) for entry in page_bans[i:i+10]]
                         emb.add_field(name=f"{column_start}-{column_end}", value="\n".join(values))
                 if (pages_count := await self.get_page_count()) > 1:
                     footer = f"{page}/{pages_count}"
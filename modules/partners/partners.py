@@ -1,6 +1,8 @@
 import asyncio
 import datetime
+import hashlib
 import importlib
+import json
 import time
 from typing import Literal
 
@@ -8,6 +10,7 @@ import aiohttp
 import discord
 from asyncache import cached
 from cachetools import TTLCache
+from cachetools.keys import hashkey
 from discord import AppCommandOptionType, app_commands
 from discord.ext import commands, tasks
 
@@ -62,6 +65,10 @@ class Partners(commands.Cog):
         self.bot = bot
         self.file = "partners"
         self.table = "partners_beta" if bot.beta else "partners"
+        # max number of partners channels refreshed at the same time
+        self.refresh_concurrency = 8
+        # hash of the last embed sent for each partner, with the ID of the message containing it
+        self.embeds_hashes: dict[int, tuple[int, str]] = {}
 
     @commands.Cog.listener()
     async def on_ready(self):
@@ -88,16 +95,23 @@ class Partners(commands.Cog):
         start = time.time()
         channels = await self.get_partners_channels()
         self.bot.log.info(f"[Partners] Reloading channels ({len(channels)} planned guilds)...")
-        count = [0,0]
-        for channel in channels:
-            try:
-                count[0] += 1
-                count[1] += await self.update_partners(channel)
-            except Exception as err:
-                self.bot.dispatch("error", err)
+        count = [len(channels), 0, 0]
+        semaphore = asyncio.Semaphore(self.refresh_concurrency)
+        async def refresh_channel(channel: discord.TextChannel):
+            async with semaphore:
+                try:
+                    updated, unchanged = await self._refresh_partners_channel(channel, session=session)
+                except Exception as err:
+                    self.bot.dispatch("error", err)
+                    return
+                count[1] += updated + unchanged
+                count[2] += unchanged
+        async with aiohttp.ClientSession() as session:
+            await asyncio.gather(*(refresh_channel(channel) for channel in channels))
         delta_time = round(time.time()-start, 3)
         emb = discord.Embed(
-            description=f"**Partners channels updated** in {delta_time}s ({count[0]} channels - {count[1]} partners)",
+            description=f"**Partners channels updated** in {delta_time}s "
+                f"({count[0]} channels - {count[1]} partners - {count[2]} unchanged)",
             color=10949630,
             timestamp=self.bot.utcnow())
         emb.set_author(name=self.bot.user, icon_url=self.bot.user.display_avatar)
@@ -185,6 +199,7 @@ class Partners(commands.Cog):
                 return query_results["server_count"]
         return None
 
+    @cached(TTLCache(10_000, ttl=3600), key=lambda _self, bot_id, _session: hashkey(bot_id))
     async def get_bot_guilds(self, bot_id: int, session: aiohttp.ClientSession) -> int | None:
         """Get the guilds count of a bot
         None if unknown bot/count not provided"""
@@ -201,6 +216,7 @@ class Partners(commands.Cog):
             return api_count
         return db_count
 
+    @cached(TTLCache(10_000, ttl=3600), key=lambda _self, bot_id, _session: hashkey(bot_id))
     async def get_bot_owners(self, bot_id: int, session: aiohttp.ClientSession) -> list[discord.User | int]:
         """Get the owners list of a bot
         Empty list if unknown bot/owners not provided"""
@@ -226,25 +242,51 @@ class Partners(commands.Cog):
                 channels.append(channel)
         return channels
 
+    @cached(TTLCache(10_000, ttl=3600))
+    async def _fetch_partner_bot(self, bot_id: int) -> discord.User:
+        "Fetch the user of a bot partner, cached across the channels listing it"
+        return await self.bot.fetch_user(bot_id)
+
+    @cached(TTLCache(10_000, ttl=600))
+    async def _fetch_partner_invite(self, invite_code: str) -> discord.Invite:
+        "Fetch the invite of a guild partner, cached across the channels listing it"
+        return await self.bot.fetch_invite(invite_code)
+
+    @staticmethod
+    def _get_embed_hash(embed: discord.Embed) -> str:
+        "Get a hash of the embed content, ignoring its timestamp"
+        data = embed.to_dict()
+        data.pop("timestamp", None)
+        return hashlib.sha1(json.dumps(data, sort_keys=True, default=str).encode()).hexdigest()
+
     async def update_partners(self, channel: discord.TextChannel, color: int | None = None) -> int:
         """Update every partners of a channel"""
+        updated, unchanged = await self._refresh_partners_channel(channel, color, force=True)
+        return updated + unchanged
+
+    async def _refresh_partners_channel(self, channel: discord.TextChannel, color: int | None = None,
+                                        session: aiohttp.ClientSession | None = None, force: bool = False
+                                        ) -> tuple[int, int]:
+        """Update every partners of a channel
+        Messages whose content didn't change since the last refresh are not edited, unless 'force' is True
+        Returns the number of updated partners and the number of unchanged ones"""
         if not channel.permissions_for(channel.guild.me).embed_links:
-            return 0
+            return 0, 0
         partners = await self.db_get_partners_of_guild(channel.guild.id)
         if len(partners) == 0:
-            return 0
-        tr_unknown = await self.bot._(channel.guild.id, "misc.unknown")
-        tr_guild = await self.bot._(channel.guild.id, "misc.server")
-        tr_bot = await self.bot._(channel.guild.id, "misc.bot")
-        tr_members = await self.bot._(channel.guild.id, "info.info.role-3")
-        tr_guilds = await self.bot._(channel.guild.id, "misc.servers")
-        tr_invite = await self.bot._(channel.guild.id, "info.info.inv-4")
-        tr_click = await self.bot._(channel.guild.id, "misc.click_here")
-        tr_owner = await self.bot._(channel.guild.id, "info.info.guild-1")
-        count = 0
+            return 0, 0
+        (
+            tr_unknown, tr_guild, tr_bot, tr_members, tr_guilds, tr_invite, tr_click, tr_owner
+        ) = await self.bot.tr_many(channel.guild.id, [
+            "misc.unknown", "misc.server", "misc.bot", "info.info.role-3",
+            "misc.servers", "info.info.inv-4", "misc.click_here", "info.info.guild-1"
+        ])
+        count = unchanged_count = 0
         if color is None:
             color = await self.bot.get_config(channel.guild.id, "partner_color")
-        session = aiohttp.ClientSession(loop=self.bot.loop)
+        own_session = session is None
+        if own_session:
+            session = aiohttp.ClientSession()
         for partner in partners:
             target_desc = partner["description"]
             if partner["type"] == "bot":
@@ -267,19 +309,25 @@ class Partners(commands.Cog):
                     emb.add_field(**field)
             if self.bot.zombie_mode:
                 continue
+            embed_hash = self._get_embed_hash(emb)
+            if not force and self.embeds_hashes.get(partner["ID"]) == (partner["messageID"], embed_hash):
+                unchanged_count += 1
+                continue
+            message_id = partner["messageID"]
             try:
-                msg = await channel.fetch_message(partner["messageID"])
-                await msg.edit(embed=emb)
+                await channel.get_partial_message(partner["messageID"]).edit(embed=emb)
             except (discord.errors.NotFound, discord.errors.Forbidden):
-                msg = await channel.send(embed=emb)
-                await self.db_edit_partner(partner_id=partner["ID"], msg=msg.id)
+                message_id = (await channel.send(embed=emb)).id
+                await self.db_edit_partner(partner_id=partner["ID"], msg=message_id)
             except Exception as err:
-                msg = await channel.send(embed=emb)
-                await self.db_edit_partner(partner_id=partner["ID"], msg=msg.id)
+                message_id = (await channel.send(embed=emb)).id
+                await self.db_edit_partner(partner_id=partner["ID"], msg=message_id)
                 self.bot.dispatch("error", err)
+            self.embeds_hashes[partner["ID"]] = (message_id, embed_hash)
             count += 1
-        await session.close()
-        return count
+        if own_session:
+            await session.close()
+        return count, unchanged_count
 
     async def update_partner_bot(self, tr_bot: str, tr_guilds: str, tr_invite: str, tr_owner: str, tr_click: str,
                                  session: aiohttp.ClientSession, partner: dict):
@@ -288,7 +336,8 @@ class Partners(commands.Cog):
         title = "**" + tr_bot.capitalize() + "** "
         fields = []
         try:
-            title += str(await self.bot.fetch_user(int(partner["target"])))
+            usr = await self._fetch_partner_bot(int(partner["target"]))
+            title += str(usr)
             # guild count field
             guild_nbr = await self.get_bot_guilds(partner["target"], session)
             if guild_nbr is not None:
@@ -303,7 +352,6 @@ class Partners(commands.Cog):
                     "name": tr_owner.capitalize(),
                     "value": ", ".join([str(u) for u in owners])
                 })
-            usr = await self.bot.fetch_user(int(partner["target"]))
             image = usr.display_avatar.with_static_format("png") if usr else ""
         except discord.NotFound:
             title += "ID: " + partner["target"]
@@ -325,7 +373,7 @@ class Partners(commands.Cog):
         """Update a guild partner embed"""
         title = "**" + tr_guild.capitalize() + "** "
         try:
-            inv = await self.bot.fetch_invite(partner["target"])
+            inv = await self._fetch_partner_invite(partner["target"])
         except discord.NotFound as err:
             raise err
         image = str(inv.guild.icon) if inv.guild.icon else None
@@ -2,7 +2,7 @@ import discord
 from discord import app_commands
 from discord.ext import commands
 
-from core.bot_classes import Axobot
+from core.bot_classes import Axobot, MessageFacts
 from core.views import TextInputModal
 
 
@@ -24,16 +24,18 @@ class PollCog(commands.Cog):
         for emoji in emojis_list:
             await msg.add_reaction(emoji)
 
-    @commands.Cog.listener(name="on_message")
-    async def check_suggestion(self, message: discord.Message):
+    @commands.Cog.listener(name="on_message_facts")
+    async def check_suggestion(self, message: discord.Message, facts: MessageFacts):
         "Check for any message sent in a poll channel, in order to add proper reactions"
         if message.guild is None or not self.bot.is_ready() or not self.bot.database_online or message.content.startswith('.'):
             return
+        if message.author.bot or not isinstance(message.author, discord.Member):
+            return
         try:
-            channels: list[discord.TextChannel] | None = await self.bot.get_config(message.guild.id, "poll_channels")
+            channels: list[discord.TextChannel] | None = facts.config["poll_channels"]
             if channels is None:
                 return
-            if message.channel in channels and not message.author.bot:
+            if message.channel in channels:
                 try:
                     await self.add_vote(message)
                 except discord.DiscordException:
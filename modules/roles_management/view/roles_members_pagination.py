@@ -1,34 +1,35 @@
-
-
 import discord
 
 from core.bot_classes import Axobot
-from core.paginator import Paginator
+from core.paginator import ListSource, Paginator
 
 _MEMBERS_PER_PAGE = 30
 
 class RoleMembersPaginator(Paginator):
     "A paginator for the members of a role."
+    pages_cache_size = 10
 
     def __init__(self, client: Axobot, user: discord.User, role: discord.Role, stop_label: str = "Quit"):
         super().__init__(client, user, stop_label)
         self.role = role
+        # Role.members walks through every guild member, so only do it once
+        self.source = ListSource(role.members, _MEMBERS_PER_PAGE)
 
     async def get_page_count(self) -> int:
-        if len(self.role.members) == 0:
-            return 1
-        return (len(self.role.members) + _MEMBERS_PER_PAGE - 1) // _MEMBERS_PER_PAGE
+        return self.source.get_page_count()
 
     async def get_page_content(self, interaction, page):
         "Create one page"
         tr_nbr = await self.client._(interaction, "info.info.role-3")
         tr_mbr = await self.client._(interaction, "misc.membres")
         emb = discord.Embed(title=self.role.name, color=self.role.color)
-        emb.add_field(name=tr_nbr.capitalize(), value=len(self.role.members), inline=False)
-        if len(self.role.members) != 0:
-            page_start, page_end = (page - 1) * _MEMBERS_PER_PAGE, min(page * _MEMBERS_PER_PAGE, len(self.role.members))
-            for i in range(page_start, page_end, 10):
-                column_start, column_end = i, min(i + 10, page_end)
+        members_count = len(self.source.items)
+        emb.add_field(name=tr_nbr.capitalize(), value=members_count, inline=False)
+        if members_count != 0:
+            page_members = await self.source.get_page(page)
+            page_start = (page - 1) * _MEMBERS_PER_PAGE
+            for i in range(0, len(page_members), 10):
+                column_start, column_end = page_start + i, page_start + min(i + 10, len(page_members))
                 if column_start == 0 and column_end < 10:
                     field_title = f"{tr_mbr.capitalize()}"
                 else:
@@ -36,7 +37,7 @@ class RoleMembersPaginator(Paginator):
                 emb.add_field(
                     name=field_title,
                     value="\n".join(
-                        member.mention for member in self.role.members[column_start:column_end]
+                        member.mention for member in page_members[i:i + 10]
                     ),
                 )
             if (pages_count := await self.get_page_count()) > 1:
@@ -486,6 +486,8 @@ class Rss(commands.Cog):
 
         class FeedsPaginator(Paginator):
             "Paginator used to display the RSS feeds list"
+            pages_cache_size = 10
+
             async def _get_feeds_for_page(self, page: int):
                 feeds_to_display: list[str] = []
                 for i in range((page - 1) * feeds_per_page, min(page * feeds_per_page, len(feeds))):
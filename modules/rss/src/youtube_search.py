@@ -26,11 +26,18 @@ import os
 import sys
 from argparse import ArgumentParser, HelpFormatter, Namespace
 from functools import wraps
-from typing import Callable, Iterable
+from typing import TYPE_CHECKING, Callable, Iterable
 
-from google.auth.exceptions import GoogleAuthError
-from googleapiclient.discovery import Resource
-from googleapiclient.errors import HttpError
+from core.lazy_import import LazyValue, lazy_import
+
+if TYPE_CHECKING:
+    from google.auth import exceptions as google_auth_exceptions
+    from googleapiclient import discovery, errors
+else:
+    # the Google API client is heavy to import, and only needed when searching for a channel
+    google_auth_exceptions = lazy_import("google.auth.exceptions")
+    discovery = lazy_import("googleapiclient.discovery")
+    errors = lazy_import("googleapiclient.errors")
 
 program = os.path.basename(sys.argv[0])
 VER_DATE = "0.1 2020-07-25 11:23"  # $ date +"%F %R"
@@ -83,13 +90,18 @@ class Text:
 class Service:
     "Base class used to make requests to the YouTube API"
 
-    # pylint: disable=import-outside-toplevel
-    from googleapiclient.discovery import build
-
     def __init__(self, max_results, app_key):
-        self.youtube: Resource = Service.build("youtube", "v3", developerKey=app_key)
+        self._youtube: LazyValue["discovery.Resource"] = LazyValue(
+            "YouTube API client",
+            lambda: discovery.build("youtube", "v3", developerKey=app_key)
+        )
         self.max_results = max_results
 
+    @property
+    def youtube(self) -> "discovery.Resource":
+        "The YouTube API client, built on its first use"
+        return self._youtube.get()
+
     def search_term(self, term, search_type=None) -> tuple[list[str], list[str], list[str]]:
         "Search for a specific term in the YouTube API"
         resp = self.youtube.search().list(  # pylint: disable=no-member
@@ -224,9 +236,9 @@ def service_func(func):
     def wrapper(*arg, **kwd):
         try:
             return func(*arg, **kwd)
-        except HttpError as err:
+        except errors.HttpError as err:
             error("HTTP error: %s", err)
-        except GoogleAuthError as err:
+        except google_auth_exceptions.GoogleAuthError as err:
             error("Google auth error: %s", err)
         return None
 
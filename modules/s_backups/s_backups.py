@@ -1,14 +1,20 @@
+import asyncio
+import gzip
 import json
 from io import BytesIO
 from typing import Any
 
 import aiohttp
 import discord
+from cachetools import TTLCache
 from discord import app_commands
 from discord.ext import commands
 
 from core.bot_classes import Axobot
 
+from .src.backup_file import decode_backup, encode_backup, get_backup_digest
+from .src.restore_plan import RestoreCheckpoint, RestorePlan, gather_limited
+
 
 class LoadArguments:
     """Arguments for the load_backup function"""
@@ -28,6 +34,8 @@ class Backups(commands.Cog):
         self.bot = bot
         self.file = "s_backups"
         self.backups_loading: set[int] = set()
+        # guild ID -> progress of the last interrupted restoration
+        self.restore_checkpoints: TTLCache[int, RestoreCheckpoint] = TTLCache(maxsize=1_000, ttl=86400)
 
     main_backup = app_commands.Group(
         name="server-backup",
@@ -39,7 +47,7 @@ class Backups(commands.Cog):
     @main_backup.command(name="load")
     @app_commands.checks.cooldown(1, 180)
     @app_commands.describe(
-        backup_file="The JSON file to load, created by the `server-backup create` command",
+        backup_file="The JSON file to load (compressed or not), created by the `server-backup create` command",
         match_by_name="If False, only match channels/roles by ID and do not fallback to name",
         delete_old_channels="If True, delete every current channel/category that is not in the backup",
         delete_old_roles="If True, delete every current role that is not in the backup",
@@ -73,14 +81,24 @@ Arguments are:
             return
         # Loading backup from file
         try:
-            data = json.loads(await backup_file.read())
-        except (json.decoder.JSONDecodeError, IndexError):
+            file_content = await backup_file.read()
+            data = decode_backup(file_content)
+        except (json.decoder.JSONDecodeError, UnicodeDecodeError, gzip.BadGzipFile, EOFError, IndexError):
             await interaction.response.send_message(
                 await self.bot._(interaction, "s_backup.invalid_file"), ephemeral=True
             )
             return
+        # resume the last restoration if it was interrupted while loading the same file
+        digest = get_backup_digest(file_content)
+        checkpoint = self.restore_checkpoints.get(interaction.guild_id)
+        if checkpoint is not None and checkpoint.backup_digest == digest:
+            loading_message = "s_backup.resuming"
+        else:
+            checkpoint = RestoreCheckpoint(digest)
+            self.restore_checkpoints[interaction.guild_id] = checkpoint
+            loading_message = "s_backup.loading"
         await interaction.response.send_message(
-            await self.bot._(interaction, "s_backup.loading")
+            await self.bot._(interaction, loading_message)
         )
         # compiling args
         arguments = LoadArguments(
@@ -94,7 +112,7 @@ Arguments are:
         # try to apply backup
         try:
             if data["_backup_version"] == 1:
-                problems, logs = await self.BackupLoaderV1().load_backup(interaction, data, arguments)
+                problems, logs = await self.BackupLoaderV1().load_backup(interaction, data, arguments, checkpoint)
             else:
                 await interaction.edit_original_response(await self.bot._(interaction, "s_backup.invalid_version"))
                 self.backups_loading.remove(interaction.guild_id)
@@ -104,6 +122,7 @@ Arguments are:
             await interaction.edit_original_response(await self.bot._(interaction, "s_backup.err"))
             self.backups_loading.remove(interaction.guild_id)
             return
+        self.restore_checkpoints.pop(interaction.guild_id, None)
         # Formatting and sending logs
         logs = f"Found {sum(problems)} problems (including {problems[0]} permissions issues)\n\n" + "\n".join(
             logs)
@@ -126,7 +145,8 @@ Arguments are:
 
     @main_backup.command(name="create")
     @app_commands.checks.cooldown(1, 60)
-    async def backup_create(self, interaction: discord.Interaction):
+    @app_commands.describe(compress="If True, send a gzip-compressed file, much smaller for big servers")
+    async def backup_create(self, interaction: discord.Interaction, compress: bool = False):
         """Make and send a backup of this server
         You will find there the configuration of your server, every general settings, the list of members with their roles, the list of categories and channels (with their permissions), emotes, and webhooks.
         Please note that audit logs, messages and invites are not used
@@ -136,15 +156,16 @@ Arguments are:
 ..Doc server.html#server-backup"""
         await interaction.response.defer()
         data = await self.create_backup(interaction)
-        file = discord.File(BytesIO(data.encode()),
-                            filename=f"backup-{interaction.guild_id}.json")
+        file_content = await asyncio.to_thread(encode_backup, data, compress)
+        filename = f"backup-{interaction.guild_id}.json" + (".gz" if compress else "")
+        file = discord.File(file_content, filename=filename)
         await interaction.followup.send(await self.bot._(interaction, "s_backup.backup-done"), file=file)
 
     # --------
 
-    async def create_backup(self, interaction: discord.Interaction) -> str:
-        "Create a backup of the server and return it as a JSON string"
-        async def get_channel_json(chan: discord.abc.GuildChannel) -> dict:
+    async def create_backup(self, interaction: discord.Interaction) -> dict[str, Any]:
+        "Create a backup of the server, as a JSON-serializable dict"
+        def get_channel_json(chan: discord.abc.GuildChannel) -> dict:
             chan_js = {"id": chan.id, "name": chan.name, "position": chan.position}
             if isinstance(chan, discord.TextChannel):
                 chan_js["type"] = "TextChannel"
@@ -224,7 +245,7 @@ Arguments are:
                 temp["permissions_overwrites"] = perms
             temp["channels"] = []
             for chan in channels:
-                temp["channels"].append(await get_channel_json(chan))
+                temp["channels"].append(get_channel_json(chan))
             categ.append(temp)
         back["categories"] = categ
         back["emojis"] = {}
@@ -233,29 +254,32 @@ Arguments are:
                 "url": str(emoji.url),
                 "roles": [x.id for x in emoji.roles]
             }
-        try:
-            banned = {}
-            async for b in g.bans():
-                banned[b.user.id] = b.reason
-            back["banned_users"] = banned
-        except discord.errors.Forbidden:
-            pass
-        except Exception as err:
-            self.bot.dispatch("error", err, interaction)
-        try:
-            webs = []
-            for w in await g.webhooks():
-                webs.append({
-                    "channel": w.channel_id,
-                    "name": w.name,
-                    "avatar": w.display_avatar.url,
-                    "url": w.url
-                })
-            back["webhooks"] = webs
-        except discord.errors.Forbidden:
-            pass
-        except Exception as err:
-            self.bot.dispatch("error", err, interaction)
+
+        async def get_banned_users():
+            try:
+                back["banned_users"] = {b.user.id: b.reason async for b in g.bans(limit=None)}
+            except discord.errors.Forbidden:
+                pass
+            except Exception as err:
+                self.bot.dispatch("error", err, interaction)
+
+        async def get_webhooks():
+            try:
+                back["webhooks"] = [
+                    {
+                        "channel": w.channel_id,
+                        "name": w.name,
+                        "avatar": w.display_avatar.url,
+                        "url": w.url
+                    }
+                    for w in await g.webhooks()
+                ]
+            except discord.errors.Forbidden:
+                pass
+            except Exception as err:
+                self.bot.dispatch("error", err, interaction)
+
+        await asyncio.gather(get_banned_users(), get_webhooks())
         back["members"] = []
         for memb in g.members:
             back["members"].append({
@@ -264,7 +288,7 @@ Arguments are:
                 "bot": memb.bot,
                 "roles": [x.id for x in memb.roles][1:]
             })
-        return json.dumps(back, sort_keys=True, indent=4)
+        return back
 
     # ----------
 
@@ -273,16 +297,29 @@ Arguments are:
         def __init__(self):
             pass
 
-        async def url_to_byte(self, url: str) -> bytes | None:
+        async def url_to_byte(self, url: str, session: aiohttp.ClientSession | None = None) -> bytes | None:
             "Fetch an image from an URL and return it as bytes, or None if the image is not found"
-            async with aiohttp.ClientSession(timeout=aiohttp.ClientTimeout(total=10)) as session:
-                async with session.get(url) as response:
-                    if response.status >= 200 and response.status < 300:
-                        res = await response.read()
-                    else:
-                        res = None
+            if session is None:
+                async with aiohttp.ClientSession(timeout=aiohttp.ClientTimeout(total=10)) as session:
+                    return await self.url_to_byte(url, session)
+            async with session.get(url) as response:
+                if response.status >= 200 and response.status < 300:
+                    res = await response.read()
+                else:
+                    res = None
             return res
 
+        async def download_images(self, urls: list[str]) -> dict[str, bytes | None]:
+            "Download multiple images in parallel, and map each URL to its image, or None if it could not be fetched"
+            async def download(session: aiohttp.ClientSession, url: str):
+                try:
+                    return await self.url_to_byte(url, session)
+                except (aiohttp.ClientError, asyncio.TimeoutError):
+                    return None
+            async with aiohttp.ClientSession(timeout=aiohttp.ClientTimeout(total=10)) as session:
+                images = await gather_limited((download(session, url) for url in urls), limit=10)
+            return dict(zip(urls, images, strict=True))
+
         async def load_roles(self, interaction: discord.Interaction, problems: list, logs: list, symb: list, data: dict,
                              args: LoadArguments, roles_list: dict[int, discord.Role]):
             "Create and update roles based on the backup map"
@@ -294,7 +331,8 @@ Arguments are:
                 action = "edit"
                 try:
                     rolename = role_data["name"]
-                    role = interaction.guild.get_role(role_data["id"])
+                    # the role may have been created during a previous attempt
+                    role = roles_list.get(role_data["id"]) or interaction.guild.get_role(role_data["id"])
                     if role is None:
                         potential_roles = [x for x in interaction.guild.roles if x.name == role_data["name"]]
                         if args.match_by_name and len(potential_roles) > 0:
@@ -362,7 +400,7 @@ Arguments are:
             for role_data in data["roles"]:
                 role_data: dict[str, Any]
                 role_id: int = role_data["id"]
-                if role_data["position"] > 0 and role_id in roles_list and (role := roles_list.get(roles_list[role_id])):
+                if role_data["position"] > 0 and (role := roles_list.get(role_id)):
                     new_pos = min(
                         max(interaction.guild.me.top_role.position-1, 1), role_data["position"])
                     if role.position == new_pos:
@@ -391,7 +429,7 @@ Arguments are:
                         if ("id" in categ.keys() and categ["id"] is None):
                             continue
                         categname = categ["name"]
-                        c = interaction.guild.get_channel(categ["id"])
+                        c = channels_list.get(categ["id"]) or interaction.guild.get_channel(categ["id"])
                         if c is None:
                             potential_categories = [x for x in interaction.guild.categories if x.name == categ["name"]]
                             if args.match_by_name and len(potential_categories) > 0:
@@ -457,7 +495,7 @@ Arguments are:
                     action = "edit"
                     try:
                         channame = chan["name"]
-                        c = interaction.guild.get_channel(chan["id"])
+                        c = channels_list.get(chan["id"]) or interaction.guild.get_channel(chan["id"])
                         if c is None:
                             potential_channels = [
                                 x
@@ -544,33 +582,41 @@ Arguments are:
             if not interaction.guild.me.guild_permissions.manage_roles:
                 logs.append(f"  {symb[0]} Unable to update permissions: missing permissions")
                 problems[0] += 1
-            # categories
+
+            async def sync_category(categ: dict) -> list[str]:
+                try:
+                    real_category = channels_list[categ["id"]]
+                    await self.apply_perm(real_category, categ["permissions_overwrites"], roles_list)
+                except Exception as err:
+                    problems[1] += 1
+                    return [f"  {symb[0]} Unable to update permissions of category {categ['name']}: {err}"]
+                return [f"  {symb[2]} Permissions of category {categ['name']} set"]
+
+            async def sync_channel(chan: dict) -> list[str]:
+                try:
+                    real_channel = channels_list[chan["id"]]
+                    await self.apply_perm(real_channel, chan["permissions_overwrites"], roles_list)
+                except discord.errors.Forbidden:
+                    problems[0] += 1
+                    return [f"     {symb[0]} Unable to update permissions of channel {chan['name']}: missing permisions"]
+                except Exception as err:
+                    problems[1] += 1
+                    return [f"     {symb[0]} Unable to update permissions of channel {chan['name']}: {err}"]
+                return [f"     {symb[2]} Permissions of channel {chan['name']} set"]
+
+            # channels don't depend on each other, so update them concurrently while keeping the logs in order
+            coroutines = []
             for categ in data["categories"]:
                 if "id" in categ.keys() and categ["id"] is not None and "permissions_overwrites" in categ.keys():
-                    try:
-                        real_category = channels_list[categ["id"]]
-                        await self.apply_perm(real_category, categ["permissions_overwrites"], roles_list)
-                    except Exception as err:
-                        logs.append(f"  {symb[0]} Unable to update permissions of category {categ['name']}: {err}")
-                        problems[1] += 1
-                    else:
-                        logs.append(f"  {symb[2]} Permissions of category {categ['name']} set")
+                    coroutines.append(sync_category(categ))
                 if "channels" not in categ.keys():
                     continue
                 for chan in categ["channels"]:
-                    try:
-                        if (chan["id"] not in channels_list.keys()) or ("permissions_overwrites" not in chan.keys()):
-                            continue
-                        real_channel = channels_list[chan["id"]]
-                        await self.apply_perm(real_channel, chan["permissions_overwrites"], roles_list)
-                    except discord.errors.Forbidden:
-                        logs.append(f"     {symb[0]} Unable to update permissions of channel {chan['name']}: missing permisions")
-                        problems[0] += 1
-                    except Exception as err:
-                        logs.append(f"     {symb[0]} Unable to update permissions of channel {chan['name']}: {err}")
-                        problems[1] += 1
-                    else:
-                        logs.append(f"     {symb[2]} Permissions of channel {chan['name']} set")
+                    if (chan["id"] not in channels_list.keys()) or ("permissions_overwrites" not in chan.keys()):
+                        continue
+                    coroutines.append(sync_channel(chan))
+            for item_logs in await gather_limited(coroutines):
+                logs.extend(item_logs)
 
         async def load_members(self, interaction: discord.Interaction, problems: list, logs: list, symb: list, data: dict,
                                _args: LoadArguments, roles_list: dict[int, discord.Role]):
@@ -587,10 +633,8 @@ Arguments are:
                 change_roles = False
                 logs.append(f"  {symb[0]} Unable to change roles: missing permissions")
                 problems[0] += 1
-            for memb in data["members"]:
-                member = interaction.guild.get_member(memb["id"])
-                if member is None:
-                    continue
+
+            async def sync_member(memb: dict, member: discord.Member) -> list[str]:
                 try:
                     edition: list[str] = []
                     if member.nick != memb["nickname"] and change_nicks and (
@@ -610,19 +654,27 @@ Arguments are:
                         try:
                             await member.add_roles(*roles)
                         except discord.errors.Forbidden:
-                            logs.append(f"  {symb[0]} Unable to give roles to user {member}: missing permissions")
                             problems[0] += 1
+                            return [f"  {symb[0]} Unable to give roles to user {member}: missing permissions"]
                         except Exception as err:
-                            logs.append(f"  {symb[0]} Unable to give roles to user {member}: {err}")
                             problems[1] += 1
+                            return [f"  {symb[0]} Unable to give roles to user {member}: {err}"]
                         else:
                             edition.append("roles")
                 except Exception as err:
-                    logs.append(f"  {symb[0]} Unable to set user {member}: {err}")
                     problems[1] += 1
-                else:
-                    if len(edition) > 0:
-                        logs.append(f"  {symb[2]} Updated {'and'.join(edition)} for user {member}")
+                    return [f"  {symb[0]} Unable to set user {member}: {err}"]
+                if len(edition) > 0:
+                    return [f"  {symb[2]} Updated {'and'.join(edition)} for user {member}"]
+                return []
+
+            coroutines = [
+                sync_member(memb, member)
+                for memb in data["members"]
+                if (member := interaction.guild.get_member(memb["id"])) is not None
+            ]
+            for item_logs in await gather_limited(coroutines):
+                logs.extend(item_logs)
 
         async def load_emojis(self, interaction: discord.Interaction, problems: list, logs: list, symb: list, data: dict,
                               args: LoadArguments, roles_list: dict):
@@ -632,20 +684,24 @@ Arguments are:
                     f"  {symb[0]} Unable to create or update emojis: missing permissions")
                 problems[0] += 1
             else:
-                for emojiname, emojidata in data["emojis"].items():
+                existing_names = {emoji.name for emoji in interaction.guild.emojis}
+                for emojiname in data["emojis"]:
+                    if emojiname in existing_names:
+                        logs.append(f"  {symb[1]} Emoji {emojiname} already exists")
+                missing_emojis = {
+                    emojiname: emojidata
+                    for emojiname, emojidata in data["emojis"].items()
+                    if emojiname not in existing_names
+                }
+                # download every image at once instead of one after the other
+                icons = await self.download_images(list({emojidata["url"] for emojidata in missing_emojis.values()}))
+
+                async def create_emoji(emojiname: str, emojidata: dict) -> list[str]:
                     try:
-                        if len([x for x in interaction.guild.emojis if x.name == emojiname]) > 0:
-                            logs.append(f"  {symb[1]} Emoji {emojiname} already exists")
-                            continue
-                        try:
-                            icon = await self.url_to_byte(emojidata["url"])
-                        except aiohttp.ClientError:
-                            icon = None
+                        icon = icons[emojidata["url"]]
                         if icon is None:
-                            logs.append(
-                                f"  {symb[0]} Unable to create emoji {emojiname}:"\
-                                " the image has probably been deleted from Discord cache")
-                            continue
+                            return [f"  {symb[0]} Unable to create emoji {emojiname}:"\
+                                    " the image has probably been deleted from Discord cache"]
                         roles = list()
                         for r in emojidata["roles"]:
                             try:
@@ -658,13 +714,17 @@ Arguments are:
                             roles = None
                         await interaction.guild.create_custom_emoji(name=emojiname, image=icon, roles=roles)
                     except discord.errors.Forbidden:
-                        logs.append(f"  {symb[0]} Unable to create emoji {emojiname}: missing permissions")
                         problems[0] += 1
+                        return [f"  {symb[0]} Unable to create emoji {emojiname}: missing permissions"]
                     except Exception as err:
-                        logs.append(f"  {symb[0]} Unable to create emoji {emojiname}: {err}")
                         problems[1] += 1
-                    else:
-                        logs.append(f"  {symb[2]} Emoji {emojiname} created")
+                        return [f"  {symb[0]} Unable to create emoji {emojiname}: {err}"]
+                    return [f"  {symb[2]} Emoji {emojiname} created"]
+
+                for item_logs in await gather_limited(
+                    create_emoji(emojiname, emojidata) for emojiname, emojidata in missing_emojis.items()
+                ):
+                    logs.extend(item_logs)
                 if args.delete_old_emojis:
                     for emoji in interaction.guild.emojis:
                         if emoji.name in data["emojis"].keys():
@@ -689,33 +749,41 @@ Arguments are:
                 problems[0] += 1
             else:
                 created_webhooks_urls: list[str] = []
+                existing_urls = {webhook.url for webhook in await interaction.guild.webhooks()}
                 for webhook in data["webhooks"]:
+                    if webhook["url"] in existing_urls:
+                        logs.append(f"  {symb[1]} Webhook {webhook['name']} already exists")
+                missing_webhooks = [webhook for webhook in data["webhooks"] if webhook["url"] not in existing_urls]
+                avatars = await self.download_images(list({webhook["avatar"] for webhook in missing_webhooks}))
+
+                async def create_webhook(webhook: dict) -> list[str]:
+                    webhook_logs: list[str] = []
                     try:
                         webhookname = webhook["name"]
-                        if len([x for x in await interaction.guild.webhooks() if x.url == webhook["url"]]) > 0:
-                            logs.append(f"  {symb[1]} Webhook {webhookname} already exists")
-                            continue
-                        try:
-                            icon = await self.url_to_byte(webhook["avatar"])
-                        except aiohttp.ClientError:
-                            logs.append(f"  {symb[0]} Unable to get avatar of wbehook {webhookname}:"\
-                                        " the image has probably been deleted from Discord cache")
-                            icon = None
+                        if (icon := avatars[webhook["avatar"]]) is None:
+                            webhook_logs.append(f"  {symb[0]} Unable to get avatar of wbehook {webhookname}:"\
+                                                " the image has probably been deleted from Discord cache")
                         try:
                             real_channel = channels_list[webhook["channel"]]
                         except KeyError:
-                            logs.append(f"  {symb[0]} Unable to create wbehook {webhookname}: unable to get the text channel")
-                            continue
+                            webhook_logs.append(
+                                f"  {symb[0]} Unable to create wbehook {webhookname}: unable to get the text channel"
+                            )
+                            return webhook_logs
                         await real_channel.create_webhook(name=webhook["name"], avatar=icon)
                     except discord.errors.Forbidden:
-                        logs.append(f"  {symb[0]} Unable to create webhook {webhookname}: missing permissions")
+                        webhook_logs.append(f"  {symb[0]} Unable to create webhook {webhookname}: missing permissions")
                         problems[0] += 1
                     except Exception as err:
-                        logs.append(f"  {symb[0]} Unable to create webhook {webhookname}: {err}")
+                        webhook_logs.append(f"  {symb[0]} Unable to create webhook {webhookname}: {err}")
                         problems[1] += 1
                     else:
-                        logs.append(f"  {symb[2]} Webhook {webhookname} created")
+                        webhook_logs.append(f"  {symb[2]} Webhook {webhookname} created")
                         created_webhooks_urls.append(webhook["url"])
+                    return webhook_logs
+
+                for item_logs in await gather_limited(create_webhook(webhook) for webhook in missing_webhooks):
+                    logs.extend(item_logs)
                 if args.delete_old_webhooks:
                     for web in await interaction.guild.webhooks():
                         if web.url in created_webhooks_urls:
@@ -732,13 +800,9 @@ Arguments are:
                         else:
                             logs.append(f"  {symb[2]} Webhook {web.name} deleted")
 
-        async def load_backup(self, interaction: discord.Interaction, data: dict, args: LoadArguments) -> tuple[list, list]:
-            "Load a backup in a server, for backups version 1"
-            if data.pop("_backup_version", None) != 1:
-                return ([0, 1], ["Unknown backup version"])
-            symb = ["`[X]`", "`[-]`", "`[O]`"]
-            problems = [0, 0]
-            logs: list[str] = []
+        async def load_settings(self, interaction: discord.Interaction, problems: list, logs: list, symb: list, data: dict,
+                                _args: LoadArguments):
+            "Update the guild general settings based on the backup map"
             # afk_timeout
             if interaction.guild.afk_timeout == data["afk_timeout"]:
                 logs.append(f"{symb[1]} No need to change AFK timeout duration")
@@ -753,31 +817,6 @@ Arguments are:
                     problems[1] += 1
                 else:
                     logs.append(f"{symb[2]} AFK timeout duration set to {data['afk_timeout']}s")
-            # banned_users
-            if "banned_users" in data:
-                try:
-                    banned_users = [x.user.id async for x in interaction.guild.bans(limit=None)]
-                    users_to_ban = [
-                        x
-                        for x in data["banned_users"].items()
-                        if x[0] not in banned_users
-                    ]
-                    if len(users_to_ban) == 0:
-                        logs.append(symb[1]+" No user to ban")
-                    else:
-                        for x in users_to_ban:
-                            user, reason = x
-                            try:
-                                await interaction.guild.ban(discord.Object(user), reason=reason, delete_message_days=0)
-                            except discord.errors.NotFound:
-                                pass
-                        logs.append(f"{symb[2]} Banned users updated ({len(data['banned_users'])} users)")
-                except discord.errors.Forbidden:
-                    logs.append(f"{symb[0]} Unable to ban users: missing permissions")
-                    problems[0] += 1
-                except Exception as err:
-                    logs.append(f"{symb[0]} Unable to ban users: {err}")
-                    problems[1] += 1
             # default_notifications
             if interaction.guild.default_notifications.value == data["default_notifications"]:
                 logs.append(f"{symb[1]} No need to change default notifications")
@@ -875,31 +914,93 @@ Arguments are:
                 else:
                     logs.append(
                         symb[2]+" Verification level set to "+verif_level.name)
-            # roles
-            logs.append(" - Creating roles")
-            roles_list: dict[int, discord.Role] = {}
-            await self.load_roles(interaction, problems, logs, symb, data, args, roles_list)
-            # categories
-            logs.append(" - Creating categories")
-            channels_list = {}
-            await self.load_categories(interaction, problems, logs, symb, data, args, channels_list)
-            # channels
-            logs.append(" - Creating channels")
-            await self.load_channels(interaction, problems, logs, symb, data, args, channels_list)
-            # channels permissions
-            logs.append(" - Updating categories and channels permissions")
-            await self.load_perms(interaction, problems, logs, symb, data, args, roles_list, channels_list)
-            # members
-            logs.append(" - Updating members roles and nick")
-            await self.load_members(interaction, problems, logs, symb, data, args, roles_list)
-            # emojis
-            logs.append(" - Creating emojis")
-            await self.load_emojis(interaction, problems, logs, symb, data, args, roles_list)
-            # webhooks
+
+        async def load_bans(self, interaction: discord.Interaction, problems: list, logs: list, symb: list, data: dict,
+                            _args: LoadArguments):
+            "Ban the users banned in the backup map"
+            if "banned_users" not in data:
+                return
+            try:
+                banned_users = {x.user.id async for x in interaction.guild.bans(limit=None)}
+                # JSON keys are always strings
+                users_to_ban = [
+                    (int(user_id), reason)
+                    for user_id, reason in data["banned_users"].items()
+                    if int(user_id) not in banned_users
+                ]
+                if len(users_to_ban) == 0:
+                    logs.append(symb[1]+" No user to ban")
+                    return
+
+                async def ban_user(user_id: int, reason: str | None):
+                    try:
+                        await interaction.guild.ban(discord.Object(user_id), reason=reason, delete_message_days=0)
+                    except discord.errors.NotFound:
+                        pass
+
+                await gather_limited(ban_user(user_id, reason) for user_id, reason in users_to_ban)
+                logs.append(f"{symb[2]} Banned users updated ({len(data['banned_users'])} users)")
+            except discord.errors.Forbidden:
+                logs.append(f"{symb[0]} Unable to ban users: missing permissions")
+                problems[0] += 1
+            except Exception as err:
+                logs.append(f"{symb[0]} Unable to ban users: {err}")
+                problems[1] += 1
+
+        async def load_backup(self, interaction: discord.Interaction, data: dict, args: LoadArguments,
+                              checkpoint: RestoreCheckpoint) -> tuple[list, list]:
+            """Load a backup in a server, for backups version 1
+
+            Independent steps run concurrently, and steps already completed according to the checkpoint are skipped"""
+            if data.pop("_backup_version", None) != 1:
+                return ([0, 1], ["Unknown backup version"])
+            symb = ["`[X]`", "`[-]`", "`[O]`"]
+            problems = [0, 0]
+            # restore the roles and channels matched during a previous attempt
+            roles_list: dict[int, discord.Role] = {
+                backup_id: role
+                for backup_id, role_id in checkpoint.roles_ids.items()
+                if (role := interaction.guild.get_role(role_id)) is not None
+            }
+            channels_list: dict[int, discord.abc.GuildChannel] = {
+                backup_id: channel
+                for backup_id, channel_id in checkpoint.channels_ids.items()
+                if (channel := interaction.guild.get_channel(channel_id)) is not None
+            }
+            # logs of each step, concatenated in the order of the steps at the end
+            steps_logs: dict[str, list[str]] = {}
+            plan = RestorePlan(checkpoint)
+
+            def add_step(name: str, title: str | None, loader, *loader_args, depends_on: tuple[str, ...] = ()):
+                logs = steps_logs[name] = [] if title is None else [title]
+                if name in checkpoint.completed_steps:
+                    logs.append(f"  {symb[1]} Already done during the previous attempt")
+
+                async def run_step():
+                    try:
+                        await loader(interaction, problems, logs, symb, data, args, *loader_args)
+                    finally:
+                        checkpoint.roles_ids.update({backup_id: role.id for backup_id, role in roles_list.items()})
+                        checkpoint.channels_ids.update(
+                            {backup_id: channel.id for backup_id, channel in channels_list.items() if backup_id is not None}
+                        )
+                plan.add_step(name, run_step, depends_on)
+
+            add_step("settings", None, self.load_settings)
+            add_step("bans", None, self.load_bans)
+            add_step("roles", " - Creating roles", self.load_roles, roles_list)
+            add_step("categories", " - Creating categories", self.load_categories, channels_list)
+            add_step("channels", " - Creating channels", self.load_channels, channels_list, depends_on=("categories",))
+            add_step("permissions", " - Updating categories and channels permissions",
+                     self.load_perms, roles_list, channels_list, depends_on=("roles", "channels"))
+            add_step("members", " - Updating members roles and nick",
+                     self.load_members, roles_list, depends_on=("roles",))
+            add_step("emojis", " - Creating emojis", self.load_emojis, roles_list, depends_on=("roles",))
             if "webhooks" in data:
-                logs.append(" - Creating webhooks")
-                await self.load_webhooks(interaction, problems, logs, symb, data, args, channels_list)
+                add_step("webhooks", " - Creating webhooks", self.load_webhooks, channels_list, depends_on=("channels",))
+            await plan.run()
 
+            logs = [line for step_logs in steps_logs.values() for line in step_logs]
             return problems, logs
 
 
@@ -0,0 +1,34 @@
+import gzip
+import hashlib
+import json
+from io import BytesIO, TextIOWrapper
+from typing import Any
+
+GZIP_MAGIC_NUMBER = b"\x1f\x8b"
+
+
+def encode_backup(data: dict[str, Any], compress: bool) -> BytesIO:
+    """Write a backup into a compact JSON file, optionally gzipped
+
+    The JSON is streamed into the file chunk by chunk instead of being built as a single string first"""
+    buffer = BytesIO()
+    binary_file = gzip.GzipFile(fileobj=buffer, mode="wb") if compress else buffer
+    text_file = TextIOWrapper(binary_file, encoding="utf-8")
+    json.dump(data, text_file, sort_keys=True, separators=(',', ':'))
+    text_file.flush()
+    # detach the wrapper so that closing it doesn't close the buffer
+    text_file.detach()
+    if compress:
+        binary_file.close()
+    buffer.seek(0)
+    return buffer
+
+def decode_backup(content: bytes) -> dict[str, Any]:
+    "Read a backup file, compressed or not"
+    if content.startswith(GZIP_MAGIC_NUMBER):
+        content = gzip.decompress(content)
+    return json.loads(content)
+
+def get_backup_digest(content: bytes) -> str:
+    "Get a digest identifying a backup file, to resume its restoration if needed"
+    return hashlib.sha256(content).hexdigest()
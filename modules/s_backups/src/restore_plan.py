@@ -0,0 +1,66 @@
+import asyncio
+from dataclasses import dataclass, field
+from typing import Awaitable, Callable, Iterable, TypeVar
+
+T = TypeVar("T")
+
+# maximum number of API requests sent at the same time by a restoration step
+# discord.py then queues them according to the rate limits of each route
+MAX_CONCURRENT_REQUESTS = 5
+
+
+async def gather_limited(coroutines: Iterable[Awaitable[T]], limit: int = MAX_CONCURRENT_REQUESTS) -> list[T]:
+    "Run some coroutines concurrently, with at most `limit` of them at the same time, and return their results in order"
+    semaphore = asyncio.Semaphore(limit)
+    async def run(coroutine: Awaitable[T]) -> T:
+        async with semaphore:
+            return await coroutine
+    return await asyncio.gather(*(run(coroutine) for coroutine in coroutines))
+
+
+@dataclass
+class RestoreCheckpoint:
+    "Progress of a backup restoration, used to resume it if it was interrupted"
+    backup_digest: str
+    completed_steps: set[str] = field(default_factory=set)
+    # ID in the backup -> ID of the matching role or channel in the guild
+    roles_ids: dict[int, int] = field(default_factory=dict)
+    channels_ids: dict[int, int] = field(default_factory=dict)
+
+
+class RestorePlan:
+    """Dependency graph of the steps of a backup restoration
+
+    Each step starts as soon as the steps it depends on are done, so independent steps run concurrently.
+    Steps already completed according to the checkpoint are skipped."""
+
+    def __init__(self, checkpoint: RestoreCheckpoint):
+        self.checkpoint = checkpoint
+        self._steps: dict[str, tuple[Callable[[], Awaitable[None]], tuple[str, ...]]] = {}
+
+    def add_step(self, name: str, func: Callable[[], Awaitable[None]], depends_on: tuple[str, ...] = ()):
+        "Register a step, after the steps it depends on"
+        if unknown_steps := [step for step in depends_on if step not in self._steps]:
+            raise ValueError(f"Unknown dependencies for step {name}: {unknown_steps}")
+        self._steps[name] = (func, depends_on)
+
+    async def run(self):
+        "Run every step, and stop everything as soon as one of them fails"
+        tasks: dict[str, asyncio.Task] = {}
+
+        async def run_step(name: str):
+            func, depends_on = self._steps[name]
+            await asyncio.gather(*(tasks[step] for step in depends_on))
+            if name in self.checkpoint.completed_steps:
+                return
+            await func()
+            self.checkpoint.completed_steps.add(name)
+
+        for name in self._steps:
+            tasks[name] = asyncio.create_task(run_step(name))
+        try:
+            await asyncio.gather(*tasks.values())
+        except BaseException:
+            for task in tasks.values():
+                task.cancel()
+            raise
@@ -8,6 +8,7 @@ from discord import app_commands
 from discord.ext import commands, tasks
 
 from core.bot_classes import Axobot
+from core.guild_values_counter import GuildValuesCounter
 from core.tips import UserTip
 from core.views import ConfirmView
 
@@ -26,6 +27,12 @@ class ServerConfig(commands.Cog):
         self.cache = TTLCache[tuple[int, str], Any](maxsize=10_000, ttl=60) # 1min cache
         self.enable_caching = True
         self.membercounter_pending: dict[int, int] = {}
+        # IDs of guilds with a membercounter channel, loaded from the database on first use
+        self.membercounter_guilds: set[int] | None = None
+        # IDs of guilds whose membercounter channel may need to be updated
+        self.membercounter_dirty: set[int] = set()
+        # usage of each enum and boolean option value, loaded from the database on first use
+        self.options_usage: dict[str, GuildValuesCounter[str]] | None = None
         self.embed_color = 0x3fb9ef
         self.log_color = 0x1b5fb1
         self.max_members_for_nicknames = 3_000
@@ -72,6 +79,29 @@ class ServerConfig(commands.Cog):
             self.cache[(guild_id, option_name)] = value
         return value
 
+    async def get_options(self, guild: discord.Guild, option_names: tuple[str, ...]) -> dict[str, Any]:
+        """Return the formated values of several server config options
+        Options missing from the cache are loaded with a single database query"""
+        result: dict[str, Any] = {}
+        missing: list[str] = []
+        for option_name in option_names:
+            if self.enable_caching and (guild.id, option_name) in self.cache:
+                result[option_name] = self.cache[(guild.id, option_name)]
+            else:
+                missing.append(option_name)
+        if not missing:
+            return result
+        options_list = await self.get_options_list()
+        raw_config = await self.db_get_guild(guild.id) or {}
+        for option_name in missing:
+            if (raw_value := raw_config.get(option_name)) is None:
+                raw_value = await to_raw(option_name, options_list[option_name]["default"], self.bot)
+            value = await from_raw(option_name, raw_value, guild, self.bot)
+            if self.enable_caching:
+                self.cache[(guild.id, option_name)] = value
+            result[option_name] = value
+        return result
+
     async def set_option(self, guild_id: int, option_name: str, value: Any):
         "Set the value of a server config option"
         if not isinstance(guild_id, int):
@@ -80,9 +110,14 @@ class ServerConfig(commands.Cog):
             raise ValueError(f"Option {option_name} does not exist")
         if not self.bot.database_online:
             return False
-        if await self.db_set_value(guild_id, option_name, await to_raw(option_name, value, self.bot)):
+        raw_value = await to_raw(option_name, value, self.bot)
+        if await self.db_set_value(guild_id, option_name, raw_value):
             if self.enable_caching:
                 self.cache[(guild_id, option_name)] = value
+            if option_name == "membercounter":
+                self._set_membercounter_enabled(guild_id, value is not None)
+            self._update_options_usage(guild_id, option_name, raw_value)
+            self.bot.dispatch("server_config_change", guild_id, option_name)
             return True
         return False
 
@@ -97,6 +132,10 @@ class ServerConfig(commands.Cog):
         if await self.db_delete_option(guild_id, option_name):
             if self.enable_caching and (guild_id, option_name) in self.cache:
                 self.cache.pop((guild_id, option_name))
+            if option_name == "membercounter":
+                self._set_membercounter_enabled(guild_id, False)
+            self._update_options_usage(guild_id, option_name, None)
+            self.bot.dispatch("server_config_change", guild_id, option_name)
             return True
         return False
 
@@ -108,6 +147,11 @@ class ServerConfig(commands.Cog):
         for option_name in (await self.get_options_list()):
             if self.enable_caching and (guild_id, option_name) in self.cache:
                 self.cache.pop((guild_id, option_name))
+        self._set_membercounter_enabled(guild_id, False)
+        if self.options_usage is not None:
+            for counter in self.options_usage.values():
+                counter.clear_guild(guild_id)
+        self.bot.dispatch("server_config_change", guild_id, None)
         return True
 
     async def get_guild_config(self, guild_id: int, with_defaults: bool) -> dict[str, Any]:
@@ -130,23 +174,61 @@ class ServerConfig(commands.Cog):
         return config
 
     async def get_enum_usage_stats(self, option_id: str, ignored_guilds: list[int]):
-        "Return stats on used languages"
+        "Return stats on the values used for an enum option"
         if not self.bot.database_online or "Languages" not in self.bot.cogs:
             return {}
-        query = "SELECT `guild_id`, `value` FROM `serverconfig` WHERE `option_name` = 'language' AND `beta` = %s"
-        values_list: list[str] = []
-        guilds = {x.id for x in self.bot.guilds if x.id not in ignored_guilds}
-        async with self.bot.db_main.read(query, (self.bot.beta,)) as query_results:
-            for row in query_results:
-                if row["guild_id"] in guilds:
-                    values_list.append(row["value"])
+        counter = (await self.get_options_usage())[option_id]
         options_list = await self.get_options_list()
-        for _ in range(len(guilds) - len(values_list)):
-            values_list.append(options_list[option_id]["default"])
-        langs: dict[str, int] = {}
-        for lang in options_list[option_id]["values"]:
-            langs[lang] = values_list.count(lang)
-        return langs
+        values_count = counter.get_histogram(ignored_guilds)
+        values_count[options_list[option_id]["default"]] += counter.get_guilds_without_value_count(ignored_guilds)
+        return {
+            value: values_count[value]
+            for value in options_list[option_id]["values"]
+        }
+
+    async def get_option_value_usage(self, option_name: str, raw_value: str, ignored_guilds: list[int] | None = None) -> int:
+        "Return the number of guilds where an enum or boolean option is explicitly set to a given value"
+        if not self.bot.database_online:
+            return 0
+        counter = (await self.get_options_usage())[option_name]
+        return counter.get_histogram(ignored_guilds or ())[raw_value]
+
+    # ---- OPTIONS USAGE COUNTERS ----
+
+    async def get_options_usage(self) -> dict[str, GuildValuesCounter[str]]:
+        "Get the usage counters of every enum and boolean option"
+        if self.options_usage is None:
+            options_list = await self.get_options_list()
+            options_usage = {
+                option_name: GuildValuesCounter[str]()
+                for option_name, option in options_list.items()
+                if option["type"] in ("enum", "boolean")
+            }
+            rows_per_option: dict[str, list[tuple[int, str]]] = {option_name: [] for option_name in options_usage}
+            for row in await self.db_get_options_values(list(options_usage)):
+                rows_per_option[row["option_name"]].append((row["guild_id"], row["value"]))
+            guild_ids = [guild.id for guild in self.bot.guilds]
+            for option_name, counter in options_usage.items():
+                counter.load(rows_per_option[option_name], guild_ids)
+            self.options_usage = options_usage
+        return self.options_usage
+
+    def _update_options_usage(self, guild_id: int, option_name: str, raw_value: str | None):
+        "Keep the options usage counters in sync with the config"
+        if self.options_usage is not None and (counter := self.options_usage.get(option_name)):
+            counter.set(guild_id, raw_value)
+
+    @commands.Cog.listener()
+    async def on_guild_join(self, guild: discord.Guild):
+        if self.options_usage is not None:
+            for counter in self.options_usage.values():
+                counter.add_guild(guild.id)
+
+    @commands.Cog.listener()
+    async def on_guild_remove(self, guild: discord.Guild):
+        if self.options_usage is not None:
+            for counter in self.options_usage.values():
+                counter.remove_guild(guild.id)
 
     async def check_member_config_permission(self, member: discord.Member, option_name: str):
         "Check if a user has the required roles from a specific config"
@@ -165,18 +247,57 @@ class ServerConfig(commands.Cog):
 
     # ---- MEMBERCOUNTER CHANNELS ----
 
+    async def get_membercounter_guilds(self) -> set[int]:
+        "Get the IDs of every guild with a membercounter channel"
+        if self.membercounter_guilds is None:
+            self.membercounter_guilds = set(await self.db_get_guilds_with_membercounter())
+            # member counts may have changed since the last time we checked
+            self.membercounter_dirty.update(self.membercounter_guilds)
+        return self.membercounter_guilds
+
+    def _set_membercounter_enabled(self, guild_id: int, enabled: bool):
+        "Keep the cached list of guilds with a membercounter in sync with the config"
+        if enabled:
+            if self.membercounter_guilds is not None:
+                self.membercounter_guilds.add(guild_id)
+            self.membercounter_dirty.add(guild_id)
+        else:
+            if self.membercounter_guilds is not None:
+                self.membercounter_guilds.discard(guild_id)
+            self.membercounter_dirty.discard(guild_id)
+
+    def _mark_membercounter_dirty(self, guild_id: int):
+        "Plan a membercounter update for a guild, if it has a membercounter channel"
+        if self.membercounter_guilds is None or guild_id in self.membercounter_guilds:
+            self.membercounter_dirty.add(guild_id)
+
+    @commands.Cog.listener()
+    async def on_member_join(self, member: discord.Member):
+        "Plan a membercounter update when a member joins"
+        self._mark_membercounter_dirty(member.guild.id)
+
+    @commands.Cog.listener()
+    async def on_raw_member_remove(self, payload: discord.RawMemberRemoveEvent):
+        "Plan a membercounter update when a member leaves"
+        self._mark_membercounter_dirty(payload.guild_id)
+
     @tasks.loop(minutes=1)
     async def update_every_membercounter(self):
         "Update all pending membercounter channels"
         if not self.bot.database_online:
             return
+        membercounter_guilds = await self.get_membercounter_guilds()
         i = 0
         now = time.time()
-        for guild_id in await self.db_get_guilds_with_membercounter():
-            if (guild := self.bot.get_guild(guild_id)) is None:
+        for guild_id in list(self.membercounter_dirty):
+            if guild_id not in membercounter_guilds or (guild := self.bot.get_guild(guild_id)) is None:
+                self.membercounter_dirty.discard(guild_id)
                 continue
-            if guild_id in self.membercounter_pending and self.membercounter_pending[guild_id] < now:
-                del self.membercounter_pending[guild.id]
+            if self.membercounter_pending.get(guild_id, 0) > now:
+                # still in cooldown: keep it for a next iteration
+                continue
+            self.membercounter_pending.pop(guild_id, None)
+            self.membercounter_dirty.discard(guild_id)
             if await self.update_memberchannel(guild):
                 i += 1
         if i > 0:
@@ -272,6 +393,16 @@ class ServerConfig(commands.Cog):
         async with self.bot.db_main.write(query, (guild_id, self.bot.beta), returnrowcount=True) as query_results:
             return query_results > 0
 
+    async def db_get_options_values(self, option_names: list[str]) -> list[dict[str, Any]]:
+        "Get every value of some options, in any guild"
+        if not self.bot.database_online or not option_names:
+            return []
+        args_placeholder = ", ".join(["%s"] * len(option_names))
+        query = f"SELECT `guild_id`, `option_name`, `value` FROM `serverconfig` WHERE `option_name` IN ({args_placeholder}) \
+AND `beta` = %s"
+        async with self.bot.db_main.read(query, (*option_names, self.bot.beta)) as query_results:
+            return query_results
+
     async def db_get_guilds_with_membercounter(self) -> list[int]:
         "Get a list of guilds with a membercounter"
         if not self.bot.database_online:
@@ -9,9 +9,10 @@ from cachetools import TTLCache
 from discord import app_commands
 from discord.ext import commands, tasks
 
-from core.bot_classes import DISCORD_INVITE_REGEX, Axobot
+from core.bot_classes import Axobot, MessageFacts
 from core.enums import ServerWarningType
 from core.formatutils import FormatUtils
+from core.guild_values_counter import GuildValuesCounter
 from core.tips import GuildTip
 from modules.antiscam.model.classes import PredictionResult
 from modules.tickets.src.types import TicketCreationEvent
@@ -33,6 +34,8 @@ class ServerLogs(commands.Cog):
         self.to_send: dict[int, list[discord.Embed]] = {}
         self.auditlogs_timeout = 3 # seconds
         self.voice_join_timestamps: dict[tuple[int, int], float] = {}
+        # number of logs channels per enabled log kind, loaded from the database on first use
+        self.enabled_logs = GuildValuesCounter[str]()
 
     async def cog_load(self):
         self.send_logs_task.start() # pylint: disable=no-member
@@ -61,6 +64,25 @@ class ServerLogs(commands.Cog):
                 self.to_send[channel_id] = [embed]
             self.bot.dispatch("serverlog", guild_id.id, channel_id, log_type)
 
+    async def get_enabled_logs_count(self) -> dict[str, int]:
+        "Get the number of channels where each log kind is enabled, in the guilds where the bot is"
+        if not self.enabled_logs.is_loaded:
+            query = "SELECT guild, kind FROM serverlogs WHERE beta = %s"
+            async with self.bot.db_main.read(query, (self.bot.beta,)) as query_results:
+                self.enabled_logs.load(
+                    ((row["guild"], row["kind"]) for row in query_results),
+                    (guild.id for guild in self.bot.guilds)
+                )
+        return self.enabled_logs.get_histogram()
+
+    @commands.Cog.listener()
+    async def on_guild_join(self, guild: discord.Guild):
+        self.enabled_logs.add_guild(guild.id)
+
+    @commands.Cog.listener()
+    async def on_guild_remove(self, guild: discord.Guild):
+        self.enabled_logs.remove_guild(guild.id)
+
     async def db_get_from_channel(self, guild_id: int, channel_id: int, use_cache: bool=True) -> list[str]:
         "Get enabled logs for a channel"
         if use_cache and (cached := self.cache.get(guild_id)) and channel_id in cached:
@@ -87,6 +109,8 @@ class ServerLogs(commands.Cog):
         query = "INSERT INTO serverlogs (guild, channel, kind, beta) VALUES (%(g)s, %(c)s, %(k)s, %(b)s) "\
             "ON DUPLICATE KEY UPDATE guild=%(g)s"
         async with self.bot.db_main.write(query, {'g': guild_id, 'c': channel_id, 'k': kind, 'b': self.bot.beta}) as query_result:
+            if query_result > 0:
+                self.enabled_logs.add(guild_id, kind)
             if query_result > 0 and guild_id in self.cache:
                 if channel_id in self.cache[guild_id]:
                     self.cache[guild_id][channel_id].append(kind)
@@ -100,6 +124,8 @@ class ServerLogs(commands.Cog):
         async with self.bot.db_main.write(
             query, (guild_id, channel_id, kind, self.bot.beta), returnrowcount=True
         ) as query_result:
+            if query_result > 0:
+                self.enabled_logs.discard(guild_id, kind)
             if query_result > 0 and guild_id in self.cache:
                 if channel_id in self.cache[guild_id]:
                     self.cache[guild_id][channel_id] = [x for x in self.cache[guild_id][channel_id] if x != kind]
@@ -508,12 +534,12 @@ class ServerLogs(commands.Cog):
             await self.validate_logs(guild, channel_ids, emb, "message_delete")
 
     @commands.Cog.listener()
-    async def on_message(self, message: discord.Message):
+    async def on_message_facts(self, message: discord.Message, facts: MessageFacts):
         """Triggered when a message is sent by someone
         Corresponding log: discord_invite"""
         if message.guild is None or message.author == self.bot.user:
             return
-        if (invites := DISCORD_INVITE_REGEX.findall(message.content)) and (
+        if (invites := facts.invites) and (
                 channel_ids := await self.is_log_enabled(message.guild.id, "discord_invite")):
             emb = discord.Embed(
                 description=f"**[Discord invite]({message.jump_url}) detected in {message.channel.mention}**",
@@ -105,7 +105,8 @@ class TwitchApiAgent:
         if not self.is_token_valid:
             raise HttpTokenNotSet()
         url = "https://api.twitch.tv/helix/streams"
-        params = {"user_id": user_ids}
+        # the API only returns 20 streams by default, even if more users are requested
+        params = {"user_id": user_ids, "first": 100}
         async with self.session.get(url, headers=await self._get_headers(), params=params) as resp:
             if resp.status == 401: # if token has been revoked, get a new one but don't retry (to avoid infinite loop)
                 self._token = None
@@ -0,0 +1,96 @@
+import asyncio
+import logging
+from typing import Awaitable, Callable, Iterable, NamedTuple
+
+from ..api.types import StreamObject
+
+StreamsFetcher = Callable[..., Awaitable[list[StreamObject]]]
+
+
+class PollResult(NamedTuple):
+    "Transitions detected during one polling cycle"
+    started: list[StreamObject]
+    ended: list[str]
+    errors: list[Exception]
+
+    @property
+    def changed_statuses(self) -> dict[str, bool]:
+        "New streaming status of every streamer whose status changed"
+        return {
+            stream["user_id"]: True for stream in self.started
+        } | {
+            user_id: False for user_id in self.ended
+        }
+
+
+class StreamsPoller:
+    """Check the live status of many streamers at once, and detect when they start or stop streaming
+
+    Streamers IDs are grouped by the maximum amount accepted by the API, and the requests are sent concurrently within
+    the given limits. The streaming state of each streamer is kept in memory between two cycles."""
+
+    MAX_IDS_PER_REQUEST = 100
+
+    def __init__(self, fetch_streams: StreamsFetcher, max_concurrent_requests: int = 4, max_requests_per_cycle: int = 400):
+        self.fetch_streams = fetch_streams
+        self.max_concurrent_requests = max_concurrent_requests
+        self.max_requests_per_cycle = max_requests_per_cycle
+        self.log = logging.getLogger("bot.twitch")
+        # last known streaming status of each streamer
+        self.states: dict[str, bool] = {}
+
+    def load_states(self, states: dict[str, bool]):
+        "Register the streaming status of streamers we don't know yet (usually from the database)"
+        for user_id, is_streaming in states.items():
+            self.states.setdefault(user_id, bool(is_streaming))
+
+    def forget_missing(self, user_ids: Iterable[str]):
+        "Remove from memory the streamers not in the given list (ie. with no more subscription)"
+        user_ids = set(user_ids)
+        for user_id in list(self.states):
+            if user_id not in user_ids:
+                del self.states[user_id]
+
+    async def poll(self, user_ids: Iterable[str]) -> PollResult:
+        """Fetch the current streams of the given streamers, and return the detected transitions
+        Streamers in a failed request keep their previous status"""
+        user_ids = list(dict.fromkeys(user_ids))
+        chunks = [
+            user_ids[i:i + self.MAX_IDS_PER_REQUEST]
+            for i in range(0, len(user_ids), self.MAX_IDS_PER_REQUEST)
+        ]
+        if len(chunks) > self.max_requests_per_cycle:
+            self.log.warning(
+                "Too many streamers to check in one cycle (%s requests needed), only the first %s requests will be sent",
+                len(chunks), self.max_requests_per_cycle
+            )
+            chunks = chunks[:self.max_requests_per_cycle]
+        semaphore = asyncio.Semaphore(self.max_concurrent_requests)
+
+        async def fetch_chunk(chunk: list[str]):
+            async with semaphore:
+                return await self.fetch_streams(*chunk)
+
+        results = await asyncio.gather(*(fetch_chunk(chunk) for chunk in chunks), return_exceptions=True)
+        started: list[StreamObject] = []
+        ended: list[str] = []
+        errors: list[Exception] = []
+        for chunk, result in zip(chunks, results):
+            if isinstance(result, BaseException):
+                if not isinstance(result, Exception):
+                    raise result
+                self.log.warning("Unable to fetch the streams of %s streamers: %s", len(chunk), result)
+                errors.append(result)
+                continue
+            streams_by_id = {stream["user_id"]: stream for stream in result}
+            for user_id in chunk:
+                was_streaming = self.states.get(user_id, False)
+                if stream := streams_by_id.get(user_id):
+                    if not was_streaming:
+                        started.append(stream)
+                    self.states[user_id] = True
+                else:
+                    if was_streaming:
+                        ended.append(user_id)
+                    self.states[user_id] = False
+        return PollResult(started, ended, errors)
@@ -1,10 +1,8 @@
 import json
 import logging
 import re
-from typing import TypedDict
 
 import discord
-from aiohttp import ClientResponseError
 from dateutil.parser import isoparse
 from discord import app_commands
 from discord.ext import commands, tasks
@@ -15,15 +13,9 @@ from core.bot_classes import Axobot
 from .api.api_agent import TwitchApiAgent
 from .api.types import (GroupedStreamerDBObject, PlatformId, StreamersDBObject,
                         StreamObject)
+from .src.streams_poller import StreamsPoller
 
 
-class _StreamersReadyForNotification(TypedDict):
-    platform: PlatformId
-    user_id: str
-    user_name: str
-    is_streaming: bool
-    guilds: list[discord.Guild]
-
 class Twitch(commands.Cog):
     "Handle twitch streams"
 
@@ -33,6 +25,7 @@ class Twitch(commands.Cog):
         self.log = logging.getLogger("bot.twitch")
         self.agent = TwitchApiAgent()
         self.twitch_color = 0x6441A4
+        self.streams_poller = StreamsPoller(self.agent.get_user_stream_by_id)
 
     async def cog_load(self):
         await self.agent.api_login(
@@ -100,6 +93,23 @@ class Twitch(commands.Cog):
         ) as query_result:
             return query_result > 0
 
+    async def db_set_streamers_status(self, platform: PlatformId, statuses: dict[str, bool]):
+        "Set the streaming status of multiple streamers at once"
+        if not statuses:
+            return 0
+        started_ids = [user_id for user_id, is_streaming in statuses.items() if is_streaming]
+        all_ids = list(statuses.keys())
+        if started_ids:
+            status_expr = f"`user_id` IN ({', '.join(['%s'] * len(started_ids))})"
+        else:
+            status_expr = "FALSE"
+        query = f"UPDATE `streamers` SET `is_streaming` = {status_expr} "\
+            f"WHERE `platform` = %s AND `beta` = %s AND `user_id` IN ({', '.join(['%s'] * len(all_ids))})"
+        async with self.bot.db_main.write(
+            query, (*started_ids, platform, self.bot.beta, *all_ids), returnrowcount=True
+        ) as query_result:
+            return query_result
+
     async def db_get_streamer_status(self, platform: PlatformId, user_id: str) -> bool | None:
         "Get the streaming status of a streamer"
         query = "SELECT `is_streaming` FROM `streamers` WHERE `platform` = %s AND `user_id` = %s AND `beta` = %s LIMIT 1"
@@ -343,8 +353,8 @@ class Twitch(commands.Cog):
         if not self.bot.database_online:
             self.log.warning("Database is offline, skipping stream check")
             return
-        count = 0
-        streamer_ids: dict[str, _StreamersReadyForNotification] = {}
+        streamers: dict[str, GroupedStreamerDBObject] = {}
+        streamers_guilds: dict[str, list[discord.Guild]] = {}
         for streamer in await self.db_get_guilds_per_streamers("twitch"):
             # fetch guilds that need to be notified
             guilds = [self.bot.get_guild(guild_id) for guild_id in streamer["guild_ids"]]
@@ -356,47 +366,35 @@ class Twitch(commands.Cog):
             ]
             if not guilds: # if not guild has been found, skip
                 continue
-            streamer_ids[streamer["user_id"]] = streamer | {"guilds": guilds}
-            count += 1
-            # make one request every 30 streamers
-            if len(streamer_ids) > 30:
-                await self._update_streams(streamer_ids)
-                streamer_ids = {}
-        if streamer_ids:
-            await self._update_streams(streamer_ids)
-        self.log.debug("%s streamers checked", count)
+            streamers[streamer["user_id"]] = streamer
+            streamers_guilds[streamer["user_id"]] = guilds
+        self.streams_poller.forget_missing(streamers.keys())
+        self.streams_poller.load_states({
+            user_id: streamer["is_streaming"]
+            for user_id, streamer in streamers.items()
+        })
+        await self._update_streams(streamers, streamers_guilds)
+        self.log.debug("%s streamers checked", len(streamers))
 
     @stream_check_task.error
     async def on_stream_check_error(self, error: Exception):
         self.bot.dispatch("error", error, "<@279568324260528128> Twitch streams loop has crashed")
 
-    async def _update_streams(self, streamer_ids: dict[str, _StreamersReadyForNotification]):
-        streaming_user_ids: set[str] = set()
-        try:
-            streams = await self.agent.get_user_stream_by_id(*streamer_ids.keys())
-        except ClientResponseError as err:
-            self.bot.dispatch("error", err, "When updating Twitch streams")
-            return
-        # Check current streams
-        for stream in streams:
-            streamer_data = streamer_ids[stream["user_id"]]
-            # mark that this streamer is streaming
-            streaming_user_ids.add(stream["user_id"])
-            # if it was already notified, skip
-            if streamer_data["is_streaming"]:
-                continue
-            # dispatch event
-            for guild in streamer_data["guilds"]:
+    async def _update_streams(self, streamers: dict[str, GroupedStreamerDBObject],
+                              streamers_guilds: dict[str, list[discord.Guild]]):
+        result = await self.streams_poller.poll(streamers.keys())
+        if result.errors:
+            self.bot.dispatch("error", result.errors[0], "When updating Twitch streams")
+        # dispatch events for new streams
+        for stream in result.started:
+            for guild in streamers_guilds[stream["user_id"]]:
                 self.bot.dispatch("stream_starts", stream, guild)
-            # mark streamers as streaming
-            await self.db_set_streamer_status("twitch", stream["user_id"], True)
-        # Check streamers that went offline
-        for streamer_id, streamer_data in streamer_ids.items():
-            if streamer_id not in streaming_user_ids and streamer_data["is_streaming"]:
-                for guild in streamer_data["guilds"]:
-                    self.bot.dispatch("stream_ends", streamer_data["user_name"], guild)
-                # mark streamers as offline
-                await self.db_set_streamer_status("twitch", streamer_id, False)
+        # dispatch events for streamers who went offline
+        for streamer_id in result.ended:
+            for guild in streamers_guilds[streamer_id]:
+                self.bot.dispatch("stream_ends", streamers[streamer_id]["user_name"], guild)
+        # save the new statuses
+        await self.db_set_streamers_status("twitch", result.changed_statuses)
 
 
 async def setup(bot: Axobot):
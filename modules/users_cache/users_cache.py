@@ -4,7 +4,7 @@ from collections import defaultdict
 import discord
 from discord.ext import commands, tasks
 
-from core.bot_classes import Axobot
+from core.bot_classes import Axobot, MessageFacts
 
 
 class UsersCache(commands.Cog):
@@ -47,7 +47,7 @@ VALUES (%s, %s, %s, %s, %s, CURRENT_TIMESTAMP()) ON DUPLICATE KEY UPDATE `userna
             pass
 
     @commands.Cog.listener()
-    async def on_message(self, message: discord.Message):
+    async def on_message_facts(self, message: discord.Message, _facts: MessageFacts):
         "Use messages event to update user data"
         if message.webhook_id:
             return
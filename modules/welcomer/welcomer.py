@@ -28,7 +28,6 @@ class Welcomer(commands.Cog):
         """Main function called when a member joins a server"""
         if not self.bot.database_online:
             return
-        await self.bot.get_cog("ServerConfig").update_memberchannel(member.guild)
         if "MEMBER_VERIFICATION_GATE_ENABLED" not in member.guild.features:
             await self.send_msg(member, "welcome")
             self.bot.loop.create_task(self.give_roles(member))
@@ -55,7 +54,6 @@ class Welcomer(commands.Cog):
         """Fonction principale appelée lorsqu'un membre quitte un serveur"""
         if not self.bot.database_online:
             return
-        await self.bot.get_cog("ServerConfig").update_memberchannel(member.guild)
         if "MEMBER_VERIFICATION_GATE_ENABLED" not in member.guild.features or not member.pending:
             await self.send_msg(member, "leave")
         await self.bot.get_cog("Events").check_user_left(member)
@@ -0,0 +1,50 @@
+from dataclasses import dataclass
+from typing import Any, Iterable
+
+# number of guild tables decayed in a same transaction, to bound the time their rows stay locked
+DECAY_CHUNK_SIZE = 50
+
+
+@dataclass(slots=True)
+class XpDecayReport:
+    "Summary of an XP decay run"
+    guilds_count: int = 0
+    users_count: int = 0
+    removed_users_count: int = 0
+    statements_count: int = 0
+    duration: float = 0.0
+
+
+def group_guilds_by_decay(config_rows: Iterable[dict[str, Any]], default_xp_type: str,
+                          present_guilds: set[int]) -> dict[int, list[int]]:
+    """Group the guilds with a local xp system by their decay value, from their `xp_decay` and `xp_type` config rows
+    Guilds where the bot isn't anymore are ignored"""
+    decays: dict[int, int] = {}
+    xp_types: dict[int, str] = {}
+    for row in config_rows:
+        if row["option_name"] == "xp_decay":
+            try:
+                decays[row["guild_id"]] = int(row["value"])
+            except ValueError:
+                continue
+        elif row["option_name"] == "xp_type":
+            xp_types[row["guild_id"]] = row["value"]
+    groups: dict[int, list[int]] = {}
+    for guild_id, value in decays.items():
+        if value <= 0 or guild_id not in present_guilds:
+            continue
+        # the global xp system doesn't decay
+        if xp_types.get(guild_id, default_xp_type) == "global":
+            continue
+        groups.setdefault(value, []).append(guild_id)
+    return groups
+
+def apply_decay_to_cache(guild_cache: dict[int, list[int]], value: int):
+    "Remove some xp from every cached member of a guild, and forget the members without any xp left"
+    removed_users: list[int] = []
+    for user_id, entry in guild_cache.items():
+        entry[1] -= value
+        if entry[1] <= 0:
+            removed_users.append(user_id)
+    for user_id in removed_users:
+        del guild_cache[user_id]
@@ -0,0 +1,72 @@
+from dataclasses import dataclass
+from typing import Any, Literal, Mapping
+
+import discord
+
+XpType = Literal["global", "mee6-like", "local"]
+
+# server config options used to build the XP settings of a guild
+XP_OPTIONS = ("xp_type", "enable_xp", "xp_rate", "noxp_channels", "noxp_roles")
+
+
+@dataclass(frozen=True, slots=True)
+class XpSettings:
+    "XP-related config of a guild, precompiled for the message handler"
+    enabled: bool
+    xp_type: XpType
+    rate: float
+    noxp_channel_ids: frozenset[int]
+    noxp_role_ids: frozenset[int]
+
+    @classmethod
+    def from_config(cls, config: Mapping[str, Any]):
+        "Build the settings from the values of the server config options"
+        return cls(
+            enabled=bool(config["enable_xp"]),
+            xp_type=config["xp_type"],
+            rate=config["xp_rate"],
+            noxp_channel_ids=frozenset(channel.id for channel in config["noxp_channels"] or ()),
+            noxp_role_ids=frozenset(role.id for role in config["noxp_roles"] or ()),
+        )
+
+    def is_blocked(self, message: discord.Message) -> bool:
+        "Check if the author of a message cannot get xp in this channel"
+        if message.channel.id in self.noxp_channel_ids:
+            return True
+        return any(message.author.get_role(role_id) is not None for role_id in self.noxp_role_ids)
+
+
+class CooldownTable:
+    """Time of the last XP reward of each user in a scope (a guild or the global leaderboard)
+
+    Timestamps come from time.monotonic(), and expired entries are removed when the table grows too much"""
+
+    __slots__ = ("last_rewards", "_purge_threshold")
+
+    def __init__(self):
+        self.last_rewards: dict[int, float] = {}
+        self._purge_threshold = 1024
+
+    def is_on_cooldown(self, user_id: int, cooldown: float, now: float) -> bool:
+        "Check if a user has been rewarded less than `cooldown` seconds ago"
+        last_reward = self.last_rewards.get(user_id)
+        return last_reward is not None and now - last_reward < cooldown
+
+    def mark(self, user_id: int, now: float, max_cooldown: float):
+        "Save the time of a new reward"
+        self.last_rewards[user_id] = now
+        if len(self.last_rewards) >= self._purge_threshold:
+            self.purge(now, max_cooldown)
+            self._purge_threshold = max(1024, len(self.last_rewards) * 2)
+
+    def purge(self, now: float, max_cooldown: float):
+        "Remove the users whose cooldown is over"
+        self.last_rewards = {
+            user_id: last_reward
+            for user_id, last_reward in self.last_rewards.items()
+            if now - last_reward < max_cooldown
+        }
+
+    def reset(self, user_id: int):
+        "Remove the cooldown of a user"
+        self.last_rewards.pop(user_id, None)
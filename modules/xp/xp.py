@@ -12,18 +12,22 @@ from typing import Any, Literal
 
 import aiohttp
 import discord
+from cachetools import TTLCache
 from discord import app_commands
 from discord.ext import commands, tasks
 from mysql.connector.errors import ProgrammingError as MySQLProgrammingError
 from PIL import Image, ImageFont
 
-from core.bot_classes import Axobot
+from core.bot_classes import Axobot, MessageFacts
 from core.tips import UserTip
 
 from .cards import CardGeneration
 from .src.top_paginator import LeaderboardScope, TopPaginator
 from .src.xp_math import (get_level_from_xp_global, get_level_from_xp_mee6,
                           get_xp_from_level_global, get_xp_from_level_mee6)
+from .src.xp_decay import (DECAY_CHUNK_SIZE, XpDecayReport,
+                           apply_decay_to_cache, group_guilds_by_decay)
+from .src.xp_settings import XP_OPTIONS, CooldownTable, XpSettings
 
 
 class Xp(commands.Cog):
@@ -35,6 +39,10 @@ class Xp(commands.Cog):
         self.log = logging.getLogger("bot.xp")
 
         self.cache: dict[int | Literal["global"], dict[int, tuple[int, int]]] = {"global": {}}
+        # time of the last xp reward of each user, per scope
+        self.cooldowns: dict[int | Literal["global"], CooldownTable] = defaultdict(CooldownTable)
+        # precompiled xp config of each guild
+        self.guild_settings = TTLCache[int, XpSettings](maxsize=50_000, ttl=3600)
         self.levels = [0]
         self.embed_color = discord.Colour(0xffcf50)
         self.table = "xp_beta" if bot.beta else "xp"
@@ -89,15 +97,44 @@ class Xp(commands.Cog):
             return msg.author.dm_channel or await msg.author.create_dm()
         return value
 
-    @commands.Cog.listener(name="on_message")
-    async def add_xp(self, msg: discord.Message):
+    @commands.Cog.listener()
+    async def on_server_config_change(self, guild_id: int, option_name: str | None):
+        "Drop the precompiled xp settings of a guild when one of its xp options is edited"
+        if option_name is None or option_name in XP_OPTIONS:
+            self.guild_settings.pop(guild_id, None)
+
+    def get_guild_settings(self, facts: MessageFacts) -> XpSettings:
+        "Get the precompiled xp settings of the guild of an analyzed message"
+        guild_id = facts.guild.id
+        if (settings := self.guild_settings.get(guild_id)) is None:
+            settings = self.guild_settings[guild_id] = XpSettings.from_config(facts.config)
+        return settings
+
+    def _get_cooldown_scope(self, guild_id: int, xp_type: str) -> tuple[int | Literal["global"], int]:
+        "Get the cooldown table key and the cooldown duration for a guild"
+        if xp_type == "global":
+            return "global", self.classic_xp_cooldown
+        if xp_type == "mee6-like":
+            return guild_id, self.mee6_xp_cooldown
+        return guild_id, self.classic_xp_cooldown
+
+    def _mark_rewarded(self, user_id: int, guild_id: int, xp_type: str):
+        "Start the xp cooldown of a user after they got a reward"
+        scope, _ = self._get_cooldown_scope(guild_id, xp_type)
+        self.cooldowns[scope].mark(user_id, time.monotonic(), self.mee6_xp_cooldown)
+
+    @commands.Cog.listener(name="on_message_facts")
+    async def add_xp(self, msg: discord.Message, facts: MessageFacts):
         """Attribue un certain nombre d'xp à un message"""
         if msg.author.bot or msg.is_system() or msg.guild is None or not self.bot.xp_enabled:
             return
-        used_xp_type: str = await self.bot.get_config(msg.guild.id, "xp_type")
-        if await self.check_noxp(msg) or not await self.bot.get_config(msg.guild.id, "enable_xp"):
+        settings = self.get_guild_settings(facts)
+        # most messages are sent during the cooldown: check it before anything else
+        scope, cooldown = self._get_cooldown_scope(msg.guild.id, settings.xp_type)
+        if self.cooldowns[scope].is_on_cooldown(msg.author.id, cooldown, time.monotonic()):
+            return
+        if not settings.enabled or settings.is_blocked(msg):
             return
-        rate: float = await self.bot.get_config(msg.guild.id, "xp_rate")
         if self.sus is None:
             if self.bot.get_cog("Utilities"):
                 await self.reload_sus()
@@ -105,19 +142,16 @@ class Xp(commands.Cog):
                 self.sus = set()
         if self.bot.zombie_mode:
             return
-        if used_xp_type == "global":
-            await self.add_xp_0(msg, rate)
-        elif used_xp_type == "mee6-like":
-            await self.add_xp_1(msg, rate)
-        elif used_xp_type == "local":
-            await self.add_xp_2(msg, rate)
-
-    async def add_xp_0(self, msg: discord.Message, _rate: float):
+        if settings.xp_type == "global":
+            await self.add_xp_0(msg, facts, settings.rate)
+        elif settings.xp_type == "mee6-like":
+            await self.add_xp_1(msg, facts, settings.rate)
+        elif settings.xp_type == "local":
+            await self.add_xp_2(msg, facts, settings.rate)
+
+    async def add_xp_0(self, msg: discord.Message, facts: MessageFacts, _rate: float):
         """Global xp type"""
-        if msg.author.id in self.cache["global"]:
-            if time.time() - self.cache["global"][msg.author.id][0] < self.classic_xp_cooldown:
-                return
-        content = msg.clean_content
+        content = facts.clean_content
         if len(content) < self.minimal_size or await self.check_spam(content):
             return
         if len(self.cache["global"]) == 0:
@@ -130,6 +164,7 @@ class Xp(commands.Cog):
         else:
             prev_points = await self.db_get_xp(msg.author.id, None) or 0
         await self.db_set_xp(msg.author.id, giv_points, "add")
+        self._mark_rewarded(msg.author.id, msg.guild.id, "global")
         # check for sus people
         if msg.author.id in self.sus:
             await self.send_sus_msg(msg, giv_points)
@@ -140,19 +175,17 @@ class Xp(commands.Cog):
             await self.send_levelup(msg, new_lvl)
             await self.give_rr(msg.author, new_lvl, await self.rr_list_role(msg.guild.id))
 
-    async def add_xp_1(self, msg:discord.Message, rate: float):
+    async def add_xp_1(self, msg:discord.Message, _facts: MessageFacts, rate: float):
         """MEE6-like xp type"""
         if msg.guild.id not in self.cache:
             await self.db_load_cache(msg.guild.id)
-        if msg.author.id in self.cache[msg.guild.id]:
-            if time.time() - self.cache[msg.guild.id][msg.author.id][0] < self.mee6_xp_cooldown:
-                return
         giv_points = round(random.randint(15,25) * rate)
         if msg.author.id in self.cache[msg.guild.id]:
             prev_points = self.cache[msg.guild.id][msg.author.id][1]
         else:
             prev_points = await self.db_get_xp(msg.author.id, msg.guild.id) or 0
         await self.db_set_xp(msg.author.id, giv_points, "add", msg.guild.id)
+        self._mark_rewarded(msg.author.id, msg.guild.id, "mee6-like")
         # check for sus people
         if msg.author.id in self.sus:
             await self.send_sus_msg(msg, giv_points)
@@ -163,14 +196,11 @@ class Xp(commands.Cog):
             await self.send_levelup(msg, new_lvl)
             await self.give_rr(msg.author, new_lvl, await self.rr_list_role(msg.guild.id))
 
-    async def add_xp_2(self, msg:discord.Message, rate: float):
+    async def add_xp_2(self, msg:discord.Message, facts: MessageFacts, rate: float):
         """Local xp type"""
         if msg.guild.id not in self.cache:
             await self.db_load_cache(msg.guild.id)
-        if msg.author.id in self.cache[msg.guild.id]:
-            if time.time() - self.cache[msg.guild.id][msg.author.id][0] < self.classic_xp_cooldown:
-                return
-        content = msg.clean_content
+        content = facts.clean_content
         if len(content) < self.minimal_size or await self.check_spam(content):
             return
         giv_points = round(await self.calc_xp(msg) * rate)
@@ -181,6 +211,7 @@ class Xp(commands.Cog):
         else:
             prev_points = await self.db_get_xp(msg.author.id, msg.guild.id) or 0
         await self.db_set_xp(msg.author.id, giv_points, "add", msg.guild.id)
+        self._mark_rewarded(msg.author.id, msg.guild.id, "local")
         # check for sus people
         if msg.author.id in self.sus:
             await self.send_sus_msg(msg, giv_points)
@@ -191,22 +222,6 @@ class Xp(commands.Cog):
             await self.send_levelup(msg, new_lvl)
             await self.give_rr(msg.author, new_lvl, await self.rr_list_role(msg.guild.id))
 
-
-    async def check_noxp(self, msg: discord.Message) -> bool:
-        "Returns True if the user cannot get xp in these conditions"
-        if msg.guild is None:
-            return False
-        chans: list[discord.abc.Messageable] | None = await self.bot.get_config(msg.guild.id, "noxp_channels")
-        if chans is not None and msg.channel in chans:
-            return True
-        roles: list[discord.Role] | None = await self.bot.get_config(msg.guild.id, "noxp_roles")
-        if roles is not None:
-            for role in roles:
-                if role in msg.author.roles:
-                    return True
-        return False
-
-
     async def send_levelup(self, msg: discord.Message, lvl: int):
         """Envoie le message de levelup"""
         if self.bot.zombie_mode:
@@ -337,8 +352,6 @@ class Xp(commands.Cog):
             return
         query = "SELECT userID FROM `users` WHERE `xp_suspect` = 1"
         async with self.bot.db_main.read(query) as query_result:
-            if not query_result:
-                return
             self.sus = {item["userID"] for item in query_result}
         self.log.info("Reloaded xp suspects (%s suspects)", len(self.sus))
 
@@ -572,38 +585,57 @@ class Xp(commands.Cog):
         except Exception as err:
             self.bot.dispatch("error", err)
 
-    async def db_get_guilds_decays(self):
-        "Get a list of guilds where xp decay is enabled"
-        query = "SELECT `guild_id`, CAST(`value` AS INT) AS 'value' FROM `serverconfig` WHERE `option_name` = 'xp_decay' AND `value` > 0 AND `beta` = %s"
+    async def db_get_guilds_decay_config(self) -> list[dict[str, Any]]:
+        "Get the xp decay and xp type config values of every guild"
+        query = "SELECT `guild_id`, `option_name`, `value` FROM `serverconfig` \
+WHERE `option_name` IN ('xp_decay', 'xp_type') AND `beta` = %s"
         async with self.bot.db_main.read(query, (self.bot.beta,)) as query_result:
             return query_result
 
+    async def db_get_guilds_tables(self) -> set[str]:
+        "Get the name of every table in the guilds xp database"
+        query = "SELECT `TABLE_NAME` AS 'name' FROM `information_schema`.`TABLES` WHERE `TABLE_SCHEMA` = DATABASE()"
+        async with self.bot.db_xp.read(query) as query_result:
+            return {row["name"] for row in query_result}
+
+    async def db_apply_decay(self, guild_ids: list[int], value: int, report: XpDecayReport):
+        """Remove some xp to every member of some guilds in a single transaction, then update the cache accordingly
+        If any query fails, the whole transaction is rolled back and the cache is left untouched"""
+        users_count = removed_users_count = 0
+        async with self.bot.db_xp.multi() as multi_query:
+            for guild_id in guild_ids:
+                users_count += await multi_query.write(f"UPDATE `{guild_id}` SET `xp` = `xp` - %s", (value,))
+                # remove members with 0xp or less
+                removed_users_count += await multi_query.write(f"DELETE FROM `{guild_id}` WHERE `xp` <= 0")
+        report.users_count += users_count
+        report.removed_users_count += removed_users_count
+        report.statements_count += 2 * len(guild_ids)
+        for guild_id in guild_ids:
+            if (guild_cache := self.cache.get(guild_id)) is not None:
+                apply_decay_to_cache(guild_cache, value)
+        report.guilds_count += len(guild_ids)
+
     @tasks.loop(time=datetime.time(hour=0, tzinfo=datetime.UTC))
     async def xp_decay_loop(self):
         "Remove some xp to every member every day at midnight"
-        guilds = await self.db_get_guilds_decays()
-        decay_query = "UPDATE `{table}` SET `xp` = `xp` - %s"
-        cleanup_query = "DELETE FROM `{table}` WHERE `xp` <= 0"
-        guilds_count = users_count = 0
-        for guild_data in guilds:
-            guild_id, value = guild_data["guild_id"], guild_data["value"]
-            # check if axobot is still there
-            if self.bot.get_guild(guild_id) is None:
-                continue
-            # check if xp_type is not 'global'
-            if await self.bot.get_config(guild_id, "xp_type") == "global":
-                continue
-            # apply decay
-            async with self.bot.db_xp.write(decay_query.format(table=guild_id), (value,), returnrowcount=True) as row_count:
-                users_count += row_count
-                # if xp has been edited, invalidate cache
-                if row_count > 0 and guild_id in self.cache:
-                    del self.cache[guild_id]
-            # remove members with 0xp or less
-            async with self.bot.db_xp.write(cleanup_query.format(table=guild_id), returnrowcount=True) as row_count:
-                self.log.info("xp decay: removed %s members from guild %s", row_count, guild_id)
-            guilds_count += 1
-        log_text = f"XP decay: removed xp of {users_count} users from {guilds_count} guilds"
+        start_time = time.time()
+        report = XpDecayReport()
+        default_xp_type = (await self.bot.get_options_list())["xp_type"]["default"]
+        guilds_groups = group_guilds_by_decay(
+            await self.db_get_guilds_decay_config(),
+            default_xp_type,
+            {guild.id for guild in self.bot.guilds}
+        )
+        existing_tables = await self.db_get_guilds_tables()
+        report.statements_count += 2
+        for value, guild_ids in guilds_groups.items():
+            guild_ids = [guild_id for guild_id in guild_ids if str(guild_id) in existing_tables]
+            for i in range(0, len(guild_ids), DECAY_CHUNK_SIZE):
+                await self.db_apply_decay(guild_ids[i:i+DECAY_CHUNK_SIZE], value, report)
+        report.duration = time.time() - start_time
+        self.bot.dispatch("xp_decay_completed", report.statements_count, report.duration)
+        log_text = f"XP decay: removed xp of {report.users_count} users from {report.guilds_count} guilds \
+({report.removed_users_count} users removed, {report.statements_count} queries in {report.duration:.2f}s)"
         emb = discord.Embed(description=log_text, color=0x66ffcc, timestamp=self.bot.utcnow())
         emb.set_author(name=self.bot.user, icon_url=self.bot.user.display_avatar)
         self.bot.log.info(log_text)
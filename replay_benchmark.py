@@ -0,0 +1,541 @@
+#!/usr/bin/env python
+"""Offline benchmark of the message listeners
+
+Replay a stream of gateway events against a bot which is never connected to Discord nor to the database:
+the guilds, channels, members and messages are built by discord.py from the events payloads, the database
+queries are answered by an in-memory stand-in, and the Discord API calls are answered by a fake HTTP client.
+
+The events stream is either synthetic (`--messages`), or read from a JSON-lines file (`--events`) where each line
+is a gateway dispatch payload like `{"t": "MESSAGE_CREATE", "d": {...}}`, as received in `on_socket_raw_receive`.
+The antiscam uses a small model trained from synthetic messages, as the real one is trained from the production database.
+A `secrets.json` file is still needed, the empty `secrets-example.json` one is enough."""
+
+import argparse
+import asyncio
+import csv
+import datetime
+import json
+import os
+import random
+import sys
+import tempfile
+import time
+import tracemalloc
+from collections import Counter
+from typing import Any, Callable, Iterator
+
+import discord
+import discord.ext.tasks
+
+from core.bot_classes import SUPPORT_GUILD_ID, Axobot
+from core.bot_classes.message_facts import ListenerTimings
+from core.database.query.profiler import get_query_fingerprint
+from modules.antiscam.model import AntiScamAgent, Message, RandomForest
+
+# modules whose message listeners are benchmarked by default, after the ones they need
+DEFAULT_MODULES = ("languages", "serverconfig", "xp", "antiscam", "antiraid", "serverlogs", "users_cache", "bot_stats")
+
+BOT_USER_ID = 1
+SYNTHETIC_WORDS = (
+    "hello", "everyone", "how", "are", "you", "today", "the", "bot", "is", "great", "check", "this", "out", "free",
+    "nitro", "giveaway", "please", "thanks", "lol", "what", "time", "server", "event", "game", "tonight", "join",
+)
+# words and domains of the synthetic scam messages used to train the antiscam fixture model
+SYNTHETIC_SCAM_WORDS = ("free", "nitro", "giveaway", "steam", "gift", "claim", "airdrop", "click", "now", "@everyone")
+FIXTURE_WEBSITES = {
+    "discord.com": True, "example.com": True, "steamcommunity.com": True, "youtube.com": True,
+    "dlscord-gift.com": False, "steamcommunlty.ru": False, "discord-nitro.gift": False, "free-nitro.xyz": False,
+}
+PROJECT_DIR = os.path.dirname(os.path.abspath(__file__)) + os.sep
+# channel of the support guild where the antiscam reports the suspicious messages
+ANTISCAM_REPORTS_CHANNEL_ID = 913821367500148776
+
+# server config options read by the message listeners, with their documented default values except for the
+# anti-scam and anti-raid which are enabled to be benchmarked, used instead of the options list fetched from the bot API
+OFFLINE_OPTIONS_LIST: dict[str, dict[str, Any]] = {
+    "anti_caps_lock": {"type": "boolean", "default": True, "is_listed": True},
+    "anti_raid": {"type": "enum", "values": ("none", "smooth", "careful", "high", "extreme"), "default": "smooth",
+                  "is_listed": True},
+    "anti_raid_ignored_roles": {"type": "roles_list", "min_count": 1, "max_count": 30, "allow_integrated_roles": True,
+                                "allow_everyone": False, "default": None, "is_listed": True},
+    "anti_scam": {"type": "boolean", "default": True, "is_listed": True},
+    "enable_events": {"type": "boolean", "default": True, "is_listed": True},
+    "enable_xp": {"type": "boolean", "default": True, "is_listed": True},
+    "language": {"type": "enum", "values": ("fr", "en", "lolcat", "fi", "de", "fr2", "cs"), "default": "fr",
+                 "is_listed": True},
+    "levelup_channel": {"type": "levelup_channel", "default": "any", "is_listed": True},
+    "levelup_msg": {"type": "text", "min_length": 1, "max_length": 2000, "default": None, "is_listed": True},
+    "levelup_silent_mention": {"type": "boolean", "default": False, "is_listed": True},
+    "noxp_channels": {"type": "text_channels_list", "min_count": 1, "max_count": 50, "allow_threads": True,
+                      "allow_announcement_channels": True, "allow_non_nsfw_channels": True, "default": None,
+                      "is_listed": True},
+    "noxp_roles": {"type": "roles_list", "min_count": 1, "max_count": 30, "allow_integrated_roles": True,
+                   "allow_everyone": False, "default": None, "is_listed": True},
+    "poll_channels": {"type": "text_channels_list", "min_count": 1, "max_count": 20, "allow_threads": True,
+                      "allow_announcement_channels": True, "allow_non_nsfw_channels": True, "default": None,
+                      "is_listed": True},
+    "xp_decay": {"type": "int", "min": 0, "max": 10000, "default": 0, "is_listed": True},
+    "xp_rate": {"type": "float", "min": 0.1, "max": 3, "default": 1.0, "is_listed": True},
+    "xp_type": {"type": "enum", "values": ("global", "mee6-like", "local"), "default": "global", "is_listed": True},
+}
+
+
+class OfflineQuery:
+    "Stand-in of a database query, returning an empty result"
+
+    def __init__(self, result: Any):
+        self.result = result
+
+    async def __aenter__(self):
+        return self.result
+
+    async def __aexit__(self, exc_type, value, traceback):
+        pass
+
+
+class OfflineMultiQueries:
+    "Stand-in of a database multi-queries context manager"
+
+    def __init__(self, handler: "OfflineQueryHandler"):
+        self.handler = handler
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, exc_type, value, traceback):
+        pass
+
+    async def write(self, query: str, _args: tuple | dict | None = None) -> int:
+        self.handler.queries[get_query_fingerprint(query)] += 1
+        return 0
+
+
+class OfflineQueryHandler:
+    """Stand-in of the bot database handlers, which counts the queries and answers them with empty results,
+    or with the given rows for the queries whose fingerprint is in `results`"""
+
+    def __init__(self, results: dict[str, list[dict[str, Any]]] | None = None):
+        self.queries: Counter[str] = Counter()
+        self.results = results or {}
+
+    def read(self, query: str, _args: tuple | dict | None = None, fetchone: bool = False, astuple: bool = False):
+        fingerprint = get_query_fingerprint(query)
+        self.queries[fingerprint] += 1
+        if fingerprint in self.results:
+            rows = self.results[fingerprint]
+            if astuple:
+                rows = [tuple(row.values()) for row in rows]
+            return OfflineQuery((rows[0] if rows else None) if fetchone else rows)
+        if fetchone:
+            return OfflineQuery(() if astuple else {})
+        return OfflineQuery([])
+
+    def write(self, query: str, _args: tuple | dict | None = None, multi: bool = False, returnrowcount: bool = False):
+        self.queries[get_query_fingerprint(query)] += 1
+        return OfflineQuery(0 if returnrowcount else None)
+
+    def multi(self):
+        return OfflineMultiQueries(self)
+
+
+class ReplayBot(Axobot):
+    "Bot which keeps track of the listeners it schedules, to be able to wait for them"
+
+    def __init__(self):
+        super().__init__(case_insensitive=True, status=discord.Status.online)
+        self.pending_listeners: set[asyncio.Task] = set()
+        self.api_calls: Counter[str] = Counter()
+        self.errors: Counter[str] = Counter()
+        self._fake_ids = iter(range(10**17, 10**18))
+
+    def _schedule_event(self, coro, event_name: str, *args, **kwargs):
+        task = super()._schedule_event(coro, event_name, *args, **kwargs)
+        self.pending_listeners.add(task)
+        task.add_done_callback(self.pending_listeners.discard)
+        return task
+
+    async def drain_listeners(self, sampler: Callable[[], None] | None = None):
+        """Wait for every scheduled listener, including the ones they schedule themselves
+        `sampler` is called once the listeners started, while they still hold their temporary data"""
+        if sampler is not None and self.pending_listeners:
+            # let every listener run until its first suspension point
+            await asyncio.sleep(0)
+            sampler()
+        while self.pending_listeners:
+            await asyncio.gather(*self.pending_listeners, return_exceptions=True)
+
+    async def send_embed(self, embeds: list[discord.Embed] | discord.Embed, url: str | None = None):
+        "Count the logs sent to the internal webhooks, without sending them"
+        self.api_calls[f"POST webhook {url or 'logs'}"] += 1
+
+    async def offline_request(self, route: discord.http.Route, **kwargs) -> Any:
+        "Answer a Discord API request without sending it"
+        self.api_calls[f"{route.method} {route.path}"] += 1
+        if route.method == "POST" and route.path == "/channels/{channel_id}/messages":
+            payload = kwargs.get("json") or {}
+            return {
+                "id": str(next(self._fake_ids)),
+                "channel_id": str(route.channel_id),
+                "author": {"id": str(BOT_USER_ID), "username": "Axobot", "discriminator": "0", "avatar": None, "bot": True},
+                "content": payload.get("content") or "",
+                "timestamp": discord.utils.utcnow().isoformat(),
+                "edited_timestamp": None, "tts": False, "mention_everyone": False, "mentions": [], "mention_roles": [],
+                "attachments": [], "embeds": payload.get("embeds") or [], "pinned": False, "type": 0,
+            }
+        return {}
+
+
+def _user_payload(user_id: int, bot: bool = False):
+    return {"id": str(user_id), "username": f"user{user_id}", "discriminator": "0", "avatar": None, "bot": bot}
+
+def _member_payload(user_id: int, bot: bool = False):
+    return {
+        "user": _user_payload(user_id, bot),
+        "roles": [], "joined_at": "2024-01-01T00:00:00+00:00", "deaf": False, "mute": False, "flags": 0,
+    }
+
+def _guild_payload(guild_id: int, name: str, channel_ids: list[int], member_ids: list[int]):
+    return {
+        "id": str(guild_id), "name": name, "owner_id": str(member_ids[0] if member_ids else BOT_USER_ID),
+        "member_count": len(member_ids) + 1, "features": [], "emojis": [], "stickers": [],
+        "threads": [], "voice_states": [], "presences": [],
+        "roles": [{
+            "id": str(guild_id), "name": "@everyone", "permissions": "1071698660929", "position": 0,
+            "color": 0, "hoist": False, "managed": False, "mentionable": False,
+        }],
+        "channels": [
+            {"id": str(channel_id), "type": 0, "name": f"channel-{i}", "position": i, "permission_overwrites": []}
+            for i, channel_id in enumerate(channel_ids)
+        ],
+        "members": [_member_payload(BOT_USER_ID, bot=True)] + [_member_payload(user_id) for user_id in member_ids],
+    }
+
+def get_support_guild_event() -> dict[str, Any]:
+    "Create the support guild, with the channels where the modules send their reports"
+    return {"t": "GUILD_CREATE", "d": _guild_payload(SUPPORT_GUILD_ID.id, "Support", [ANTISCAM_REPORTS_CHANNEL_ID], [])}
+
+def generate_synthetic_events(messages_count: int, guilds_count: int, members_count: int, seed: int
+                              ) -> Iterator[dict[str, Any]]:
+    "Generate guilds creation events, then a stream of messages sent in these guilds"
+    rng = random.Random(seed)
+    guilds: list[tuple[int, list[int], list[int]]] = []
+    for guild_index in range(guilds_count):
+        guild_id = 10**17 + guild_index
+        channels = [guild_id + 1000 + i for i in range(5)]
+        members = [2 * 10**17 + guild_index * members_count + i for i in range(members_count)]
+        guilds.append((guild_id, channels, members))
+        yield {"t": "GUILD_CREATE", "d": _guild_payload(guild_id, f"Guild {guild_index}", channels, members)}
+    start_date = discord.utils.utcnow()
+    for message_index in range(messages_count):
+        guild_id, channels, members = rng.choice(guilds)
+        author_id = rng.choice(members)
+        words = rng.choices(SYNTHETIC_WORDS, k=rng.randint(1, 25))
+        kind = rng.random()
+        if kind < 0.05:
+            words.append("https://discord.gg/abcdef")
+        elif kind < 0.15:
+            words.append("https://example.com/some/page")
+        elif kind < 0.25:
+            words.append(f"<@{rng.choice(members)}>")
+        elif kind < 0.30:
+            words = [word.upper() for word in words]
+        elif kind < 0.35:
+            words.append("<:custom:123456789012345678>")
+        timestamp = start_date + datetime.timedelta(milliseconds=200 * message_index)
+        yield {"t": "MESSAGE_CREATE", "d": {
+            "id": str(discord.utils.time_snowflake(timestamp)), "channel_id": str(rng.choice(channels)),
+            "guild_id": str(guild_id),
+            "author": _user_payload(author_id),
+            "member": {"roles": [], "joined_at": "2024-01-01T00:00:00+00:00", "deaf": False, "mute": False, "flags": 0},
+            "content": ' '.join(words), "timestamp": timestamp.isoformat(), "edited_timestamp": None,
+            "tts": False, "mention_everyone": False, "mentions": [], "mention_roles": [], "attachments": [],
+            "embeds": [], "pinned": False, "type": 0,
+        }}
+
+def shift_messages_events(events: list[dict[str, Any]], delay_ms: int) -> list[dict[str, Any]]:
+    """Copy the events with new message IDs and dates, `delay_ms` milliseconds later,
+    so that replaying them again doesn't hit the caches filled by the previous replays"""
+    shifted_events: list[dict[str, Any]] = []
+    for event in events:
+        if event["t"].startswith("MESSAGE_"):
+            data = dict(event["d"])
+            for key in ("id", "message_id"):
+                if key in data:
+                    data[key] = str(int(data[key]) + (delay_ms << 22))
+            if data.get("timestamp"):
+                timestamp = datetime.datetime.fromisoformat(data["timestamp"])
+                data["timestamp"] = (timestamp + datetime.timedelta(milliseconds=delay_ms)).isoformat()
+            event = {"t": event["t"], "d": data}
+        shifted_events.append(event)
+    return shifted_events
+
+def get_messages_time_span(events: list[dict[str, Any]]) -> int:
+    "Get the time between the first and the last message of the events, in milliseconds, from their IDs"
+    timestamps = [int(event["d"]["id"]) >> 22 for event in events if event["t"] == "MESSAGE_CREATE"]
+    return max(timestamps) - min(timestamps) + 1000 if timestamps else 0
+
+def create_fixture_antiscam_model(directory: str, seed: int, samples_count: int = 300):
+    """Train an antiscam model from synthetic harmless and scam messages, and save it with a websites list
+    in the given directory, where the antiscam module will load them from"""
+    rng = random.Random(seed)
+    samples: list[Message] = []
+    for index in range(samples_count):
+        words = rng.choices(SYNTHETIC_WORDS, k=rng.randint(3, 25))
+        is_scam = index % 3 == 0
+        if is_scam:
+            words += rng.choices(SYNTHETIC_SCAM_WORDS, k=rng.randint(2, 6))
+            words.append(f"https://{rng.choice(list(FIXTURE_WEBSITES))}/gift")
+            rng.shuffle(words)
+        elif rng.random() < 0.2:
+            words.append(f"https://{rng.choice(list(FIXTURE_WEBSITES)[:4])}/watch")
+        sample = Message.from_raw(' '.join(words), rng.randint(0, 3) if is_scam else 0, FIXTURE_WEBSITES)
+        sample.category = int(is_scam)
+        samples.append(sample)
+    # same parameters as the default ones of train_model
+    model = RandomForest(ntree=100, test_percent=0.2, round_values={"max_frequency": 3, "caps_percentage": 1, "avg_word_len": 2})
+    model.fit(samples)
+    AntiScamAgent.MODEL_FILEPATH = os.path.join(directory, "bayes_model.pkl")
+    AntiScamAgent.WEBSITES_FILEPATH = os.path.join(directory, "base_websites.csv")
+    AntiScamAgent.save_model_to_file(model)
+    with open(AntiScamAgent.WEBSITES_FILEPATH, 'w', encoding="utf-8") as csv_file:
+        csv.writer(csv_file).writerows((domain, int(is_safe)) for domain, is_safe in FIXTURE_WEBSITES.items())
+
+def get_offline_query_results() -> dict[str, list[dict[str, Any]]]:
+    "Get the rows returned by the offline database to the queries needing some data"
+    websites_query = "SELECT `domain`, `is_safe` FROM `spam-detection`.`websites`"
+    return {
+        get_query_fingerprint(websites_query): [
+            {"domain": domain, "is_safe": is_safe} for domain, is_safe in FIXTURE_WEBSITES.items()
+        ],
+    }
+
+def read_events_file(filepath: str) -> Iterator[dict[str, Any]]:
+    "Read gateway dispatch payloads from a JSON-lines file"
+    with open(filepath, 'r', encoding="utf-8") as file:
+        for line in file:
+            if line.strip():
+                event = json.loads(line)
+                if event.get("t") is not None:
+                    yield event
+
+
+async def build_bot(modules: list[str], options_list: dict[str, dict[str, Any]], skip_failed_modules: bool) -> ReplayBot:
+    """Create a bot connected to nothing, and load the given modules
+    A module failing to load stops the benchmark, unless `skip_failed_modules` is set"""
+    bot = ReplayBot()
+    await bot._async_setup_hook() # pylint: disable=protected-access
+    bot._options_list = options_list # pylint: disable=protected-access
+    state = bot._connection # pylint: disable=protected-access
+    state.user = discord.ClientUser(state=state, data=_user_payload(BOT_USER_ID, bot=True))
+    bot.db_main = bot.db_xp = OfflineQueryHandler(get_offline_query_results())
+    bot.http.request = bot.offline_request
+
+    async def on_error(error: Exception, *_args):
+        bot.errors[type(error).__name__] += 1
+    bot.add_listener(on_error, "on_error")
+
+    await bot.load_extension("core.utilities")
+    for module_name in modules:
+        try:
+            await bot.load_module(module_name)
+        except discord.ext.commands.ExtensionFailed as err:
+            if not skip_failed_modules:
+                raise RuntimeError(f"The {module_name} module failed to load, give an explicit --modules list to skip it"
+                                   ) from err
+            print(f"Skipping the {module_name} module, which failed to load: {err.original!r}")
+    # the periodic tasks are not benchmarked, and would wait for the bot to be ready before using the real database
+    for cog in bot.cogs.values():
+        for attribute_name, attribute in vars(type(cog)).items():
+            if isinstance(attribute, discord.ext.tasks.Loop):
+                getattr(cog, attribute_name).cancel()
+    # some listeners wait for the bot to be ready, which happens after the modules are loaded
+    bot._ready.set() # pylint: disable=protected-access
+    return bot
+
+async def replay(bot: ReplayBot, events: list[dict[str, Any]], concurrency: int,
+                 sampler: Callable[[], None] | None = None) -> tuple[int, float]:
+    """Send the events to the bot, letting up to `concurrency` messages be processed at the same time
+    `sampler` is called while each batch of messages is being processed
+    Return the number of replayed messages and how long it took"""
+    state = bot._connection # pylint: disable=protected-access
+    messages_count = 0
+    start = time.perf_counter()
+    for event in events:
+        event_type: str = event["t"]
+        if event_type == "GUILD_CREATE":
+            state._add_guild_from_data(event["d"]) # pylint: disable=protected-access
+            continue
+        if (parser := getattr(state, "parse_" + event_type.lower(), None)) is None:
+            continue
+        parser(event["d"])
+        if event_type == "MESSAGE_CREATE":
+            messages_count += 1
+            if messages_count % concurrency == 0:
+                await bot.drain_listeners(sampler)
+    await bot.drain_listeners(sampler)
+    return messages_count, time.perf_counter() - start
+
+
+def _get_module_name(filename: str) -> str | None:
+    "Get the bot module (or core) a file belongs to"
+    if not filename.startswith(PROJECT_DIR):
+        return None
+    parts = filename[len(PROJECT_DIR):].split(os.sep)
+    if parts[0] == "modules" and len(parts) > 1:
+        return parts[1]
+    return parts[0].removesuffix(".py")
+
+def get_memory_diff_per_module(snapshot: tracemalloc.Snapshot, reference: tracemalloc.Snapshot
+                               ) -> tuple[Counter[str], Counter[str]]:
+    "Get the number of memory blocks and bytes allocated by each module between two snapshots"
+    blocks_per_module: Counter[str] = Counter()
+    size_per_module: Counter[str] = Counter()
+    for stat in snapshot.compare_to(reference, "filename"):
+        if (module_name := _get_module_name(stat.traceback[0].filename)) is not None:
+            blocks_per_module[module_name] += stat.count_diff
+            size_per_module[module_name] += stat.size_diff
+    return blocks_per_module, size_per_module
+
+def format_listener_timings(timings: dict[str, ListenerTimings], duration: float) -> list[str]:
+    "Format the listeners timings as a text table"
+    lines = [f"{'Listener':<45} {'Calls':>7} {'Avg (ms)':>9} {'p95 (ms)':>9} {'Max (ms)':>9} {'Share':>6}"]
+    for name, listener in sorted(timings.items(), key=lambda item: item[1].total_ms, reverse=True):
+        share = listener.total_ms / (duration * 1000) if duration else 0
+        lines.append(
+            f"{name[:45]:<45} {listener.count:>7} {listener.average_ms:>9.3f} {listener.percentile(95):>9.0f} "
+            f"{listener.max_ms:>9.2f} {share:>6.0%}"
+        )
+    return lines
+
+def compare_results(results: dict[str, Any], baseline: dict[str, Any], threshold: float) -> list[str]:
+    "List the metrics which got worse than the baseline by more than `threshold` percents"
+    regressions: list[str] = []
+    ratio = 1 + threshold / 100
+    if results["messages_per_second"] * ratio < baseline["messages_per_second"]:
+        regressions.append(
+            f"throughput: {results['messages_per_second']:.1f} msg/s, was {baseline['messages_per_second']:.1f} msg/s"
+        )
+    for name, avg_ms in results["listeners_avg_ms"].items():
+        baseline_avg = baseline["listeners_avg_ms"].get(name)
+        # ignore tiny durations, which are mostly noise
+        if baseline_avg is not None and avg_ms > baseline_avg * ratio and avg_ms - baseline_avg > 0.05:
+            regressions.append(f"{name}: {avg_ms:.3f}ms on average, was {baseline_avg:.3f}ms")
+    return regressions
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n", maxsplit=1)[0])
+    source = parser.add_mutually_exclusive_group()
+    source.add_argument("--events", help="JSON-lines file of gateway events to replay")
+    source.add_argument("--messages", type=int, default=5000, help="Number of synthetic messages to replay")
+    parser.add_argument("--guilds", type=int, default=20, help="Number of synthetic guilds")
+    parser.add_argument("--members", type=int, default=200, help="Number of synthetic members per guild")
+    parser.add_argument("--seed", type=int, default=0, help="Seed of the synthetic events generator")
+    parser.add_argument("--modules", nargs='+',
+                        help="Bot modules to load, skipping the ones failing to load (default: every benchmarked module)")
+    parser.add_argument("--options-list",
+                        help="JSON file of the server config options, as returned by the bot API, to replace the default ones")
+    parser.add_argument("--concurrency", type=int, default=100, help="Number of messages processed at the same time")
+    parser.add_argument("--no-allocations", action="store_false", dest="allocations",
+                        help="Skip the second replay counting the memory allocations")
+    parser.add_argument("--output", help="Save the results to this JSON file, to be used as a baseline later")
+    parser.add_argument("--baseline", help="Compare the results to a previous JSON output")
+    parser.add_argument("--threshold", type=float, default=10,
+                        help="Regression threshold in percents, when comparing to a baseline")
+    args = parser.parse_args()
+
+    if not os.path.isfile("secrets.json"):
+        print("A secrets.json file is needed, you can copy secrets-example.json")
+        sys.exit(2)
+    if args.events:
+        events = list(read_events_file(args.events))
+    else:
+        events = list(generate_synthetic_events(args.messages, args.guilds, args.members, args.seed))
+
+    setup_events = [get_support_guild_event()] + [event for event in events if event["t"] == "GUILD_CREATE"]
+    events = [event for event in events if event["t"] != "GUILD_CREATE"]
+
+    options_list = OFFLINE_OPTIONS_LIST
+    if args.options_list:
+        with open(args.options_list, 'r', encoding="utf-8") as file:
+            options_list = {}
+            for options in json.load(file).values():
+                options_list.update(options)
+    models_directory = tempfile.TemporaryDirectory(prefix="replay-benchmark-")
+    create_fixture_antiscam_model(models_directory.name, args.seed)
+    bot = await build_bot(args.modules or DEFAULT_MODULES, options_list, skip_failed_modules=args.modules is not None)
+    # create the guilds, and warm up the caches and lazy imports with a few messages
+    await replay(bot, setup_events + events[:min(200, len(events) // 10)], 10)
+    bot.message_analyzer.pop_timings()
+    bot.api_calls.clear()
+    bot.db_main.queries.clear()
+    bot.errors.clear()
+
+    # every replay uses new messages, later than the previous ones
+    time_span = get_messages_time_span(events)
+    messages_count, duration = await replay(bot, shift_messages_events(events, time_span), args.concurrency)
+    timings = bot.message_analyzer.pop_timings()
+    throughput = messages_count / duration if duration else 0.0
+    print(f"\nReplayed {messages_count} messages in {duration:.2f}s: {throughput:.1f} messages/s\n")
+    print("\n".join(format_listener_timings(timings, duration)))
+    print(f"\nDatabase queries: {sum(bot.db_main.queries.values())} "
+          f"({sum(bot.db_main.queries.values()) / max(messages_count, 1):.2f} per message)")
+    for fingerprint, count in bot.db_main.queries.most_common(5):
+        print(f"  {count:>7}  {fingerprint[:110]}")
+    print(f"Discord API calls: {sum(bot.api_calls.values())}")
+    for route, count in bot.api_calls.most_common(5):
+        print(f"  {count:>7}  {route}")
+    if bot.errors:
+        print("Listener errors: " + ", ".join(f"{name} ({count})" for name, count in bot.errors.most_common()))
+
+    retained_blocks: dict[str, int] = {}
+    peak_blocks: Counter[str] = Counter()
+    if args.allocations:
+        allocation_events = shift_messages_events(events, 2 * time_span)
+        peak_size: Counter[str] = Counter()
+        tracemalloc.start()
+        before = tracemalloc.take_snapshot()
+
+        def sample_memory():
+            "Keep the highest memory used by each module while a batch of messages is processed"
+            blocks_per_module, size_per_module = get_memory_diff_per_module(tracemalloc.take_snapshot(), before)
+            for module_name, blocks in blocks_per_module.items():
+                peak_blocks[module_name] = max(peak_blocks[module_name], blocks)
+                peak_size[module_name] = max(peak_size[module_name], size_per_module[module_name])
+
+        await replay(bot, allocation_events, args.concurrency, sample_memory)
+        blocks_per_module, size_per_module = get_memory_diff_per_module(tracemalloc.take_snapshot(), before)
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        retained_blocks = dict(blocks_per_module)
+        print(f"\nMemory allocations during a second replay of new messages (peak traced memory: {peak / 1024**2:.1f} MB)")
+        print("Peak values are sampled while each batch of messages is processed, retained values are left after the replay")
+        print(f"{'Module':<20} {'Peak blocks':>12} {'Peak size':>12} {'Retained blocks':>16} {'Retained size':>14}")
+        for module_name, blocks in peak_blocks.most_common(10):
+            print(f"{module_name:<20} {blocks:>12} {peak_size[module_name] / 1024:>9.1f} KB "
+                  f"{blocks_per_module[module_name]:>16} {size_per_module[module_name] / 1024:>11.1f} KB")
+    await bot.close()
+    models_directory.cleanup()
+
+    results = {
+        "messages": messages_count,
+        "messages_per_second": throughput,
+        "listeners_avg_ms": {name: listener.average_ms for name, listener in timings.items()},
+        "queries_per_message": sum(bot.db_main.queries.values()) / max(messages_count, 1),
+        "peak_blocks": dict(peak_blocks),
+        "retained_blocks": retained_blocks,
+    }
+    if args.output:
+        with open(args.output, 'w', encoding="utf-8") as file:
+            json.dump(results, file, indent=2)
+    if args.baseline:
+        with open(args.baseline, 'r', encoding="utf-8") as file:
+            baseline = json.load(file)
+        if regressions := compare_results(results, baseline, args.threshold):
+            print(f"\nRegressions above {args.threshold}%:\n- " + "\n- ".join(regressions))
+            sys.exit(1)
+        print(f"\nNo regression above {args.threshold}% compared to the baseline")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
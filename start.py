@@ -3,20 +3,26 @@
 
 # pylint: disable=wrong-import-order, wrong-import-position, ungrouped-imports
 
+from core.boot_utils.startup_timeline import StartupTimeline
+timeline = StartupTimeline()
+
 # Check Python version and 3rd party libraries
-from core.boot_utils.check_requirements import check_requirements
-check_requirements()
+with timeline.phase("requirements check"):
+    from core.boot_utils.check_requirements import check_requirements
+    check_requirements()
 
-# required to avoid segmentation error - don't ask me why
-from nltk import SnowballStemmer # pylint: disable=unused-import
+with timeline.phase("libraries import"):
+    # required to avoid segmentation error - don't ask me why
+    from nltk import SnowballStemmer # pylint: disable=unused-import
 
-import discord
-import asyncio
-import time
-import json
-from random import choice
-from core.bot_classes import Axobot
-from core.boot_utils import set_beta_logs, setup_start_parser, setup_logger, load_cogs, conf_loader
+    import discord
+    import asyncio
+    import time
+    import json
+    from random import choice
+    from core.bot_classes import Axobot
+    from core.boot_utils import set_beta_logs, setup_start_parser, setup_logger, load_cogs, conf_loader
+    from core.lazy_import import prewarm_lazy_values
 
 async def main():
     "Load everything and start the bot"
@@ -26,9 +32,20 @@ async def main():
     log = setup_logger()
     log.info("Starting bot")
 
-    client = Axobot(case_insensitive=True, status=discord.Status("online"))
+    with timeline.phase("bot initialization"):
+        client = Axobot(case_insensitive=True, status=discord.Status("online"))
+    connection_start: float | None = None
+    prewarm_task: asyncio.Task | None = None
 
     async def on_ready():
+        nonlocal connection_start, prewarm_task
+        if connection_start is not None:
+            timeline.record("connection until ready", connection_start)
+            connection_start = None
+            print("\nStartup timeline:")
+            print(timeline.format_table())
+            if client.prewarm_imports_enabled:
+                prewarm_task = asyncio.create_task(prewarm_lazy_values())
         print("\nBot connected")
         print("Name:", client.user.name)
         print("ID:", client.user.id)
@@ -54,12 +71,15 @@ async def main():
         emb = discord.Embed(description=f"**{client.user.name}** is launching !", color=8311585, timestamp=client.utcnow())
         await client.send_embed(emb)
 
-    if not client.db.test_connection():
+    with timeline.phase("database connection test"):
+        database_online = client.db.test_connection()
+    if not database_online:
         client.database_online = False
         if len(args.token) < 30:
             client.log.fatal("Invalid bot token")
             return
 
+    token_start = time.perf_counter()
     if args.token == "axobot":
         bot_data = await conf_loader.load_token(client, 1048011651145797673)
         token = bot_data["token"]
@@ -79,6 +99,7 @@ async def main():
     else:
         token: str = args.token
         client.entity_id = args.entity_id
+    timeline.record("token loading", token_start)
     # Events loop
     if not args.event_loop:
         client.internal_loop_enabled = False
@@ -87,11 +108,18 @@ async def main():
         client.rss_enabled = False
     if args.count_open_files:
         client.files_count_enabled = True
+    if args.prewarm_imports:
+        client.prewarm_imports_enabled = True
+    # SQL tracing
+    client.sql_profiler.enabled = args.sql_trace
+    client.sql_profiler.slow_query_threshold_ms = args.slow_query_threshold
 
     client.add_listener(on_ready)
 
     async with client:
-        await load_cogs(client)
+        with timeline.phase("modules loading"):
+            await load_cogs(client, timeline)
+        connection_start = time.perf_counter()
         await client.start(token)
 
 
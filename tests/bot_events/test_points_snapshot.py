@@ -0,0 +1,273 @@
+import asyncio
+import random
+import re
+import sqlite3
+import unittest
+from collections import Counter
+from datetime import UTC, datetime
+from types import SimpleNamespace
+
+from modules.bot_events.bot_events import BotEvents
+from modules.bot_events.src.points_snapshot import EventPointsSnapshot, PointsDistribution
+from modules.bot_stats.bot_stats import BotStats
+
+RE_NAMED_PLACEHOLDER = re.compile(r"%\((\w+)\)s")
+
+# queries used to compute the event points stats before the snapshot, writing into another table
+OLD_AGGREGATE_QUERIES = [
+    (f"eventpoints_collect.{name}",
+     f"INSERT INTO `statsbot`.`zbot_old` SELECT %s, %s, {aggregate} AS value, 0, %s, %s, %s FROM `axobot`.`event_points` "
+     "WHERE `beta` = %s")
+    for name, aggregate in (("total", "SUM(collect_points)"), ("min", "MIN(collect_points)"), ("max", "MAX(collect_points)"))
+] + [
+    (f"eventpoints.{name}",
+     f"INSERT INTO `statsbot`.`zbot_old` SELECT %s, %s, {aggregate} AS value, 0, %s, %s, %s FROM `axobot`.`event_points`"
+     " WHERE `beta` = %s")
+    for name, aggregate in (("total", "SUM(`points`)"), ("min", "MIN(`points`)"), ("max", "MAX(`points`)"))
+] + [
+    ("eventpoints_collect.rows", "INSERT INTO `statsbot`.`zbot_old` SELECT %s, %s, COUNT(*) AS value, 0, %s, %s, %s "
+     "FROM `axobot`.`event_points` WHERE `collect_points` != 0 AND `beta` = %s"),
+    ("eventpoints.rows", "INSERT INTO `statsbot`.`zbot_old` SELECT %s, %s, COUNT(*) AS value, 0, %s, %s, %s "
+     "FROM `axobot`.`event_points` WHERE `points` != 0 AND `beta` = %s"),
+]
+# the old median queries numbered the rows with a MySQL session variable, replaced here by window functions:
+# the values at the FLOOR and CEIL of the last row index divided by 2 are averaged, then rounded
+OLD_MEDIAN_QUERY = """INSERT INTO `statsbot`.`zbot_old`
+    SELECT %s, %s, ROUND(AVG(subq.{column})) as value, 0, %s, %s, %s
+    FROM (
+        SELECT ROW_NUMBER() OVER (ORDER BY {column}) - 1 AS row_index, COUNT(*) OVER () - 1 AS last_index, {column}
+        FROM `axobot`.`event_points`
+        WHERE {condition} `beta` = %s
+    ) AS subq
+    WHERE subq.row_index IN (subq.last_index / 2, (subq.last_index + 1) / 2)"""
+OLD_MEDIAN_QUERIES = [
+    ("eventpoints_collect.median", OLD_MEDIAN_QUERY.format(column="collect_points", condition="")),
+    ("eventpoints.median", OLD_MEDIAN_QUERY.format(column="`points`", condition="`points` != 0 AND")),
+]
+# the old rank query, with GROUP_CONCAT ordered by a subquery as SQLite doesn't support ORDER BY in it
+OLD_RANK_QUERY = "SELECT `user_id`, `points`, FIND_IN_SET( `points`, \
+    ( SELECT GROUP_CONCAT( `points` ) \
+        FROM ( SELECT `points` FROM `event_points` WHERE `beta` = %(beta)s ORDER BY `points` DESC ) ) ) AS rank \
+    FROM `event_points` WHERE `user_id` = %(user)s AND `beta` = %(beta)s"
+
+
+def _find_in_set(value, values_list: str | None) -> int:
+    "Implementation of the MySQL FIND_IN_SET function"
+    items = str(values_list).split(',')
+    return items.index(str(value)) + 1 if str(value) in items else 0
+
+
+class FakeQuery:
+    "Result of a query on the fake database"
+
+    def __init__(self, result):
+        self.result = result
+
+    async def __aenter__(self):
+        return self.result
+
+    async def __aexit__(self, *_args):
+        pass
+
+
+class SqlitePointsDatabase:
+    "Stand-in of the main database, counting the queries and running them on SQLite"
+
+    def __init__(self):
+        self.cnx = sqlite3.connect(":memory:")
+        self.cnx.row_factory = sqlite3.Row
+        self.cnx.create_function("FIND_IN_SET", 2, _find_in_set, deterministic=True)
+        self.cnx.execute("ATTACH DATABASE ':memory:' AS `axobot`")
+        self.cnx.execute("ATTACH DATABASE ':memory:' AS `statsbot`")
+        self.cnx.execute("CREATE TABLE `axobot`.`event_points` (`user_id` INT, `points` INT, `collect_points` INT, `beta` INT)")
+        for table in ("`statsbot`.`zbot`", "`statsbot`.`zbot_old`"):
+            self.cnx.execute(f"CREATE TABLE {table} (`date` TEXT, `variable` TEXT, `value` REAL, `type` INT, `unit` TEXT, "
+                             "`is_sum` INT, `entity_id` INT)")
+        self.queries: Counter[str] = Counter()
+
+    def _execute(self, query: str, args: tuple | list | dict | None):
+        if isinstance(args, dict):
+            query = RE_NAMED_PLACEHOLDER.sub(r":\1", query)
+        else:
+            query = query.replace("%s", '?')
+        return self.cnx.execute(query, args or ())
+
+    def read(self, query: str, args: tuple | dict | None = None, fetchone: bool = False, astuple: bool = False):
+        self.queries["read"] += 1
+        rows = [tuple(row) if astuple else dict(row) for row in self._execute(query, args).fetchall()]
+        if fetchone:
+            return FakeQuery(rows[0] if rows else (() if astuple else {}))
+        return FakeQuery(rows)
+
+    def write(self, query: str, args: tuple | list | dict | None = None):
+        self.queries["write"] += 1
+        self._execute(query, args)
+        return FakeQuery(None)
+
+    def insert_points(self, rows: list[tuple[int, int, int]], beta: bool = False):
+        "Insert some (user ID, points, collect points) rows"
+        self.cnx.executemany("INSERT INTO `axobot`.`event_points` VALUES (?, ?, ?, ?)", [row + (beta,) for row in rows])
+
+    def get_stats_rows(self, table: str) -> dict[str, float | None]:
+        "Get the values of every variable inserted in a stats table"
+        return {
+            row["variable"]: row["value"]
+            for row in self.cnx.execute(f"SELECT `variable`, `value` FROM `statsbot`.`{table}`")
+        }
+
+
+def create_bot(database: SqlitePointsDatabase, cogs: dict):
+    return SimpleNamespace(
+        db_main=database, beta=False, entity_id=0, database_online=True, secrets={"statuspage": ""},
+        utcnow=lambda: datetime(2024, 6, 1, 12, 0, 0, tzinfo=UTC), get_cog=cogs.get,
+    )
+
+def points_rows(points: list[int], collect_points: list[int]):
+    "Create the points table rows of some users"
+    return [(user_id, user_points, collect) for user_id, (user_points, collect) in enumerate(zip(points, collect_points), 1)]
+
+
+class TestOldStatsSemantics(unittest.TestCase):
+    "Check that the snapshot stats have the same values as the queries they replaced"
+
+    DATASETS = {
+        "odd counts": points_rows([0, 0, 5, 3, 3, 10, -2], [0, 1, 2, 2, 7, 0, 4]),
+        "even counts": points_rows([0, 4, 7, 10, 20, 0], [1, 2, 3, 4, 5, 6]),
+        "rounded halves": points_rows([1, 2], [-3, -2]),
+        "single row": points_rows([3], [0]),
+        "no points": points_rows([0, 0, 0], [3, 0, 0]),
+    }
+
+    def setUp(self):
+        rng = random.Random(0)
+        self.datasets = dict(self.DATASETS)
+        self.datasets["random"] = points_rows(
+            [rng.choice([0, 0, rng.randint(-50, 5000)]) for _ in range(501)],
+            [rng.randint(0, 300) for _ in range(501)],
+        )
+
+    def record_stats(self, rows: list[tuple[int, int, int]]):
+        "Record the stats from the snapshot, then with the old queries"
+        database = SqlitePointsDatabase()
+        database.insert_points(rows)
+        # rows of the beta bot are never counted
+        database.insert_points([(10**6, 10**6, 10**6)], beta=True)
+        stats = BotStats(create_bot(database, {}))
+        now = datetime(2024, 6, 1, 12, 0, 0).isoformat()
+        asyncio.run(stats.db_record_event_points_snapshot(now))
+        for variable, query in OLD_AGGREGATE_QUERIES + OLD_MEDIAN_QUERIES:
+            database.write(query, (now, variable, "points", False, 0, False))
+        return database.get_stats_rows("zbot"), database.get_stats_rows("zbot_old")
+
+    def test_same_metrics(self):
+        for name, rows in self.datasets.items():
+            with self.subTest(dataset=name):
+                new_metrics, old_metrics = self.record_stats(rows)
+                # the percentiles are new
+                self.assertIn("eventpoints_collect.p99", new_metrics)
+                for variable in ("eventpoints_collect.p90", "eventpoints_collect.p99", "eventpoints.p90", "eventpoints.p99"):
+                    new_metrics.pop(variable, None)
+                # a median of no value used to be inserted as NULL, it is now skipped
+                old_metrics = {variable: value for variable, value in old_metrics.items() if value is not None}
+                self.assertEqual(new_metrics, old_metrics)
+
+    def test_median_rounding(self):
+        "Medians of an even number of values are rounded half away from zero, like MySQL does"
+        _, old_metrics = self.record_stats(self.DATASETS["rounded halves"])
+        self.assertEqual(old_metrics["eventpoints.median"], 2)
+        self.assertEqual(old_metrics["eventpoints_collect.median"], -3)
+        self.assertEqual(PointsDistribution.from_sorted_values([1, 2]).median, 2)
+        self.assertEqual(PointsDistribution.from_sorted_values([-3, -2]).median, -3)
+        self.assertEqual(PointsDistribution.from_sorted_values([-3, 2]).median, -1)
+        self.assertEqual(PointsDistribution.from_sorted_values([1, 2, 4, 100]).median, 3)
+
+    def test_distribution(self):
+        distribution = PointsDistribution.from_sorted_values([-2, 0, 0, 3, 3, 5, 10])
+        self.assertEqual(distribution.count, 7)
+        self.assertEqual(distribution.nonzero_count, 5)
+        self.assertEqual(distribution.total, 19)
+        self.assertEqual((distribution.min, distribution.max, distribution.median), (-2, 10, 3))
+        # nearest-rank percentiles
+        self.assertEqual((distribution.p90, distribution.p99), (10, 10))
+        distribution = PointsDistribution.from_sorted_values(list(range(1, 101)))
+        self.assertEqual((distribution.p90, distribution.p99), (90, 99))
+        self.assertEqual(PointsDistribution.from_sorted_values([]), PointsDistribution(0, 0, 0, None, None, None, None, None))
+
+
+class TestSnapshotRanks(unittest.TestCase):
+    "Check the leaderboard answered by the snapshot"
+
+    def test_ranks_like_find_in_set(self):
+        "Tied users share the best rank of their points, like the old FIND_IN_SET query"
+        rng = random.Random(1)
+        rows = points_rows([rng.choice([-5, 0, 0, 1, 2, 2, 7, 30, 30, 30, 100]) for _ in range(200)], [0] * 200)
+        database = SqlitePointsDatabase()
+        database.insert_points(rows)
+        snapshot = EventPointsSnapshot(rows)
+        for user_id in range(1, len(rows) + 2):
+            with self.subTest(user_id=user_id):
+                async def get_old_rank():
+                    async with database.read(OLD_RANK_QUERY, {"user": user_id, "beta": False}, fetchone=True) as result:
+                        return result or None
+                self.assertEqual(snapshot.get_rank(user_id), asyncio.run(get_old_rank()))
+
+    def test_top(self):
+        snapshot = EventPointsSnapshot(points_rows([5, 0, 12, -1, 5], [0] * 5))
+        self.assertEqual(snapshot.get_top(3), [
+            {"user_id": 3, "points": 12}, {"user_id": 1, "points": 5}, {"user_id": 5, "points": 5}
+        ])
+        self.assertEqual(len(snapshot.get_top(10)), 4)
+        self.assertEqual(snapshot.participants_count, 3)
+        self.assertEqual(snapshot.get_rank(4), {"user_id": 4, "points": -1, "rank": 5})
+
+
+class TestStatsCycleQueries(unittest.TestCase):
+    "Count the queries made to record the event points stats"
+
+    def setUp(self):
+        self.database = SqlitePointsDatabase()
+        self.database.insert_points(points_rows([0, 5, 3, 3, 10], [1, 2, 0, 4, 4]))
+        self.cogs = {}
+        self.bot = create_bot(self.database, self.cogs)
+        self.stats = BotStats(self.bot)
+        self.now = datetime(2024, 6, 1, 12, 0, 0).isoformat()
+
+    def test_without_events_cog(self):
+        "The points table is read once, and the metrics written at once, instead of 2 reads and 10 writes before"
+        asyncio.run(self.stats.db_record_event_points_snapshot(self.now))
+        self.assertEqual(self.database.queries, {"read": 1, "write": 1})
+        self.assertEqual(len(self.database.get_stats_rows("zbot")), 14)
+
+    def test_empty_table(self):
+        self.database.cnx.execute("DELETE FROM `axobot`.`event_points`")
+        asyncio.run(self.stats.db_record_event_points_snapshot(self.now))
+        self.assertEqual(self.database.queries, {"read": 1})
+
+    def test_snapshot_reused_by_leaderboard(self):
+        "The leaderboard is answered from the snapshot of the last stats cycle, until the next points update"
+        events = self.cogs["BotEvents"] = BotEvents(self.bot)
+        subcog = events.subcog
+
+        async def read_leaderboard():
+            return (await subcog.db_get_event_top(3), await subcog.db_get_participants_count(),
+                    await subcog.db_get_event_rank(3))
+
+        async def run_cycle():
+            await self.stats.db_record_event_points_snapshot(self.now)
+            self.assertEqual(self.database.queries, {"read": 1, "write": 1})
+            top, participants, rank = await read_leaderboard()
+            self.assertEqual(self.database.queries, {"read": 1, "write": 1})
+            self.assertEqual(top, [{"user_id": 5, "points": 10}, {"user_id": 2, "points": 5}, {"user_id": 3, "points": 3}])
+            self.assertEqual(participants, 4)
+            self.assertEqual(rank, {"user_id": 3, "points": 3, "rank": 3})
+            # after a points update, the leaderboard is read from the database again
+            events.invalidate_points_snapshot()
+            await subcog.db_get_event_top(3)
+            await subcog.db_get_participants_count()
+            self.assertEqual(self.database.queries, {"read": 3, "write": 1})
+
+        asyncio.run(run_cycle())
+
+
+if __name__ == "__main__":
+    unittest.main()
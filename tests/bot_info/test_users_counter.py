@@ -0,0 +1,113 @@
+import unittest
+from types import SimpleNamespace
+
+from modules.bot_info.src.users_counter import UsersCounter
+
+
+class FakeGuild:
+    "Guild with a members cache, like the ones of discord.py"
+
+    def __init__(self, guild_id: int, users: list[tuple[int, bool]]):
+        self.id = guild_id
+        self.members = [self.create_member(user_id, is_bot) for user_id, is_bot in users]
+
+    def create_member(self, user_id: int, is_bot: bool = False):
+        "Create a member of this guild, without adding it to the cache"
+        return SimpleNamespace(id=user_id, bot=is_bot, guild=self)
+
+
+class TestUsersCounter(unittest.TestCase):
+    "Check that the users counter stays consistent with the members cache when guilds and members change"
+
+    def setUp(self):
+        self.guild_a = FakeGuild(1, [(10, False), (11, False), (12, True)])
+        self.guild_b = FakeGuild(2, [(10, False), (12, True), (13, False), (14, True)])
+        self.guild_c = FakeGuild(3, [(11, False), (15, False)])
+        self.guilds = [self.guild_a, self.guild_b, self.guild_c]
+
+    def assert_counts(self, counter: UsersCounter, guilds: list[FakeGuild], users_count: int, bots_count: int):
+        self.assertTrue(counter.check_consistency(guilds))
+        self.assertEqual(counter.get_counts(), (users_count, bots_count))
+
+    def test_not_built(self):
+        "Events received before the first build are ignored"
+        counter = UsersCounter()
+        counter.add_guild(self.guild_a)
+        counter.add_member(self.guild_a.create_member(20))
+        self.assertFalse(counter.is_built)
+        self.assertEqual(counter.get_counts(), (0, 0))
+
+    def test_shared_members(self):
+        "Members of several guilds are counted once"
+        counter = UsersCounter()
+        counter.rebuild(self.guilds)
+        self.assert_counts(counter, self.guilds, 6, 2)
+
+    def test_member_leaving_one_guild(self):
+        "A member leaving one of their two guilds is still counted, until they leave the second one"
+        counter = UsersCounter()
+        counter.rebuild(self.guilds)
+        member = self.guild_a.members.pop(0)
+        counter.remove_member(member)
+        self.assert_counts(counter, self.guilds, 6, 2)
+        member = self.guild_b.members.pop(0)
+        counter.remove_member(member)
+        self.assert_counts(counter, self.guilds, 5, 2)
+        bot = self.guild_b.members.pop(0)
+        counter.remove_member(bot)
+        self.assert_counts(counter, self.guilds, 5, 2)
+        bot = self.guild_a.members.pop(-1)
+        counter.remove_member(bot)
+        self.assert_counts(counter, self.guilds, 4, 1)
+
+    def test_member_joining(self):
+        "A new member is counted once, even when joining a second guild"
+        counter = UsersCounter()
+        counter.rebuild(self.guilds)
+        for guild in (self.guild_a, self.guild_c):
+            member = guild.create_member(20, is_bot=True)
+            guild.members.append(member)
+            counter.add_member(member)
+            self.assert_counts(counter, self.guilds, 7, 3)
+
+    def test_unavailable_guild(self):
+        "Members of an unavailable guild are only counted while they share another guild with the bot"
+        counter = UsersCounter()
+        counter.rebuild(self.guilds)
+        counter.remove_guild(self.guild_b)
+        available_guilds = [self.guild_a, self.guild_c]
+        self.assert_counts(counter, available_guilds, 4, 1)
+        # events of an uncounted guild don't change anything
+        counter.remove_member(self.guild_b.members[0])
+        counter.remove_guild(self.guild_b)
+        self.assert_counts(counter, available_guilds, 4, 1)
+        counter.add_guild(self.guild_b)
+        self.assert_counts(counter, self.guilds, 6, 2)
+        # a guild already counted is not counted twice
+        counter.add_guild(self.guild_b)
+        self.assert_counts(counter, self.guilds, 6, 2)
+
+    def test_ignored_guilds(self):
+        "Members of ignored guilds are not counted, unless they are in another guild"
+        counter = UsersCounter(ignored_guilds=[self.guild_b.id])
+        counter.rebuild(self.guilds)
+        self.assert_counts(counter, self.guilds, 4, 1)
+        member = self.guild_b.create_member(20)
+        self.guild_b.members.append(member)
+        counter.add_member(member)
+        counter.remove_member(self.guild_b.members[0])
+        counter.add_guild(self.guild_b)
+        self.assert_counts(counter, self.guilds, 4, 1)
+        counter.rebuild(self.guilds, ignored_guilds=[self.guild_a.id])
+        self.assert_counts(counter, self.guilds, 7, 2)
+
+    def test_inconsistency_detection(self):
+        "A missed event is detected by the consistency check"
+        counter = UsersCounter()
+        counter.rebuild(self.guilds)
+        self.guild_c.members.append(self.guild_c.create_member(20))
+        self.assertFalse(counter.check_consistency(self.guilds))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,160 @@
+import asyncio
+import re
+import sqlite3
+import unittest
+from datetime import datetime, timedelta
+from types import SimpleNamespace
+
+from modules.bot_stats.src.rollups import StatsRollups, get_period_start
+
+RE_NAMED_PLACEHOLDER = re.compile(r"%\((\w+)\)s")
+
+
+class FakeReadQuery:
+    "Result of a read query on the fake database"
+
+    def __init__(self, rows: list[dict]):
+        self.rows = rows
+
+    async def __aenter__(self):
+        return self.rows
+
+    async def __aexit__(self, *_args):
+        pass
+
+
+class SqliteStatsDatabase:
+    "Stand-in of the stats database, running the MySQL queries of the rollups on SQLite"
+
+    def __init__(self):
+        self.cnx = sqlite3.connect(":memory:")
+        self.cnx.row_factory = sqlite3.Row
+        self.cnx.execute("ATTACH DATABASE ':memory:' AS `statsbot`")
+        for table in ("`statsbot`.`zbot`", "`statsbot`.`zbot-archives`"):
+            self.cnx.execute(f"CREATE TABLE {table} (`date` TEXT, `variable` TEXT, `value` REAL, `type` INT, `entity_id` INT)")
+        self.cnx.execute("""CREATE TABLE `statsbot`.`zbot_rollups` (`granularity` TEXT, `period_start` TEXT, `variable` TEXT,
+            `entity_id` INT, `value_sum` REAL, `value_count` INT, `value_min` REAL, `value_max` REAL, `type` INT)""")
+
+    @staticmethod
+    def _convert_arg(value):
+        return value.strftime("%Y-%m-%d %H:%M:%S") if isinstance(value, datetime) else value
+
+    def read(self, query: str, args: dict):
+        query = RE_NAMED_PLACEHOLDER.sub(r":\1", query)
+        rows = self.cnx.execute(query, {key: self._convert_arg(value) for key, value in args.items()}).fetchall()
+        return FakeReadQuery([dict(row) for row in rows])
+
+    def insert_raw_row(self, date: datetime, variable: str, value: float):
+        self.cnx.execute(
+            "INSERT INTO `statsbot`.`zbot` VALUES (?, ?, ?, 0, 0)",
+            (self._convert_arg(date), variable, value)
+        )
+
+    def insert_hour_rollup(self, period_start: datetime, variable: str, value_sum: float):
+        self.cnx.execute(
+            "INSERT INTO `statsbot`.`zbot_rollups` VALUES ('hour', ?, ?, 0, ?, 1, 0, 0, 0)",
+            (self._convert_arg(period_start), variable, value_sum)
+        )
+
+
+class TestRollupsSums(unittest.TestCase):
+    "Check how the sums over a window are split between the hourly summaries and the raw rows at its edges"
+
+    def setUp(self):
+        self.now = datetime(2024, 6, 1, 12, 34, 0)
+        self.database = SqliteStatsDatabase()
+        self.bot = SimpleNamespace(db_main=self.database, entity_id=0, utcnow=lambda: self.now)
+        self.rollups = StatsRollups(self.bot)
+        # one raw row per minute during the last 6 hours, up to now included, with the minute index as value
+        self.raw_rows: list[tuple[datetime, float]] = []
+        hours_sums: dict[datetime, float] = {}
+        for minute in range(6 * 60 + 1):
+            date = self.now - timedelta(minutes=minute)
+            self.raw_rows.append((date, minute))
+            self.database.insert_raw_row(date, "cmd.rank", minute)
+            self.database.insert_raw_row(date, "cmd.help", 1)
+            hour = get_period_start(date, "hour")
+            hours_sums[hour] = hours_sums.get(hour, 0) + minute
+        # the summaries include the current incomplete hour, like the ones updated every minute
+        for hour, value_sum in hours_sums.items():
+            self.database.insert_hour_rollup(hour, "cmd.rank", value_sum)
+            self.database.insert_hour_rollup(hour, "cmd.help", 1_000_000)
+
+    def get_expected_sum(self, minutes: int):
+        start = self.now - timedelta(minutes=minutes)
+        return sum(value for date, value in self.raw_rows if start <= date <= self.now)
+
+    def get_sums(self, minutes: int, prefix: bool = False, variable: str = "cmd.rank"):
+        return asyncio.run(self.rollups.get_sums(variable, minutes, prefix=prefix))
+
+    def test_windows_match_raw_rows(self):
+        "Every window length gives the same sum as the raw rows, whether it is aligned on hours or not"
+        self.rollups.is_initialized = True
+        for minutes in (1, 20, 34, 35, 60, 61, 94, 120, 180, 241, 300):
+            with self.subTest(minutes=minutes):
+                self.assertEqual(self.get_sums(minutes)["cmd.rank"][0], self.get_expected_sum(minutes))
+
+    def test_complete_hours_come_from_rollups(self):
+        "The complete hours of the window are read from the summaries, not from the raw rows"
+        self.rollups.is_initialized = True
+        # 09:34 -> 12:34: hours 10:00 and 11:00 are summarized, with a wrong value on purpose for cmd.help
+        result = self.get_sums(180, variable="cmd.help")
+        raw_edges_count = 26 + 35 # 09:34 to 09:59, then 12:00 to 12:34
+        self.assertEqual(result["cmd.help"][0], 2 * 1_000_000 + raw_edges_count)
+
+    def test_short_window_only_reads_raw_rows(self):
+        "A window without any complete hour is only read from the raw rows"
+        self.rollups.is_initialized = True
+        self.assertEqual(self.get_sums(20, variable="cmd.help")["cmd.help"][0], 21)
+
+    def test_not_initialized_only_reads_raw_rows(self):
+        "Until the backfill is done, the summaries are ignored"
+        self.assertFalse(self.rollups.is_initialized)
+        self.assertEqual(self.get_sums(180, variable="cmd.help")["cmd.help"][0], 181)
+
+    def test_prefix(self):
+        "Every variable starting with the prefix is summed separately"
+        self.rollups.is_initialized = True
+        result = self.get_sums(120, prefix=True, variable="cmd.")
+        self.assertEqual(set(result), {"cmd.rank", "cmd.help"})
+        self.assertEqual(result["cmd.rank"][0], self.get_expected_sum(120))
+
+
+class FakeCursor:
+    "Cursor recording the executed queries"
+
+    def __init__(self):
+        self.executed: list[tuple] = []
+
+    def execute(self, _query: str, args: tuple):
+        self.executed.append(args)
+
+
+class TestRollupsCutoff(unittest.TestCase):
+    "Check that the raw rows are summarized either by the backfill or every minute, never by both"
+
+    def test_record_minute_after_cutoff(self):
+        cutoff = datetime(2024, 6, 1, 12, 34)
+        rollups = StatsRollups(SimpleNamespace(entity_id=0))
+        rollups.cutoffs = {"hour": cutoff, "day": cutoff}
+        self.assertTrue(rollups.is_prepared)
+        cursor = FakeCursor()
+        rollups.record_minute(cursor, cutoff - timedelta(minutes=1))
+        self.assertEqual(cursor.executed, [])
+        rollups.record_minute(cursor, cutoff)
+        self.assertEqual(
+            [(args[0], args[1]) for args in cursor.executed],
+            [("hour", datetime(2024, 6, 1, 12)), ("day", datetime(2024, 6, 1))]
+        )
+
+    def test_not_prepared(self):
+        "Nothing is recorded before the cutoffs are known"
+        rollups = StatsRollups(SimpleNamespace(entity_id=0))
+        self.assertFalse(rollups.is_prepared)
+        cursor = FakeCursor()
+        rollups.record_minute(cursor, datetime(2024, 6, 1, 12, 34))
+        self.assertEqual(cursor.executed, [])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,149 @@
+import unittest
+
+from core.database.query.profiler import LATENCY_BUCKETS_MS, QueryTimings, SqlProfiler, get_query_fingerprint
+
+
+class TestQueryFingerprint(unittest.TestCase):
+    "Check that every execution of a statement gets the same fingerprint, and different statements different ones"
+
+    def assert_fingerprint(self, queries: list[str], expected: str):
+        for query in queries:
+            with self.subTest(query=query):
+                self.assertEqual(get_query_fingerprint(query), expected)
+
+    def test_arguments(self):
+        "Placeholders and literal values are replaced"
+        self.assert_fingerprint([
+            "SELECT `xp` FROM `xp` WHERE `userID` = %s AND `banned` = %s",
+            "SELECT `xp` FROM `xp` WHERE `userID` = %(user)s AND `banned` = %(banned)s",
+            "SELECT `xp` FROM `xp` WHERE `userID` = 123456789012345678 AND `banned` = 0",
+            "SELECT `xp`\n  FROM `xp`\n  WHERE `userID` = 1.5   AND `banned` = 'no'",
+        ], "SELECT `xp` FROM `xp` WHERE `userID` = ? AND `banned` = ?")
+        # numbers in names are not values
+        self.assert_fingerprint(["SELECT col1, t2.col FROM db1.t2 WHERE x = 3"], "SELECT col1, t2.col FROM db1.t2 WHERE x = ?")
+
+    def test_in_lists(self):
+        "IN lists of any length have the same fingerprint, but not subqueries"
+        self.assert_fingerprint([
+            "SELECT * FROM t WHERE id IN (1, 2, 3)",
+            "SELECT * FROM t WHERE id IN (%s,%s)",
+            "SELECT * FROM t WHERE id in ( 'a' )",
+            "SELECT * FROM t WHERE id IN (%(a)s, %(b)s, %(c)s, %(d)s)",
+        ], "SELECT * FROM t WHERE id IN (...)")
+        subquery = "SELECT * FROM t WHERE id IN (SELECT id FROM u)"
+        self.assert_fingerprint([subquery], subquery)
+
+    def test_values_lists(self):
+        "Inserts of any number of rows have the same fingerprint"
+        self.assert_fingerprint([
+            "INSERT INTO t (a, b) VALUES (%s, %s)",
+            "INSERT INTO t (a, b) VALUES (%s, %s), (%s, %s), (%s, %s)",
+            "INSERT INTO t (a, b) values (1, 'x'),(2, 'y')",
+        ], "INSERT INTO t (a, b) VALUES (...)")
+        self.assert_fingerprint(
+            ["INSERT INTO `xp` (`userID`,`xp`) VALUES (%(u)s, %(x)s) ON DUPLICATE KEY UPDATE xp = xp + %(x)s;"],
+            "INSERT INTO `xp` (`userID`,`xp`) VALUES (...) ON DUPLICATE KEY UPDATE xp = xp + ?;"
+        )
+
+    def test_numeric_tables(self):
+        "Tables named after a guild ID share the same fingerprint"
+        self.assert_fingerprint([
+            "SELECT `xp` FROM `123456789012345678` WHERE `userID` = %s",
+            "SELECT `xp` FROM `987654321098765432` WHERE `userID` = %s",
+        ], "SELECT `xp` FROM `?` WHERE `userID` = ?")
+
+    def test_strings(self):
+        "Quoted strings are replaced, including escaped and doubled quotes, and comment delimiters"
+        self.assert_fingerprint([
+            "SELECT * FROM t WHERE name = 'it''s' AND note = \"say \"\"hi\"\"\"",
+            "SELECT * FROM t WHERE name = 'it\\'s' AND note = ''",
+            "SELECT * FROM t WHERE name = '-- not a comment' AND note = '#1 /* no */'",
+        ], "SELECT * FROM t WHERE name = ? AND note = ?")
+
+    def test_comments(self):
+        "Comments are removed, even when they contain quotes"
+        self.assert_fingerprint([
+            "SELECT a FROM t WHERE b = %s",
+            "SELECT a -- first column\nFROM t WHERE b = %s",
+            "SELECT a /* don't read\n the rest */ FROM t WHERE b = %s # it's the end",
+            "SELECT a -- don't\nFROM t WHERE b = 'x'",
+        ], "SELECT a FROM t WHERE b = ?")
+
+
+class TestQueryTimings(unittest.TestCase):
+    "Check the latency histogram of a query"
+
+    def create_timings(self, durations: list[float]):
+        timings = QueryTimings()
+        for duration in durations:
+            timings.record(duration)
+        return timings
+
+    def test_empty(self):
+        timings = QueryTimings()
+        self.assertEqual(timings.percentile(50), 0.0)
+        self.assertEqual(timings.average_ms, 0.0)
+
+    def test_record(self):
+        timings = self.create_timings([0.1, 2, 3.5, 40])
+        self.assertEqual(timings.count, 4)
+        self.assertEqual(timings.total_ms, 45.6)
+        self.assertEqual(timings.average_ms, 11.4)
+        self.assertEqual(timings.max_ms, 40)
+        self.assertEqual(len(timings.buckets), len(LATENCY_BUCKETS_MS) + 1)
+
+    def test_bucket_bounds(self):
+        "A duration equal to the upper bound of a bucket is counted in that bucket"
+        timings = self.create_timings([0.25, 0.2500001, 1, 10000, 10000.1])
+        self.assertEqual(timings.buckets[LATENCY_BUCKETS_MS.index(0.25)], 1)
+        self.assertEqual(timings.buckets[LATENCY_BUCKETS_MS.index(0.5)], 1)
+        self.assertEqual(timings.buckets[LATENCY_BUCKETS_MS.index(1)], 1)
+        self.assertEqual(timings.buckets[LATENCY_BUCKETS_MS.index(10000)], 1)
+        # durations above the last bound have their own bucket
+        self.assertEqual(timings.buckets[-1], 1)
+
+    def test_percentiles(self):
+        "Percentiles are the upper bound of their bucket, without exceeding the longest duration"
+        timings = self.create_timings([0.1] * 9 + [40])
+        self.assertEqual(timings.percentile(50), 0.25)
+        self.assertEqual(timings.percentile(90), 0.25)
+        # in the (25, 50] bucket, but no query took 50ms
+        self.assertEqual(timings.percentile(95), 40)
+        self.assertEqual(timings.percentile(100), 40)
+        timings = self.create_timings([1, 1, 1, 3, 7])
+        self.assertEqual(timings.percentile(60), 1)
+        self.assertEqual(timings.percentile(61), 5)
+        self.assertEqual(timings.percentile(80), 5)
+        self.assertEqual(timings.percentile(81), 7)
+
+    def test_percentiles_above_last_bucket(self):
+        "Durations longer than the last bound are reported as the longest one"
+        timings = self.create_timings([3, 20000, 30000])
+        self.assertEqual(timings.percentile(30), 5)
+        self.assertEqual(timings.percentile(50), 30000)
+
+
+class TestSqlProfiler(unittest.TestCase):
+    "Check how the profiler groups the queries timings"
+
+    def test_record(self):
+        profiler = SqlProfiler()
+        profiler.record("SELECT * FROM t WHERE id = %s", 2)
+        profiler.record("SELECT * FROM t WHERE id = 5", 3)
+        profiler.record("SELECT * FROM t WHERE id IN (1, 2)", 1)
+        self.assertEqual(set(profiler.timings), {"SELECT * FROM t WHERE id = ?", "SELECT * FROM t WHERE id IN (...)"})
+        self.assertEqual([fingerprint for fingerprint, _ in profiler.get_top(1)], ["SELECT * FROM t WHERE id = ?"])
+        self.assertEqual(profiler.timings["SELECT * FROM t WHERE id = ?"].count, 2)
+        profiler.reset()
+        self.assertEqual(profiler.timings, {})
+
+    def test_slow_queries(self):
+        profiler = SqlProfiler()
+        self.assertFalse(profiler.is_slow(10**6))
+        profiler.slow_query_threshold_ms = 100
+        self.assertFalse(profiler.is_slow(99.9))
+        self.assertTrue(profiler.is_slow(100))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,204 @@
+import asyncio
+import json
+import struct
+import time
+import unittest
+from types import SimpleNamespace
+
+from modules.minecraft.minecraft import Minecraft
+from modules.minecraft.src.server_list_ping import (ServerListPingClient, ServerPingError, _decode_varint,
+                                                    _encode_string, _make_packet, _read_packet)
+
+STATUS_RESPONSE = {
+    "version": {"name": "1.20.4", "protocol": 765},
+    "players": {"online": 3, "max": 20, "sample": [{"name": "Steve", "id": "0"}, {"name": "Alex", "id": "1"}]},
+    "description": {"text": "A ", "extra": [{"text": "Minecraft"}, " server"]},
+}
+
+
+class FakeMinecraftServer:
+    "Local TCP server answering the Server List Ping like a modern, legacy or silent Minecraft server"
+
+    def __init__(self, kind: str):
+        self.kind = kind
+        self.connections_count = 0
+        self.handshakes: list[tuple[int, str, int, int]] = []
+        self.server: asyncio.Server | None = None
+        self.port: int | None = None
+
+    async def __aenter__(self):
+        self.server = await asyncio.start_server(self._handle, "127.0.0.1", 0)
+        self.port = self.server.sockets[0].getsockname()[1]
+        return self
+
+    async def __aexit__(self, *_args):
+        self.server.close()
+        await self.server.wait_closed()
+
+    async def _handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        self.connections_count += 1
+        try:
+            if self.kind == "modern":
+                await self._answer_modern(reader, writer)
+            elif self.kind == "legacy":
+                await self._answer_legacy(reader, writer)
+            elif self.kind == "silent":
+                await asyncio.sleep(10)
+        except (asyncio.IncompleteReadError, ConnectionError):
+            pass
+        finally:
+            writer.close()
+
+    async def _answer_modern(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        packet_id, payload = await _read_packet(reader)
+        assert packet_id == 0x00
+        protocol, offset = _decode_varint(payload)
+        if protocol >= 2**31:
+            # VarInts are signed 32-bit integers
+            protocol -= 2**32
+        host_length, offset = _decode_varint(payload, offset)
+        host = payload[offset:offset + host_length].decode()
+        port = struct.unpack(">H", payload[offset + host_length:offset + host_length + 2])[0]
+        next_state, _ = _decode_varint(payload, offset + host_length + 2)
+        self.handshakes.append((protocol, host, port, next_state))
+        packet_id, _ = await _read_packet(reader)
+        assert packet_id == 0x00
+        writer.write(_make_packet(0x00, _encode_string(json.dumps(STATUS_RESPONSE))))
+        await writer.drain()
+        packet_id, payload = await _read_packet(reader)
+        assert packet_id == 0x01
+        writer.write(_make_packet(0x01, payload))
+        await writer.drain()
+
+    async def _answer_legacy(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        first_byte = await reader.readexactly(1)
+        if first_byte != b"\xfe":
+            # old servers don't understand the modern handshake, and close the connection
+            return
+        response = "§1\x0047\x001.4.2\x00A legacy server\x005\x0010".encode("utf-16-be")
+        writer.write(b"\xff" + struct.pack(">H", len(response) // 2) + response)
+        await writer.drain()
+
+
+class TestServerListPing(unittest.IsolatedAsyncioTestCase):
+    "Check the Server List Ping client against local fake servers"
+
+    async def test_modern_ping(self):
+        "The handshake, status request and ping of Minecraft 1.7+ are supported"
+        async with FakeMinecraftServer("modern") as server:
+            client = ServerListPingClient(timeout=2)
+            status = await client.ping("127.0.0.1", server.port)
+        self.assertEqual(server.handshakes, [(-1, "127.0.0.1", server.port, 1)])
+        self.assertEqual(status.version, "1.20.4")
+        self.assertEqual(status.protocol, 765)
+        self.assertEqual((status.online_players, status.max_players), (3, 20))
+        self.assertEqual(status.players_sample, ["Steve", "Alex"])
+        self.assertEqual(status.description, "A Minecraft server")
+        self.assertIsNotNone(status.latency)
+        self.assertFalse(status.legacy)
+
+    async def test_legacy_fallback(self):
+        "Servers not understanding the modern handshake are pinged again with the legacy 0xFE request"
+        async with FakeMinecraftServer("legacy") as server:
+            client = ServerListPingClient(timeout=2)
+            status = await client.ping("127.0.0.1", server.port)
+        self.assertEqual(server.connections_count, 2)
+        self.assertTrue(status.legacy)
+        self.assertEqual(status.version, "1.4.2")
+        self.assertEqual(status.protocol, 47)
+        self.assertEqual((status.online_players, status.max_players), (5, 10))
+        self.assertEqual(status.description, "A legacy server")
+
+    async def test_silent_server_timeout(self):
+        "A server accepting the connection but never answering fails after the timeout, without a legacy attempt"
+        async with FakeMinecraftServer("silent") as server:
+            client = ServerListPingClient(timeout=0.2)
+            start = time.perf_counter()
+            with self.assertRaises(ServerPingError):
+                await client.ping("127.0.0.1", server.port)
+            self.assertLess(time.perf_counter() - start, 2)
+        self.assertEqual(server.connections_count, 1)
+
+    async def test_cache_and_concurrent_requests(self):
+        "Concurrent requests to the same address share one ping, and the next ones are answered from the cache"
+        async with FakeMinecraftServer("modern") as server:
+            client = ServerListPingClient(timeout=2)
+            results = await asyncio.gather(*(client.ping("127.0.0.1", server.port) for _ in range(10)))
+            self.assertEqual(server.connections_count, 1)
+            self.assertTrue(all(result is results[0] for result in results))
+            self.assertIs(await client.ping("127.0.0.1", server.port), results[0])
+            self.assertEqual(server.connections_count, 1)
+
+    async def test_failures_are_cached(self):
+        "A failed ping is cached too, to avoid hammering unreachable servers"
+        async with FakeMinecraftServer("silent") as server:
+            client = ServerListPingClient(timeout=0.2)
+            for _ in range(3):
+                with self.assertRaises(ServerPingError):
+                    await client.ping("127.0.0.1", server.port)
+        self.assertEqual(server.connections_count, 1)
+
+
+class FakeApiResponse:
+    "Response of the fake minetools.eu API"
+
+    def __init__(self, data: dict):
+        self.data = data
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *_args):
+        pass
+
+    async def json(self):
+        return self.data
+
+
+class FakeApiSession:
+    "Fake HTTP session answering the minetools.eu ping endpoint"
+
+    def __init__(self):
+        self.urls: list[str] = []
+
+    def get(self, url: str, timeout: float):
+        self.urls.append(url)
+        return FakeApiResponse({
+            "version": {"name": "Paper 1.20.4"}, "players": {"online": 1, "max": 50, "sample": [{"name": "Notch"}]},
+            "favicon": None, "latency": 42.0, "description": "From the API",
+        })
+
+
+class TestGetServerStatus(unittest.IsolatedAsyncioTestCase):
+    "Check how the Minecraft cog chooses between the direct ping and the HTTP APIs"
+
+    def create_cog(self, timeout: float):
+        bot = SimpleNamespace(log=SimpleNamespace(debug=lambda *_args: None, warning=lambda *_args: None))
+        cog = Minecraft(bot)
+        cog.ping_client = ServerListPingClient(timeout=timeout)
+        cog._session = FakeApiSession() # pylint: disable=protected-access
+        return cog
+
+    async def test_direct_ping(self):
+        "Servers answering the ping don't need the HTTP APIs"
+        cog = self.create_cog(timeout=2)
+        async with FakeMinecraftServer("modern") as server:
+            result = await cog.get_server_status(None, "127.0.0.1", str(server.port))
+        self.assertEqual(result.api, "Server List Ping")
+        self.assertEqual(result.ip, f"127.0.0.1:{server.port}")
+        self.assertEqual(result.players, ["Steve", "Alex"])
+        self.assertEqual(cog.session.urls, [])
+
+    async def test_api_fallback(self):
+        "When the ping fails, the status is fetched from the HTTP API"
+        cog = self.create_cog(timeout=0.2)
+        async with FakeMinecraftServer("silent") as server:
+            result = await cog.get_server_status(None, "127.0.0.1", str(server.port))
+        self.assertEqual(cog.session.urls, [f"https://api.minetools.eu/ping/127.0.0.1/{server.port}"])
+        self.assertEqual(result.api, "api.minetools.eu")
+        self.assertEqual(result.players, ["Notch"])
+        self.assertEqual(result.desc, "From the API")
+
+
+if __name__ == "__main__":
+    unittest.main()
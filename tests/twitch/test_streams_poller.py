@@ -0,0 +1,100 @@
+import asyncio
+import unittest
+from datetime import datetime, timedelta, timezone
+
+from modules.twitch.api.api_agent import TwitchApiAgent
+from modules.twitch.src.streams_poller import StreamsPoller
+
+
+class FakeHelixResponse:
+    "Response of the fake Helix API"
+
+    def __init__(self, data: list[dict]):
+        self.status = 200
+        self._data = data
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *_args):
+        pass
+
+    def raise_for_status(self):
+        pass
+
+    async def json(self):
+        return {"data": self._data, "pagination": {}}
+
+
+class FakeHelixSession:
+    "Fake HTTP session answering the Helix /streams endpoint like Twitch does, including its default page size"
+
+    def __init__(self, live_user_ids: set[str]):
+        self.live_user_ids = live_user_ids
+        self.requests_count = 0
+        self.closed = False
+
+    def get(self, url: str, headers: dict, params: dict):
+        assert url == "https://api.twitch.tv/helix/streams"
+        self.requests_count += 1
+        requested_ids = params["user_id"]
+        assert len(requested_ids) <= 100
+        first = int(params.get("first", 20))
+        streams = [
+            {"user_id": user_id, "user_login": f"streamer{user_id}", "type": "live"}
+            for user_id in requested_ids
+            if user_id in self.live_user_ids
+        ]
+        return FakeHelixResponse(streams[:first])
+
+
+def create_agent(session: FakeHelixSession):
+    "Create an API agent logged in to the fake API"
+    agent = TwitchApiAgent()
+    agent.client_id = "client-id"
+    agent._token = "token" # pylint: disable=protected-access
+    agent.token_expires_at = datetime.now(timezone.utc) + timedelta(hours=1)
+    agent._session = session # pylint: disable=protected-access
+    return agent
+
+
+class TestStreamsPoller(unittest.TestCase):
+    "Check the streams poller against a fake Helix API"
+
+    def setUp(self):
+        self.user_ids = [str(1000 + i) for i in range(250)]
+        # 3 out of 5 streamers are live, so more than 20 per request
+        self.live_user_ids = {user_id for i, user_id in enumerate(self.user_ids) if i % 5 < 3}
+
+    def test_every_live_streamer_is_detected(self):
+        session = FakeHelixSession(self.live_user_ids)
+        poller = StreamsPoller(create_agent(session).get_user_stream_by_id)
+        result = asyncio.run(poller.poll(self.user_ids))
+        self.assertEqual(session.requests_count, 3)
+        self.assertEqual({stream["user_id"] for stream in result.started}, self.live_user_ids)
+        self.assertEqual(result.ended, [])
+        self.assertEqual(result.errors, [])
+
+    def test_no_false_transitions_between_cycles(self):
+        poller = StreamsPoller(create_agent(FakeHelixSession(self.live_user_ids)).get_user_stream_by_id)
+        asyncio.run(poller.poll(self.user_ids))
+        # a new agent, to bypass the API cache
+        poller.fetch_streams = create_agent(FakeHelixSession(self.live_user_ids)).get_user_stream_by_id
+        result = asyncio.run(poller.poll(self.user_ids))
+        self.assertEqual(result.started, [])
+        self.assertEqual(result.ended, [])
+
+    def test_stream_end_is_detected(self):
+        poller = StreamsPoller(create_agent(FakeHelixSession(self.live_user_ids)).get_user_stream_by_id)
+        asyncio.run(poller.poll(self.user_ids))
+        stopped_user_id = min(self.live_user_ids)
+        poller.fetch_streams = create_agent(
+            FakeHelixSession(self.live_user_ids - {stopped_user_id})
+        ).get_user_stream_by_id
+        result = asyncio.run(poller.poll(self.user_ids))
+        self.assertEqual(result.started, [])
+        self.assertEqual(result.ended, [stopped_user_id])
+
+
+if __name__ == "__main__":
+    unittest.main()